@@ -0,0 +1,57 @@
+"""Batch log analysis throughput versus number of worker processes.
+
+    python benchmarks/batch_scaling.py --logs 16 --rows 200000 --workers 1 2 4 8
+
+Writes ``--logs`` synthetic client logs to a temporary directory and runs
+``tools/batch_analyze.py``'s analysis over them once per worker count.
+Sidecars are disabled so every run parses the CSVs; the speedup is relative
+to the single-process run and is bounded by the number of CPU cores.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.log_loading import write_synthetic_log
+from tools.batch_analyze import run_batch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark parallel batch log analysis.")
+    parser.add_argument('--logs', type=int, default=16, help='Number of synthetic logs.')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows per log.')
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help='Worker counts to run. Default: 1, 2, 4, ... up to the CPU count.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1 << i for i in range(cpus.bit_length())} | {cpus})
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.logs):
+            path = Path(tmp) / f"log_{i:03d}.csv"
+            write_synthetic_log(path, args.rows)
+            paths.append(path)
+        print(f"{args.logs} logs x {args.rows} rows, {cpus} CPUs")
+        print(f"{'workers':>8} {'time (s)':>9} {'logs/s':>8} {'rows/s':>11} {'speedup':>8}")
+        baseline = None
+        for n in workers:
+            start = time.perf_counter()
+            summary = run_batch(paths, workers=n, use_sidecar=False)
+            elapsed = time.perf_counter() - start
+            if "error" in summary.columns and summary["error"].notna().any():
+                raise RuntimeError(summary["error"].dropna().iloc[0])
+            baseline = baseline or elapsed
+            print(f"{n:>8} {elapsed:>9.2f} {args.logs / elapsed:>8.2f} {args.logs * args.rows / elapsed:>11,.0f} "
+                  f"{baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
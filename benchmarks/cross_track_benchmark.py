@@ -0,0 +1,89 @@
+"""Cross-track error: uniform-grid nearest-segment search versus brute force.
+
+    python benchmarks/cross_track_benchmark.py --sizes 10000 100000 1000000 --brute-max 100000
+
+Reference A and trace B follow the same stop-and-go route at 10 Hz; B has
+~0.3 m noise and 1% multipath outliers. Brute force computes every
+point-segment distance in NumPy chunks (O(N*M)) and is only run up to
+``--brute-max`` points; where both run, results must agree exactly.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.cross_track import cross_track_error, error_summary
+from dashboard.utils.geo import local_xy
+
+M_PER_DEG_LAT = 111320.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark cross-track error computation.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='Points per trace.')
+    parser.add_argument('--brute-max', type=int, default=100_000, help='Largest size to run brute force on.')
+    return parser.parse_args()
+
+
+def synthetic_trace(n, seed, noise_m, outlier_fraction=0.0):
+    """Non-repeating stop-and-go drive at 10 Hz; the route is the same for every seed"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 10.0
+    speed = 8 * (1 - np.cos(t / 20))
+    heading = 0.8 * np.sin(t / 90) + 0.5 * np.sin(t / 37) + t / 600
+    east = np.cumsum(speed * np.cos(heading)) / 10.0
+    north = np.cumsum(speed * np.sin(heading)) / 10.0
+    lat = 36.116588 + (north + rng.normal(0, noise_m, n)) / M_PER_DEG_LAT
+    lon = 128.364695 + (east + rng.normal(0, noise_m, n)) / (M_PER_DEG_LAT * np.cos(np.radians(36.116588)))
+    outliers = rng.random(n) < outlier_fraction
+    lat[outliers] += rng.normal(0, 10.0, outliers.sum()) / M_PER_DEG_LAT
+    return lat, lon
+
+
+def brute_force(ref_lat, ref_lon, lat, lon, chunk_pairs=1 << 24):
+    lat0, lon0 = float(ref_lat.mean()), float(ref_lon.mean())
+    rx, ry = local_xy(ref_lat, ref_lon, lat0, lon0)
+    qx, qy = local_xy(lat, lon, lat0, lon0)
+    x0, y0, dx, dy = rx[:-1], ry[:-1], np.diff(rx), np.diff(ry)
+    length2 = dx * dx + dy * dy
+    best = np.empty(len(qx))
+    step = max(1, chunk_pairs // len(x0))
+    for lo in range(0, len(qx), step):
+        px, py = qx[lo:lo + step, None], qy[lo:lo + step, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(length2 > 0, np.clip(((px - x0) * dx + (py - y0) * dy) / length2, 0, 1), 0)
+        best[lo:lo + step] = np.hypot(px - (x0 + t * dx), py - (y0 + t * dy)).min(axis=1)
+    return best
+
+
+def main():
+    args = parse_args()
+    print(f"{'points':>9} {'method':>12} {'time (s)':>9} {'p50 (m)':>8} {'p95 (m)':>8} {'max (m)':>8} {'max diff (m)':>13}")
+    for n in args.sizes:
+        ref_lat, ref_lon = synthetic_trace(n, seed=1, noise_m=0.02)
+        lat, lon = synthetic_trace(n, seed=2, noise_m=0.3, outlier_fraction=0.01)
+
+        start = time.perf_counter()
+        result = cross_track_error(ref_lat, ref_lon, lat, lon)
+        elapsed = time.perf_counter() - start
+        summary = error_summary(result.distance_m)
+        diff = "-"
+        if n <= args.brute_max:
+            brute_start = time.perf_counter()
+            expected = brute_force(ref_lat, ref_lon, lat, lon)
+            brute_elapsed = time.perf_counter() - brute_start
+            diff = f"{np.abs(expected - result.distance_m).max():.2e}"
+            brute_summary = error_summary(expected)
+            print(f"{n:>9} {'brute force':>12} {brute_elapsed:>9.3f} {brute_summary['p50']:>8.3f} "
+                  f"{brute_summary['p95']:>8.3f} {brute_summary['max']:>8.3f} {'-':>13}")
+        print(f"{n:>9} {'grid':>12} {elapsed:>9.3f} {summary['p50']:>8.3f} {summary['p95']:>8.3f} "
+              f"{summary['max']:>8.3f} {diff:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark the vectorized DTW engine against the dtw-python + haversine callback implementation.
+
+    python benchmarks/dtw_benchmark.py --sizes 500 1000 2000 --legacy-max 2000
+
+The legacy implementation (what log_analysis.py used to call) is only run up
+to ``--legacy-max`` points because it needs one Python callback per matrix
+cell. Peak memory is measured with tracemalloc in a second, untimed call.
+"""
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.trace_dtw import dtw_distance
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark DTW implementations on synthetic GNSS traces.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 5000, 18000], help='Points per trace.')
+    parser.add_argument('--legacy-max', type=int, default=2000, help='Largest size to run the legacy implementation on.')
+    parser.add_argument('--band-percent', type=float, default=10.0, help='Sakoe-Chiba half-width in percent of the trace length.')
+    return parser.parse_args()
+
+
+def synthetic_trace(n, seed):
+    """Loop-shaped drive around Gumi with ~5 cm noise"""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 2 * np.pi, n)
+    lat = 36.116588 + 0.002 * np.sin(t) + rng.normal(0, 5e-7, n)
+    lon = 128.364695 + 0.003 * np.cos(t) + rng.normal(0, 5e-7, n)
+    return np.column_stack((lat, lon))
+
+
+def legacy_dtw(trace1, trace2):
+    from dtw import dtw
+    from haversine import haversine as hvs
+
+    def gnss_distance(x, y):
+        return hvs((x[0], x[1]), (y[0], y[1]), unit='m')
+
+    alignment = dtw(trace1, trace2, dist_method=gnss_distance, keep_internals=True)
+    return alignment.normalizedDistance
+
+
+def run(fn):
+    """Time one call, then repeat it under tracemalloc for peak memory (tracing slows NumPy-heavy code)"""
+    start = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, elapsed, peak / 1e6
+
+
+def main():
+    args = parse_args()
+    try:
+        import dtw  # noqa: F401
+        import haversine  # noqa: F401
+        have_legacy = True
+    except ImportError:
+        print("dtw-python/haversine not installed, skipping the legacy implementation.")
+        have_legacy = False
+
+    print(f"{'points':>7} {'implementation':>22} {'time (s)':>9} {'peak MB':>9} {'norm. distance':>15}")
+    for n in args.sizes:
+        a = synthetic_trace(n, seed=1)
+        b = synthetic_trace(int(n * 1.1), seed=2)
+        radius = max(1, int(len(b) * args.band_percent / 100))
+        cases = [
+            ("vectorized full", lambda: dtw_distance(a, b).normalized_distance),
+            (f"sakoe-chiba {args.band_percent:g}%", lambda: dtw_distance(a, b, band="sakoe-chiba", radius=radius).normalized_distance),
+            ("itakura (slope 2)", lambda: dtw_distance(a, b, band="itakura").normalized_distance),
+            ("vectorized full + path", lambda: dtw_distance(a, b, return_path=True).normalized_distance),
+        ]
+        if have_legacy and n <= args.legacy_max:
+            cases.insert(0, ("legacy dtw-python", lambda: legacy_dtw(a, b)))
+        for name, fn in cases:
+            value, elapsed, peak_mb = run(fn)
+            print(f"{n:>7} {name:>22} {elapsed:>9.3f} {peak_mb:>9.1f} {value:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Error and speed of multiscale (FastDTW-style) DTW versus exact DTW on test traces.
+
+    python benchmarks/dtw_multiscale_accuracy.py --points 5000 --radii 1 2 5 10 20
+
+Exact DTW is the full-matrix vectorized engine, so ``--points`` should stay
+in the range where that is affordable.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.trace_dtw import dtw_distance, multiscale_dtw_distance
+
+M_PER_DEG_LAT = 111320.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare multiscale DTW against exact DTW.")
+    parser.add_argument('--points', type=int, default=5000, help='Points in trace A (B has ~10%% more).')
+    parser.add_argument('--radii', type=int, nargs='+', default=[1, 2, 5, 10, 20], help='Multiscale radii to test.')
+    return parser.parse_args()
+
+
+def loop(n, rng, noise_m=0.05, phase=None):
+    t = np.linspace(0, 2 * np.pi, n) if phase is None else phase
+    lat = 36.116588 + 0.002 * np.sin(t) + rng.normal(0, noise_m / M_PER_DEG_LAT, len(t))
+    lon = 128.364695 + 0.003 * np.cos(t) + rng.normal(0, noise_m / M_PER_DEG_LAT, len(t))
+    return np.column_stack((lat, lon))
+
+
+def test_cases(n, rng):
+    """(name, trace A, trace B) pairs covering the situations seen in comparison runs"""
+    m = int(n * 1.1)
+    base = loop(n, rng)
+    # Receiver B drives the same loop with a varying speed profile
+    u = np.linspace(0, 1, m)
+    warped = loop(m, rng, phase=2 * np.pi * (u + 0.05 * np.sin(4 * np.pi * u)))
+    # Receiver B offset by ~1.5 m (e.g. a float solution or antenna lever arm)
+    offset = loop(m, rng) + np.array([1.5 / M_PER_DEG_LAT, 0.0])
+    # Stop-and-go: B stays still for two stretches of the loop
+    stop_phase = np.interp(u, [0, 0.2, 0.35, 0.6, 0.75, 1.0], [0, 0.3, 0.3, 0.6, 0.6, 1.0]) * 2 * np.pi
+    stop_and_go = loop(m, rng, phase=stop_phase)
+    # Multipath: 2% of B's fixes jump by ~10 m (1 sigma)
+    multipath = loop(m, rng)
+    jumps = rng.random(m) < 0.02
+    multipath[jumps] += rng.normal(0, 10.0 / M_PER_DEG_LAT, (jumps.sum(), 2))
+    return [
+        ("noisy copy", base, loop(m, rng)),
+        ("time-warped", base, warped),
+        ("1.5 m offset", base, offset),
+        ("stop-and-go", base, stop_and_go),
+        ("multipath", base, multipath),
+    ]
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(7)
+    print(f"{'case':>14} {'method':>14} {'time (s)':>9} {'norm. dist (m)':>15} {'rel. error %':>13}")
+    for name, a, b in test_cases(args.points, rng):
+        start = time.perf_counter()
+        exact = dtw_distance(a, b)
+        exact_time = time.perf_counter() - start
+        print(f"{name:>14} {'exact':>14} {exact_time:>9.3f} {exact.normalized_distance:>15.4f} {0.0:>13.4f}")
+        for radius in args.radii:
+            start = time.perf_counter()
+            approx = multiscale_dtw_distance(a, b, radius=radius)
+            elapsed = time.perf_counter() - start
+            error = 100.0 * (approx.distance - exact.distance) / exact.distance
+            print(f"{name:>14} {f'radius {radius}':>14} {elapsed:>9.3f} {approx.normalized_distance:>15.4f} {error:>13.4f}")
+
+
+if __name__ == "__main__":
+    main()
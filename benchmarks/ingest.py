@@ -0,0 +1,166 @@
+"""TCP ingest throughput and CPU: the shared selector loop per sink versus the previous receive loop.
+
+    python benchmarks/ingest.py --messages 1000000 --idle 3
+
+A streamer subprocess sends ``--messages`` JSON fixes as fast as the socket
+allows. Each receiver drains them and reports messages/s and this process's
+CPU time per million messages (the streamer's CPU is not counted). The idle
+run connects to a silent streamer for ``--idle`` seconds and reports the CPU
+spent waiting: the previous loop polls with a 0.1 s socket timeout, the
+selector loop sleeps until data or a stop arrives. ``callback profiled`` is
+``ingest callback`` with the per-stage profiler enabled (the other ingest
+runs have it disabled).
+"""
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.services.gnss_ingest_process import parse_fix
+from dashboard.utils.gnss_ingest import CallbackSink, IngestLoop, QueueSink, RawSink, RingBufferSink, StopEvent
+from dashboard.utils.queue import ThreadSafeQueue
+from dashboard.utils.ring_buffer import SharedRingBuffer
+from dashboard.utils.stage_profiler import StageProfiler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark TCP ingest.")
+    parser.add_argument('--messages', type=int, default=1_000_000, help='Messages sent per run.')
+    parser.add_argument('--idle', type=float, default=3.0, help='Seconds of the idle-CPU run; 0 skips it.')
+    parser.add_argument('--serve', nargs=2, type=int, metavar=('MESSAGES', 'RUNS'), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def make_payload(n):
+    line = json.dumps({"timestamp": "2025-06-12 01:00:00.000", "gnss_time": "160000.00", "lat": 36.116588,
+                       "lon": 128.364695, "type": "fixed-rtk"}) + "\n"
+    return line.encode() * n
+
+
+def serve(messages, runs):
+    """Streamer: for each of ``runs`` connections, send everything (or nothing when messages is 0) and close"""
+    payload = make_payload(messages)
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        print(server.getsockname()[1], flush=True)
+        for _ in range(runs):
+            conn, _ = server.accept()
+            with conn:
+                if messages:
+                    conn.sendall(payload)
+                else:
+                    conn.recv(1)  # Silent until the receiver hangs up
+
+
+def legacy_receive(port, on_message, stop_event):
+    """The receive loop the client and the dashboard service used before the shared ingest"""
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5.0)
+    sock.settimeout(0.1)
+    data_buffer = b""
+    try:
+        while not stop_event.is_set():
+            try:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data_buffer += chunk
+                while b'\n' in data_buffer:
+                    message_bytes, data_buffer = data_buffer.split(b'\n', 1)
+                    msg_str = message_bytes.decode('utf-8', errors='replace').strip()
+                    if msg_str:
+                        on_message(msg_str)
+            except socket.timeout:
+                continue
+    finally:
+        sock.close()
+
+
+class CountSink(RawSink):
+
+    def __init__(self):
+        self.count = 0
+
+    def put_block(self, block, count, now):
+        self.count += count
+
+
+def ring_fix(ring):
+    def on_message(msg_str):
+        fix = parse_fix(msg_str)
+        if fix is not None:
+            ring.append(fix)
+    return on_message
+
+
+def receivers():
+    """name -> fn(port, stop_event) that receives until the streamer closes"""
+    def legacy(make_callback):
+        return lambda port, stop: legacy_receive(port, make_callback(), stop)
+
+    def ingest(make_sink, profiled=False):
+        def run(port, stop):
+            loop = IngestLoop(stop_event=stop, profiler=StageProfiler(enabled=profiled))
+            loop.connect("127.0.0.1", port, make_sink())
+            loop.run()
+        return run
+
+    return {
+        "legacy count": legacy(lambda: (lambda msg: None)),
+        "legacy ring+parse": legacy(lambda: ring_fix(SharedRingBuffer(10000))),
+        "ingest raw count": ingest(CountSink),
+        "ingest callback": ingest(lambda: CallbackSink(lambda msg: None)),
+        "callback profiled": ingest(lambda: CallbackSink(lambda msg: None), profiled=True),
+        "ingest queue": ingest(lambda: QueueSink(ThreadSafeQueue(max_size=100))),
+        "ingest ring+parse": ingest(lambda: RingBufferSink(SharedRingBuffer(10000), parse_fix)),
+    }
+
+
+def start_streamer(messages, runs):
+    process = subprocess.Popen([sys.executable, __file__, "--serve", str(messages), str(runs)],
+                               stdout=subprocess.PIPE, text=True)
+    return process, int(process.stdout.readline())
+
+
+def main():
+    args = parse_args()
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    runs = receivers()
+    process, port = start_streamer(args.messages, len(runs))
+    print(f"{'receiver':>20} {'time (s)':>9} {'messages/s':>12} {'CPU s / 1M msgs':>16}")
+    for name, run in runs.items():
+        cpu, start = time.process_time(), time.perf_counter()
+        run(port, StopEvent())
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+        print(f"{name:>20} {elapsed:>9.2f} {args.messages / elapsed:>12,.0f} {cpu / args.messages * 1e6:>16.2f}")
+    process.wait()
+
+    if args.idle > 0:
+        idle_runs = {"legacy": runs["legacy count"], "ingest": runs["ingest raw count"]}
+        process, port = start_streamer(0, len(idle_runs))
+        print(f"\n{'idle receiver':>20} {'CPU ms / s':>11} {'stop latency (ms)':>18}")
+        for name, run in idle_runs.items():
+            stop = StopEvent()
+            thread = threading.Thread(target=run, args=(port, stop))
+            cpu = time.process_time()
+            thread.start()
+            time.sleep(args.idle)
+            stopped = time.perf_counter()
+            stop.set()
+            thread.join()
+            latency = time.perf_counter() - stopped
+            cpu = time.process_time() - cpu
+            print(f"{name:>20} {cpu / args.idle * 1e3:>11.2f} {latency * 1e3:>18.1f}")
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Live stream ingest under UI load: receiver thread in the server process versus a child process.
+
+    python benchmarks/ingest_process.py --rate 2000 --duration 10 --ui-threads 1
+
+A streamer subprocess sends fixes at ``--rate`` messages/s, each stamped with
+its send time. The stream registry receives them either in a thread of this
+process (the default) or in an ingest child process (``--ingest-process`` on
+the dashboard), while ``--ui-threads`` threads keep the GIL busy with the
+kind of work a Streamlit rerun does (pandas and JSON serialization) and one
+viewer polls the stream into a LiveMapView like the live page does.
+Reported per mode: fixes seen by the viewer and dropped, the receive delay
+(receive time minus send time; it grows whenever the socket loop waits for
+the GIL) and the UI work completed.
+"""
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.services.gnss_stream_registry import GNSSStreamRegistry
+from dashboard.views.live_map import LiveMapView
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark live ingest in a thread vs a child process under UI load.")
+    parser.add_argument('--rate', type=float, default=2000.0, help='Messages per second sent.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per mode.')
+    parser.add_argument('--ui-threads', type=int, default=1, help='Threads simulating script reruns.')
+    parser.add_argument('--display-hz', type=float, default=5.0, help='Viewer poll rate.')
+    parser.add_argument('--serve', nargs=3, type=float, metavar=('RATE', 'DURATION', 'RUNS'), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def serve(rate, duration, runs):
+    """Streamer: for each of ``runs`` connections, send send-time-stamped fixes at ``rate``/s for ``duration`` s"""
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        print(server.getsockname()[1], flush=True)
+        for _ in range(int(runs)):
+            conn, _ = server.accept()
+            with conn:
+                start, sent = time.monotonic(), 0
+                while (elapsed := time.monotonic() - start) < duration:
+                    due = int(elapsed * rate) - sent
+                    if due > 0:
+                        now = repr(time.time())
+                        conn.sendall("".join(
+                            json.dumps({"timestamp": now, "gnss_time": "000000.00", "lat": 36.116588 + i * 1e-7,
+                                        "lon": 128.364695, "type": "fixed-rtk"}) + "\n"
+                            for i in range(sent, sent + due)).encode())
+                        sent += due
+                    time.sleep(0.002)
+
+
+def ui_work(stop, counter):
+    """A rerun's worth of GIL-holding work: build a frame, aggregate it and serialize it"""
+    rng = np.random.default_rng(0)
+    while not stop.is_set():
+        frame = pd.DataFrame({"lat": rng.random(20000), "lon": rng.random(20000), "fix": rng.integers(0, 5, 20000)})
+        summary = frame.groupby("fix").agg(["mean", "max"])
+        json.dumps(frame.head(5000).to_dict("records"))
+        summary.to_json()
+        counter[0] += 1
+
+
+def receive_delays(fixes):
+    if isinstance(fixes, np.ndarray):
+        return (fixes["recv_time"] - fixes["timestamp"].astype(np.float64)).tolist()
+    return [fix["recv_time"] - float(fix["timestamp"]) for fix in fixes]
+
+
+def run_mode(port, ingest_process, args):
+    registry = GNSSStreamRegistry(capacity=100_000, ingest_process=ingest_process)
+    stop = threading.Event()
+    counters = [[0] for _ in range(args.ui_threads)]
+    workers = [threading.Thread(target=ui_work, args=(stop, counter), daemon=True) for counter in counters]
+    for worker in workers:
+        worker.start()
+    cursor = registry.acquire("127.0.0.1", port)
+    live_map = LiveMapView()
+    delays, seen = [], 0
+    start = time.monotonic()
+    # Until the streamer hangs up (the child process needs a moment to start and connect)
+    while cursor.is_running or cursor.pending():
+        time.sleep(1.0 / args.display_hz)
+        fixes = cursor.poll()
+        seen += len(fixes)
+        delays.extend(receive_delays(fixes))
+        live_map.add_fixes(cursor.key, fixes)
+        live_map.deck().to_json()
+    elapsed = time.monotonic() - start
+    stop.set()
+    for worker in workers:
+        worker.join()
+    dropped = cursor.dropped
+    cursor.close()
+    registry.stop_all()
+    delays_ms = np.array(delays) * 1e3 if delays else np.zeros(1)
+    return seen, dropped, np.percentile(delays_ms, 50), np.percentile(delays_ms, 99), delays_ms.max(), \
+        sum(c[0] for c in counters) / elapsed
+
+
+def main():
+    args = parse_args()
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    modes = {"thread": False, "process": True}
+    process = subprocess.Popen([sys.executable, __file__, "--serve", str(args.rate), str(args.duration), str(len(modes))],
+                               stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline())
+    expected = int(args.rate * args.duration)
+    print(f"~{expected:,} fixes per mode at {args.rate:g}/s with {args.ui_threads} UI thread(s)")
+    print(f"{'ingest':>8} {'seen':>9} {'dropped':>8} {'p50 delay (ms)':>15} {'p99 delay (ms)':>15} "
+          f"{'max delay (ms)':>15} {'UI reruns/s':>12}")
+    for name, ingest_process in modes.items():
+        seen, dropped, p50, p99, worst, reruns = run_mode(port, ingest_process, args)
+        print(f"{name:>8} {seen:>9,} {dropped:>8,} {p50:>15.1f} {p99:>15.1f} {worst:>15.1f} {reruns:>12.1f}")
+    process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""KML export throughput: the streaming writer versus the previous iterrows() converter.
+
+    python benchmarks/kml_export.py --rows 100000 1000000 --legacy-max 100000
+
+Converts synthetic client logs with placemarks and a trace, as
+``tools/convert_log_to_kml.py --placemark --trace`` does. The legacy
+converter (one inline-styled placemark string per ``iterrows()`` row, joined
+in memory) is only run up to ``--legacy-max`` rows. ``tiled kmz`` is the
+``--tiles`` quadtree output, rendered by ``--workers`` processes.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.log_loading import write_synthetic_log
+from dashboard.utils.kml_tiles import TILE_POINTS
+from dashboard.utils.kml_writer import fix_type_color
+from dashboard.utils.log_loader import load_log
+from tools.convert_log_to_kml import ALL_FIX_TYPES, main as convert
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark KML export.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000], help='Rows per synthetic log.')
+    parser.add_argument('--legacy-max', type=int, default=100_000, help='Largest size to run the legacy converter on.')
+    parser.add_argument('--workers', type=int, default=None, help='Tile rendering processes. Default: CPU count.')
+    return parser.parse_args()
+
+
+def legacy_convert(input_path, output_path, name="GNSS Log"):
+    df = load_log(input_path, columns=['Latitude', 'Longitude', 'FixType'], use_sidecar=False)
+    placemarks, track_coords = [], []
+    for idx, row in df.iterrows():
+        lat, lon, fix_type = row['Latitude'], row['Longitude'], row['FixType']
+        placemarks.append(f"""
+      <Placemark>
+        <name>{name} {idx}</name>
+        <description>FixType: {fix_type}</description>
+        <Style>
+          <IconStyle>
+            <color>{fix_type_color(fix_type)}</color>
+            <scale>0.6</scale>
+            <Icon>
+              <href>http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png</href>
+            </Icon>
+          </IconStyle>
+        </Style>
+        <Point>
+          <coordinates>{lon},{lat},0</coordinates>
+        </Point>
+      </Placemark>
+""")
+        track_coords.append(f"{lon},{lat},0")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2">\n'
+                f'  <Document>\n    <name>{name}</name>\n    <Folder>\n      <name>{name} Points</name>\n'
+                f'{"".join(placemarks)}\n    </Folder>\n    <Placemark>\n      <name>GNSS Track</name>\n'
+                f'      <LineString>\n        <coordinates>\n          {" ".join(track_coords)}\n'
+                f'        </coordinates>\n      </LineString>\n    </Placemark>\n  </Document>\n</kml>\n')
+
+
+def streaming_convert(input_path, output_path, tiles=False, workers=None):
+    convert(argparse.Namespace(input=str(input_path), output=str(output_path), name="GNSS Log", downsample=1,
+                               trace=True, simplify=0.0, placemark=True, fix_types=ALL_FIX_TYPES,
+                               chunk_rows=200_000, tiles=tiles, tile_points=TILE_POINTS, workers=workers))
+
+
+def main():
+    args = parse_args()
+    print(f"{'rows':>10} {'method':>16} {'time (s)':>9} {'points/s':>11} {'size (MB)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            log_path = Path(tmp) / f"log_{rows}.csv"
+            write_synthetic_log(log_path, rows)
+            tiled = lambda i, o: streaming_convert(i, o, tiles=True, workers=args.workers)
+            runs = [("streaming kml", streaming_convert, "out.kml"), ("streaming kmz", streaming_convert, "out.kmz"),
+                    ("tiled kmz", tiled, "tiled.kmz")]
+            if rows <= args.legacy_max:
+                runs.insert(0, ("legacy kml", legacy_convert, "legacy.kml"))
+            for method, fn, name in runs:
+                output_path = Path(tmp) / name
+                start = time.perf_counter()
+                fn(log_path, output_path)
+                elapsed = time.perf_counter() - start
+                size_mb = os.path.getsize(output_path) / 1e6
+                print(f"{rows:>10} {method:>16} {elapsed:>9.2f} {rows / elapsed:>11,.0f} {size_mb:>10.1f}")
+                output_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
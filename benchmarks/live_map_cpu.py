@@ -0,0 +1,107 @@
+"""Server CPU per connected viewer for the live GNSS map.
+
+Feeds a synthetic fix stream into a shared ring buffer and runs N simulated
+viewers, each doing what the live page fragment does on every tick. Compares
+the old behaviour (rebuild the whole deck every 10 ms) with the incremental
+LiveMapView driven at the display rate.
+
+    python benchmarks/live_map_cpu.py --viewers 1 5 10 --duration 10 --fix-hz 10
+"""
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+
+import pydeck as pdk
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.ring_buffer import SharedRingBuffer
+from dashboard.views.live_map import LiveMapView
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure live map server CPU per viewer.")
+    parser.add_argument('--viewers', type=int, nargs='+', default=[1, 5, 10], help='Viewer counts to measure.')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per measurement.')
+    parser.add_argument('--fix-hz', type=float, default=10.0, help='Synthetic fix rate of the stream.')
+    parser.add_argument('--display-hz', type=float, default=5.0, help='Display rate of the incremental map.')
+    parser.add_argument('--prefill', type=int, default=20000, help='Fixes already in the trace when viewers attach.')
+    return parser.parse_args()
+
+
+def make_fix(i):
+    return {"lat": 36.116588 + i * 1e-6, "lon": 128.364695 + i * 1e-6, "fix_type": "fixed-rtk", "recv_time": time.time()}
+
+
+def legacy_viewer(buffer, stop_event, prefill):
+    """Old page: 10 ms fragment that rebuilds a full PathLayer deck from Python lists"""
+    cursor = 0
+    path = [[f["lon"], f["lat"]] for f in (make_fix(i) for i in range(prefill))]
+    while not stop_event.is_set():
+        items, cursor, _ = buffer.read_since(cursor)
+        path.extend([f["lon"], f["lat"]] for f in items)
+        deck = pdk.Deck(
+            map_style='mapbox://styles/mapbox/satellite-v9',
+            layers=[pdk.Layer("PathLayer", data=[{"path": path}], get_path='path')],
+        )
+        deck.to_json()
+        stop_event.wait(0.01)
+
+
+def incremental_viewer(buffer, stop_event, prefill, display_hz):
+    """New page: display-rate fragment feeding only the delta into LiveMapView"""
+    cursor = 0
+    live_map = LiveMapView()
+    live_map.add_fixes("bench", [make_fix(i) for i in range(prefill)])
+    while not stop_event.is_set():
+        items, cursor, _ = buffer.read_since(cursor)
+        live_map.add_fixes("bench", items)
+        live_map.deck().to_json()
+        stop_event.wait(1.0 / display_hz)
+
+
+def feeder(buffer, stop_event, fix_hz, start_index):
+    i = start_index
+    while not stop_event.wait(1.0 / fix_hz):
+        buffer.append(make_fix(i))
+        i += 1
+
+
+def measure(target, n_viewers, args):
+    buffer = SharedRingBuffer(capacity=10000)
+    stop_event = threading.Event()
+    threads = [threading.Thread(target=feeder, args=(buffer, stop_event, args.fix_hz, args.prefill), daemon=True)]
+    for _ in range(n_viewers):
+        viewer_args = (buffer, stop_event, args.prefill)
+        if target is incremental_viewer:
+            viewer_args += (args.display_hz,)
+        threads.append(threading.Thread(target=target, args=viewer_args, daemon=True))
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop_event.set()
+    for t in threads:
+        t.join()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return 100.0 * cpu / wall
+
+
+def main():
+    args = parse_args()
+    print(f"fix rate {args.fix_hz} Hz, display rate {args.display_hz} Hz, prefill {args.prefill} points, {args.duration}s per run")
+    print(f"{'viewers':>8} {'mode':>12} {'CPU %':>8} {'CPU %/viewer':>13}")
+    for n in args.viewers:
+        for name, target in (("legacy", legacy_viewer), ("incremental", incremental_viewer)):
+            cpu_pct = measure(target, n, args)
+            print(f"{n:>8} {name:>12} {cpu_pct:>8.1f} {cpu_pct / n:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
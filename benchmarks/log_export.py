@@ -0,0 +1,75 @@
+"""Throughput and peak memory of the streaming log exporters, per format and all formats in one pass.
+
+    python benchmarks/log_export.py --rows 1000000 4000000 --chunk-rows 200000
+
+Writes synthetic client logs of each size and exports each in a fresh
+subprocess per run, so peak RSS (VmHWM above the post-import baseline; Linux
+only) is measured independently. Peak memory should stay flat as the log
+grows; the ``all`` run reads the log once for every format.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.log_loading import write_synthetic_log
+from benchmarks.streaming_analysis import peak_rss_kb
+from dashboard.utils.log_exporters import EXPORTERS, export_log, exporter_for
+
+FORMATS = sorted(EXPORTERS)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark streaming log export.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 4_000_000], help='Rows per synthetic log.')
+    parser.add_argument('--chunk-rows', type=int, default=200_000, help='Rows per chunk.')
+    parser.add_argument('--child', nargs='+', metavar='ARG', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_child(path, chunk_rows, *outputs):
+    baseline_kb = peak_rss_kb()
+    start = time.perf_counter()
+    export_log(path, [exporter_for(output) for output in outputs], chunk_rows=int(chunk_rows))
+    elapsed = time.perf_counter() - start
+    peak_kb = peak_rss_kb()
+    sizes = [os.path.getsize(output) for output in outputs]
+    print(json.dumps({"elapsed": elapsed, "peak_mb": (peak_kb - baseline_kb) / 1024, "size_mb": sum(sizes) / 1e6}))
+
+
+def measure(path, chunk_rows, outputs):
+    output = subprocess.run([sys.executable, __file__, "--child", str(path), str(chunk_rows), *map(str, outputs)],
+                            check=True, capture_output=True, text=True).stdout
+    for out in outputs:
+        Path(out).unlink()
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+    print(f"{'rows':>10} {'format':>10} {'time (s)':>9} {'rows/s':>11} {'size (MB)':>10} {'peak RSS (MB)':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"log_{rows}.csv"
+            write_synthetic_log(path, rows)
+            runs = [(suffix.lstrip("."), [Path(tmp) / f"out{suffix}"]) for suffix in FORMATS]
+            runs.append(("all", [Path(tmp) / f"out{suffix}" for suffix in FORMATS]))
+            for label, outputs in runs:
+                result = measure(path, args.chunk_rows, outputs)
+                print(f"{rows:>10} {label:>10} {result['elapsed']:>9.2f} {rows / result['elapsed']:>11,.0f} "
+                      f"{result['size_mb']:>10.1f} {result['peak_mb']:>14.1f}")
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Load time and memory of the typed log loader versus plain ``pd.read_csv``.
+
+    python benchmarks/log_loading.py --rows 2000000
+
+Writes a synthetic client log (same header and formatting as
+gnss_eval_tcp_client.py) to a temporary directory, then loads it with plain
+``pd.read_csv`` (+ timestamp parsing), the typed CSV reader, the loader's
+first load (CSV + sidecar write) and sidecar loads with and without column
+projection. Memory is ``DataFrame.memory_usage(deep=True)``.
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.log_loader import LOG_COLUMNS, TRACE_COLUMNS, load_log, read_log_csv, sidecar_path
+
+FIX_TYPES = np.array(["fixed-rtk", "float-rtk", "no-rtk", "no-fix", "dead-reckoning"])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark GNSS log loading.")
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Rows in the synthetic log.')
+    parser.add_argument('--keep', type=str, default=None, help='Write the log to this path and keep it instead of using a temp dir.')
+    return parser.parse_args()
+
+
+def write_synthetic_log(path, rows, chunk=500_000):
+    """10 Hz drive with realistic FixType mix, written in chunks to bound memory"""
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2025-06-12 01:00:00")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(LOG_COLUMNS) + "\n")
+        for offset in range(0, rows, chunk):
+            n = min(chunk, rows - offset)
+            idx = np.arange(offset, offset + n)
+            ts = (start + pd.to_timedelta(idx * 100, unit="ms")).strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+            t = idx / 3000.0
+            frame = pd.DataFrame({
+                "TimestampKST": ts,
+                "GNSSTime": (start + pd.to_timedelta(idx * 100 - 9 * 3600 * 1000, unit="ms")).strftime("%H%M%S.%f").str[:-4],
+                "Latitude": np.round(36.116588 + 0.002 * np.sin(t), 6),
+                "Longitude": np.round(128.364695 + 0.003 * np.cos(t), 6),
+                "FixType": FIX_TYPES[rng.choice(len(FIX_TYPES), n, p=[0.8, 0.12, 0.05, 0.02, 0.01])],
+                "HPE(m)": np.round(rng.gamma(2.0, 0.02, n), 2),
+                "NorthingError(m)": np.round(rng.normal(0, 0.02, n), 2),
+                "EastingError(m)": np.round(rng.normal(0, 0.02, n), 2),
+                "MessageRate(Hz)": np.round(10 + rng.normal(0, 0.05, n), 2),
+            })
+            frame.to_csv(f, header=False, index=False)
+
+
+def legacy_load(path):
+    df = pd.read_csv(path)
+    df["TimestampKST"] = pd.to_datetime(df["TimestampKST"], format="ISO8601")
+    return df
+
+
+def measure(name, fn):
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+    memory_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{name:>34} {elapsed:>9.3f} {memory_mb:>10.1f} {len(df.columns):>5}")
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.keep) if args.keep else Path(tmp) / "synthetic_log.csv"
+        start = time.perf_counter()
+        write_synthetic_log(path, args.rows)
+        print(f"Wrote {args.rows} rows ({path.stat().st_size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f} s\n")
+        sidecar_path(path).unlink(missing_ok=True)
+
+        print(f"{'method':>34} {'time (s)':>9} {'memory MB':>10} {'cols':>5}")
+        measure("pd.read_csv + to_datetime", lambda: legacy_load(path))
+        measure("typed CSV, all columns", lambda: read_log_csv(path))
+        measure("typed CSV, trace columns", lambda: read_log_csv(path, TRACE_COLUMNS))
+        measure("first load (CSV + sidecar write)", lambda: load_log(path))
+        measure("sidecar, all columns", lambda: load_log(path))
+        measure("sidecar, trace columns", lambda: load_log(path, TRACE_COLUMNS))
+        print(f"\nSidecar size: {sidecar_path(path).stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""NMEA decoding throughput: NmeaDecoder versus a straightforward str.split parser.
+
+    python benchmarks/nmea_parse.py --epochs 200000
+
+Builds the output of a receiver at ``--epochs`` epochs: per epoch a GGA, an
+RMC and a GST sentence (the ones evaluated) plus a GSA and three GSV
+sentences (ignored), checksummed, with ``--corrupt`` of them damaged. Both
+parsers get it as framed blocks of ``--block-lines`` lines like the ingest
+loop delivers them. The baseline decodes each block to text and, per line,
+strips, splits off and verifies the checksum, splits the fields and converts
+the GGA/RMC/GST ones; ``NmeaDecoder`` works on the bytes and skips the
+unused sentence types before checksumming. Both must yield the same fixes.
+"""
+import sys
+import time
+import random
+import argparse
+import functools
+import operator
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.nmea import GGA_FIX_TYPES, NmeaDecoder
+
+GT_LAT, GT_LON = 36.116588, 128.364695
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark NMEA sentence decoding.")
+    parser.add_argument('--epochs', type=int, default=200_000, help='Epochs (7 sentences each).')
+    parser.add_argument('--block-lines', type=int, default=70, help='Lines per framed block.')
+    parser.add_argument('--corrupt', type=float, default=0.001, help='Fraction of sentences with a bad checksum.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per parser; the best is reported.')
+    return parser.parse_args()
+
+
+def sentence(body):
+    return f"${body}*{functools.reduce(operator.xor, body.encode(), 0):02X}\r\n"
+
+
+def ddmm(value, positive, negative, width):
+    hemisphere = positive if value >= 0 else negative
+    value = abs(value)
+    degrees = int(value)
+    return f"{degrees:0{width}d}{(value - degrees) * 60:08.5f}", hemisphere
+
+
+def epoch_sentences(i, rng):
+    seconds = 36000 + i * 0.1
+    hhmmss = f"{int(seconds // 3600):02d}{int(seconds % 3600 // 60):02d}{seconds % 60:05.2f}"
+    lat, ns = ddmm(GT_LAT + rng.gauss(0, 2e-6), "N", "S", 2)
+    lon, ew = ddmm(GT_LON + rng.gauss(0, 2e-6), "E", "W", 3)
+    quality = rng.choice((4, 4, 4, 4, 5, 1))
+    mode = {4: "R", 5: "F", 1: "A"}[quality]
+    return [
+        sentence(f"GNGGA,{hhmmss},{lat},{ns},{lon},{ew},{quality},18,0.61,52.3,M,24.1,M,1.0,0000"),
+        sentence(f"GNRMC,{hhmmss},A,{lat},{ns},{lon},{ew},0.012,,120625,,,{mode},V"),
+        sentence(f"GNGST,{hhmmss},12,0.011,0.008,45.2,0.012,0.009,0.021"),
+        sentence("GNGSA,A,3,05,13,15,18,20,23,24,29,,,,,1.12,0.61,0.94,1"),
+        sentence("GPGSV,3,1,11,05,38,305,45,13,55,048,47,15,71,173,48,18,27,253,41,1"),
+        sentence("GPGSV,3,2,11,20,24,041,40,23,12,156,35,24,40,110,44,29,31,315,43,1"),
+        sentence("GPGSV,3,3,11,30,09,199,31,36,44,152,42,40,10,255,,1"),
+    ]
+
+
+def make_blocks(args):
+    rng = random.Random(0)
+    lines = []
+    for i in range(args.epochs):
+        for line in epoch_sentences(i, rng):
+            if rng.random() < args.corrupt:
+                line = line.replace("1", "2", 1)
+            lines.append(line.encode())
+    return [b"".join(lines[i:i + args.block_lines]) for i in range(0, len(lines), args.block_lines)], len(lines)
+
+
+def split_coordinate(value, hemisphere):
+    if not value:
+        return None
+    degrees_len = value.index(".") - 2
+    decimal = int(value[:degrees_len]) + float(value[degrees_len:]) / 60.0
+    return -decimal if hemisphere in ("S", "W") else decimal
+
+
+class SplitParser:
+    """The baseline: text, str.split and a field dict per sentence (fixes before the first RMC wait for its date)"""
+
+    def __init__(self):
+        self.date = None
+        self.gst = None
+        self.undated = []
+
+    def feed_block(self, block):
+        fixes = []
+        for line in block.decode("ascii", errors="replace").split("\n"):
+            line = line.strip()
+            if not line.startswith("$") or "*" not in line:
+                continue
+            body, checksum = line[1:].split("*", 1)
+            if functools.reduce(operator.xor, map(ord, body), 0) != int(checksum[:2], 16):
+                continue
+            fields = body.split(",")
+            kind = fields[0][2:]
+            if kind == "GGA":
+                quality = int(fields[6] or 0)
+                lat, lon = split_coordinate(fields[2], fields[3]), split_coordinate(fields[4], fields[5])
+                if lat is None or lon is None:
+                    continue
+                fix = {"gnss_time": fields[1], "date": self.date, "lat": lat, "lon": lon,
+                       "type": GGA_FIX_TYPES.get(quality, "no-fix"), "alt": float(fields[9]) if fields[9] else None,
+                       "num_sats": int(fields[7]) if fields[7] else None,
+                       "hdop": float(fields[8]) if fields[8] else None}
+                if self.gst is not None:
+                    fix["std_lat"], fix["std_lon"], fix["std_time"] = self.gst
+                (fixes if self.date else self.undated).append(fix)
+            elif kind == "RMC":
+                self.date = fields[9] or self.date
+                for fix in self.undated:
+                    fix["date"] = self.date
+                fixes.extend(self.undated)
+                self.undated = []
+            elif kind == "GST":
+                self.gst = (float(fields[6]), float(fields[7]), fields[1])
+        return fixes
+
+
+def run(parser_factory, blocks):
+    parser = parser_factory()
+    started = time.perf_counter()
+    fixes = []
+    for block in blocks:
+        fixes.extend(parser.feed_block(block))
+    return time.perf_counter() - started, fixes
+
+
+def main():
+    args = parse_args()
+    blocks, sentences = make_blocks(args)
+    print(f"{sentences:,} sentences ({args.epochs:,} epochs) in {len(blocks):,} blocks")
+    print(f"{'parser':>12} {'time (s)':>9} {'sentences/s':>12} {'fixes':>9}")
+    results = {}
+    for name, factory in (("str.split", SplitParser), ("NmeaDecoder", NmeaDecoder)):
+        elapsed, fixes = min((run(factory, blocks) for _ in range(args.repeat)), key=lambda r: r[0])
+        results[name] = fixes
+        print(f"{name:>12} {elapsed:>9.2f} {sentences / elapsed:>12,.0f} {len(fixes):>9,}")
+    baseline, decoded = results["str.split"], results["NmeaDecoder"]
+    same = len(baseline) == len(decoded) and all(
+        a.keys() == b.keys() and all(abs(a[k] - b[k]) < 1e-9 if isinstance(a[k], float) else a[k] == b[k] for k in a)
+        for a, b in zip(baseline, decoded))
+    print(f"fixes identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
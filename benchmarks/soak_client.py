@@ -0,0 +1,200 @@
+"""Soak test: run the eval client against a paced stream and fail if its memory grows.
+
+    python benchmarks/soak_client.py --duration 3600 --rate 20 --eval-hz 20
+    python benchmarks/soak_client.py --replay drive.csv --duration 86400 -- --gt-lat 36.1 --gt-lon 128.3
+
+A streamer subprocess sends synthetic fixes (or loops over the rows of a
+client log with ``--replay``) at ``--rate`` messages/s for ``--duration``
+seconds and then hangs up. The client runs in this process with report-line
+logging to a temporary file and its console output discarded, so every
+buffer it keeps is exercised; arguments after ``--`` are passed to it. RSS
+(VmRSS; Linux only) and tracemalloc's traced memory are sampled every
+``--sample-interval`` seconds. After ``--warmup`` seconds, growth is the
+median of the last three samples minus the median of the first three; the
+run fails (exit 1) when RSS or traced growth exceeds its threshold. The top
+allocators grown since the warmup are printed either way.
+"""
+import os
+import sys
+import csv
+import json
+import socket
+import math
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+GT_LAT, GT_LON = 36.116588, 128.364695
+FIX_TYPES = ["fixed-rtk"] * 16 + ["float-rtk"] * 3 + ["no-rtk"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Soak-test the eval client for memory growth.",
+                                     epilog="Arguments after -- are passed to gnss_eval_tcp_client.py.")
+    parser.add_argument('--duration', type=float, default=600.0, help='Seconds to stream.')
+    parser.add_argument('--rate', type=float, default=20.0, help='Messages per second.')
+    parser.add_argument('--eval-hz', type=float, default=20.0, help='Client report rate.')
+    parser.add_argument('--replay', type=str, default=None, help='Client log CSV to loop over instead of synthetic fixes.')
+    parser.add_argument('--warmup', type=float, default=60.0, help='Seconds before the memory baseline.')
+    parser.add_argument('--sample-interval', type=float, default=5.0, help='Seconds between memory samples.')
+    parser.add_argument('--max-rss-growth-mb', type=float, default=8.0, help='Allowed RSS growth after warmup.')
+    parser.add_argument('--max-traced-growth-mb', type=float, default=2.0, help='Allowed tracemalloc growth after warmup.')
+    parser.add_argument('--top', type=int, default=10, help='Allocators shown.')
+    parser.add_argument('--serve', nargs=3, metavar=('RATE', 'DURATION', 'REPLAY'), help=argparse.SUPPRESS)
+    args, client_args = parser.parse_known_args()
+    if client_args and client_args[0] == '--':
+        client_args = client_args[1:]
+    return args, client_args
+
+
+def synthetic_fixes():
+    """Endless JSON fixes circling the default ground truth, shaped like the streamer's"""
+    i = 0
+    while True:
+        t = i / 600.0
+        seconds = i / 10.0 % 86400
+        yield json.dumps({
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "gnss_time": f"{int(seconds // 3600):02d}{int(seconds % 3600 // 60):02d}{seconds % 60:05.2f}",
+            "lat": round(GT_LAT + 0.0005 * math.sin(t), 7),
+            "lon": round(GT_LON + 0.0005 * math.cos(t), 7),
+            "type": FIX_TYPES[i % len(FIX_TYPES)],
+        })
+        i += 1
+
+
+def replayed_fixes(path):
+    """Rows of a client log as streamer fixes, from the start again at the end"""
+    while True:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = 0
+            for row in csv.DictReader(f):
+                try:
+                    lat, lon = float(row["Latitude"]), float(row["Longitude"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                rows += 1
+                yield json.dumps({"timestamp": row.get("TimestampKST"), "gnss_time": row.get("GNSSTime"),
+                                  "lat": lat, "lon": lon, "type": row.get("FixType")})
+        if not rows:
+            raise SystemExit(f"{path}: no rows with Latitude/Longitude")
+
+
+def serve(rate, duration, replay):
+    """Streamer: accept one client and send fixes at ``rate``/s in 10 ms batches for ``duration`` s"""
+    rate, duration = float(rate), float(duration)
+    fixes = replayed_fixes(replay) if replay != "-" else synthetic_fixes()
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        print(server.getsockname()[1], flush=True)
+        conn, _ = server.accept()
+        with conn:
+            start = time.monotonic()
+            sent = 0
+            while (elapsed := time.monotonic() - start) < duration:
+                due = int(elapsed * rate) - sent
+                if due > 0:
+                    conn.sendall("".join(next(fixes) + "\n" for _ in range(due)).encode())
+                    sent += due
+                time.sleep(0.01)
+
+
+def rss_mb():
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+
+class MemorySampler(threading.Thread):
+    """Samples (elapsed s, RSS MB, traced MB) and snapshots tracemalloc once the warmup is over"""
+
+    def __init__(self, interval, warmup):
+        super().__init__(daemon=True, name="MemorySampler")
+        self.interval = interval
+        self.warmup = warmup
+        self.samples = []
+        self.baseline = None
+        self.stop_event = threading.Event()
+
+    def run(self):
+        start = time.monotonic()
+        while not self.stop_event.wait(self.interval):
+            elapsed = time.monotonic() - start
+            if elapsed >= self.warmup and self.baseline is None:
+                self.baseline = tracemalloc.take_snapshot()
+            self.samples.append((elapsed, rss_mb(), tracemalloc.get_traced_memory()[0] / 2**20))
+
+    def growth(self):
+        """(RSS growth, traced growth, RSS slope MB/h) over the post-warmup samples, or None if too few"""
+        after = [s for s in self.samples if s[0] >= self.warmup]
+        if len(after) < 6:
+            return None
+        first, last = after[:3], after[-3:]
+        rss = statistics.median(s[1] for s in last) - statistics.median(s[1] for s in first)
+        traced = statistics.median(s[2] for s in last) - statistics.median(s[2] for s in first)
+        slope = statistics.linear_regression([s[0] for s in after], [s[1] for s in after]).slope * 3600
+        return rss, traced, slope
+
+
+def run_client(port, eval_hz, log_file, client_args):
+    import gnss_eval_tcp_client as client
+    client.ch.setStream(open(os.devnull, "w", encoding="utf-8"))  # Formatted and written, not shown
+    sys.argv = ["gnss_eval_tcp_client.py", "--tcp-host", "127.0.0.1", "--tcp-port", str(port),
+                "--eval-hz", str(eval_hz), "--log-enable", "--log-file", str(log_file), *client_args]
+    client.main()
+
+
+def main():
+    args, client_args = parse_args()
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    process = subprocess.Popen([sys.executable, __file__, "--serve", str(args.rate), str(args.duration),
+                                args.replay or "-"], stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline())
+    tracemalloc.start()
+    sampler = MemorySampler(args.sample_interval, args.warmup)
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = Path(tmp) / "soak.csv"
+        sampler.start()
+        started = time.monotonic()
+        try:
+            run_client(port, args.eval_hz, log_file, client_args)
+        finally:
+            sampler.stop_event.set()
+            process.kill()
+        final = tracemalloc.take_snapshot()
+        logged = sum(1 for _ in open(log_file, encoding="utf-8")) - 1 if log_file.exists() else 0
+    elapsed = time.monotonic() - started
+
+    print(f"\n{'time (s)':>9} {'RSS (MB)':>9} {'traced (MB)':>12}")
+    for t, rss, traced in sampler.samples:
+        print(f"{t:>9.0f} {rss:>9.1f} {traced:>12.2f}")
+    print(f"{elapsed:.0f} s, {logged} report lines logged")
+    if sampler.baseline is not None:
+        print(f"\nTop allocation growth since the {args.warmup:g} s warmup:")
+        for stat in final.compare_to(sampler.baseline, "lineno")[:args.top]:
+            print(f"  {stat}")
+
+    growth = sampler.growth()
+    if growth is None:
+        print("\nFAIL: too few samples after the warmup; lengthen --duration or shorten --warmup")
+        sys.exit(1)
+    rss, traced, slope = growth
+    ok = rss <= args.max_rss_growth_mb and traced <= args.max_traced_growth_mb
+    print(f"\n{'PASS' if ok else 'FAIL'}: RSS {rss:+.2f} MB (limit {args.max_rss_growth_mb:g}, trend {slope:+.2f} MB/h), "
+          f"traced {traced:+.2f} MB (limit {args.max_traced_growth_mb:g})")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Peak memory and time of chunked (streaming) log analysis versus loading the whole log.
+
+    python benchmarks/streaming_analysis.py --rows 1000000 4000000 --chunk-rows 200000
+
+Writes synthetic client logs of each size and summarizes them in a fresh
+subprocess per mode, so peak RSS (VmHWM above the post-import baseline;
+Linux only) is measured independently. Streaming peak memory should stay flat
+as the log grows; both modes must produce identical summaries.
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.log_loading import write_synthetic_log
+from dashboard.utils.log_loader import iter_log_chunks, read_log_csv
+from dashboard.utils.log_metrics import summarize_log, summarize_log_chunks
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark streaming log analysis.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 4_000_000], help='Rows per synthetic log.')
+    parser.add_argument('--chunk-rows', type=int, default=200_000, help='Rows per chunk in streaming mode.')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'PATH', 'CHUNK_ROWS'), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def peak_rss_kb():
+    # ru_maxrss survives exec (it would include the parent's peak); VmHWM belongs to this process image
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+
+
+def run_child(mode, path, chunk_rows):
+    baseline_kb = peak_rss_kb()
+    start = time.perf_counter()
+    if mode == "memory":
+        row = summarize_log(read_log_csv(path))
+    else:
+        row = summarize_log_chunks(iter_log_chunks(path, chunk_rows=int(chunk_rows), use_sidecar=False))
+    elapsed = time.perf_counter() - start
+    peak_kb = peak_rss_kb()
+    print(json.dumps({"elapsed": elapsed, "peak_mb": (peak_kb - baseline_kb) / 1024, "row": row}, default=str))
+
+
+def measure(mode, path, chunk_rows):
+    output = subprocess.run([sys.executable, __file__, "--child", mode, str(path), str(chunk_rows)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        run_child(*args.child)
+        return
+    print(f"{'rows':>10} {'mode':>10} {'time (s)':>9} {'rows/s':>11} {'peak RSS (MB)':>14} {'identical':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"log_{rows}.csv"
+            write_synthetic_log(path, rows)
+            results = {mode: measure(mode, path, args.chunk_rows) for mode in ("memory", "stream")}
+            identical = results["memory"]["row"] == results["stream"]["row"]
+            for mode, result in results.items():
+                print(f"{rows:>10} {mode:>10} {result['elapsed']:>9.2f} {rows / result['elapsed']:>11,.0f} "
+                      f"{result['peak_mb']:>14.1f} {str(identical):>10}")
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
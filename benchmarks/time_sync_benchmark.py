@@ -0,0 +1,93 @@
+"""Time synchronization on multi-hour logs: notebook pandas sync vs the vectorized engine.
+
+    python benchmarks/time_sync_benchmark.py --hours 1 3 6 --offset 2.37
+
+Log A is sampled at ``--rate-a`` Hz and log B at ``--rate-b`` Hz with timing
+jitter, a 1 m antenna offset and its clock ahead of A's by ``--offset``
+seconds. The drive is stop-and-go so speed carries timing information.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.time_sync import sync_logs
+
+M_PER_DEG_LAT = 111320.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark GNSS log time synchronization.")
+    parser.add_argument('--hours', type=float, nargs='+', default=[1, 3, 6], help='Log durations in hours.')
+    parser.add_argument('--rate-a', type=float, default=10.0, help='Sampling rate of log A in Hz.')
+    parser.add_argument('--rate-b', type=float, default=5.0, help='Sampling rate of log B in Hz.')
+    parser.add_argument('--offset', type=float, default=2.37, help="True offset of B's clock in seconds.")
+    parser.add_argument('--legacy-max-hours', type=float, default=6.0, help='Longest log to run the notebook implementation on.')
+    return parser.parse_args()
+
+
+def synthetic_log(hours, rate_hz, seed, clock_offset_s=0.0, jitter_s=0.0, position_offset_m=(0.0, 0.0)):
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * rate_hz)
+    t = np.sort(np.arange(n) / rate_hz + rng.normal(0, jitter_s, n))
+    along = 8 * (t - 20 * np.sin(t / 20))  # Speed 8 * (1 - cos(t / 20)) m/s, stopping every ~2 min
+    lat = 36.116588 + 0.003 * np.sin(along / 200) + (position_offset_m[0] + rng.normal(0, 0.02, n)) / M_PER_DEG_LAT
+    lon = 128.364695 + 0.004 * np.cos(along / 200) + (position_offset_m[1] + rng.normal(0, 0.02, n)) / M_PER_DEG_LAT
+    timestamps = pd.Timestamp("2025-06-12 01:00:00") + pd.to_timedelta((t + clock_offset_s) * 1e9, unit="ns")
+    return pd.DataFrame({
+        "TimestampKST": timestamps,
+        "Latitude": lat,
+        "Longitude": lon,
+        "FixType": pd.Categorical(["fixed-rtk"] * n),
+    })
+
+
+def legacy_sync(df_a, df_b, time_col='TimestampKST'):
+    """sync_gnss from notebooks/time_sync_analyze.ipynb (without the FixType rewrite)"""
+    df_a_proc = df_a.set_index(time_col).sort_index()
+    df_b_proc = df_b.set_index(time_col).sort_index()
+    common_start_time = max(df_a_proc.index.min(), df_b_proc.index.min())
+    common_end_time = min(df_a_proc.index.max(), df_b_proc.index.max())
+    synced_a = df_a_proc.loc[common_start_time:common_end_time]
+    df_b_trimmed = df_b_proc.loc[common_start_time:common_end_time]
+    combined_index = synced_a.index.union(df_b_trimmed.index)
+    df_b_reindexed = df_b_trimmed.reindex(combined_index)
+    numeric_cols = df_b_reindexed.select_dtypes(include=np.number).columns.tolist()
+    df_b_reindexed[numeric_cols] = df_b_reindexed[numeric_cols].interpolate(method='time')
+    return synced_a, df_b_reindexed.reindex(synced_a.index)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    print(f"{'hours':>6} {'rows A':>9} {'rows B':>9} {'method':>28} {'time (s)':>9} {'offset (s)':>11} {'error (ms)':>11}")
+    for hours in args.hours:
+        df_a = synthetic_log(hours, args.rate_a, seed=1)
+        df_b = synthetic_log(hours, args.rate_b, seed=2, clock_offset_s=args.offset,
+                             jitter_s=0.002, position_offset_m=(1.0, 0.5))
+        prefix = f"{hours:>6g} {len(df_a):>9} {len(df_b):>9}"
+        if hours <= args.legacy_max_hours:
+            _, elapsed = timed(lambda: legacy_sync(df_a, df_b))
+            print(f"{prefix} {'notebook sync (no offset)':>28} {elapsed:>9.3f} {'-':>11} {'-':>11}")
+        _, elapsed = timed(lambda: sync_logs(df_a, df_b, estimate_offset=False))
+        print(f"{prefix} {'align only':>28} {elapsed:>9.3f} {'-':>11} {'-':>11}")
+        for signal in ("speed", "position"):
+            result, elapsed = timed(lambda: sync_logs(df_a, df_b, signal=signal))
+            offset = result.offset.offset_s
+            error_ms = 1000 * (offset - args.offset)
+            print(f"{prefix} {f'estimate ({signal}) + align':>28} {elapsed:>9.3f} {offset:>11.4f} {error_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Loopback latency of the input transports: TCP, Unix-domain stream, UDP and UDP multicast.
+
+    python benchmarks/transports.py --rate 1000 --duration 5 --receivers 1
+    python benchmarks/transports.py --receivers 4
+
+A streamer subprocess sends JSON fixes at ``--rate`` messages/s, each stamped
+with its send time, to ``--receivers`` inputs of one ``IngestLoop`` in this
+process, the way the eval client receives them. TCP and Unix-domain receivers
+each connect to the streamer, which writes every batch to every connection;
+UDP sends one datagram per fix to each receiver's port; multicast sends each
+fix once to a group that all receivers join. Reported per transport: fixes
+received out of those sent (UDP may drop), the receive delay (receive time
+minus send time) and the streamer's CPU time per fix, which shows what
+fanning out to several evaluators costs the sender.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.gnss_ingest import IngestLoop, Sink, StopEvent, start_ingest_thread
+
+MULTICAST_GROUP = "239.255.50.12"
+LOOPBACK = "127.0.0.1"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark input transport latency on loopback.")
+    parser.add_argument('--rate', type=float, default=1000.0, help='Messages per second sent.')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per transport.')
+    parser.add_argument('--receivers', type=int, default=1, help='Inputs receiving the stream.')
+    parser.add_argument('--serve', nargs=5, metavar=('TRANSPORT', 'RATE', 'DURATION', 'RECEIVERS', 'TARGET'),
+                        help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def fix_line(i):
+    return json.dumps({"timestamp": repr(time.time()), "gnss_time": "000000.00", "lat": 36.116588 + i * 1e-7,
+                       "lon": 128.364695, "type": "fixed-rtk"})
+
+
+def paced(rate, duration):
+    """Yields the indices of the fixes due every 1 ms for ``duration`` s"""
+    start, sent = time.monotonic(), 0
+    while (elapsed := time.monotonic() - start) < duration:
+        due = int(elapsed * rate) - sent
+        if due > 0:
+            yield range(sent, sent + due)
+            sent += due
+        time.sleep(0.001)
+
+
+def serve(transport, rate, duration, receivers, target):
+    """Streamer: print where to connect (stream transports), send, then print the fixes sent and CPU seconds"""
+    rate, duration, receivers = float(rate), float(duration), int(receivers)
+    sent = 0
+    if transport in ("tcp", "unix"):
+        if transport == "tcp":
+            server = socket.create_server((LOOPBACK, 0))
+            print(server.getsockname()[1], flush=True)
+        else:
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(target)
+            server.listen()
+            print(target, flush=True)
+        with server:
+            conns = [server.accept()[0] for _ in range(receivers)]
+        cpu = time.process_time()
+        for batch in paced(rate, duration):
+            payload = "".join(fix_line(i) + "\n" for i in batch).encode()
+            for conn in conns:
+                conn.sendall(payload)
+            sent += len(batch)
+        for conn in conns:
+            conn.close()
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if transport == "multicast":
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(LOOPBACK))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            addresses = [(MULTICAST_GROUP, int(target))]
+        else:
+            addresses = [(LOOPBACK, int(port)) for port in target.split(",")]
+        print("ready", flush=True)
+        cpu = time.process_time()
+        for batch in paced(rate, duration):
+            for i in batch:
+                datagram = fix_line(i).encode()
+                for address in addresses:
+                    sock.sendto(datagram, address)
+            sent += len(batch)
+        sock.close()
+    print(sent, time.process_time() - cpu, flush=True)
+
+
+class DelaySink(Sink):
+    """Collects receive time minus send time of every fix"""
+
+    def __init__(self, delays):
+        self.delays = delays
+
+    def put_many(self, messages, now):
+        received = time.time()      # ``now`` is monotonic; send times are wall clock
+        self.delays.extend(received - float(json.loads(message)["timestamp"]) for message in messages)
+
+
+def run_transport(transport, args, tmp):
+    loop = IngestLoop(stop_event=StopEvent())
+    delays = []
+    command = [sys.executable, __file__, "--serve", transport, str(args.rate), str(args.duration), str(args.receivers)]
+    if transport in ("udp", "multicast"):
+        host = MULTICAST_GROUP if transport == "multicast" else LOOPBACK
+        port = 0
+        ports = []
+        for _ in range(args.receivers):
+            connection = loop.bind_udp(host, port, DelaySink(delays), interface=LOOPBACK)
+            ports.append(connection.sock.getsockname()[1])
+            if transport == "multicast":
+                port = ports[0]  # Every receiver joins the group on the same port
+        target = str(ports[0]) if transport == "multicast" else ",".join(map(str, ports))
+        process = subprocess.Popen(command + [target], stdout=subprocess.PIPE, text=True)
+        process.stdout.readline()
+    else:
+        target = os.path.join(tmp, "gnss.sock") if transport == "unix" else "-"
+        process = subprocess.Popen(command + [target], stdout=subprocess.PIPE, text=True)
+        address = process.stdout.readline().strip()
+        for _ in range(args.receivers):
+            if transport == "unix":
+                loop.connect_unix(address, DelaySink(delays))
+            else:
+                loop.connect(LOOPBACK, int(address), DelaySink(delays))
+    reader = start_ingest_thread(loop, name=f"Ingest-{transport}")
+    sent, sender_cpu = process.stdout.readline().split()
+    process.wait()
+    time.sleep(0.2)  # Datagrams have no end of stream; let the last ones arrive
+    loop.stop()
+    reader.join()
+    expected = int(sent) * args.receivers
+    delays_us = np.array(delays) * 1e6 if delays else np.zeros(1)
+    return len(delays), expected, np.percentile(delays_us, 50), np.percentile(delays_us, 99), delays_us.max(), \
+        float(sender_cpu) / int(sent) * 1e6
+
+
+def main():
+    args = parse_args()
+    if args.serve:
+        serve(*args.serve)
+        return
+
+    print(f"{args.rate:g} fixes/s for {args.duration:g} s to {args.receivers} receiver(s)")
+    print(f"{'transport':>10} {'received':>17} {'p50 delay (us)':>15} {'p99 delay (us)':>15} {'max delay (us)':>15} "
+          f"{'sender CPU us/fix':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for transport in ("tcp", "unix", "udp", "multicast"):
+            try:
+                received, expected, p50, p99, worst, sender_cpu = run_transport(transport, args, tmp)
+            except OSError as e:
+                print(f"{transport:>10} unavailable here: {e}")
+                continue
+            print(f"{transport:>10} {f'{received:,}/{expected:,}':>17} {p50:>15.0f} {p99:>15.0f} {worst:>15.0f} "
+                  f"{sender_cpu:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
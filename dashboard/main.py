@@ -21,6 +21,7 @@ from dashboard.utils.logger import logger
 from dashboard.utils.queue import ThreadSafeQueue
 from dashboard.services.gnss_data_tcp_service import GNSSDataTCPService
 from dashboard.views.sidebar import Sidebar
+from dashboard.utils.result_cache import DEFAULT_CACHE_DIR, DEFAULT_MEMORY_BUDGET_MB, DEFAULT_DISK_BUDGET_MB
 
 
 
@@ -34,6 +35,29 @@ def arg_parser():
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Set the logging level (default: INFO)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached parsed logs and analysis results; empty disables the disk cache (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-memory-mb",
+        type=int,
+        default=DEFAULT_MEMORY_BUDGET_MB,
+        help=f"In-memory budget of the analysis cache in MB (default: {DEFAULT_MEMORY_BUDGET_MB})",
+    )
+    parser.add_argument(
+        "--cache-disk-mb",
+        type=int,
+        default=DEFAULT_DISK_BUDGET_MB,
+        help=f"On-disk budget of the analysis cache in MB (default: {DEFAULT_DISK_BUDGET_MB})",
+    )
+    parser.add_argument(
+        "--ingest-process",
+        action="store_true",
+        help="Receive and parse live GNSS streams in a child process per stream, handing fixes over in shared memory (keeps the socket loop off the server's GIL)",
+    )
     
     return parser.parse_args()
 
@@ -42,7 +66,12 @@ def main():
     
     app_config = {
         "log_level": args.log_level.upper(),
+        "cache_dir": args.cache_dir,
+        "cache_memory_mb": args.cache_memory_mb,
+        "cache_disk_mb": args.cache_disk_mb,
+        "ingest_process": args.ingest_process,
     }
+    st.session_state.app_config = app_config
     
     logger.setLevel(app_config["log_level"])
     logger.info(f"Starting GNSS Dashboard Client with config: {app_config}")
@@ -1,8 +1,8 @@
 import streamlit as st
-import pydeck as pdk
-import pandas as pd
 
 from dashboard.utils.logger import logger
+from dashboard.services.gnss_stream_registry import get_stream_registry
+from dashboard.views.live_map import LiveMapView
 
 st.set_page_config(
     page_title="Live GNSS",
@@ -12,48 +12,72 @@ st.set_page_config(
 
 st.title("Live GNSS")
 
-@st.fragment(run_every=0.01)
-def map_update():
-    # Map placeholder
-    with st.empty().container():
+STREAM_IDS = (1, 2)
+DEFAULT_DISPLAY_HZ = 5.0
+TRACE_WINDOWS = {"Full trace": None, "Last 1 min": 60.0, "Last 5 min": 300.0, "Last 15 min": 900.0, "Last 60 min": 3600.0}
 
-        layers = [
-            # pdk.Layer(
-            #     'ScatterplotLayer',
-            #     data=pd.DataFrame([st.session_state.df.iloc[-1]]),
-            #     get_position='[lon, lat]',
-            #     get_color=[200, 30, 0, 160],
-            #     get_radius=1,
-            # ),
-            # pdk.Layer(
-            #     'PathLayer',
-            #     data=[{"path": st.session_state.df[['lon', 'lat']].values.tolist()}],
-            #     get_path='path',
-            #     get_color=[255, 0, 0, 255],  # Bright red, fully opaque
-            #     get_width=0.01,  # Increased width
-            #     pickable=True,
-            #     width_scale=20,  # Scale the width
-            #     width_min_pixels=5,  # Ensure minimum width
-            # ),
-        ]
+def stream_registry():
+    # --ingest-process runs each stream's socket loop and parsing in a child process
+    return get_stream_registry(st.session_state.get("app_config", {}).get("ingest_process", False))
 
-        st.pydeck_chart(
-            pdk.Deck(
-                map_style='mapbox://styles/mapbox/satellite-v9',
-                # initial_view_state=pdk.ViewState(
-                #     latitude=lat,
-                #     longitude=lon,
-                #     zoom=zoom
-                # ),
-                layers=layers,
-            )
-        )
-        
-map_update()
+if "live_map" not in st.session_state:
+    st.session_state.live_map = LiveMapView()
+
+display_hz = st.sidebar.slider(
+    "Map refresh rate (Hz)",
+    min_value=0.5,
+    max_value=20.0,
+    value=DEFAULT_DISPLAY_HZ,
+    step=0.5,
+    help="Upper bound on map updates; fixes arriving in between are coalesced into one update"
+)
+trace_window = st.sidebar.selectbox("Trace window", options=list(TRACE_WINDOWS))
+max_map_points = st.sidebar.number_input(
+    "Max map points per stream",
+    min_value=100,
+    max_value=100000,
+    value=5000,
+    step=500,
+    help="Older parts of the trace are drawn from decimated levels so the map never exceeds this"
+)
+st.session_state.live_map.configure(int(max_map_points), TRACE_WINDOWS[trace_window])
+
+def map_update():
+    live_map = st.session_state.live_map
+    for id in STREAM_IDS:
+        cursor = st.session_state.get(f"gnss_stream_{id}_cursor")
+        if cursor is not None:
+            # Only the fixes received since the last tick; the deck is rebuilt only if there are any.
+            # Traces are keyed per slot: two slots may attach to the same shared stream.
+            live_map.add_fixes(f"{id}:{cursor.key}", cursor.poll())
+    live_map.render()
+
+# Fragment period follows the configured display rate (applied on the next full rerun)
+st.fragment(run_every=1.0 / display_hz)(map_update)()
 
 # GNSS Data Receivers
 with st.empty().container():
     
+    def toggle_gnss_stream(id: int):
+        """Attach to / detach from the process-wide shared stream for this receiver slot"""
+        cursor_key = f"gnss_stream_{id}_cursor"
+        if st.session_state[f"gnss_stream_{id}_connected"]:
+            cursor = st.session_state.pop(cursor_key, None)
+            if cursor is not None:
+                st.session_state.live_map.remove_stream(f"{id}:{cursor.key}")
+                cursor.close()
+            st.session_state[f"gnss_stream_{id}_connected"] = False
+        else:
+            try:
+                port = int(st.session_state[f"gnss_stream_{id}_port"])
+            except ValueError:
+                logger.error(f"Invalid port for GNSS Stream {id}: {st.session_state[f'gnss_stream_{id}_port']}")
+                return
+            st.session_state[cursor_key] = stream_registry().acquire(
+                st.session_state[f"gnss_stream_{id}_host"], port
+            )
+            st.session_state[f"gnss_stream_{id}_connected"] = True
+
     def render_gnss_data_receiver(id: int):
         # Initialize connection state
         if f"gnss_stream_{id}_connected" not in st.session_state:
@@ -80,25 +104,20 @@ with st.empty().container():
             st.button(
                 "Disconnect" if st.session_state[f"gnss_stream_{id}_connected"] else "Connect",
                 key=f"connect_btn_{id}",
-                on_click=lambda: {
-                    st.session_state.update({
-                        f"gnss_stream_{id}_connected": not st.session_state[f"gnss_stream_{id}_connected"]
-                    })
-                }
+                on_click=toggle_gnss_stream,
+                args=(id,),
             )
 
-    col1, col2 = st.columns(2)
-    with col1:
-        render_gnss_data_receiver(id=1)
-    with col2:
-        render_gnss_data_receiver(id=2)
-        
-@st.fragment(run_every=0.01)
-def test():
-    if "test_count" not in st.session_state:
-        st.session_state.test_count = 0
-    # st.write(f"Test count: {st.session_state.test_count}")
-    print(f"Test count: {st.session_state.test_count}")
-    st.session_state.test_count += 1
-
+        cursor = st.session_state.get(f"gnss_stream_{id}_cursor")
+        if cursor is not None:
+            stats = stream_registry().stats().get(cursor.key, {})
+            rate = stats.get("ingest", {}).get("rate")
+            st.caption(
+                f"{cursor.key} | running: {cursor.is_running} | "
+                f"viewers: {stats.get('ref_count', 0)} | received: {stats.get('received', 0)} | "
+                f"rate: {f'{rate:.1f} msg/s' if rate is not None else 'N/A'}"
+            )
 
+    for col, id in zip(st.columns(len(STREAM_IDS)), STREAM_IDS):
+        with col:
+            render_gnss_data_receiver(id=id)
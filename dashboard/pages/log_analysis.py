@@ -1,100 +1,189 @@
+import io
+from datetime import timedelta
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import pydeck as pdk
-# Install dtaidistance: pip install dtaidistance
-# from dtaidistance import dtw
-from dtw import dtw
 
-from haversine import haversine as hvs
+from dashboard.utils.cross_track import cross_track_error, error_summary
+from dashboard.utils.log_index import LogIndex
+from dashboard.utils.log_loader import read_log_csv
+from dashboard.utils.log_metrics import total_distance
+from dashboard.utils.simplify import simplify_trace
+from dashboard.utils.time_sync import sync_logs, synced_separation
+from dashboard.utils.result_cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_DISK_BUDGET_MB,
+    DEFAULT_MEMORY_BUDGET_MB,
+    content_hash,
+    get_result_cache,
+)
+from dashboard.utils.trace_dtw import (
+    dtw_distance,
+    multiscale_dtw_distance,
+    similarity_score as dtw_similarity,
+)
 
 st.set_page_config(page_title="GNSS Logs Analysis", page_icon="📊", layout="wide")
 st.title("GNSS Logs Analysis")
 
-# --- Haversine distance for GNSS traces ---
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371e3  # meters
-    phi1 = np.radians(lat1)
-    phi2 = np.radians(lat2)
-    dphi = np.radians(lat2 - lat1)
-    dlambda = np.radians(lon2 - lon1)
-    a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
-    return 2*R*np.arctan2(np.sqrt(a), np.sqrt(1-a))
-
-def total_distance(df):
-    if 'Latitude' in df.columns and 'Longitude' in df.columns and len(df) > 1:
-        lats = df['Latitude'].values
-        lons = df['Longitude'].values
-        return float(np.sum(haversine(lats[:-1], lons[:-1], lats[1:], lons[1:])))
-    return 0.0
+map_tolerance_m = st.sidebar.number_input(
+    "Map path tolerance (m)",
+    min_value=0.0,
+    max_value=10.0,
+    value=0.2,
+    step=0.1,
+    key="map_tolerance_m",
+    help="Map paths drop points closer than this to the simplified line; 0 draws every point"
+)
+
+DTW_MODE_OPTIONS = {
+    "Exact (banded)": "exact",
+    "Multiscale (approximate, for long traces)": "multiscale",
+}
+DTW_BAND_OPTIONS = {
+    "Sakoe-Chiba": "sakoe-chiba",
+    "Itakura": "itakura",
+    "None (full matrix)": "none",
+}
+# Bump when parsing or analysis output changes so stale cache entries are ignored
+ANALYSIS_CACHE_VERSION = 3
+# Error columns (HPE, northing/easting) are not used here and are never parsed
+ANALYSIS_COLUMNS = ['TimestampKST', 'GNSSTime', 'Latitude', 'Longitude', 'FixType', 'MessageRate(Hz)']
+# Points of trace B drawn in the cross-track error overlay (all points above the 95th percentile are kept)
+MAX_OVERLAY_POINTS = 20000
+# Session memory caps: loaded logs are held per tab, and upload hashes are remembered
+# per uploaded file (each re-upload gets a new file id), oldest forgotten first
+MAX_LOG_TABS = 8
+MAX_UPLOAD_HASHES = 32
 
 # --- DTW Functions ---
-def downsample_trace(trace, max_points=2000):
-    """Downsample trace to reduce memory usage for DTW"""
-    if len(trace) <= max_points:
-        return trace
-    
-    # Use uniform sampling to preserve trace shape
-    indices = np.linspace(0, len(trace) - 1, max_points, dtype=int)
-    return [trace[i] for i in indices]
-
-
-
-def calculate_dtw_distance(trace1, trace2, max_points=2000):
-    """Calculate DTW distance and similarity score using dtaidistance"""
-    try:
-        # Downsample traces
-        # trace1_sampled = downsample_trace(trace1, max_points)
-        # trace2_sampled = downsample_trace(trace2, max_points)
-        trace1_sampled = trace1
-        trace2_sampled = trace2
-        
-        # Convert to numpy arrays and flatten for dtaidistance
-        # dtaidistance expects 1D arrays, so we need to handle 2D GPS coordinates
-        # trace1_array = np.array(trace1_sampled).flatten()
-        # trace2_array = np.array(trace2_sampled).flatten()
-        trace1_array = np.array(trace1_sampled, dtype=np.float64)
-        trace2_array = np.array(trace2_sampled, dtype=np.float64)
-        
-        # Use optimized DTW from dtaidistance
-        # dtw_distance = dtw.distance_fast(trace1_array, trace2_array)
-        
-        def gnss_distance(x, y):
-            """Calculate distance between two (lat, lon) points in meters."""
-            return hvs((x[0], x[1]), (y[0], y[1]), unit='m')
-        
-        alignment = dtw(
-            trace1_array,
-            trace2_array,
-            dist_method=gnss_distance,  # Use the correct parameter
-            keep_internals=True
-        )
-        dtw_distance = alignment.normalizedDistance
-        
-        # Calculate similarity score (0-1 scale, higher = more similar)
-        similarity_score = 1 / (1 + dtw_distance)
-        
-        return dtw_distance, similarity_score
-        
-    except MemoryError:
-        pass
-        # # If still out of memory, try with even fewer points
-        # trace1_small = downsample_trace(trace1, 500)
-        # trace2_small = downsample_trace(trace2, 500)
-        
-        # trace1_array = np.array(trace1_small).flatten()
-        # trace2_array = np.array(trace2_small).flatten()
-        
-        # distance = dtw.distance_fast(trace1_array, trace2_array)
-        # similarity_score = 1 / (1 + distance)
-        
-        # return distance, similarity_score
+def calculate_dtw_distance(trace1, trace2, mode="exact", band="sakoe-chiba", band_percent=10.0,
+                           radius=2, progress=None, cancel=None):
+    """Calculate normalized DTW distance (meters) and similarity score.
+
+    ``mode="exact"`` runs the banded vectorized engine; ``mode="multiscale"``
+    runs the FastDTW-style approximation with the given ``radius``.
+    """
+    trace1_array = np.asarray(trace1, dtype=np.float64)
+    trace2_array = np.asarray(trace2, dtype=np.float64)
+    if mode == "multiscale":
+        result = multiscale_dtw_distance(trace1_array, trace2_array, radius=radius, progress=progress, cancel=cancel)
+    else:
+        band_radius = max(1, int(len(trace2_array) * band_percent / 100))
+        result = dtw_distance(trace1_array, trace2_array, band=band, radius=band_radius, progress=progress, cancel=cancel)
+    dtw_distance_m = result.normalized_distance
+    return dtw_distance_m, dtw_similarity(dtw_distance_m)
+
+def map_path(df, tolerance_m):
+    """[lon, lat] vertices for a PathLayer, simplified so no dropped point is off by more than tolerance_m"""
+    lats = df['Latitude'].to_numpy(dtype=np.float64)
+    lons = df['Longitude'].to_numpy(dtype=np.float64)
+    simplified = simplify_trace(lats, lons, tolerance_m)
+    path = np.column_stack((lons[simplified.indices], lats[simplified.indices])).tolist()
+    return path, simplified
+
+def describe_simplification(name, simplified):
+    drawn = len(simplified.indices)
+    return (f"{name}: drawing {drawn:,} of {drawn + simplified.dropped:,} points "
+            f"(max deviation {simplified.max_deviation_m:.2f} m)")
+
+def error_colors(errors, scale_max_m):
+    """RGB rows from green (0 m) through yellow to red (>= scale_max_m)"""
+    x = np.clip(np.nan_to_num(errors, nan=scale_max_m) / scale_max_m, 0.0, 1.0)
+    red = np.clip(2 * x, 0, 1) * 255
+    green = np.clip(2 * (1 - x), 0, 1) * 255
+    return np.column_stack((red, green, np.zeros_like(x))).astype(np.uint8)
+
+def cross_track_overlay(df, errors, scale_max_m, max_points=MAX_OVERLAY_POINTS):
+    """ScatterplotLayer data for trace B colored by cross-track error, thinned to about max_points"""
+    stride = max(1, int(np.ceil(len(df) / max_points)))
+    keep = np.zeros(len(df), dtype=bool)
+    keep[::stride] = True
+    if len(errors):
+        keep |= errors > np.nanpercentile(errors, 95)
+    colors = error_colors(errors[keep], scale_max_m)
+    return pd.DataFrame({
+        "lat": df["Latitude"].to_numpy()[keep],
+        "lon": df["Longitude"].to_numpy()[keep],
+        "error": np.round(errors[keep], 3),
+        "r": colors[:, 0], "g": colors[:, 1], "b": colors[:, 2],
+    })
 
 def get_lat_lon_pairs(df):
-    """Extract lat/lon pairs from dataframe"""
+    """Extract lat/lon pairs from dataframe as an (N, 2) float array"""
     if df is not None and 'Latitude' in df.columns and 'Longitude' in df.columns:
-        return df[['Latitude', 'Longitude']].values.tolist()
-    return []
+        return df[['Latitude', 'Longitude']].to_numpy(dtype=np.float64)
+    return np.empty((0, 2))
+
+# --- Cached parsing and analysis ---
+def get_cache():
+    config = st.session_state.get("app_config", {})
+    return get_result_cache(
+        config.get("cache_dir", DEFAULT_CACHE_DIR),
+        config.get("cache_memory_mb", DEFAULT_MEMORY_BUDGET_MB),
+        config.get("cache_disk_mb", DEFAULT_DISK_BUDGET_MB),
+    )
+
+def parse_log(data):
+    return read_log_csv(io.BytesIO(data), columns=ANALYSIS_COLUMNS)
+
+def load_uploaded_log(uploaded_file):
+    """Return (content hash, DataFrame) for an upload; identical content is parsed only once.
+
+    The returned DataFrame may be shared with other sessions and must not be modified in place.
+    """
+    hashes = st.session_state.setdefault("upload_hashes", {})  # {file_id: content hash}
+    digest = hashes.get(uploaded_file.file_id)
+    if digest is None:
+        digest = content_hash(uploaded_file.getvalue())
+        hashes[uploaded_file.file_id] = digest
+        while len(hashes) > MAX_UPLOAD_HASHES:
+            hashes.pop(next(iter(hashes)))
+    df = get_cache().get_or_compute(
+        ("log", ANALYSIS_CACHE_VERSION, digest),
+        lambda: parse_log(uploaded_file.getvalue()),
+    )
+    return digest, df
+
+def get_log_index(digest, df):
+    """Fix-type/time/distance index of a log, built once per log content"""
+    return cached(("log_index", ANALYSIS_CACHE_VERSION, digest), lambda: LogIndex(df))
+
+def time_window_slider(label, index, key):
+    """(start, end) picked on a slider over the log's time range; None for an untouched end"""
+    time_range = index.time_range()
+    if time_range is None or time_range[0] >= time_range[1]:
+        return None, None
+    first, last = (t.to_pydatetime() for t in time_range)
+    start, end = st.slider(
+        label,
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        step=timedelta(seconds=1),
+        format="HH:mm:ss",
+        key=key,
+    )
+    return (start if start > first else None), (end if end < last else None)
+
+def time_window_key(start, end):
+    return tuple("" if t is None else t.isoformat() for t in (start, end))
+
+def fix_type_key(selected_fix_types):
+    return tuple(sorted(str(fix_type) for fix_type in selected_fix_types))
+
+def cached(key, compute):
+    """Look ``key`` up in the result cache; logs without a content hash are computed directly"""
+    if None in key:
+        return compute()
+    return get_cache().get_or_compute(key, compute)
+
+def request_dtw_cancel():
+    # Runs at the start of the rerun triggered by the Cancel button, which has
+    # already interrupted the running comparison at its next progress update
+    st.session_state["comparison_cancelled"] = True
 
 # --- Session State Initialization ---
 if "gnss_file_tabs" not in st.session_state:
@@ -103,6 +192,8 @@ if "logs_data" not in st.session_state:
     st.session_state.logs_data = {}  # {tab_name: DataFrame}
 if "logs_analysis" not in st.session_state:
     st.session_state.logs_analysis = {}  # {tab_name: analysis_result}
+if "logs_hash" not in st.session_state:
+    st.session_state.logs_hash = {}  # {tab_name: content hash}
 
 # --- Helper function to delete a tab ---
 def delete_log_tab(tab_name):
@@ -110,6 +201,7 @@ def delete_log_tab(tab_name):
         st.session_state.gnss_file_tabs.remove(tab_name)
     st.session_state.logs_data.pop(tab_name, None)
     st.session_state.logs_analysis.pop(tab_name, None)
+    st.session_state.logs_hash.pop(tab_name, None)
 
 # --- Helper function to reorder tabs and associated data ---
 def reorder_tabs_and_data():
@@ -118,22 +210,27 @@ def reorder_tabs_and_data():
     new_tabs = [f"File {i+1}" for i in range(len(old_tabs))]
     new_logs_data = {}
     new_logs_analysis = {}
+    new_logs_hash = {}
     for new_name, old_name in zip(new_tabs, old_tabs):
         if old_name in st.session_state.logs_data:
             new_logs_data[new_name] = st.session_state.logs_data[old_name]
         if old_name in st.session_state.logs_analysis:
             new_logs_analysis[new_name] = st.session_state.logs_analysis[old_name]
+        if old_name in st.session_state.logs_hash:
+            new_logs_hash[new_name] = st.session_state.logs_hash[old_name]
     # Update session state
     st.session_state.gnss_file_tabs = new_tabs
     st.session_state.logs_data = new_logs_data
     st.session_state.logs_analysis = new_logs_analysis
+    st.session_state.logs_hash = new_logs_hash
 
 # --- Add New Tab Button ---
 with st.container():
     st.subheader("Single Log Analysis (Multiple Tabs)")
     cols = st.columns([1, 3])
     with cols[0]:
-        if st.button("➕ Add GNSS File Tab"):
+        if st.button("➕ Add GNSS File Tab", disabled=len(st.session_state.gnss_file_tabs) >= MAX_LOG_TABS,
+                     help=f"Up to {MAX_LOG_TABS} tabs; each keeps its loaded log in memory"):
             new_tab_name = f"File {len(st.session_state.gnss_file_tabs) + 1}"
             st.session_state.gnss_file_tabs.append(new_tab_name)
 
@@ -163,11 +260,9 @@ for i, tab in enumerate(tabs):
             key=f"uploader_{tab_name}"
         )
         if uploaded_file:
-            df = pd.read_csv(uploaded_file)
-            # Exclude unwanted columns
-            exclude_cols = ['HPE(m)', 'NorthingError(m)', 'EastingError(m)']
-            df = df.drop(columns=[col for col in exclude_cols if col in df.columns])
+            digest, df = load_uploaded_log(uploaded_file)
             st.session_state.logs_data[tab_name] = df
+            st.session_state.logs_hash[tab_name] = digest
         else:
             df = st.session_state.logs_data.get(tab_name)
 
@@ -175,48 +270,23 @@ for i, tab in enumerate(tabs):
             st.write(f"**Preview of {tab_name}:**")
             with st.expander("Show Data"):
                 st.dataframe(df)
+            index = get_log_index(st.session_state.logs_hash.get(tab_name), df)
             # FixType filter
-            fix_types = sorted(df["FixType"].dropna().unique()) if "FixType" in df.columns else []
+            fix_types = index.fix_types
             selected_fix_types = st.multiselect(
                 f"Select FixType(s) for {tab_name}",
                 options=fix_types,
                 default=fix_types,
                 key=f"fix_type_{tab_name}"
             ) if fix_types else []
-            filtered_df = df[df["FixType"].isin(selected_fix_types)] if selected_fix_types else df
+            window_start, window_end = time_window_slider(f"Time window for {tab_name}", index, f"time_window_{tab_name}")
 
             if st.button(f"Analyze {tab_name}", key=f"analyze_{tab_name}"):
-                result = {}
-            
-                # Parse TimestampKST (ISO 8601 with timezone)
-                try:
-                    filtered_df = filtered_df.copy()  # Avoid SettingWithCopyWarning
-                    filtered_df['TimestampKST'] = pd.to_datetime(filtered_df['TimestampKST'], format='ISO8601')
-                    trace_duration = filtered_df['TimestampKST'].iloc[-1] - filtered_df['TimestampKST'].iloc[0]
-                    duration_seconds = trace_duration.total_seconds()
-                    result["Trace Duration"] = str(trace_duration)
-                    result["Sampling Rate (Hz)"] = round(len(filtered_df) / duration_seconds, 3) if duration_seconds > 0 else "N/A"
-                except Exception as e:
-                    print(f"Error parsing TimestampKST: {e}")
-                    result["Trace Duration"] = "N/A"
-                    result["Sampling Rate (Hz)"] = "N/A"
-            
-                # Latitude/Longitude Range and Total Distance
-                if "Latitude" in filtered_df.columns and "Longitude" in filtered_df.columns:
-                    result["Latitude Range"] = [float(filtered_df['Latitude'].min()), float(filtered_df['Latitude'].max())]
-                    result["Longitude Range"] = [float(filtered_df['Longitude'].min()), float(filtered_df['Longitude'].max())]
-                    dist = total_distance(filtered_df)
-                    result["Total Distance (meters)"] = round(dist, 2) if dist is not None else "N/A"
-                else:
-                    result["Latitude Range"] = "N/A"
-                    result["Longitude Range"] = "N/A"
-                    result["Total Distance (meters)"] = "N/A"
-            
-                # FixType Distribution
-                if "FixType" in filtered_df.columns:
-                    fix_counts = filtered_df["FixType"].value_counts().to_dict()
-                    result["FixType Distribution"] = fix_counts
-            
+                result = cached(
+                    ("analysis", ANALYSIS_CACHE_VERSION, st.session_state.logs_hash.get(tab_name),
+                     fix_type_key(selected_fix_types), time_window_key(window_start, window_end)),
+                    lambda: index.analysis(selected_fix_types, window_start, window_end),
+                )
                 st.session_state.logs_analysis[tab_name] = result
                 st.success(f"Analysis of {tab_name} completed!")
             
@@ -252,7 +322,10 @@ for i, tab in enumerate(tabs):
                     
             # --- Plot Map Button ---
             if st.button(f"Plot Map for {tab_name}", key=f"plot_map_{tab_name}"):
-                if "Latitude" in filtered_df.columns and "Longitude" in filtered_df.columns:
+                filtered_df = df[index.select(selected_fix_types, window_start, window_end)]
+                if filtered_df.empty:
+                    st.warning("No points match the selected FixType(s) and time window.")
+                elif "Latitude" in filtered_df.columns and "Longitude" in filtered_df.columns:
                     # Prepare DataFrame for Pydeck
                     map_df = filtered_df[["Latitude", "Longitude"]].copy()
                     map_df.rename(columns={"Latitude": "lat", "Longitude": "lon"}, inplace=True)
@@ -264,12 +337,13 @@ for i, tab in enumerate(tabs):
 
                     # Save to session_state for compatibility with your code
                     st.session_state.df = map_df
+                    path, simplified = map_path(filtered_df, map_tolerance_m)
 
                     # Pydeck layers
                     layers = [
                         pdk.Layer(
                             "PathLayer",
-                            data=[{"path": map_df[["lon", "lat"]].values.tolist()}],
+                            data=[{"path": path}],
                             get_path='path',
                             get_color=[255, 0, 0, 255],  # Bright red, fully opaque
                             get_width=0.01,
@@ -297,6 +371,7 @@ for i, tab in enumerate(tabs):
                             layers=layers,
                         )
                     )
+                    st.caption(describe_simplification(tab_name, simplified))
                 else:
                     st.warning("Latitude/Longitude columns are required to plot the map.")
         else:
@@ -318,9 +393,12 @@ if len(available_logs) >= 2:
     dfA = st.session_state.logs_data.get(logA)
     dfB = st.session_state.logs_data.get(logB)
 
+    indexA = get_log_index(st.session_state.logs_hash.get(logA), dfA)
+    indexB = get_log_index(st.session_state.logs_hash.get(logB), dfB)
+
     # FixType filters for each log
-    fix_types_A = sorted(dfA["FixType"].dropna().unique()) if "FixType" in dfA.columns else []
-    fix_types_B = sorted(dfB["FixType"].dropna().unique()) if "FixType" in dfB.columns else []
+    fix_types_A = indexA.fix_types
+    fix_types_B = indexB.fix_types
 
     selected_fix_types_A = st.multiselect(
         f"Select FixType(s) for {logA}",
@@ -335,10 +413,90 @@ if len(available_logs) >= 2:
         key="compare_fix_type_B"
     ) if fix_types_B else []
 
-    filtered_dfA = dfA[dfA["FixType"].isin(selected_fix_types_A)] if selected_fix_types_A else dfA
-    filtered_dfB = dfB[dfB["FixType"].isin(selected_fix_types_B)] if selected_fix_types_B else dfB
+    filtered_dfA = dfA[indexA.select(selected_fix_types_A)] if selected_fix_types_A else dfA
+    filtered_dfB = dfB[indexB.select(selected_fix_types_B)] if selected_fix_types_B else dfB
+
+    dtw_mode_label = st.selectbox(
+        "DTW mode",
+        options=list(DTW_MODE_OPTIONS),
+        key="compare_dtw_mode",
+        help="Multiscale coarsens both traces and refines only around the coarse warping path"
+    )
+    dtw_mode = DTW_MODE_OPTIONS[dtw_mode_label]
+    dtw_cols = st.columns(2)
+    if dtw_mode == "exact":
+        with dtw_cols[0]:
+            dtw_band_label = st.selectbox(
+                "DTW band",
+                options=list(DTW_BAND_OPTIONS),
+                key="compare_dtw_band",
+                help="Restricts the warping path around the diagonal; the full matrix is O(N·M) time"
+            )
+        with dtw_cols[1]:
+            dtw_band_percent = st.slider(
+                "Sakoe-Chiba band width (% of trace length)",
+                min_value=1.0,
+                max_value=50.0,
+                value=10.0,
+                step=1.0,
+                key="compare_dtw_band_percent",
+                disabled=DTW_BAND_OPTIONS[dtw_band_label] != "sakoe-chiba"
+            )
+        dtw_radius = None
+    else:
+        with dtw_cols[0]:
+            dtw_radius = st.number_input(
+                "Multiscale radius (cells)",
+                min_value=1,
+                max_value=100,
+                value=2,
+                key="compare_dtw_radius",
+                help="Width of the refinement window around the projected coarse path; larger is slower but more accurate"
+            )
+        dtw_band_label, dtw_band_percent = "None (full matrix)", None
+
+    sync_cols = st.columns(3)
+    with sync_cols[0]:
+        sync_enabled = st.checkbox(
+            "Time-synchronize traces",
+            key="compare_sync",
+            help=f"Interpolate {logB} at {logA}'s timestamps and compare only the common time window"
+        )
+    with sync_cols[1]:
+        sync_estimate_offset = st.checkbox(
+            "Estimate clock offset",
+            value=True,
+            key="compare_sync_offset",
+            disabled=not sync_enabled,
+            help="Cross-correlate the speed of both traces to find a constant offset between the receivers' clocks"
+        )
+    with sync_cols[2]:
+        sync_max_offset_s = st.number_input(
+            "Max clock offset (s)",
+            min_value=1.0,
+            max_value=3600.0,
+            value=60.0,
+            key="compare_sync_max_offset",
+            disabled=not (sync_enabled and sync_estimate_offset)
+        )
 
     if st.button("Compare Selected Logs"):
+        clock_offset_s = None
+        separation = None
+        cross_track = None
+        if sync_enabled:
+            try:
+                synced = sync_logs(
+                    filtered_dfA, filtered_dfB,
+                    estimate_offset=sync_estimate_offset,
+                    max_offset_s=sync_max_offset_s,
+                )
+                filtered_dfA = synced.synced_a.reset_index()
+                filtered_dfB = synced.synced_b.reset_index()
+                clock_offset_s = synced.offset.offset_s if synced.offset is not None else 0.0
+                separation = synced_separation(synced.synced_a, synced.synced_b)
+            except Exception as e:
+                st.warning(f"Time synchronization failed, comparing unsynchronized traces: {str(e)}")
         
         # plot 2 traces on map
         if "Latitude" in filtered_dfA.columns and "Longitude" in filtered_dfA.columns and \
@@ -353,11 +511,24 @@ if len(available_logs) >= 2:
             latB = map_dfB["lat"].mean()
             lonB = map_dfB["lon"].mean()
             zoom = 14  # You can adjust zoom as needed
+            pathA, simplifiedA = map_path(filtered_dfA, map_tolerance_m)
+            pathB, simplifiedB = map_path(filtered_dfB, map_tolerance_m)
+
+            # Cross-track error of every point of B against A's path
+            try:
+                cross_track = cross_track_error(
+                    filtered_dfA["Latitude"].to_numpy(), filtered_dfA["Longitude"].to_numpy(),
+                    filtered_dfB["Latitude"].to_numpy(), filtered_dfB["Longitude"].to_numpy(),
+                )
+                cross_track_stats = error_summary(cross_track.distance_m)
+            except ValueError as e:
+                st.warning(f"Cross-track error calculation failed: {str(e)}")
+                cross_track = None
             
             layers = [
                 pdk.Layer(
                     "PathLayer",
-                    data=[{"path": map_dfA[["lon", "lat"]].values.tolist()}],
+                    data=[{"path": pathA}],
                     get_path='path',
                     get_color=[255, 0, 0, 255],  # Bright red, fully opaque
                     get_width=0.01,
@@ -367,7 +538,7 @@ if len(available_logs) >= 2:
                 ),
                 pdk.Layer(
                     "PathLayer",
-                    data=[{"path": map_dfB[["lon", "lat"]].values.tolist()}],
+                    data=[{"path": pathB}],
                     get_path='path',
                     get_color=[0, 0, 255, 255],  # Bright blue, fully opaque
                     get_width=0.01,
@@ -376,6 +547,18 @@ if len(available_logs) >= 2:
                     width_min_pixels=5,
                 ),
             ]
+            if cross_track is not None and cross_track_stats:
+                scale_max_m = max(0.1, cross_track_stats["p95"])
+                layers.append(
+                    pdk.Layer(
+                        "ScatterplotLayer",
+                        data=cross_track_overlay(filtered_dfB, cross_track.distance_m, scale_max_m),
+                        get_position='[lon, lat]',
+                        get_fill_color='[r, g, b, 220]',
+                        get_radius=0.3,
+                        radius_min_pixels=2,
+                    )
+                )
             
             st.pydeck_chart(
                 pdk.Deck(
@@ -388,20 +571,49 @@ if len(available_logs) >= 2:
                     layers=layers,
                 )
             )
+            st.caption(describe_simplification(logA, simplifiedA))
+            st.caption(describe_simplification(logB, simplifiedB))
+            if cross_track is not None and cross_track_stats:
+                st.caption(f"{logB} points colored by cross-track error to {logA}'s path: "
+                           f"green 0 m → yellow {scale_max_m / 2:.2f} m → red ≥ {scale_max_m:.2f} m (95th percentile)")
         
         distA = total_distance(filtered_dfA)
         distB = total_distance(filtered_dfB)
         
-        # Calculate DTW similarity
+        # Calculate DTW similarity, reusing results for the same files, filters and DTW settings
         traceA = get_lat_lon_pairs(filtered_dfA)
         traceB = get_lat_lon_pairs(filtered_dfB)
-        dtw_distance = None
+        dtw_distance_m = None
         similarity_score = None
-        if traceA and traceB:
+        st.session_state["comparison_cancelled"] = False
+        compare_key = (
+            "compare", ANALYSIS_CACHE_VERSION,
+            st.session_state.logs_hash.get(logA), st.session_state.logs_hash.get(logB),
+            fix_type_key(selected_fix_types_A), fix_type_key(selected_fix_types_B),
+            dtw_mode, DTW_BAND_OPTIONS[dtw_band_label], str(dtw_band_percent), str(dtw_radius),
+            sync_enabled, sync_estimate_offset, str(sync_max_offset_s), separation is not None,
+        )
+        cacheable = None not in compare_key[2:4]
+        cached_dtw = get_cache().get(compare_key) if cacheable else None
+        if cached_dtw is not None:
+            dtw_distance_m, similarity_score = cached_dtw
+        elif len(traceA) and len(traceB):
+            progress_bar = st.progress(0.0, text="Computing DTW...")
+            st.button("Cancel DTW", key="cancel_dtw", on_click=request_dtw_cancel)
             try:
-                dtw_distance, similarity_score = calculate_dtw_distance(traceA, traceB)
+                dtw_distance_m, similarity_score = calculate_dtw_distance(
+                    traceA, traceB,
+                    mode=dtw_mode,
+                    band=DTW_BAND_OPTIONS[dtw_band_label],
+                    band_percent=dtw_band_percent,
+                    radius=dtw_radius,
+                    progress=lambda fraction: progress_bar.progress(fraction, text=f"Computing DTW... {fraction:.0%}"),
+                )
+                if cacheable:
+                    get_cache().put(compare_key, (dtw_distance_m, similarity_score))
             except Exception as e:
                 st.warning(f"DTW calculation failed: {str(e)}")
+            progress_bar.empty()
         
         comparison = {
             f"{logA} Total Distance (meters)": round(distA, 2) if distA is not None else "N/A",
@@ -409,13 +621,23 @@ if len(available_logs) >= 2:
             "Distance Difference (meters)": round(abs(distA - distB), 2) if distA is not None and distB is not None else "N/A",
             f"{logA} Points After Filter": len(filtered_dfA),
             f"{logB} Points After Filter": len(filtered_dfB),
-            "DTW Distance": round(dtw_distance, 4) if dtw_distance is not None else "N/A",
+            "DTW Distance": round(dtw_distance_m, 4) if dtw_distance_m is not None else "N/A",
             "Similarity Score": f"{round(similarity_score * 100, 1)}%" if similarity_score is not None else "N/A"
         }
+        if cross_track is not None and cross_track_stats:
+            for stat, label in (("mean", "Mean"), ("p50", "Median"), ("p95", "95%"), ("max", "Max")):
+                comparison[f"Cross-Track {label} (m)"] = round(cross_track_stats[stat], 3)
+        if separation is not None:
+            comparison["Clock Offset (s)"] = round(clock_offset_s, 3)
+            comparison["Synced Points"] = len(separation)
+            comparison["Mean Synced Separation (m)"] = round(float(np.mean(separation)), 3)
+            comparison["95% Synced Separation (m)"] = round(float(np.percentile(separation, 95)), 3)
         st.session_state["comparison_result"] = comparison
         st.success("Comparison completed!")
 
-    if st.session_state.get("comparison_result") is not None:
+    if st.session_state.pop("comparison_cancelled", False):
+        st.warning("Comparison cancelled.")  # Once; the previous result is shown again on the next rerun
+    elif st.session_state.get("comparison_result") is not None:
         st.info("Comparison Result:")
         result = st.session_state["comparison_result"]
         
@@ -457,5 +679,23 @@ if len(available_logs) >= 2:
                 result.get("Similarity Score", "N/A"),
                 help="Higher percentage indicates more similar traces"
             )
+
+        if "Cross-Track Mean (m)" in result:
+            st.markdown(f"**Cross-track error of {logB} to {logA}'s path**")
+            cross_track_cols = st.columns(4)
+            for col, label in zip(cross_track_cols, ("Mean", "Median", "95%", "Max")):
+                col.metric(f"{label} (m)", result[f"Cross-Track {label} (m)"])
+
+        if "Clock Offset (s)" in result:
+            st.markdown("**Time-synchronized comparison**")
+            sync_metric_cols = st.columns(4)
+            sync_metric_cols[0].metric(
+                "Clock Offset (s)",
+                result["Clock Offset (s)"],
+                help=f"{logB}'s clock minus {logA}'s, removed before aligning"
+            )
+            sync_metric_cols[1].metric("Synced Points", result["Synced Points"])
+            sync_metric_cols[2].metric("Mean Separation (m)", result["Mean Synced Separation (m)"])
+            sync_metric_cols[3].metric("95% Separation (m)", result["95% Synced Separation (m)"])
 else:
     st.warning("Upload at least two logs to enable comparison.")
@@ -1,7 +1,7 @@
 import threading
-import socket
-from typing import Optional
+from typing import Callable, Optional
 
+from dashboard.utils.gnss_ingest import CallbackSink, IngestLoop, QueueSink, Sink, StopEvent
 from dashboard.utils.queue import ThreadSafeQueue
 from dashboard.utils.logger import logger
 
@@ -10,26 +10,32 @@ class GNSSDataTCPService:
         self,
         host: str = "localhost",
         port: int = 5000,
-        buffer_size: int = 4096,
-        max_buffer: int = 10 * 1024 * 1024  # 10MB max buffer
+        buffer_size: int = 65536,
+        max_buffer: int = 10 * 1024 * 1024,  # 10MB max line
+        on_message: Optional[Callable[[str], None]] = None,
+        sink: Optional[Sink] = None
     ):
         self.host = host
         self.port = port
         self.buffer_size = buffer_size
         self.max_buffer = max_buffer
-        
+        # Optional per-message callback; when set, messages bypass the internal queue.
+        # A sink (e.g. a RingBufferSink) takes each read's messages as one batch instead.
+        self.on_message = on_message
+        self.sink = sink
+
         # Internal state management
-        self._stop_event = threading.Event()
+        self._stop_event = StopEvent()  # Also wakes the ingest loop
         self._data_queue = ThreadSafeQueue(max_size=100)  # Thread-safe queue for data
         self._thread: Optional[threading.Thread] = None
-        self.sock: Optional[socket.socket] = None
+        self._connection = None
 
     def start(self) -> bool:
         """Start the service and return True if started successfully"""
         if self.is_running:
             logger.warning("Service is already running")
             return False
-            
+
         self._stop_event.clear()
         self._thread = threading.Thread(
             target=self._run,
@@ -50,84 +56,40 @@ class GNSSDataTCPService:
         if not self.is_running:
             logger.warning("Service is not running")
             return
-            
+
         self._stop_event.set()
         self._thread.join(timeout=2.0)
-        
+
         if self._thread.is_alive():
             logger.error("Service thread failed to terminate")
         else:
             logger.info("GNSS TCP service stopped")
             self._thread = None
 
-    def get_data(self, block: bool = True, timeout: float = None) -> Optional[str]:
+    def get_data(self, block: bool = False, timeout: Optional[float] = None) -> Optional[str]:
         """Get data from the queue (thread-safe)"""
-        try:
-            return self._data_queue.get(block=block, timeout=timeout)
-        except Exception as e:
-            logger.error(f"Data retrieval error: {e}")
-            return None
+        return self._data_queue.get(block=block, timeout=timeout)
+
+    def stats(self) -> dict:
+        """Ingest counters of the current (or last) connection"""
+        return self._connection.stats.snapshot() if self._connection is not None else {}
+
+    def _sink(self) -> Sink:
+        if self.sink is not None:
+            return self.sink
+        if self.on_message is not None:
+            return CallbackSink(self.on_message)
+        return QueueSink(self._data_queue)
 
     def _run(self):
-        data_buffer = b""
-        
+        loop = IngestLoop(stop_event=self._stop_event, read_size=self.buffer_size, logger=logger,
+                          max_line_bytes=self.max_buffer)
         try:
-            self.sock = socket.create_connection(
-                (self.host, self.port),
-                timeout=5.0
-            )
-            self.sock.settimeout(0.1)
+            self._connection = loop.connect(self.host, self.port, self._sink())
             logger.info(f"Connected to GNSS server at {self.host}:{self.port}")
-            
-            while not self._stop_event.is_set():
-                try:
-                    chunk = self.sock.recv(self.buffer_size)
-                    if not chunk:
-                        logger.info("Server closed connection")
-                        break
-                        
-                    data_buffer += chunk
-                    
-                    if len(data_buffer) > self.max_buffer:
-                        logger.error("Buffer overflow detected")
-                        break
-                        
-                    data_buffer = self._process_buffer(data_buffer)
-                    
-                except socket.timeout:
-                    continue
-                except OSError as e:
-                    if not self._stop_event.is_set():
-                        logger.error(f"Socket error: {e}")
-                    break
-                    
-        except (socket.error, ConnectionError) as e:
+            loop.run()
+        except OSError as e:
             logger.error(f"Connection failed: {e}")
         finally:
-            self._cleanup()
-
-    def _process_buffer(self, data_buffer: bytes) -> bytes:
-        """Process complete messages from buffer"""
-        while b'\n' in data_buffer and not self._stop_event.is_set():
-            message_bytes, data_buffer = data_buffer.split(b'\n', 1)
-            try:
-                msg_str = message_bytes.decode('utf-8', errors='replace').strip()
-                if msg_str:
-                    self._data_queue.put(msg_str)
-            except UnicodeDecodeError as ude:
-                logger.warning(f"Decode error: {ude}. Partial: {message_bytes[:50]}")
-            except Exception as e:
-                logger.error(f"Message processing error: {e}")
-        return data_buffer
-
-    def _cleanup(self):
-        """Safe resource cleanup"""
-        if self.sock:
-            try:
-                self.sock.shutdown(socket.SHUT_RDWR)
-            except OSError:
-                pass
-            finally:
-                self.sock.close()
-                self.sock = None
-        self._stop_event.set()
\ No newline at end of file
+            loop.close()
+            self._stop_event.set()
@@ -0,0 +1,182 @@
+"""GNSS stream ingest in a child process, handed to the UI process through shared memory.
+
+In the Streamlit server the socket loop shares the GIL with script reruns,
+pandas and pydeck serialization; under load it stalls between reads and the
+kernel socket buffer overflows. ``ProcessGNSSStream`` runs the ingest loop
+and fix parsing in a spawned child instead, which writes parsed fixes as
+fixed-width records into a ``ShmFixRing`` that sessions read without copying.
+
+The child watches a pipe to the parent and stops when it is told to or when
+the parent goes away (the pipe closes), so it never outlives the server.
+This module must not import Streamlit: the spawned child imports it.
+"""
+import json
+import time
+import logging
+import threading
+import multiprocessing
+from typing import Optional
+
+from dashboard.utils.gnss_ingest import IngestLoop, Sink, StopEvent, READ_SIZE, MAX_LINE_BYTES
+from dashboard.utils.shm_ring import FAILED, RUNNING, STARTING, STOPPED, ShmFixRing, fix_records
+
+# Seconds the child gets to stop on its own before it is terminated
+STOP_TIMEOUT = 2.0
+
+
+def stream_key(host: str, port: int) -> str:
+    return f"{host}:{int(port)}"
+
+
+def parse_fix(msg_str: str) -> Optional[dict]:
+    """Parse one streamer JSON line into a fix dict, or None if it is not a usable fix"""
+    try:
+        data = json.loads(msg_str)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    try:
+        lat = float(data["lat"])
+        lon = float(data["lon"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return {
+        "timestamp": data.get("timestamp", "N/A"),
+        "gnss_time": data.get("gnss_time", "N/A"),
+        "lat": lat,
+        "lon": lon,
+        "fix_type": str(data.get("type", "N/A")),
+    }
+
+
+class ShmRingSink(Sink):
+    """Parses each read's messages and writes the fixes to the ring as one batch, then publishes the counters"""
+
+    def __init__(self, ring: ShmFixRing):
+        self.ring = ring
+        self.connection = None
+        self.parse_errors = 0
+
+    def put_many(self, messages, now):
+        recv_time = time.time()     # ``now`` is monotonic; the TraceStore window needs wall time
+        fixes = []
+        for msg_str in messages:
+            fix = parse_fix(msg_str)
+            if fix is None:
+                self.parse_errors += 1
+                continue
+            fix["recv_time"] = recv_time
+            fixes.append(fix)
+        if fixes:
+            self.ring.write(fix_records(fixes))
+        if self.connection is not None:
+            self.ring.publish_stats(self.connection.stats.snapshot(), self.parse_errors)
+
+
+def run_ingest_child(shm_name: str, host: str, port: int, control, read_size: int, max_line_bytes: int):
+    """Child process entry point: ingest host:port into the ring until told to stop or the server closes"""
+    logger = logging.getLogger("GNSS Ingest")
+    if not logger.handlers:
+        logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(name)s - %(message)s")
+    ring = ShmFixRing(name=shm_name)
+    stop_event = StopEvent()
+
+    def watch_parent():
+        try:
+            control.recv()
+        except (EOFError, OSError):
+            pass  # Parent closed its end or exited
+        stop_event.set()
+
+    threading.Thread(target=watch_parent, daemon=True, name="ParentWatch").start()
+    loop = IngestLoop(stop_event=stop_event, read_size=read_size, logger=logger, max_line_bytes=max_line_bytes)
+    sink = ShmRingSink(ring)
+    state = FAILED
+    try:
+        sink.connection = loop.connect(host, port, sink)
+        logger.info(f"Connected to GNSS server at {host}:{port} (ingest process)")
+        ring.set_state(RUNNING)
+        loop.run()
+        state = STOPPED
+    except OSError as e:
+        logger.error(f"Connection failed: {e}")
+    finally:
+        loop.close()
+        if sink.connection is not None:
+            ring.publish_stats(sink.connection.stats.snapshot(), sink.parse_errors)
+        ring.set_state(state)
+        ring.close()
+
+
+class ProcessGNSSStream:
+    """``SharedGNSSStream`` counterpart whose connection and parsing run in a child process.
+
+    ``buffer`` is a ``ShmFixRing``, so cursors poll ``FIX_RECORD`` arrays instead of fix dicts.
+    """
+
+    def __init__(self, host: str, port: int, capacity: int = 10000, read_size: int = READ_SIZE,
+                 max_line_bytes: int = MAX_LINE_BYTES):
+        self.host = host
+        self.port = port
+        self.key = stream_key(host, port)
+        self.read_size = read_size
+        self.max_line_bytes = max_line_bytes
+        self.buffer = ShmFixRing(capacity)
+        self.ref_count = 0
+        self._process = None
+        self._control = None
+        self._lock = threading.Lock()
+
+    @property
+    def parse_errors(self) -> int:
+        return int(self.buffer.header["parse_errors"]) if self.buffer.header is not None else 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive() and self.buffer.state in (STARTING, RUNNING)
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.is_running:
+                return False
+            self._reap()
+            self.buffer.set_state(STARTING)
+            context = multiprocessing.get_context("spawn")  # The server is multi-threaded; never fork it
+            self._control, child_control = context.Pipe()
+            self._process = context.Process(
+                target=run_ingest_child,
+                args=(self.buffer.name, self.host, self.port, child_control, self.read_size, self.max_line_bytes),
+                daemon=True,
+                name=f"GNSSIngest-{self.key}",
+            )
+            self._process.start()
+            child_control.close()
+            self.buffer.header["pid"] = self._process.pid
+            return True
+
+    def stop(self):
+        """Stop the child and release the shared memory; the stream cannot be restarted afterwards"""
+        with self._lock:
+            self._reap()
+            self.buffer.close()
+            self.buffer.unlink()
+
+    def _reap(self):
+        """Ask a running child to stop (terminating it after STOP_TIMEOUT) and close the pipe"""
+        if self._process is None:
+            return
+        try:
+            self._control.send(None)
+        except OSError:
+            pass  # Child already gone
+        self._process.join(STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(STOP_TIMEOUT)
+        self._control.close()
+        self._process.close()
+        self._process = self._control = None
+
+    def ingest_stats(self) -> dict:
+        return self.buffer.stats() if self.buffer.header is not None else {}
@@ -0,0 +1,173 @@
+import time
+import threading
+import weakref
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+import streamlit as st
+
+from dashboard.services.gnss_data_tcp_service import GNSSDataTCPService
+from dashboard.services.gnss_ingest_process import ProcessGNSSStream, parse_fix, stream_key
+from dashboard.utils.gnss_ingest import RingBufferSink
+from dashboard.utils.ring_buffer import SharedRingBuffer
+from dashboard.utils.logger import logger
+
+
+class SharedGNSSStream:
+    """One TCP connection to a streamer, parsed once and fanned out through a ring buffer"""
+
+    def __init__(self, host: str, port: int, capacity: int = 10000):
+        self.host = host
+        self.port = port
+        self.key = stream_key(host, port)
+        self.buffer = SharedRingBuffer(capacity)
+        self.parse_errors = 0
+        self.ref_count = 0
+        # Each read's fixes go into the ring in one batch
+        self.service = GNSSDataTCPService(host=host, port=port, sink=RingBufferSink(self.buffer, self._parse_message))
+
+    def _parse_message(self, msg_str: str) -> Optional[dict]:
+        fix = parse_fix(msg_str)
+        if fix is None:
+            self.parse_errors += 1
+            return None
+        fix["recv_time"] = time.time()
+        return fix
+
+    @property
+    def is_running(self) -> bool:
+        return self.service.is_running
+
+    def start(self) -> bool:
+        return self.service.start()
+
+    def stop(self):
+        if self.service.is_running:
+            self.service.stop()
+        # Wake any reader blocked in wait() so it can notice the stream is gone
+        self.buffer.notify_all()
+
+    def ingest_stats(self) -> dict:
+        return self.service.stats()
+
+
+class StreamCursor:
+    """Per-session read position into a shared stream.
+
+    Holding a cursor keeps the stream alive. The reference is dropped when
+    ``close()`` is called or when the cursor is garbage collected together
+    with its session state, so abandoned browser tabs do not leak sockets.
+    """
+
+    def __init__(self, stream: SharedGNSSStream, registry: "GNSSStreamRegistry", from_start: bool = False):
+        self._stream = stream
+        self.position = stream.buffer.oldest if from_start else stream.buffer.head
+        self.dropped = 0
+        self._finalizer = weakref.finalize(self, registry._release, stream.key)
+
+    @property
+    def key(self) -> str:
+        return self._stream.key
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    @property
+    def is_running(self) -> bool:
+        return not self.closed and self._stream.is_running
+
+    def pending(self) -> int:
+        """Number of fixes written since the last poll"""
+        return max(0, self._stream.buffer.head - self.position)
+
+    def poll(self, max_items: Optional[int] = None) -> Union[List[dict], np.ndarray]:
+        """Return the fixes received since the last poll and advance the cursor.
+
+        Fix dicts, or a ``FIX_RECORD`` array viewing shared memory for a process stream.
+        """
+        if self.closed:
+            return []
+        items, self.position, dropped = self._stream.buffer.read_since(self.position, max_items)
+        self.dropped += dropped
+        return items
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until new fixes are available; return False on timeout"""
+        if self.closed:
+            return False
+        return self._stream.buffer.wait_for_new(self.position, timeout=timeout)
+
+    def close(self):
+        """Release this session's reference on the stream (idempotent)"""
+        self._finalizer()
+
+
+class GNSSStreamRegistry:
+    """Process-wide registry of shared GNSS streams keyed by host:port with reference counting.
+
+    With ``ingest_process`` each stream's connection and parsing run in a
+    child process (``ProcessGNSSStream``) and cursors poll ``FIX_RECORD``
+    arrays from shared memory instead of fix dicts.
+    """
+
+    def __init__(self, capacity: int = 10000, ingest_process: bool = False):
+        self.capacity = capacity
+        self.ingest_process = ingest_process
+        self._streams: Dict[str, SharedGNSSStream] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str, port: int, from_start: bool = False) -> StreamCursor:
+        """Attach a new session cursor to the stream for host:port, connecting if needed"""
+        key = stream_key(host, port)
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                stream_class = ProcessGNSSStream if self.ingest_process else SharedGNSSStream
+                stream = stream_class(host, int(port), capacity=self.capacity)
+                self._streams[key] = stream
+            if not stream.is_running:
+                stream.start()
+            stream.ref_count += 1
+            logger.info(f"Stream {key} acquired (ref_count={stream.ref_count})")
+            return StreamCursor(stream, self, from_start=from_start)
+
+    def _release(self, key: str):
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                return
+            stream.ref_count -= 1
+            logger.info(f"Stream {key} released (ref_count={stream.ref_count})")
+            if stream.ref_count > 0:
+                return
+            del self._streams[key]
+        stream.stop()
+
+    def stats(self) -> Dict[str, dict]:
+        """Snapshot of every active stream for display/debugging"""
+        with self._lock:
+            return {
+                key: {
+                    "ref_count": stream.ref_count,
+                    "running": stream.is_running,
+                    "received": stream.buffer.head,
+                    "parse_errors": stream.parse_errors,
+                    "ingest": stream.ingest_stats(),
+                }
+                for key, stream in self._streams.items()
+            }
+
+    def stop_all(self):
+        with self._lock:
+            streams = list(self._streams.values())
+            self._streams.clear()
+        for stream in streams:
+            stream.stop()
+
+
+@st.cache_resource
+def get_stream_registry(ingest_process: bool = False) -> GNSSStreamRegistry:
+    """Return the registry shared by every session of this Streamlit server process"""
+    return GNSSStreamRegistry(ingest_process=ingest_process)
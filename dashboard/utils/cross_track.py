@@ -0,0 +1,219 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from dashboard.utils.geo import local_xy
+
+
+ERROR_PERCENTILES = (50, 68, 95, 99)
+
+
+class CrossTrackResult(NamedTuple):
+    distance_m: np.ndarray  # Distance from each point to the reference polyline (NaN for invalid points)
+    signed_m: np.ndarray  # Same, positive left of the reference's direction of travel
+    segment: np.ndarray  # Index of the nearest reference segment (-1 for invalid points)
+    along_track_m: np.ndarray  # Distance along the reference to the closest point on it
+
+
+class SegmentGrid:
+    """Uniform grid over the segments of a planar polyline for nearest-segment queries.
+
+    Every segment is registered in each cell its bounding box touches. A
+    query searches square rings of cells around the point's cell and stops
+    once the best distance found is no larger than the distance to the
+    unsearched cells, so a query costs O(1) cells near the path instead of
+    O(M) segments. Queries are vectorized over all points still searching.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell_size: Optional[float] = None,
+                 max_cells_per_segment: int = 64):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) == 0:
+            raise ValueError("The reference path needs at least one point")
+        if len(x) == 1:
+            x, y = np.repeat(x, 2), np.repeat(y, 2)
+        self.x0, self.y0, self.x1, self.y1 = x[:-1], y[:-1], x[1:], y[1:]
+        lengths = np.hypot(self.x1 - self.x0, self.y1 - self.y0)
+        if cell_size is None:
+            # A few segments per cell; at least 1 m so stationary stretches don't explode the grid
+            cell_size = max(1.0, 4.0 * float(np.median(lengths)))
+        # Very long segments would cover too many cells; coarsen the grid instead
+        cell_size = max(cell_size, float(lengths.max()) / max_cells_per_segment)
+        self.cell_size = cell_size
+        self.origin_x = float(x.min())
+        self.origin_y = float(y.min())
+
+        cx0, cy0 = self._cell(np.minimum(self.x0, self.x1), np.minimum(self.y0, self.y1))
+        cx1, cy1 = self._cell(np.maximum(self.x0, self.x1), np.maximum(self.y0, self.y1))
+        span_x, span_y = cx1 - cx0 + 1, cy1 - cy0 + 1
+        counts = span_x * span_y
+        segment = np.repeat(np.arange(len(self.x0)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_x = cx0[segment] + local % span_x[segment]
+        cell_y = cy0[segment] + local // span_x[segment]
+        keys = self._key(cell_x, cell_y)
+        order = np.argsort(keys, kind="stable")
+        keys, self.cell_segments = keys[order], segment[order]
+        self.keys, starts = np.unique(keys, return_index=True)
+        self.starts = starts
+        self.ends = np.append(starts[1:], len(keys))
+
+    def __len__(self):
+        return len(self.x0)
+
+    def _cell(self, x, y):
+        return (np.floor((x - self.origin_x) / self.cell_size).astype(np.int64),
+                np.floor((y - self.origin_y) / self.cell_size).astype(np.int64))
+
+    @staticmethod
+    def _key(cell_x, cell_y):
+        return (cell_x << 32) + (cell_y & 0xFFFFFFFF)
+
+    def _segment_distance(self, px, py, segment):
+        x0, y0 = self.x0[segment], self.y0[segment]
+        dx, dy = self.x1[segment] - x0, self.y1[segment] - y0
+        length2 = dx * dx + dy * dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = ((px - x0) * dx + (py - y0) * dy) / length2
+        t = np.where(length2 > 0, np.clip(t, 0.0, 1.0), 0.0)
+        return np.hypot(px - (x0 + t * dx), py - (y0 + t * dy)), t
+
+    def _ring_offsets(self, ring):
+        if ring == 0:
+            return np.zeros((1, 2), dtype=np.int64)
+        span = np.arange(-ring, ring + 1)
+        top = np.column_stack((span, np.full_like(span, ring)))
+        bottom = np.column_stack((span, np.full_like(span, -ring)))
+        inner = np.arange(-ring + 1, ring)
+        left = np.column_stack((np.full_like(inner, -ring), inner))
+        right = np.column_stack((np.full_like(inner, ring), inner))
+        return np.vstack((top, bottom, left, right))
+
+    def nearest(self, px, py, max_rings: int = 16, chunk_pairs: int = 1 << 21):
+        """Nearest segment of each query point: (distance, segment index, position t in [0, 1] along it)"""
+        px = np.asarray(px, dtype=np.float64)
+        py = np.asarray(py, dtype=np.float64)
+        n = len(px)
+        best = np.full(n, np.inf)
+        best_segment = np.full(n, -1, dtype=np.int64)
+        best_t = np.zeros(n)
+        finite = np.isfinite(px) & np.isfinite(py)
+        cell_x, cell_y = self._cell(np.where(finite, px, self.origin_x), np.where(finite, py, self.origin_y))
+        # Distance from the point to the edge of its own cell, so ring r covers at least r cells + this margin
+        margin = np.minimum.reduce([
+            px - (self.origin_x + cell_x * self.cell_size),
+            (self.origin_x + (cell_x + 1) * self.cell_size) - px,
+            py - (self.origin_y + cell_y * self.cell_size),
+            (self.origin_y + (cell_y + 1) * self.cell_size) - py,
+        ])
+        active = np.flatnonzero(finite)
+
+        for ring in range(max_rings + 1):
+            if not len(active):
+                break
+            offsets = self._ring_offsets(ring)
+            # Point/cell pairs for this ring, looked up in the sorted cell keys
+            point = np.repeat(active, len(offsets))
+            keys = self._key(cell_x[point] + np.tile(offsets[:, 0], len(active)),
+                             cell_y[point] + np.tile(offsets[:, 1], len(active)))
+            slot = np.clip(np.searchsorted(self.keys, keys), 0, len(self.keys) - 1)
+            found = self.keys[slot] == keys
+            point, slot = point[found], slot[found]
+            counts = self.ends[slot] - self.starts[slot]
+            step = max(1, chunk_pairs // max(1, int(counts.mean()))) if len(counts) else 1
+            for lo in range(0, len(point), step):
+                self._update(point[lo:lo + step], slot[lo:lo + step], counts[lo:lo + step],
+                             px, py, best, best_segment, best_t)
+            # Everything outside the searched square is at least this far away
+            covered = ring * self.cell_size + margin[active]
+            active = active[best[active] > covered]
+
+        if len(active):
+            # Points far from the path: exact search over all segments, a few points at a time
+            step = max(1, chunk_pairs // len(self))
+            for lo in range(0, len(active), step):
+                points = active[lo:lo + step]
+                point = np.repeat(points, len(self))
+                segment = np.tile(np.arange(len(self)), len(points))
+                self._reduce(point, segment, px, py, best, best_segment, best_t)
+        return best, best_segment, best_t
+
+    def _update(self, point, slot, counts, px, py, best, best_segment, best_t):
+        if not len(point):
+            return
+        pair_point = np.repeat(point, counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        segment = self.cell_segments[np.repeat(self.starts[slot], counts) + within]
+        self._reduce(pair_point, segment, px, py, best, best_segment, best_t)
+
+    def _reduce(self, point, segment, px, py, best, best_segment, best_t):
+        """Fold (point, segment) pairs into the running best; pairs must be grouped by point"""
+        distance, t = self._segment_distance(px[point], py[point], segment)
+        new_group = np.empty(len(point), dtype=bool)
+        new_group[0] = True
+        new_group[1:] = point[1:] != point[:-1]
+        starts = np.flatnonzero(new_group)
+        group = np.cumsum(new_group) - 1
+        group_min = np.minimum.reduceat(distance, starts)
+        # First pair of each group reaching the group's minimum
+        at_min = np.flatnonzero(distance == group_min[group])
+        first = np.empty(len(at_min), dtype=bool)
+        first[0] = True
+        first[1:] = group[at_min[1:]] != group[at_min[:-1]]
+        pick = at_min[first]
+        point, distance, segment, t = point[pick], distance[pick], segment[pick], t[pick]
+        better = distance < best[point]
+        point = point[better]
+        best[point] = distance[better]
+        best_segment[point] = segment[better]
+        best_t[point] = t[better]
+
+
+def cross_track_error(ref_lats, ref_lons, lats, lons, cell_size_m: Optional[float] = None) -> CrossTrackResult:
+    """Distance from every point of a trace to the polyline of a reference trace, in meters.
+
+    Both traces are projected to a local metric frame around the reference.
+    Non-finite reference points are skipped; non-finite query points get NaN.
+    """
+    ref_lats = np.asarray(ref_lats, dtype=np.float64)
+    ref_lons = np.asarray(ref_lons, dtype=np.float64)
+    finite = np.isfinite(ref_lats) & np.isfinite(ref_lons)
+    ref_lats, ref_lons = ref_lats[finite], ref_lons[finite]
+    if not len(ref_lats):
+        raise ValueError("The reference trace has no valid points")
+    lat0, lon0 = float(ref_lats.mean()), float(ref_lons.mean())
+    rx, ry = local_xy(ref_lats, ref_lons, lat0, lon0)
+    qx, qy = local_xy(lats, lons, lat0, lon0)
+
+    grid = SegmentGrid(rx, ry, cell_size_m)
+    distance, segment, t = grid.nearest(qx, qy)
+    valid = segment >= 0
+    distance[~valid] = np.nan
+
+    # Sign from the cross product of the segment direction and the point offset
+    seg = np.where(valid, segment, 0)
+    dx, dy = grid.x1[seg] - grid.x0[seg], grid.y1[seg] - grid.y0[seg]
+    cross = dx * (qy - grid.y0[seg]) - dy * (qx - grid.x0[seg])
+    signed = np.where(cross < 0, -distance, distance)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(np.hypot(grid.x1 - grid.x0, grid.y1 - grid.y0))))
+    along = cumulative[seg] + t * (cumulative[seg + 1] - cumulative[seg])
+    along[~valid] = np.nan
+    return CrossTrackResult(distance, signed, np.where(valid, segment, -1), along)
+
+
+def error_summary(errors, percentiles=ERROR_PERCENTILES) -> dict:
+    """Mean, RMS, max and percentiles of absolute errors, ignoring NaNs"""
+    errors = np.abs(np.asarray(errors, dtype=np.float64))
+    errors = errors[np.isfinite(errors)]
+    if not len(errors):
+        return {}
+    summary = {
+        "mean": float(errors.mean()),
+        "rms": float(np.sqrt(np.mean(errors ** 2))),
+        "max": float(errors.max()),
+    }
+    for p, value in zip(percentiles, np.percentile(errors, percentiles)):
+        summary[f"p{p}"] = float(value)
+    return summary
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+EARTH_RADIUS_M = 6371e3
+
+
+# --- Haversine distance for GNSS traces ---
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters; works element-wise on scalars or broadcastable arrays"""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = np.radians(lat2 - lat1)
+    dlambda = np.radians(lon2 - lon1)
+    a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
+    return 2*EARTH_RADIUS_M*np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+
+def segment_distances(lats, lons):
+    """Haversine length of every segment of a polyline (``len(lats) - 1`` values)"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if len(lats) < 2:
+        return np.zeros(0)
+    return haversine(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+
+class RadianTrace:
+    """Lat/lon trace with radians and cos(lat) precomputed for repeated haversine queries"""
+
+    def __init__(self, latlon):
+        latlon = np.asarray(latlon, dtype=np.float64).reshape(-1, 2)
+        self.lat = np.radians(latlon[:, 0])
+        self.lon = np.radians(latlon[:, 1])
+        self.cos_lat = np.cos(self.lat)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def distances_to(self, other: "RadianTrace", i: int, lo: int = 0, hi: int = None) -> np.ndarray:
+        """Haversine distances in meters from point ``i`` of this trace to ``other[lo:hi]``"""
+        lat2 = other.lat[lo:hi]
+        dphi = lat2 - self.lat[i]
+        dlambda = other.lon[lo:hi] - self.lon[i]
+        a = np.sin(dphi / 2) ** 2 + self.cos_lat[i] * other.cos_lat[lo:hi] * np.sin(dlambda / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def local_xy(lats, lons, lat0: float = None, lon0: float = None):
+    """Equirectangular projection to meters east/north of (lat0, lon0), default the trace's mean.
+
+    Distances are off by roughly 0.01% per kilometer of north-south extent at
+    mid latitudes, which is fine for meter-level tolerances on a single drive.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    lat0 = float(np.nanmean(lats)) if lat0 is None else lat0
+    lon0 = float(np.nanmean(lons)) if lon0 is None else lon0
+    x = EARTH_RADIUS_M * np.cos(np.radians(lat0)) * np.radians(lons - lon0)
+    y = EARTH_RADIUS_M * np.radians(lats - lat0)
+    return x, y
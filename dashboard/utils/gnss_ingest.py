@@ -0,0 +1,460 @@
+"""Newline-delimited message ingest shared by the eval client, the dashboard and the tools.
+
+One ``IngestLoop`` waits on any number of connections with a selector (no
+timeout polling) and hands each read's complete lines to the connection's
+sink in one batch: a read is framed with a single ``rfind`` and decoded with
+a single ``decode``, however many messages it holds. Every connection keeps
+``IngestStats`` counters.
+
+Connections are TCP (``connect``), Unix-domain stream sockets
+(``connect_unix``) or UDP sockets (``bind_udp``, unicast or a multicast group)
+on which each datagram carries one message; ``open`` picks one of them by
+transport name. Datagrams waiting together are drained and handed to the sink
+as one batch, like the lines of one stream read.
+"""
+import abc
+import socket
+import struct
+import logging
+import ipaddress
+import selectors
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from dashboard.utils.stage_profiler import DISABLED, StageProfiler
+
+READ_SIZE = 1 << 16
+# Longest partial line kept while waiting for its newline; longer lines are dropped
+MAX_LINE_BYTES = 10 * 1024 * 1024
+# Messages/s is re-estimated at most this often and smoothed with RATE_ALPHA
+RATE_INTERVAL = 0.5
+RATE_ALPHA = 0.3
+# Largest UDP payload; every datagram is read whole
+MAX_DATAGRAM = 65535
+# Datagrams drained per wake-up and handed to the sink as one batch
+DATAGRAM_BATCH = 64
+TRANSPORTS = ("tcp", "udp", "unix")
+# Wake-up period when stopping is signalled by a plain threading.Event instead of a StopEvent
+IDLE_POLL_SECONDS = 0.5
+
+default_logger = logging.getLogger("GNSS Ingest")
+
+
+class StopEvent(threading.Event):
+    """``threading.Event`` whose ``set()`` also wakes every ``IngestLoop`` waiting on it"""
+
+    def __init__(self):
+        super().__init__()
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+
+    def set(self):
+        super().set()
+        try:
+            self._wake_send.send(b"\0")
+        except OSError:
+            pass  # Already woken (buffer full) or closed
+
+    def clear(self):
+        super().clear()
+        try:
+            while self._wake_recv.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def fileno(self) -> int:
+        return self._wake_recv.fileno()
+
+
+class IngestStats:
+    """Counters of one connection"""
+
+    def __init__(self):
+        self.connected_at = None    # time.time()
+        self.last_message_at = None # time.monotonic(), like every ``now`` the loop passes
+        self.reads = 0
+        self.bytes = 0
+        self.messages = 0
+        self.decode_errors = 0      # Messages that were not valid UTF-8 (decoded with replacement)
+        self.oversized = 0          # Lines dropped for exceeding the framing limit
+        self.sink_errors = 0
+        self.rate = None            # Smoothed messages/s
+        self._rate_time = None
+        self._rate_messages = 0
+
+    def update(self, now: float, nbytes: int, messages: int):
+        self.reads += 1
+        self.bytes += nbytes
+        if not messages:
+            return
+        self.messages += messages
+        self.last_message_at = now
+        if self._rate_time is None:
+            self._rate_time, self._rate_messages = now, self.messages - messages
+        elapsed = now - self._rate_time
+        if elapsed >= RATE_INTERVAL:
+            current = (self.messages - self._rate_messages) / elapsed
+            self.rate = current if self.rate is None else RATE_ALPHA * current + (1 - RATE_ALPHA) * self.rate
+            self._rate_time, self._rate_messages = now, self.messages
+
+    def snapshot(self) -> dict:
+        return {
+            "reads": self.reads,
+            "bytes": self.bytes,
+            "messages": self.messages,
+            "decode_errors": self.decode_errors,
+            "oversized": self.oversized,
+            "sink_errors": self.sink_errors,
+            "rate": self.rate,
+        }
+
+
+class LineFramer:
+    """Splits a byte stream into blocks of complete lines"""
+
+    def __init__(self, max_line_bytes: int = MAX_LINE_BYTES):
+        self.max_line_bytes = max_line_bytes
+        self._partial = b""
+        self._discarding = False    # Inside a line that was too long; skip to its end
+        self.oversized = 0
+
+    def feed(self, data: bytes) -> bytes:
+        """Complete lines ending in this data (including their newlines), or ``b""``"""
+        end = data.rfind(b"\n")
+        if end < 0:
+            if not self._discarding:
+                self._partial += data
+                if len(self._partial) > self.max_line_bytes:
+                    self._partial = b""
+                    self._discarding = True
+                    self.oversized += 1
+            return b""
+        if self._discarding:
+            # The rest of the dropped line ends at the first newline
+            data = data[data.find(b"\n") + 1:]
+            end = data.rfind(b"\n")
+            self._discarding = False
+            if end < 0:
+                self._partial = data
+                return b""
+        block = self._partial + data[:end + 1] if self._partial else data[:end + 1]
+        self._partial = data[end + 1:]
+        return block
+
+
+def decode_lines(block: bytes) -> Tuple[List[str], int]:
+    """Non-empty, stripped lines of a block of complete lines, decoded in one call, and how many were not UTF-8.
+
+    Invalid lines are kept, decoded with replacement characters.
+    """
+    try:
+        text, errors = block.decode("utf-8"), 0
+    except UnicodeDecodeError:
+        text = block.decode("utf-8", errors="replace")
+        errors = 0
+        for raw in block.split(b"\n"):
+            try:
+                raw.decode("utf-8")
+            except UnicodeDecodeError:
+                errors += 1
+    return [line for line in (raw.strip() for raw in text.split("\n")) if line], errors
+
+
+class Sink(abc.ABC):
+    """Receives each read's messages as one batch: ``put_many`` gets the decoded lines"""
+
+    raw = False
+
+    @abc.abstractmethod
+    def put_many(self, messages: List[str], now: float):
+        """Take the ``messages`` of one read, received at ``now`` (``time.monotonic``)"""
+
+
+class RawSink(Sink):
+    """Receives each read's undecoded block of complete lines instead (e.g. to only count it)"""
+
+    raw = True
+
+    @abc.abstractmethod
+    def put_block(self, block: bytes, count: int, now: float):
+        """Take one read's ``block`` of ``count`` newline-terminated lines"""
+
+    def put_many(self, messages, now):
+        self.put_block("".join(message + "\n" for message in messages).encode(), len(messages), now)
+
+
+class QueueSink(Sink):
+    """Appends messages to a queue with ``put_many`` (``ThreadSafeQueue``) or ``put``"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def put_many(self, messages, now):
+        if hasattr(self.queue, "put_many"):
+            self.queue.put_many(messages)
+        else:
+            for message in messages:
+                self.queue.put(message)
+
+
+class CallbackSink(Sink):
+    """Calls ``callback(message)`` per message, or ``callback(messages)`` once per read with ``batch``"""
+
+    def __init__(self, callback: Callable, batch: bool = False):
+        self.callback = callback
+        self.batch = batch
+
+    def put_many(self, messages, now):
+        if self.batch:
+            self.callback(messages)
+        else:
+            for message in messages:
+                self.callback(message)
+
+
+class RingBufferSink(Sink):
+    """Appends messages (or ``transform(message)``, skipping None) to a ``SharedRingBuffer`` in one locked batch"""
+
+    def __init__(self, ring, transform: Optional[Callable] = None):
+        self.ring = ring
+        self.transform = transform
+
+    def put_many(self, messages, now):
+        if self.transform is not None:
+            messages = [item for item in map(self.transform, messages) if item is not None]
+        if messages:
+            self.ring.extend(messages)
+
+
+class IngestConnection:
+    def __init__(self, sock: socket.socket, sink: Sink, name: str, max_line_bytes: int = MAX_LINE_BYTES,
+                 datagram: bool = False):
+        self.sock = sock
+        self.sink = sink
+        self.name = name
+        self.datagram = datagram    # One message per datagram instead of a line stream
+        self.framer = LineFramer(max_line_bytes)
+        self.stats = IngestStats()
+        self.stats.connected_at = time.time()
+        self.closed = False
+
+
+class IngestLoop:
+    """Reads any number of connections in one thread until they close or ``stop()`` is called.
+
+    Pass a ``StopEvent`` as ``stop_event`` to stop from elsewhere with
+    ``stop_event.set()``; a plain ``threading.Event`` also works but is only
+    checked every ``IDLE_POLL_SECONDS`` while no data arrives. Reads are timed
+    as ``recv``/``frame``/``decode``/``sink`` stages of ``profiler``. UDP
+    sockets have no end, so a loop with one runs until it is stopped.
+    """
+
+    def __init__(self, stop_event: Optional[threading.Event] = None, read_size: int = READ_SIZE,
+                 logger: logging.Logger = default_logger, max_line_bytes: int = MAX_LINE_BYTES,
+                 profiler: StageProfiler = DISABLED):
+        self.stop_event = StopEvent() if stop_event is None else stop_event
+        self.profiler = profiler
+        self.read_size = read_size
+        self.logger = logger
+        self.max_line_bytes = max_line_bytes
+        self.connections: List[IngestConnection] = []
+        self._selector = selectors.DefaultSelector()
+        self._wakeable = isinstance(self.stop_event, StopEvent)
+        if self._wakeable:
+            self._selector.register(self.stop_event, selectors.EVENT_READ, None)
+
+    def connect(self, host: str, port: int, sink: Sink, timeout: float = 5.0, name: Optional[str] = None) -> IngestConnection:
+        """Open a TCP connection (blocking up to ``timeout``) and add it; raises ``OSError`` on failure"""
+        sock = socket.create_connection((host, port), timeout=timeout)
+        return self.add(sock, sink, name or f"{host}:{port}")
+
+    def connect_unix(self, path: str, sink: Sink, timeout: Optional[float] = 5.0,
+                     name: Optional[str] = None) -> IngestConnection:
+        """Connect to a Unix-domain stream socket and add it; raises ``OSError`` on failure"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        return self.add(sock, sink, name or path)
+
+    def bind_udp(self, host: str, port: int, sink: Sink, interface: str = "0.0.0.0",
+                 name: Optional[str] = None) -> IngestConnection:
+        """Receive the datagrams sent to host:port and add the socket; raises ``OSError`` on failure.
+
+        A multicast ``host`` joins that group on the ``interface`` address;
+        several receivers on one host can join the same group and port.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            if is_multicast(host):
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                if hasattr(socket, "SO_REUSEPORT"):
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                sock.bind((host, port))
+                membership = struct.pack("4s4s", socket.inet_aton(host), socket.inet_aton(interface))
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            else:
+                sock.bind((host, port))
+        except OSError:
+            sock.close()
+            raise
+        return self.add(sock, sink, name or f"udp://{host}:{sock.getsockname()[1]}", datagram=True)
+
+    def open(self, transport: str, sink: Sink, host: str = "127.0.0.1", port: int = 0,
+             path: Optional[str] = None, interface: str = "0.0.0.0", timeout: Optional[float] = 5.0,
+             name: Optional[str] = None) -> IngestConnection:
+        """Add an input by transport name: ``tcp`` connects to host:port, ``unix`` to ``path``,
+        ``udp`` binds host:port (see ``bind_udp``)"""
+        if transport == "tcp":
+            return self.connect(host, port, sink, timeout=timeout, name=name)
+        if transport == "unix":
+            if not path:
+                raise ValueError("the unix transport needs a socket path")
+            return self.connect_unix(path, sink, timeout=timeout, name=name)
+        if transport == "udp":
+            return self.bind_udp(host, port, sink, interface=interface, name=name)
+        raise ValueError(f"unknown transport {transport!r} (expected one of {', '.join(TRANSPORTS)})")
+
+    def add(self, sock: socket.socket, sink: Sink, name: str, datagram: bool = False) -> IngestConnection:
+        sock.setblocking(False)
+        connection = IngestConnection(sock, sink, name, self.max_line_bytes, datagram)
+        self.connections.append(connection)
+        self._selector.register(sock, selectors.EVENT_READ, connection)
+        return connection
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        """Serve all connections; returns once every one is closed or the loop is stopped"""
+        timeout = None if self._wakeable else IDLE_POLL_SECONDS
+        try:
+            while not self.stop_event.is_set() and any(not c.closed for c in self.connections):
+                for key, _ in self._selector.select(timeout):
+                    if key.data is not None:
+                        self._read(key.data)
+        finally:
+            self.close()
+
+    def close(self):
+        """Close every connection and the selector (idempotent)"""
+        for connection in self.connections:
+            self._close(connection)
+        self._selector.close()
+
+    def _read(self, connection: IngestConnection):
+        if connection.datagram:
+            self._read_datagrams(connection)
+            return
+        profiler = self.profiler
+        started = profiler.start()
+        try:
+            data = connection.sock.recv(self.read_size)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            if not self.stop_event.is_set():
+                self.logger.error(f"[Ingest] {connection.name}: socket error: {e}")
+            self._close(connection)
+            return
+        if not data:
+            self.logger.info(f"[Ingest] {connection.name}: server closed connection")
+            self._close(connection)
+            return
+        started = profiler.stop("recv", started)
+
+        now = time.monotonic()
+        stats = connection.stats
+        block = connection.framer.feed(data)
+        stats.oversized = connection.framer.oversized
+        if not block:
+            stats.update(now, len(data), 0)
+            profiler.stop("frame", started, 0)
+            return
+        self._deliver(connection, block, len(data), now, started)
+
+    def _read_datagrams(self, connection: IngestConnection):
+        """Drain up to ``DATAGRAM_BATCH`` waiting datagrams and deliver them as one block of lines"""
+        profiler = self.profiler
+        started = profiler.start()
+        datagrams = []
+        try:
+            while len(datagrams) < DATAGRAM_BATCH:
+                datagrams.append(connection.sock.recv(MAX_DATAGRAM))
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            if not self.stop_event.is_set():
+                self.logger.error(f"[Ingest] {connection.name}: socket error: {e}")
+            self._close(connection)
+            return
+        if not datagrams:
+            return
+        started = profiler.stop("recv", started)
+
+        now = time.monotonic()
+        nbytes = sum(map(len, datagrams))
+        lines = [datagram.rstrip(b"\r\n") for datagram in datagrams]
+        lines = [line for line in lines if line]
+        if not lines:
+            connection.stats.update(now, nbytes, 0)
+            profiler.stop("frame", started, 0)
+            return
+        self._deliver(connection, b"\n".join(lines) + b"\n", nbytes, now, started)
+
+    def _deliver(self, connection: IngestConnection, block: bytes, nbytes: int, now: float, started: int):
+        """Hand a block of complete lines to the connection's sink"""
+        profiler = self.profiler
+        stats = connection.stats
+        try:
+            if connection.sink.raw:
+                count = block.count(b"\n")
+                stats.update(now, nbytes, count)
+                started = profiler.stop("frame", started, count)
+                connection.sink.put_block(block, count, now)
+                profiler.stop("sink", started, count)
+            else:
+                started = profiler.stop("frame", started)
+                messages, errors = decode_lines(block)
+                stats.decode_errors += errors
+                stats.update(now, nbytes, len(messages))
+                started = profiler.stop("decode", started, len(messages))
+                connection.sink.put_many(messages, now)
+                profiler.stop("sink", started, len(messages))
+        except Exception as e:
+            stats.sink_errors += 1
+            if stats.sink_errors == 1 or stats.sink_errors % 1000 == 0:  # A failing sink fails on every read
+                self.logger.error(f"[Ingest] {connection.name}: sink error ({stats.sink_errors} so far): {e}")
+
+    def _close(self, connection: IngestConnection):
+        if connection.closed:
+            return
+        connection.closed = True
+        try:
+            self._selector.unregister(connection.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        connection.sock.close()
+
+
+def is_multicast(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_multicast
+    except ValueError:
+        return False  # A host name
+
+
+def start_ingest_thread(loop: IngestLoop, name: str = "GNSSIngest") -> threading.Thread:
+    thread = threading.Thread(target=loop.run, daemon=True, name=name)
+    thread.start()
+    return thread
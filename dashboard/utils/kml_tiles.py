@@ -0,0 +1,262 @@
+import os
+import zipfile
+from dataclasses import dataclass, field
+from typing import List, Optional
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.geo import EARTH_RADIUS_M
+from dashboard.utils.kml_writer import (
+    COORDINATE_DECIMALS,
+    KML_FOOTER,
+    KML_HEADER,
+    TRACK_STYLE_ID,
+    format_coordinates,
+    placemarks_kml,
+    styles_kml,
+)
+from dashboard.utils.simplify import simplify_trace
+
+# Placemarks drawn by one tile; the rest are pushed down to its children
+TILE_POINTS = 1000
+# Tiles whose track has more points than this are split even when their placemarks fit
+TILE_TRACK_POINTS = 20000
+# Identical positions (e.g. a static receiver) cannot be split further; the last level keeps them all
+MAX_TILE_LEVEL = 20
+# A tile's content is shown once its region spans this many screen pixels. A child spans half
+# its parent, so the parent's coarse track hands over to the children's at twice this size.
+MIN_LOD_PIXELS = 128
+# Coarse tracks are simplified to about a pixel at the largest size they are shown at
+TRACK_TOLERANCE_PIXELS = 1.0
+
+
+@dataclass
+class TileData:
+    """Everything drawn in a tiled KMZ: placemarks and the (full-resolution) track"""
+    point_numbers: np.ndarray
+    point_lats: np.ndarray
+    point_lons: np.ndarray
+    point_fix_types: pd.Categorical
+    track_lats: np.ndarray
+    track_lons: np.ndarray
+
+
+@dataclass
+class Tile:
+    level: int
+    x: int
+    y: int
+    south: float
+    north: float
+    west: float
+    east: float
+    points: np.ndarray = None           # Indices into the placemark arrays drawn by this tile
+    track_runs: np.ndarray = None       # (first, last) track indices of each run inside the tile
+    children: List["Tile"] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return f"{self.level}_{self.x}_{self.y}"
+
+    @property
+    def leaf(self) -> bool:
+        return not self.children
+
+    def width_m(self) -> float:
+        """Larger of the tile's east-west and north-south extent in meters"""
+        mid_lat = np.radians((self.south + self.north) / 2)
+        east_west = np.radians(self.east - self.west) * EARTH_RADIUS_M * np.cos(mid_lat)
+        north_south = np.radians(self.north - self.south) * EARTH_RADIUS_M
+        return float(max(east_west, north_south))
+
+
+def _runs(indices: np.ndarray) -> np.ndarray:
+    """(first, last) of each run of consecutive values in sorted ``indices``"""
+    if not len(indices):
+        return np.zeros((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(indices) > 1)
+    return np.column_stack((indices[np.r_[0, breaks + 1]], indices[np.r_[breaks, len(indices) - 1]]))
+
+
+def build_tiles(data: TileData, tile_points: int = TILE_POINTS, tile_track_points: int = TILE_TRACK_POINTS,
+                max_level: int = MAX_TILE_LEVEL) -> Optional[Tile]:
+    """Quadtree of tiles over the data's bounding box, or None when there is nothing to draw.
+
+    Each tile draws up to ``tile_points`` of the placemarks that reach it,
+    spread evenly in log order, and passes the rest to its quadrants, so
+    every placemark is drawn by exactly one tile. Tracks are split along.
+    """
+    lats = np.concatenate((data.point_lats, data.track_lats))
+    lons = np.concatenate((data.point_lons, data.track_lons))
+    finite = np.isfinite(lats) & np.isfinite(lons)
+    if not finite.any():
+        return None
+    # Pad so no point lies exactly on the outer edge, and give a static log a non-zero extent
+    south, north = lats[finite].min() - 1e-6, lats[finite].max() + 1e-6
+    west, east = lons[finite].min() - 1e-6, lons[finite].max() + 1e-6
+
+    def valid(lat, lon):
+        return np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+
+    root = Tile(0, 0, 0, south, north, west, east)
+    stack = [(root, valid(data.point_lats, data.point_lons), valid(data.track_lats, data.track_lons))]
+    while stack:
+        tile, points, track = stack.pop()
+        tile.track_runs = _runs(track)
+        split = tile.level < max_level and (len(points) > tile_points or len(track) > tile_track_points)
+        if not split:
+            tile.points = points
+            continue
+        keep = np.zeros(len(points), dtype=bool)
+        keep[np.linspace(0, len(points) - 1, min(tile_points, len(points))).astype(np.int64)] = True
+        tile.points = points[keep]
+        points = points[~keep]
+
+        mid_lat = (tile.south + tile.north) / 2
+        mid_lon = (tile.west + tile.east) / 2
+        point_quadrant = (data.point_lats[points] >= mid_lat) * 2 + (data.point_lons[points] >= mid_lon)
+        track_quadrant = (data.track_lats[track] >= mid_lat) * 2 + (data.track_lons[track] >= mid_lon)
+        for quadrant in range(4):
+            north_half, east_half = divmod(quadrant, 2)
+            child_points = points[point_quadrant == quadrant]
+            child_track = track[track_quadrant == quadrant]
+            if not len(child_points) and not len(child_track):
+                continue
+            child = Tile(
+                tile.level + 1, tile.x * 2 + east_half, tile.y * 2 + north_half,
+                mid_lat if north_half else tile.south, tile.north if north_half else mid_lat,
+                mid_lon if east_half else tile.west, tile.east if east_half else mid_lon,
+            )
+            tile.children.append(child)
+            stack.append((child, child_points, child_track))
+    return root
+
+
+def iter_tiles(root: Tile):
+    stack = [root]
+    while stack:
+        tile = stack.pop()
+        yield tile
+        stack.extend(reversed(tile.children))
+
+
+def _region(tile: Tile, min_lod: int, max_lod: int, indent: str) -> str:
+    f = f"%.{COORDINATE_DECIMALS}f"
+    return (f"{indent}<Region><LatLonAltBox><north>{f % tile.north}</north><south>{f % tile.south}</south>"
+            f"<east>{f % tile.east}</east><west>{f % tile.west}</west></LatLonAltBox>"
+            f"<Lod><minLodPixels>{min_lod}</minLodPixels><maxLodPixels>{max_lod}</maxLodPixels></Lod></Region>\n")
+
+
+def render_tile(tile: Tile, data: TileData, name: str, simplify_m: float = 0.0) -> str:
+    """KML document of one tile: its placemarks, its part of the track and links to its children.
+
+    The track is simplified to about a pixel of the tile's largest display
+    size and hidden once the children take over; leaves draw it in full (or
+    simplified by ``simplify_m``) at every zoom level past their own.
+    """
+    min_lod = 0 if tile.level == 0 else MIN_LOD_PIXELS
+    parts = [KML_HEADER.format(name=escape(f"{name} {tile.name}")), styles_kml(data.point_fix_types.categories)]
+
+    if len(tile.points):
+        points = tile.points
+        parts.append("    <Folder>\n      <name>Points</name>\n")
+        parts.append(_region(tile, min_lod, -1, "      "))
+        parts.append(placemarks_kml(data.point_numbers[points], data.point_lats[points], data.point_lons[points],
+                                    data.point_fix_types.take(points), name))
+        parts.append("    </Folder>\n")
+
+    if len(tile.track_runs):
+        if tile.leaf:
+            tolerance, max_lod = simplify_m, -1
+        else:
+            tolerance = tile.width_m() * TRACK_TOLERANCE_PIXELS / (2 * MIN_LOD_PIXELS)
+            max_lod = 2 * MIN_LOD_PIXELS
+        lines = []
+        last_index = len(data.track_lats) - 1
+        for first, last in tile.track_runs:
+            # One point past each end joins the run to the neighbouring tiles' track
+            lo, hi = max(first - 1, 0), min(last + 1, last_index) + 1
+            lats, lons = data.track_lats[lo:hi], data.track_lons[lo:hi]
+            kept = simplify_trace(lats, lons, tolerance).indices
+            if len(kept) > 1:
+                lines.append(f"<LineString><coordinates>{format_coordinates(lats[kept], lons[kept])}</coordinates></LineString>")
+        if lines:
+            parts.append("    <Folder>\n      <name>Track</name>\n")
+            parts.append(_region(tile, min_lod, max_lod, "      "))
+            parts.append(f"      <Placemark><name>Track {tile.name}</name><styleUrl>#{TRACK_STYLE_ID}</styleUrl>"
+                         f"<MultiGeometry>{''.join(lines)}</MultiGeometry></Placemark>\n")
+            parts.append("    </Folder>\n")
+
+    for child in tile.children:
+        parts.append(f"    <NetworkLink>\n      <name>{child.name}</name>\n")
+        parts.append(_region(child, MIN_LOD_PIXELS, -1, "      "))
+        parts.append(f"      <Link><href>{child.name}.kml</href><viewRefreshMode>onRegion</viewRefreshMode></Link>\n"
+                     f"    </NetworkLink>\n")
+
+    parts.append(KML_FOOTER)
+    return "".join(parts)
+
+
+# Tile data is handed to each worker process once, not pickled with every tile
+_worker_data = None
+
+
+def _init_worker(data, name, simplify_m):
+    global _worker_data
+    _worker_data = (data, name, simplify_m)
+
+
+def _render_worker(tile):
+    data, name, simplify_m = _worker_data
+    return tile.name, render_tile(tile, data, name, simplify_m).encode("utf-8")
+
+
+def _tile_job(tile: Tile) -> Tile:
+    """A copy of ``tile`` without its subtree, so submitting it does not pickle the whole tree"""
+    job = Tile(tile.level, tile.x, tile.y, tile.south, tile.north, tile.west, tile.east, tile.points, tile.track_runs)
+    job.children = [Tile(c.level, c.x, c.y, c.south, c.north, c.west, c.east) for c in tile.children]
+    return job
+
+
+def write_tiled_kmz(path, data: TileData, name: str, tile_points: int = TILE_POINTS, simplify_m: float = 0.0,
+                    workers: Optional[int] = None) -> dict:
+    """Write ``data`` as a KMZ of Region-gated, NetworkLinked quadtree tiles.
+
+    ``doc.kml`` links the root tile in ``tiles/``; each tile links its four
+    quadrants, which Google Earth only fetches once they are in view and
+    large enough on screen. Tiles are rendered in ``workers`` processes
+    (default: all CPUs) and written to the archive in tree order.
+    """
+    root = build_tiles(data, tile_points)
+    tiles = [] if root is None else list(iter_tiles(root))
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=3) as kmz:
+        doc = [KML_HEADER.format(name=escape(name))]
+        if root is not None:
+            doc.append(f"    <NetworkLink>\n      <name>{escape(name)}</name>\n"
+                       f"      <Link><href>tiles/{root.name}.kml</href></Link>\n    </NetworkLink>\n")
+        doc.append(KML_FOOTER)
+        kmz.writestr("doc.kml", "".join(doc))
+
+        jobs = [_tile_job(tile) for tile in tiles]
+        if workers == 1 or len(jobs) < 2:
+            _init_worker(data, name, simplify_m)
+            rendered = map(_render_worker, jobs)
+            for tile_name, content in rendered:
+                kmz.writestr(f"tiles/{tile_name}.kml", content)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(data, name, simplify_m)) as executor:
+                for tile_name, content in executor.map(_render_worker, jobs, chunksize=max(1, len(jobs) // (workers * 8))):
+                    kmz.writestr(f"tiles/{tile_name}.kml", content)
+
+    return {
+        "tiles": len(tiles),
+        "levels": 1 + max((tile.level for tile in tiles), default=-1),
+        "points": len(data.point_numbers),
+        "track_points": len(data.track_lats),
+    }
@@ -0,0 +1,156 @@
+import re
+import zipfile
+import itertools
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+
+# KML colors are aabbggrr
+FIX_TYPE_COLORS = {
+    'extrapolated': 'ff0000ff',     # Red
+    'no-fix': 'ff7f7f7f',           # Gray
+    'no-rtk': 'ff00ffff',           # Cyan
+    'float-rtk': 'ff00ff00',        # Green
+    'fixed-rtk': 'ffff0000',        # Blue
+    'dead-reckoning': 'ffff00ff'    # Magenta
+}
+DEFAULT_COLOR = "ffffffff"  # White
+TRACK_COLOR = "ff00ffff"
+POINT_ICON = "http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png"
+# 1e-8 degrees is about a millimeter; the client logs 6 decimals
+COORDINATE_DECIMALS = 8
+TRACK_STYLE_ID = "track"
+
+KML_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+  <Document>
+    <name>{name}</name>
+"""
+KML_FOOTER = "  </Document>\n</kml>\n"
+
+
+def fix_type_color(fix_type) -> str:
+    return FIX_TYPE_COLORS.get(str(fix_type).lower(), DEFAULT_COLOR)
+
+
+def style_id(fix_type) -> str:
+    """Shared style id of a fix type (case-insensitive, like the colors)"""
+    return "fix-" + re.sub(r"[^a-z0-9_.-]", "_", str(fix_type).lower())
+
+
+def _interleave(*columns) -> tuple:
+    return tuple(itertools.chain.from_iterable(zip(*columns)))
+
+
+def format_coordinates(lats, lons) -> str:
+    """``lon,lat,0`` tuples of a LineString, space-terminated, built with one %-format call"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    template = f"%.{COORDINATE_DECIMALS}f,%.{COORDINATE_DECIMALS}f,0 "
+    return (template * len(lats)) % _interleave(lons.tolist(), lats.tolist())
+
+
+def styles_kml(fix_types) -> str:
+    """``<Style>`` elements for each fix type (by ``style_id``) and the track line"""
+    styles = []
+    for fix_type in dict.fromkeys(str(ft).lower() for ft in fix_types):
+        styles.append(f"""    <Style id="{style_id(fix_type)}">
+      <IconStyle>
+        <color>{fix_type_color(fix_type)}</color>
+        <scale>0.6</scale>
+        <Icon>
+          <href>{POINT_ICON}</href>
+        </Icon>
+      </IconStyle>
+    </Style>
+""")
+    styles.append(f"""    <Style id="{TRACK_STYLE_ID}">
+      <LineStyle>
+        <color>{TRACK_COLOR}</color>
+        <width>2</width>
+      </LineStyle>
+    </Style>
+""")
+    return "".join(styles)
+
+
+def placemarks_kml(numbers, lats, lons, fix_types, label: str) -> str:
+    """Point placemarks named ``"<label> <number>"``, formatted with one %-format call"""
+    fix_types = pd.Categorical(fix_types)
+    descriptions = np.array([escape(str(ft)) for ft in fix_types.categories] + [""], dtype=object)
+    styles = np.array([style_id(ft) for ft in fix_types.categories] + [style_id("")], dtype=object)
+    codes = fix_types.codes  # -1 (missing) picks the last entry
+    label = escape(label).replace("%", "%%")
+    template = (f"      <Placemark><name>{label} %d</name><description>FixType: %s</description>"
+                f"<styleUrl>#%s</styleUrl><Point><coordinates>%.{COORDINATE_DECIMALS}f,"
+                f"%.{COORDINATE_DECIMALS}f,0</coordinates></Point></Placemark>\n")
+    return (template * len(codes)) % _interleave(
+        np.asarray(numbers).tolist(),
+        descriptions[codes].tolist(),
+        styles[codes].tolist(),
+        np.asarray(lons, dtype=np.float64).tolist(),
+        np.asarray(lats, dtype=np.float64).tolist(),
+    )
+
+
+class KmlWriter:
+    """Write a KML document piece by piece; a ``.kmz`` path gets a deflated ``doc.kml`` instead.
+
+    Nothing is collected in memory: each call formats its chunk of points
+    with a single %-format (no per-point Python string building) and writes
+    it out. Point placemarks refer to one shared ``<Style>`` per fix type.
+    """
+
+    def __init__(self, path, name: str):
+        self.path = Path(path)
+        self.name = name
+        self._zip = None
+        self._file = None
+
+    def __enter__(self):
+        if self.path.suffix.lower() == ".kmz":
+            self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=3)
+            self._file = self._zip.open("doc.kml", "w", force_zip64=True)
+        else:
+            self._file = open(self.path, "wb")
+        self.write(KML_HEADER.format(name=escape(self.name)))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.write(KML_FOOTER)
+        finally:
+            self._file.close()
+            if self._zip is not None:
+                self._zip.close()
+
+    def write(self, text: str):
+        self._file.write(text.encode("utf-8"))
+
+    def write_styles(self, fix_types):
+        """Shared point styles for ``fix_types`` and the track line style"""
+        self.write(styles_kml(fix_types))
+
+    def begin_folder(self, name: str):
+        self.write(f"    <Folder>\n      <name>{escape(name)}</name>\n")
+
+    def end_folder(self):
+        self.write("    </Folder>\n")
+
+    def write_points(self, numbers, lats, lons, fix_types, label: str = None):
+        """Point placemarks named ``"<label> <number>"`` with their fix type's shared style"""
+        self.write(placemarks_kml(numbers, lats, lons, fix_types, self.name if label is None else label))
+
+    def begin_line(self, name: str):
+        self.write(f"    <Placemark>\n      <name>{escape(name)}</name>\n      <styleUrl>#{TRACK_STYLE_ID}</styleUrl>\n"
+                   f"      <LineString>\n        <coordinates>\n")
+
+    def write_line_coordinates(self, lats, lons):
+        self.write(format_coordinates(lats, lons))
+
+    def end_line(self):
+        self.write("\n        </coordinates>\n      </LineString>\n    </Placemark>\n")
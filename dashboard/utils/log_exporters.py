@@ -0,0 +1,283 @@
+import json
+import inspect
+import contextlib
+from pathlib import Path
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.kml_writer import COORDINATE_DECIMALS, _interleave
+from dashboard.utils.log_loader import DEFAULT_CHUNK_ROWS, LOG_COLUMNS, iter_log_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # Parquet and CSV export are unavailable
+    pa = None
+
+# Rows formatted into one string at a time, so text output never holds a whole chunk twice
+FORMAT_BATCH_ROWS = 1 << 16
+# The client logs timestamps in KST
+DEFAULT_UTC_OFFSET_HOURS = 9.0
+# Decimals the client writes in its log (gnss_eval_tcp_client.py)
+CSV_DECIMALS = {"Latitude": 6, "Longitude": 6, "HPE(m)": 2, "NorthingError(m)": 2, "EastingError(m)": 2,
+                "MessageRate(Hz)": 2}
+
+
+def _json_strings(values: pd.Series) -> np.ndarray:
+    """JSON literals of a column (strings, numbers or timestamps), ``null`` for missing values"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        times = values.to_numpy(dtype="datetime64[ms]")
+        out = np.char.add(np.char.add('"', np.datetime_as_string(times, unit="ms")), '"').astype(object)
+        out[np.isnat(times)] = "null"
+        return out
+    if pd.api.types.is_integer_dtype(values) and not values.hasnans:
+        return values.to_numpy().astype(str).astype(object)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.to_numpy(dtype=values.dtype if values.dtype.kind == "f" else np.float64, na_value=np.nan)
+        out = numbers.astype(str).astype(object)
+        out[~np.isfinite(numbers)] = "null"
+        return out
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        text = values.astype("string")
+        if not text.str.contains(r'["\\\x00-\x1f]', regex=True).any():
+            # Nothing to escape: quoting is enough
+            return ('"' + text + '"').fillna("null").to_numpy(dtype=object)
+    # Text: each distinct value is JSON-encoded once
+    categorical = pd.Categorical(values)
+    literals = np.array([json.dumps(str(value)) for value in categorical.categories] + ["null"], dtype=object)
+    return literals[categorical.codes]
+
+
+def _positions(df: pd.DataFrame) -> np.ndarray:
+    """Rows with finite coordinates; the others have no geometry and are skipped"""
+    if "Latitude" not in df.columns or "Longitude" not in df.columns:
+        raise ValueError("Log has no Latitude/Longitude columns to export")
+    lats = df["Latitude"].to_numpy(dtype=np.float64)
+    lons = df["Longitude"].to_numpy(dtype=np.float64)
+    return np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+
+
+class LogExporter:
+    """Streaming writer of one output format, fed one chunk of the log at a time.
+
+    Subclasses list the file ``suffixes`` they handle and implement
+    ``write``; ``open``/``close`` wrap the output (headers and footers).
+    """
+
+    suffixes = ()
+
+    def __init__(self, path, name: str = "GNSS Log"):
+        self.path = Path(path)
+        self.name = name
+        self.rows = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(complete=exc_type is None)
+
+    def open(self):
+        pass
+
+    def write(self, df: pd.DataFrame):
+        raise NotImplementedError
+
+    def close(self, complete: bool = True):
+        pass
+
+
+class _TextExporter(LogExporter):
+    header = ""
+    footer = ""
+
+    def open(self):
+        self._file = open(self.path, "wb")
+        self._write_text(self.header)
+
+    def _write_text(self, text: str):
+        self._file.write(text.encode("utf-8"))
+
+    def close(self, complete: bool = True):
+        try:
+            if complete:
+                self._write_text(self.footer)
+        finally:
+            self._file.close()
+
+    def write(self, df: pd.DataFrame):
+        rows = _positions(df)
+        for start in range(0, len(rows), FORMAT_BATCH_ROWS):
+            batch = df.iloc[rows[start:start + FORMAT_BATCH_ROWS]]
+            self._write_text(self._format(batch))
+            self.rows += len(batch)
+
+    def _format(self, df: pd.DataFrame) -> str:
+        raise NotImplementedError
+
+
+class GeoJsonExporter(_TextExporter):
+    """FeatureCollection of Point features carrying every other column as a property"""
+
+    suffixes = (".geojson",)
+    header = '{"type": "FeatureCollection", "features": ['
+    footer = "\n]}\n"
+
+    def _format(self, df: pd.DataFrame) -> str:
+        names = [name for name in df.columns if name not in ("Latitude", "Longitude")]
+        properties = ", ".join(f"{json.dumps(name).replace('%', '%%')}: %s" for name in names)
+        template = (f',\n{{"type": "Feature", "geometry": {{"type": "Point", "coordinates": '
+                    f'[%.{COORDINATE_DECIMALS}f, %.{COORDINATE_DECIMALS}f]}}, "properties": {{{properties}}}}}')
+        columns = [df["Longitude"].to_numpy(dtype=np.float64).tolist(), df["Latitude"].to_numpy(dtype=np.float64).tolist()]
+        columns += [_json_strings(df[name]).tolist() for name in names]
+        text = (template * len(df)) % _interleave(*columns)
+        if not self.rows:
+            text = text[1:]  # No comma before the first feature
+        return text
+
+
+class GpxExporter(_TextExporter):
+    """One GPX 1.1 track; ``FixType`` goes to ``<type>`` and times are converted to UTC"""
+
+    suffixes = (".gpx",)
+    footer = "    </trkseg>\n  </trk>\n</gpx>\n"
+
+    def __init__(self, path, name: str = "GNSS Log", utc_offset_hours: float = DEFAULT_UTC_OFFSET_HOURS):
+        super().__init__(path, name)
+        self.utc_offset = np.timedelta64(int(round(utc_offset_hours * 3600 * 1000)), "ms")
+        self.header = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                       '<gpx version="1.1" creator="gnss-eval" xmlns="http://www.topografix.com/GPX/1/1">\n'
+                       f'  <trk>\n    <name>{escape(name)}</name>\n    <trkseg>\n')
+
+    def _format(self, df: pd.DataFrame) -> str:
+        n = len(df)
+        times = np.full(n, "", dtype=object)
+        if "TimestampKST" in df.columns:
+            values = df["TimestampKST"].to_numpy(dtype="datetime64[ms]") - self.utc_offset
+            valid = ~np.isnat(values)
+            times[valid] = np.char.add(np.char.add("<time>", np.datetime_as_string(values[valid], unit="ms")), "Z</time>")
+        types = np.full(n, "", dtype=object)
+        if "FixType" in df.columns:
+            categorical = pd.Categorical(df["FixType"])
+            elements = np.array([f"<type>{escape(str(value))}</type>" for value in categorical.categories] + [""], dtype=object)
+            types = elements[categorical.codes]
+        template = f'      <trkpt lat="%.{COORDINATE_DECIMALS}f" lon="%.{COORDINATE_DECIMALS}f">%s%s</trkpt>\n'
+        return (template * n) % _interleave(
+            df["Latitude"].to_numpy(dtype=np.float64).tolist(),
+            df["Longitude"].to_numpy(dtype=np.float64).tolist(),
+            times.tolist(),
+            types.tolist(),
+        )
+
+
+class ParquetExporter(LogExporter):
+    """All rows and columns, one row group per chunk, with the schema of the first chunk"""
+
+    suffixes = (".parquet",)
+
+    def __init__(self, path, name: str = "GNSS Log", compression: str = "snappy"):
+        super().__init__(path, name)
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow")
+        self.compression = compression
+        self._writer = None
+
+    def write(self, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = pa_parquet.ParquetWriter(self.path, table.schema, compression=self.compression)
+        else:
+            # FixType categories differ between chunks; the dictionary type does not
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self, complete: bool = True):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class CsvExporter(LogExporter):
+    """A client log: its columns in its order, rounded like the client and "N/A" for missing values.
+
+    Trailing zeros are not written (``1.5``, not ``1.50``); the values are the same.
+    """
+
+    suffixes = (".csv",)
+
+    def __init__(self, path, name: str = "GNSS Log"):
+        super().__init__(path, name)
+        if pa is None:
+            raise RuntimeError("CSV export needs pyarrow")
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        columns = [column for column in LOG_COLUMNS if column in df.columns]
+        arrays = []
+        for column in columns:
+            values = df[column]
+            if column in CSV_DECIMALS:
+                array = pa.array(values.to_numpy(dtype=np.float64, na_value=np.nan), from_pandas=True)
+                array = pa_compute.round(array, CSV_DECIMALS[column])
+            elif pd.api.types.is_datetime64_any_dtype(values):
+                # Arrow writes millisecond timestamps as "YYYY-MM-DD HH:MM:SS.fff", like the client
+                array = pa_compute.cast(pa.array(values.to_numpy(dtype="datetime64[ms]"), from_pandas=True), pa.string())
+            else:
+                array = pa.array(values.astype("string").to_numpy(dtype=object, na_value=None), type=pa.string())
+            arrays.append(array)
+        table = pa.Table.from_arrays(arrays, names=columns)
+        if self._writer is None:
+            options = pa_csv.WriteOptions(null_string="N/A", quoting_style="none", quoting_header="none")
+            self._schema = table.schema
+            self._writer = pa_csv.CSVWriter(self.path, self._schema, write_options=options)
+        self._writer.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self, complete: bool = True):
+        if self._writer is not None:
+            self._writer.close()
+
+
+EXPORTERS = {suffix: cls for cls in (GeoJsonExporter, GpxExporter, ParquetExporter, CsvExporter)
+             for suffix in cls.suffixes}
+
+
+def exporter_for(path, name: str = "GNSS Log", **options) -> LogExporter:
+    """Exporter chosen by the file suffix; ``options`` go to exporters that accept them"""
+    suffix = Path(path).suffix.lower()
+    if suffix not in EXPORTERS:
+        raise ValueError(f"Unsupported export format '{suffix}', expected one of {sorted(EXPORTERS)}")
+    cls = EXPORTERS[suffix]
+    accepted = inspect.signature(cls).parameters
+    return cls(path, name, **{key: value for key, value in options.items() if key in accepted})
+
+
+def export_log(source, exporters: Iterable[LogExporter], fix_types: Optional[Iterable[str]] = None,
+               chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Read ``source`` once, in chunks, and feed every chunk to all ``exporters``.
+
+    Only rows whose FixType is in ``fix_types`` (case-insensitive) are kept
+    when it is given. Returns the number of rows read after filtering.
+    """
+    exporters = list(exporters)
+    selected = None if fix_types is None else {ft.lower() for ft in fix_types}
+    rows = 0
+    with contextlib.ExitStack() as stack:
+        for exporter in exporters:
+            stack.enter_context(exporter)
+        for chunk in iter_log_chunks(source, chunk_rows=chunk_rows):
+            if selected is not None and "FixType" in chunk.columns:
+                fix = chunk["FixType"].astype("category")
+                allowed = np.append(fix.cat.categories.str.lower().isin(selected), False)
+                chunk = chunk[allowed[fix.cat.codes.to_numpy()]]
+            for exporter in exporters:
+                exporter.write(chunk)
+            rows += len(chunk)
+    return rows
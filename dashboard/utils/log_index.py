@@ -0,0 +1,193 @@
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.geo import haversine, segment_distances
+from dashboard.utils.log_loader import parse_timestamps
+
+
+def _bit_dtype(n_types: int):
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_types <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"Too many fix types for a bitmask index: {n_types}")
+
+
+class LogIndex:
+    """Arrays built once per log so fix-type and time-window selections need no DataFrame filtering.
+
+    - ``fix_codes``: FixType as codes into ``fix_types`` (sorted names, -1 for missing)
+    - ``fix_bits``: one bit per fix type, so any set of types is a single AND
+    - ``times`` plus ``time_order``: window bounds are found by binary search
+    - ``cum_distance``: cumulative haversine segment lengths in file order
+
+    A selection of rows keeps the file order, and its metrics are those
+    ``analyze_log(df[mask])`` reports: runs of consecutive rows take their
+    distance from ``cum_distance``; only the jumps between runs are computed.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+
+        self.has_fix_type = "FixType" in df.columns
+        if self.has_fix_type:
+            self.fix_types = sorted(df["FixType"].dropna().unique())
+            self.fix_codes = pd.Categorical(df["FixType"], categories=self.fix_types).codes.astype(np.int16)
+        else:
+            self.fix_types = []
+            self.fix_codes = np.full(self.n, -1, dtype=np.int16)
+        bit_dtype = _bit_dtype(len(self.fix_types))
+        self.fix_bits = np.zeros(self.n, dtype=bit_dtype)
+        present = self.fix_codes >= 0
+        self.fix_bits[present] = np.left_shift(bit_dtype(1), self.fix_codes[present].astype(bit_dtype))
+        self.fix_totals = np.bincount(self.fix_codes[present], minlength=len(self.fix_types))
+
+        self.times = None
+        if "TimestampKST" in df.columns:
+            timestamps = df["TimestampKST"]
+            if not pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = parse_timestamps(timestamps)
+            self.times = timestamps.to_numpy(dtype="datetime64[ms]")
+            # Logs are written in time order; the permutation is only kept when they are not
+            self.time_sorted = not np.isnat(self.times).any() and bool(np.all(self.times[1:] >= self.times[:-1]))
+            self.time_order = None if self.time_sorted else np.argsort(self.times, kind="stable")
+
+        self.has_position = "Latitude" in df.columns and "Longitude" in df.columns
+        if self.has_position:
+            self.lats = df["Latitude"].to_numpy(dtype=np.float64)
+            self.lons = df["Longitude"].to_numpy(dtype=np.float64)
+            segments = segment_distances(self.lats, self.lons)
+            bad = np.isnan(segments)
+            # NaN segments are counted separately so they only poison selections that include them
+            self.cum_distance = np.concatenate(([0.0], np.cumsum(np.where(bad, 0.0, segments))))
+            self.cum_bad = np.concatenate(([0], np.cumsum(bad)))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the index arrays, for the result cache's memory budget"""
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+    def __len__(self):
+        return self.n
+
+    def time_range(self):
+        """(first, last) timestamp of the log, or None without valid timestamps"""
+        if self.times is None:
+            return None
+        valid = self.times[~np.isnat(self.times)]
+        if not len(valid):
+            return None
+        return pd.Timestamp(valid.min()), pd.Timestamp(valid.max())
+
+    def _window(self, start, end):
+        """Row range [lo, hi) when the log is time-sorted, otherwise a boolean mask"""
+        start = np.datetime64(pd.Timestamp(start), "ms") if start is not None else None
+        end = np.datetime64(pd.Timestamp(end), "ms") if end is not None else None
+        sorted_times = self.times if self.time_sorted else self.times[self.time_order]
+        n_valid = len(sorted_times) - int(np.isnat(sorted_times).sum())  # NaT sorts last
+        lo = 0 if start is None else int(np.searchsorted(sorted_times[:n_valid], start, side="left"))
+        hi = n_valid if end is None else int(np.searchsorted(sorted_times[:n_valid], end, side="right"))
+        if self.time_sorted:
+            return lo, hi
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.time_order[lo:hi]] = True
+        return mask
+
+    def select(self, fix_types: Optional[Iterable] = None, start=None, end=None) -> np.ndarray:
+        """Boolean row mask for the given fix types (default: all rows) and inclusive time window"""
+        return self._select(fix_types, self._window_for(start, end))
+
+    def _window_for(self, start, end):
+        if self.times is None or (start is None and end is None):
+            return None
+        return self._window(start, end)
+
+    def _select(self, fix_types, window):
+        mask = None
+        if fix_types:
+            wanted = set(fix_types)
+            bits = 0
+            for code, fix_type in enumerate(self.fix_types):
+                if fix_type in wanted:
+                    bits |= 1 << code
+            mask = (self.fix_bits & self.fix_bits.dtype.type(bits)) != 0
+        if isinstance(window, tuple):
+            lo, hi = window
+            window = np.zeros(self.n, dtype=bool)
+            window[lo:hi] = True
+        if window is not None:
+            mask = window if mask is None else mask & window
+        return np.ones(self.n, dtype=bool) if mask is None else mask
+
+    def _runs(self, mask):
+        """First and last row of every run of consecutive selected rows"""
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).view(np.int8)))
+        return edges[0::2], edges[1::2] - 1
+
+    def distance(self, mask: np.ndarray) -> float:
+        """Haversine length of the selected rows, joined in file order"""
+        if not self.has_position:
+            return 0.0
+        starts, ends = self._runs(mask)
+        if (ends - starts + 1).sum() < 2:
+            return 0.0
+        runs = self.cum_distance[ends] - self.cum_distance[starts]
+        if (self.cum_bad[ends] - self.cum_bad[starts]).any():
+            return float("nan")
+        jumps = haversine(self.lats[ends[:-1]], self.lons[ends[:-1]], self.lats[starts[1:]], self.lons[starts[1:]])
+        return float(runs.sum() + jumps.sum())
+
+    def fix_counts(self, mask: np.ndarray, fix_types: Optional[Iterable] = None, window=None) -> np.ndarray:
+        """Rows per fix type in the selection; a contiguous time window only counts its own slice"""
+        if window is None:
+            counts = self.fix_totals.copy()
+        elif isinstance(window, tuple):
+            codes = self.fix_codes[window[0]:window[1]]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.fix_types))
+        else:
+            codes = self.fix_codes[mask]
+            return np.bincount(codes[codes >= 0], minlength=len(self.fix_types))
+        if fix_types:
+            wanted = set(fix_types)
+            counts[[fix_type not in wanted for fix_type in self.fix_types]] = 0
+        return counts
+
+    def analysis(self, fix_types: Optional[Iterable] = None, start=None, end=None) -> dict:
+        """``analyze_log`` of the selected rows, computed from the index"""
+        window = self._window_for(start, end)
+        mask = self._select(fix_types, window)
+        starts, ends = self._runs(mask)
+        points = int((ends - starts + 1).sum())
+        result = {}
+
+        duration = None
+        if self.times is not None and points:
+            duration = pd.Timedelta(self.times[ends[-1]] - self.times[starts[0]])
+        if duration is not None and not pd.isna(duration):
+            duration_seconds = duration.total_seconds()
+            result["Trace Duration"] = str(duration)
+            result["Sampling Rate (Hz)"] = round(points / duration_seconds, 3) if duration_seconds > 0 else "N/A"
+        else:
+            result["Trace Duration"] = "N/A"
+            result["Sampling Rate (Hz)"] = "N/A"
+
+        if self.has_position:
+            ranges = []
+            for values in (self.lats, self.lons):
+                where = mask & ~np.isnan(values)
+                ranges.append([float(np.min(values, where=where, initial=np.inf)),
+                               float(np.max(values, where=where, initial=-np.inf))] if where.any() else [np.nan, np.nan])
+            result["Latitude Range"], result["Longitude Range"] = ranges
+            result["Total Distance (meters)"] = round(self.distance(mask), 2)
+        else:
+            result["Latitude Range"] = "N/A"
+            result["Longitude Range"] = "N/A"
+            result["Total Distance (meters)"] = "N/A"
+
+        if self.has_fix_type:
+            counts = self.fix_counts(mask, fix_types, window)
+            distribution = {fix_type: int(count) for fix_type, count in zip(self.fix_types, counts) if count > 0}
+            result["FixType Distribution"] = dict(sorted(distribution.items(), key=lambda item: -item[1]))
+
+        return result
@@ -0,0 +1,295 @@
+import os
+import io
+import json
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pandas' C parser is used instead and no sidecars are written
+    pa = None
+
+from dashboard.utils.logger import logger
+
+
+# Columns written by gnss_eval_tcp_client.py, in file order, with their pandas dtypes
+LOG_DTYPES = {
+    "TimestampKST": "datetime64[ms]",
+    "GNSSTime": "string",
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "FixType": "category",
+    "HPE(m)": "float32",
+    "NorthingError(m)": "float32",
+    "EastingError(m)": "float32",
+    "MessageRate(Hz)": "float32",
+}
+LOG_COLUMNS = list(LOG_DTYPES)
+TRACE_COLUMNS = ["TimestampKST", "Latitude", "Longitude", "FixType"]
+# Values the client writes for missing fields
+NULL_VALUES = ["", "N/A", "NaN", "nan"]
+
+SIDECAR_SUFFIX = ".parquet"
+# Bump when LOG_DTYPES or the parsing changes so old sidecars are rebuilt
+SIDECAR_VERSION = 1
+_SIDECAR_META_KEY = b"gnss_log_source"
+
+DEFAULT_CHUNK_ROWS = 500_000
+# pyarrow's streaming CSV reader buffers a few dozen blocks ahead, so blocks are kept small
+# and regrouped into chunks; this bounds its read-ahead to tens of MB
+_CSV_BLOCK_BYTES = 1 << 20
+
+Source = Union[str, os.PathLike, io.IOBase]
+
+
+def sidecar_path(path: Union[str, os.PathLike]) -> Path:
+    """Parquet sidecar kept next to a CSV log (``log.csv`` -> ``log.csv.parquet``)"""
+    path = Path(path)
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def _arrow_type(dtype: str):
+    if dtype == "datetime64[ms]":
+        return pa.timestamp("ms")
+    if dtype == "string":
+        return pa.string()
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.from_numpy_dtype(dtype)
+
+
+def read_header(source: Source) -> list:
+    """Column names of a CSV log without reading its body"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            line = f.readline()
+    else:
+        position = source.tell()
+        line = source.readline()
+        source.seek(position)
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+    return [name.strip() for name in line.strip().split(",")] if line.strip() else []
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """Parse client timestamps (KST, or UTC with a " UTC" suffix when KST was unavailable)"""
+    text = values.astype("string").str.removesuffix(" UTC")
+    return pd.to_datetime(text, format="ISO8601", errors="coerce").astype("datetime64[ms]")
+
+
+def _read_csv_arrow(source: Source, columns: list) -> pd.DataFrame:
+    column_types = {name: _arrow_type(LOG_DTYPES[name]) for name in columns if name in LOG_DTYPES}
+    position = None if isinstance(source, (str, os.PathLike)) else source.tell()
+
+    def read(types):
+        if position is not None:
+            source.seek(position)
+        convert_options = pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types=types,
+            null_values=NULL_VALUES,
+            strings_can_be_null=False,
+        )
+        return pa_csv.read_csv(source, convert_options=convert_options)
+
+    try:
+        df = read(column_types).to_pandas()
+    except pa.ArrowInvalid:
+        # Timestamps that are not plain ISO 8601 (e.g. a " UTC" suffix) are parsed by pandas instead
+        if "TimestampKST" not in column_types:
+            raise
+        column_types["TimestampKST"] = pa.string()
+        df = read(column_types).to_pandas()
+        df["TimestampKST"] = parse_timestamps(df["TimestampKST"])
+    return df
+
+
+def _read_csv_pandas(source: Source, columns: list) -> pd.DataFrame:
+    dtypes = {name: dtype for name, dtype in LOG_DTYPES.items() if name in columns and name != "TimestampKST"}
+    # Like the pyarrow reader, string columns keep "N/A" as text
+    na_values = {name: NULL_VALUES for name in columns if LOG_DTYPES.get(name) != "string"}
+    df = pd.read_csv(source, usecols=columns, dtype=dtypes, na_values=na_values, keep_default_na=False)
+    if "TimestampKST" in df.columns:
+        df["TimestampKST"] = parse_timestamps(df["TimestampKST"])
+    return df[columns]
+
+
+def read_log_csv(source: Source, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Read a client CSV log with explicit dtypes, parsing only ``columns`` (default: all).
+
+    Requested columns missing from the file are skipped. ``FixType`` is
+    categorical and ``TimestampKST`` is parsed to ``datetime64[ms]``.
+    """
+    header = read_header(source)
+    wanted = header if columns is None else [name for name in columns if name in header]
+    if pa is not None:
+        return _read_csv_arrow(source, wanted)
+    return _read_csv_pandas(source, wanted)
+
+
+def _source_stamp(path: Path) -> dict:
+    stat = path.stat()
+    return {"version": SIDECAR_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _fresh_sidecar(path: Path) -> Optional[Path]:
+    """The sidecar of ``path`` if it exists and was written from the current CSV"""
+    sidecar = sidecar_path(path)
+    if not sidecar.exists():
+        return None
+    try:
+        schema = pa_parquet.read_schema(sidecar)
+        stamp = json.loads((schema.metadata or {}).get(_SIDECAR_META_KEY, b"{}"))
+        return sidecar if stamp == _source_stamp(path) else None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable sidecar {sidecar}: {e}")
+        return None
+
+
+def _read_sidecar(path: Path, columns: Optional[Iterable[str]]) -> Optional[pd.DataFrame]:
+    sidecar = _fresh_sidecar(path)
+    if sidecar is None:
+        return None
+    try:
+        names = pa_parquet.read_schema(sidecar).names
+        wanted = None if columns is None else [name for name in columns if name in names]
+        return pa_parquet.read_table(sidecar, columns=wanted).to_pandas()
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable sidecar {sidecar}: {e}")
+        return None
+
+
+def _write_sidecar(path: Path, df: pd.DataFrame):
+    sidecar = sidecar_path(path)
+    tmp_path = sidecar.with_name(f".{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SIDECAR_META_KEY] = json.dumps(_source_stamp(path)).encode("utf-8")
+        pa_parquet.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, sidecar)
+    except Exception as e:
+        logger.warning(f"Could not write sidecar {sidecar}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def load_log(source: Source, columns: Optional[Iterable[str]] = None, use_sidecar: bool = True) -> pd.DataFrame:
+    """Load a client log, preferring an up-to-date Parquet sidecar for file paths.
+
+    The first load of a CSV path parses every column and writes
+    ``<log>.csv.parquet`` next to it; later loads read only ``columns`` from
+    the sidecar. Sidecars are rebuilt when the CSV's size or mtime changes.
+    File-like sources (e.g. dashboard uploads) are parsed directly.
+    """
+    columns = None if columns is None else list(columns)
+    if isinstance(source, (str, os.PathLike)) and Path(source).suffix == SIDECAR_SUFFIX:
+        return pd.read_parquet(source, columns=columns)
+    if not use_sidecar or pa is None or not isinstance(source, (str, os.PathLike)):
+        return read_log_csv(source, columns)
+
+    path = Path(source)
+    df = _read_sidecar(path, columns)
+    if df is not None:
+        return df
+    df = read_log_csv(path)
+    _write_sidecar(path, df)
+    if columns is not None:
+        df = df[[name for name in columns if name in df.columns]]
+    return df
+
+
+def _iter_parquet(path: Path, columns: Optional[list], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    parquet_file = pa_parquet.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    wanted = None if columns is None else [name for name in columns if name in schema.names]
+    empty = True
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=wanted):
+        empty = False
+        # Going through a Table keeps the pandas metadata (e.g. the "string" dtype of GNSSTime)
+        yield pa.Table.from_batches([batch]).replace_schema_metadata(schema.metadata).to_pandas()
+    if empty:  # A log without rows still yields one empty chunk with its columns
+        yield parquet_file.read(columns=wanted).to_pandas()
+
+
+def _iter_csv_arrow(source: Source, columns: list, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    column_types = {name: _arrow_type(LOG_DTYPES[name]) for name in columns if name in LOG_DTYPES}
+    # A bad timestamp can appear in any block, after earlier blocks were already consumed,
+    # so timestamps are read as text and converted chunk by chunk (see _arrow_chunk)
+    if "TimestampKST" in column_types:
+        column_types["TimestampKST"] = pa.string()
+    read_options = pa_csv.ReadOptions(block_size=_CSV_BLOCK_BYTES)
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types=column_types,
+        null_values=NULL_VALUES,
+        strings_can_be_null=False,
+    )
+    with pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options) as reader:
+        batches, rows, empty = [], 0, True
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            if rows >= chunk_rows:
+                yield _arrow_chunk(pa.Table.from_batches(batches))
+                batches, rows, empty = [], 0, False
+        if batches or empty:  # A log without rows still yields one empty chunk with its columns
+            yield _arrow_chunk(pa.Table.from_batches(batches, schema=reader.schema))
+
+
+def _arrow_chunk(table) -> pd.DataFrame:
+    if "TimestampKST" in table.column_names:
+        try:
+            timestamps = pa_compute.cast(table["TimestampKST"], pa.timestamp("ms"))
+        except pa.ArrowInvalid:
+            return _parse_chunk(table.to_pandas())
+        table = table.set_column(table.column_names.index("TimestampKST"), "TimestampKST", timestamps)
+    return table.to_pandas()
+
+
+def _parse_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    if "TimestampKST" in df.columns:
+        df["TimestampKST"] = parse_timestamps(df["TimestampKST"])
+    return df
+
+
+def _iter_csv_pandas(source: Source, columns: list, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    dtypes = {name: dtype for name, dtype in LOG_DTYPES.items() if name in columns and name != "TimestampKST"}
+    na_values = {name: NULL_VALUES for name in columns if LOG_DTYPES.get(name) != "string"}
+    with pd.read_csv(source, usecols=columns, dtype=dtypes, na_values=na_values, keep_default_na=False,
+                     chunksize=chunk_rows) as reader:
+        for df in reader:
+            yield _parse_chunk(df)[columns]
+
+
+def iter_log_chunks(source: Source, columns: Optional[Iterable[str]] = None,
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS, use_sidecar: bool = True) -> Iterator[pd.DataFrame]:
+    """Yield a client log as consecutive DataFrames, with the same dtypes as ``load_log``.
+
+    Only about ``chunk_rows`` rows are held at a time, so logs larger than
+    memory can be reduced chunk by chunk. An up-to-date sidecar is streamed
+    when there is one; CSVs are streamed directly and no sidecar is written.
+    Categorical ``FixType`` categories may differ between chunks.
+    """
+    columns = None if columns is None else list(columns)
+    is_path = isinstance(source, (str, os.PathLike))
+    if is_path and Path(source).suffix == SIDECAR_SUFFIX:
+        yield from _iter_parquet(Path(source), columns, chunk_rows)
+        return
+    if is_path and use_sidecar and pa is not None:
+        sidecar = _fresh_sidecar(Path(source))
+        if sidecar is not None:
+            yield from _iter_parquet(sidecar, columns, chunk_rows)
+            return
+
+    header = read_header(source)
+    wanted = header if columns is None else [name for name in columns if name in header]
+    if pa is not None:
+        yield from _iter_csv_arrow(source, wanted, chunk_rows)
+    else:
+        yield from _iter_csv_pandas(source, wanted, chunk_rows)
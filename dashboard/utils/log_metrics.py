@@ -0,0 +1,351 @@
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.cross_track import cross_track_error, error_summary
+from dashboard.utils.geo import segment_distances
+from dashboard.utils.log_loader import parse_timestamps
+from dashboard.utils.logger import logger
+from dashboard.utils.time_sync import sync_logs, synced_separation
+from dashboard.utils.trace_dtw import multiscale_dtw_distance, similarity_score
+
+
+# Segments per block of the distance sum. Blocks start at fixed segment indices, so the
+# sum is the same whether the log is reduced in one piece or in chunks of any size.
+DISTANCE_BLOCK = 1 << 16
+
+
+class BlockSum:
+    """Float sum of a stream added up in fixed-size blocks, independent of how the stream is split"""
+
+    def __init__(self, block: int = DISTANCE_BLOCK):
+        self.block = block
+        self.total = 0.0
+        self._pending = np.zeros(0)
+
+    def update(self, values):
+        values = np.concatenate((self._pending, np.asarray(values, dtype=np.float64)))
+        full = len(values) - len(values) % self.block
+        for lo in range(0, full, self.block):
+            self.total += float(np.sum(values[lo:lo + self.block]))
+        self._pending = values[full:]
+
+    def result(self) -> float:
+        return self.total + float(np.sum(self._pending))
+
+
+class DistanceReducer:
+    """Haversine length of a trace fed in consecutive chunks; the last point is carried to the next chunk"""
+
+    def __init__(self):
+        self._sum = BlockSum()
+        self._last = None
+
+    def update(self, lats, lons):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if not len(lats):
+            return
+        if self._last is not None:
+            lats = np.concatenate(([self._last[0]], lats))
+            lons = np.concatenate(([self._last[1]], lons))
+        self._sum.update(segment_distances(lats, lons))
+        self._last = (lats[-1], lons[-1])
+
+    def result(self) -> float:
+        return self._sum.result()
+
+
+class ValueCounts:
+    """Distribution of the finite values of a stream as sorted bin values and their counts.
+
+    Values are rounded to ``resolution`` (the client logs errors and rates
+    with two decimals) for the percentiles; the mean, mean square and max
+    are kept exactly. If more than ``max_bins`` bins are occupied the
+    resolution is doubled until they fit, so memory stays bounded however
+    many distinct values the stream has.
+    """
+
+    def __init__(self, resolution: float = 0.01, max_bins: int = 1 << 16):
+        self.resolution = resolution
+        self.max_bins = max_bins
+        self.bins = np.zeros(0)     # Bin index of each value, rounded value / resolution
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.max = -np.inf
+        self._sum = BlockSum()
+        self._square_sum = BlockSum()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self._sum.update(values)
+        self._square_sum.update(values * values)
+        self.max = max(self.max, float(values.max()))
+        new_bins, new_counts = np.unique(np.round(values / self.resolution), return_counts=True)
+        self._merge(np.concatenate((self.bins, new_bins)), np.concatenate((self.counts, new_counts)))
+        while len(self.bins) > self.max_bins:
+            self.resolution *= 2
+            self._merge(np.round(self.bins / 2), self.counts)
+
+    def _merge(self, bins, counts):
+        merged, inverse = np.unique(bins, return_inverse=True)
+        self.bins = merged
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(merged)).astype(np.int64)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.bins * self.resolution
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    def mean(self) -> float:
+        return self._sum.result() / self.n
+
+    def mean_square(self) -> float:
+        return self._square_sum.result() / self.n
+
+    def percentile(self, p: float) -> float:
+        """Linearly interpolated percentile, like ``np.percentile``'s default method"""
+        rank = p / 100.0 * (self.n - 1)
+        lo = int(np.floor(rank))
+        cumulative = np.cumsum(self.counts)
+        a, b = self.values[np.searchsorted(cumulative, [lo, min(lo + 1, self.n - 1)], side="right")]
+        return float(a + (b - a) * (rank - lo))
+
+    def stats(self, prefix, percentiles=(50, 95)):
+        if not self.n:
+            return {}
+        stats = {f"{prefix}_mean": self.mean(), f"{prefix}_max": self.max}
+        for p in percentiles:
+            stats[f"{prefix}_p{p}"] = self.percentile(p)
+        return stats
+
+
+def total_distance(df):
+    if 'Latitude' in df.columns and 'Longitude' in df.columns and len(df) > 1:
+        distance = DistanceReducer()
+        distance.update(df['Latitude'].values, df['Longitude'].values)
+        return distance.result()
+    return 0.0
+
+
+class LogSummary:
+    """Streaming reducer for the single-log metrics.
+
+    Feed consecutive chunks of a log to ``update`` and read ``analysis()``
+    (the log-analysis page's dict) or ``row()`` (a flat row with accuracy
+    statistics). ``analyze_log`` and ``summarize_log`` run this over a whole
+    DataFrame as one chunk, so chunked and in-memory results are identical.
+    """
+
+    def __init__(self, accuracy: bool = True):
+        self.accuracy = accuracy
+        self.columns = set()
+        self.points = 0
+        self.first_time = None
+        self.last_time = None
+        self.time_error = None
+        self.lat_range = [np.nan, np.nan]
+        self.lon_range = [np.nan, np.nan]
+        self.distance = DistanceReducer()
+        self.fix_counts = {}
+        self.hpe = ValueCounts()
+        self.horizontal = ValueCounts()
+        self.northing = ValueCounts()
+        self.easting = ValueCounts()
+        self.message_rate = ValueCounts()
+
+    def update(self, df):
+        self.columns.update(df.columns)
+        if not len(df):
+            return self
+        self.points += len(df)
+        self._update_time(df)
+
+        if "Latitude" in df.columns and "Longitude" in df.columns:
+            for bounds, values in ((self.lat_range, df["Latitude"]), (self.lon_range, df["Longitude"])):
+                bounds[0] = float(np.fmin(bounds[0], values.min()))
+                bounds[1] = float(np.fmax(bounds[1], values.max()))
+            self.distance.update(df["Latitude"].values, df["Longitude"].values)
+
+        if "FixType" in df.columns:
+            for fix_type, count in df["FixType"].value_counts().items():
+                if count > 0:  # Categorical counts include filtered-out types
+                    self.fix_counts[fix_type] = self.fix_counts.get(fix_type, 0) + int(count)
+
+        if self.accuracy:
+            self._update_accuracy(df)
+        return self
+
+    def _update_time(self, df):
+        if "TimestampKST" not in df.columns or self.time_error is not None:
+            return
+        # TimestampKST is parsed by the loader; strings only appear in frames built elsewhere
+        try:
+            timestamps = df["TimestampKST"].iloc[[0, -1]]
+            if not pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = parse_timestamps(timestamps)
+        except Exception as e:
+            logger.warning(f"Error parsing TimestampKST: {e}")
+            self.time_error = e
+            return
+        if self.first_time is None:
+            self.first_time = timestamps.iloc[0]
+        self.last_time = timestamps.iloc[1]
+
+    def _update_accuracy(self, df):
+        if "HPE(m)" in df.columns:
+            self.hpe.update(df["HPE(m)"].to_numpy(dtype=np.float64))
+        if "NorthingError(m)" in df.columns and "EastingError(m)" in df.columns:
+            north = df["NorthingError(m)"].to_numpy(dtype=np.float64)
+            east = df["EastingError(m)"].to_numpy(dtype=np.float64)
+            horizontal = np.hypot(north, east)
+            finite = np.isfinite(horizontal)
+            self.horizontal.update(horizontal[finite])
+            self.northing.update(north[finite])
+            self.easting.update(east[finite])
+        if "MessageRate(Hz)" in df.columns:
+            self.message_rate.update(df["MessageRate(Hz)"].to_numpy(dtype=np.float64))
+
+    def duration(self):
+        """Time between the first and last fix, or None if TimestampKST is missing or unparseable"""
+        if self.time_error is not None or self.first_time is None:
+            return None
+        duration = self.last_time - self.first_time
+        return None if pd.isna(duration) else duration
+
+    def analysis(self):
+        """Single-log metrics shown on the log-analysis page"""
+        result = {}
+
+        duration = self.duration()
+        if duration is not None:
+            duration_seconds = duration.total_seconds()
+            result["Trace Duration"] = str(duration)
+            result["Sampling Rate (Hz)"] = round(self.points / duration_seconds, 3) if duration_seconds > 0 else "N/A"
+        else:
+            result["Trace Duration"] = "N/A"
+            result["Sampling Rate (Hz)"] = "N/A"
+
+        # Latitude/Longitude Range and Total Distance
+        if "Latitude" in self.columns and "Longitude" in self.columns:
+            result["Latitude Range"] = list(self.lat_range)
+            result["Longitude Range"] = list(self.lon_range)
+            result["Total Distance (meters)"] = round(self.distance.result(), 2)
+        else:
+            result["Latitude Range"] = "N/A"
+            result["Longitude Range"] = "N/A"
+            result["Total Distance (meters)"] = "N/A"
+
+        # FixType Distribution
+        if "FixType" in self.columns:
+            result["FixType Distribution"] = dict(sorted(self.fix_counts.items(), key=lambda item: -item[1]))
+
+        return result
+
+    def accuracy_stats(self):
+        """HPE and ground-truth error statistics from the client's error columns, where present"""
+        stats = self.hpe.stats("hpe_m")
+        stats.update(self.horizontal.stats("horizontal_error_m"))
+        if self.horizontal.n:
+            stats["northing_bias_m"] = self.northing.mean()
+            stats["easting_bias_m"] = self.easting.mean()
+            stats["horizontal_rms_m"] = float(np.sqrt(self.horizontal.mean_square()))
+        if self.message_rate.n:
+            stats["message_rate_mean_hz"] = self.message_rate.mean()
+        return stats
+
+    def row(self):
+        """One flat row of metrics: the page's analysis plus accuracy statistics"""
+        analysis = self.analysis()
+        row = {"points": self.points}
+        duration = self.duration()
+        row["duration_s"] = duration.total_seconds() if duration is not None else np.nan
+        rate = analysis["Sampling Rate (Hz)"]
+        row["sampling_rate_hz"] = rate if rate != "N/A" else np.nan
+        for axis, key in (("lat", "Latitude Range"), ("lon", "Longitude Range")):
+            bounds = analysis[key] if isinstance(analysis[key], list) else [np.nan, np.nan]
+            row[f"{axis}_min"], row[f"{axis}_max"] = bounds
+        distance = analysis["Total Distance (meters)"]
+        row["distance_m"] = distance if distance != "N/A" else np.nan
+        for fix_type, count in analysis.get("FixType Distribution", {}).items():
+            row[f"fix_{fix_type}"] = count
+            row[f"fix_{fix_type}_pct"] = round(100.0 * count / self.points, 3) if self.points else 0.0
+        if self.accuracy:
+            row.update(self.accuracy_stats())
+        return row
+
+
+def analyze_log(filtered_df):
+    """Single-log metrics shown on the log-analysis page"""
+    return LogSummary(accuracy=False).update(filtered_df).analysis()
+
+
+def accuracy_stats(df):
+    return LogSummary().update(df).accuracy_stats()
+
+
+def summarize_log(df):
+    """One flat row of metrics for a log: the page's analysis plus accuracy statistics"""
+    return LogSummary().update(df).row()
+
+
+def summarize_log_chunks(chunks: Iterable[pd.DataFrame]):
+    """``summarize_log`` over consecutive chunks of one log (e.g. from ``iter_log_chunks``)"""
+    summary = LogSummary()
+    for df in chunks:
+        summary.update(df)
+    return summary.row()
+
+
+def _stats(prefix, values, percentiles=(50, 95)):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {}
+    stats = {f"{prefix}_mean": float(values.mean()), f"{prefix}_max": float(values.max())}
+    for p, value in zip(percentiles, np.percentile(values, percentiles)):
+        stats[f"{prefix}_p{p}"] = float(value)
+    return stats
+
+
+def compare_logs(df_a, df_b, sync: bool = False, max_offset_s: float = 60.0,
+                 dtw_radius: Optional[int] = None):
+    """Flat comparison metrics of log B against log A.
+
+    With ``sync`` B is interpolated at A's timestamps (after removing an
+    estimated clock offset) and the synced separation is reported.
+    ``dtw_radius`` adds a multiscale DTW distance, which is the slowest part.
+    """
+    row = {}
+    if sync:
+        synced = sync_logs(df_a, df_b, estimate_offset=True, max_offset_s=max_offset_s)
+        separation = synced_separation(synced.synced_a, synced.synced_b)
+        row["clock_offset_s"] = synced.offset.offset_s
+        row["offset_correlation"] = synced.offset.correlation
+        row["synced_points"] = len(separation)
+        row.update(_stats("synced_separation_m", separation))
+        df_a, df_b = synced.synced_a.reset_index(), synced.synced_b.reset_index()
+
+    row["points_a"], row["points_b"] = len(df_a), len(df_b)
+    row["distance_a_m"], row["distance_b_m"] = total_distance(df_a), total_distance(df_b)
+    row["distance_difference_m"] = abs(row["distance_a_m"] - row["distance_b_m"])
+
+    lat_a, lon_a = df_a["Latitude"].to_numpy(), df_a["Longitude"].to_numpy()
+    lat_b, lon_b = df_b["Latitude"].to_numpy(), df_b["Longitude"].to_numpy()
+    cross_track = error_summary(cross_track_error(lat_a, lon_a, lat_b, lon_b).distance_m)
+    row.update({f"cross_track_{name}_m": value for name, value in cross_track.items()})
+
+    if dtw_radius is not None:
+        valid_a = np.isfinite(lat_a) & np.isfinite(lon_a)
+        valid_b = np.isfinite(lat_b) & np.isfinite(lon_b)
+        result = multiscale_dtw_distance(np.column_stack((lat_a, lon_a))[valid_a],
+                                         np.column_stack((lat_b, lon_b))[valid_b], radius=dtw_radius)
+        row["dtw_distance_m"] = result.normalized_distance
+        row["dtw_similarity"] = similarity_score(result.normalized_distance)
+    return row
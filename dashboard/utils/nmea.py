@@ -0,0 +1,283 @@
+"""NMEA 0183 GGA, RMC and GST sentences as fixes shaped like the streamer's JSON messages.
+
+``NmeaDecoder`` reads raw receiver output (one sentence per line) and returns
+a fix dict per epoch with the JSON message keys (``gnss_time``, ``lat``,
+``lon``, ``type``) plus the date, altitude and accuracy the sentences carry,
+so an NMEA source plugs into the same evaluation as the streamer.
+
+Receivers send RMC, the only sentence with the date, after the GGA of the
+same epoch. A fix is therefore dated by time of day rather than by arrival
+order: its date is the latest RMC's, moved a day forward or back when the
+two times are more than half a day apart. So the fix of 00:00:00 UTC that
+precedes the new day's first RMC is not stamped 24 h early. Fixes arriving
+before any RMC are held until its date is known, for up to
+``DATE_WAIT_FIXES`` fixes. After that the source is taken to send no RMC,
+and its fixes are passed on undated.
+
+The parser works on the undecoded bytes of a read (``float`` and ``int``
+accept ASCII bytes), rejects sentences it does not use by their type before
+validating anything, and only splits the ones it keeps. No regular
+expressions; no per-field strip or decode.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# GGA fix quality -> fix type string used in the logs
+GGA_FIX_TYPES = {
+    0: "no-fix",            # Invalid
+    1: "no-rtk",            # Autonomous GPS
+    2: "no-rtk",            # Differential (SBAS/DGPS)
+    3: "no-rtk",            # PPS
+    4: "fixed-rtk",
+    5: "float-rtk",
+    6: "dead-reckoning",    # Estimated
+    7: "no-fix",            # Manual input
+    8: "no-fix",            # Simulator
+}
+# RMC mode indicator (NMEA 2.3+) -> fix type string, for sources without GGA
+RMC_FIX_TYPES = {
+    b"A": "no-rtk",         # Autonomous
+    b"D": "no-rtk",         # Differential
+    b"P": "no-rtk",         # Precise
+    b"R": "fixed-rtk",
+    b"F": "float-rtk",
+    b"E": "dead-reckoning",
+    b"M": "no-fix",         # Manual input
+    b"S": "no-fix",         # Simulator
+    b"N": "no-fix",
+}
+# Sentence types parsed (after the two-letter talker ID: GP, GN, GL, GA, GB, ...)
+SENTENCE_TYPES = (b"GGA", b"RMC", b"GST")
+# Fixes held back while waiting for the first RMC date before passing them on undated
+DATE_WAIT_FIXES = 20
+SECONDS_PER_DAY = 86400
+
+
+def nmea_checksum(body: bytes) -> int:
+    """XOR of the bytes between ``$`` and ``*``"""
+    checksum = 0
+    for byte in body:
+        checksum ^= byte
+    return checksum
+
+
+def sentence_fields(line: bytes) -> Optional[List[bytes]]:
+    """Fields of a ``$...*hh`` sentence (the first is the address, e.g. ``GNGGA``), or None if the checksum fails"""
+    star = line.rfind(b"*", 1)
+    if line[:1] != b"$" or star < 0:
+        return None
+    try:
+        expected = int(line[star + 1:star + 3], 16)
+    except ValueError:
+        return None
+    body = line[1:star]
+    if nmea_checksum(body) != expected:
+        return None
+    return body.split(b",")
+
+
+def parse_coordinate(value: bytes, hemisphere: bytes) -> Optional[float]:
+    """Decimal degrees of a ``(d)ddmm.mmmm`` value; negative in the S and W hemispheres"""
+    if not value:
+        return None
+    raw = float(value)
+    degrees = int(raw // 100)
+    decimal = degrees + (raw - degrees * 100) / 60.0
+    return -decimal if hemisphere in (b"S", b"W") else decimal
+
+
+def seconds_of_day(hhmmss: str) -> Optional[float]:
+    """Seconds since midnight of an ``hhmmss(.ss)`` time, or None if it is malformed"""
+    try:
+        return int(hhmmss[0:2]) * 3600 + int(hhmmss[2:4]) * 60 + float(hhmmss[4:])
+    except ValueError:
+        return None
+
+
+def shift_date(ddmmyy: str, days: int) -> str:
+    """An RMC date (``ddmmyy``) moved by ``days``"""
+    return (datetime.strptime(ddmmyy, "%d%m%y") + timedelta(days=days)).strftime("%d%m%y")
+
+
+def _float(value: bytes) -> Optional[float]:
+    return float(value) if value else None
+
+
+def parse_gga(fields: List[bytes]) -> Optional[dict]:
+    """Time, position, fix quality, satellites, HDOP and altitude of a GGA sentence"""
+    if len(fields) < 10:
+        return None
+    quality = int(fields[6]) if fields[6] else 0
+    return {
+        "gnss_time": fields[1].decode("ascii"),
+        "lat": parse_coordinate(fields[2], fields[3]),
+        "lon": parse_coordinate(fields[4], fields[5]),
+        "quality": quality,
+        "type": GGA_FIX_TYPES.get(quality, "no-fix"),
+        "num_sats": int(fields[7]) if fields[7] else None,
+        "hdop": _float(fields[8]),
+        "alt": _float(fields[9]),
+    }
+
+
+def parse_rmc(fields: List[bytes]) -> Optional[dict]:
+    """Time, status, position, date (ddmmyy) and mode of an RMC sentence"""
+    if len(fields) < 10:
+        return None
+    mode = fields[12][:1] if len(fields) > 12 else b""
+    valid = fields[2] == b"A"
+    return {
+        "gnss_time": fields[1].decode("ascii"),
+        "valid": valid,
+        "lat": parse_coordinate(fields[3], fields[4]),
+        "lon": parse_coordinate(fields[5], fields[6]),
+        "date": fields[9].decode("ascii"),
+        "type": RMC_FIX_TYPES.get(mode, "no-rtk" if valid else "no-fix"),
+    }
+
+
+def parse_gst(fields: List[bytes]) -> Optional[dict]:
+    """Time and 1-sigma latitude/longitude/altitude errors (m) of a GST sentence"""
+    if len(fields) < 9:
+        return None
+    return {
+        "gnss_time": fields[1].decode("ascii"),
+        "std_lat": _float(fields[6]),
+        "std_lon": _float(fields[7]),
+        "std_alt": _float(fields[8]),
+    }
+
+
+class NmeaDecoder:
+    """Turns a stream of NMEA sentences into fixes.
+
+    A GGA sentence with a position is a fix. It carries the date of the
+    latest RMC, adjusted across midnight, and the latest GST errors.
+    Receivers send GST after GGA, so these are usually the previous epoch's;
+    compare ``std_time`` with ``gnss_time``. Sources that send RMC but no GGA
+    get a fix per RMC instead. Counters: ``sentences`` (lines seen),
+    ``ignored`` (other sentence types), ``checksum_errors``, ``invalid``
+    (malformed fields) and ``fixes``.
+    """
+
+    def __init__(self):
+        self.date = None
+        self.date_seconds = None    # Time of day of the RMC that gave the date
+        self.gst = None
+        self.gga_seen = False
+        self.undated = []           # Fixes waiting for the first RMC
+        self.dateless = False       # No RMC within DATE_WAIT_FIXES fixes: pass fixes on undated
+        self.sentences = 0
+        self.ignored = 0
+        self.checksum_errors = 0
+        self.invalid = 0
+        self.fixes = 0
+
+    def feed_block(self, block: bytes) -> List[dict]:
+        """Fixes from a block of complete lines (as framed by the ingest loop)"""
+        fixes = []
+        for line in block.split(b"\n"):
+            self._feed(line, fixes)
+        return fixes
+
+    def feed(self, line: bytes) -> List[dict]:
+        """The fixes completed by one sentence (several when it is the first RMC and fixes were waiting)"""
+        fixes = []
+        self._feed(line, fixes)
+        return fixes
+
+    def flush(self) -> List[dict]:
+        """Fixes still waiting for a date, undated; call at the end of the stream"""
+        fixes, self.undated = self.undated, []
+        return fixes
+
+    def _feed(self, line: bytes, fixes: List[dict]):
+        line = line.rstrip(b"\r")
+        if not line:
+            return
+        self.sentences += 1
+        kind = line[3:6]
+        if kind not in SENTENCE_TYPES:
+            self.ignored += 1
+            return
+        fields = sentence_fields(line)
+        if fields is None:
+            self.checksum_errors += 1
+            return
+        try:
+            if kind == b"GGA":
+                sentence = parse_gga(fields)
+                if sentence is not None:
+                    self.gga_seen = True
+                    self._fix(sentence, fixes)
+            elif kind == b"RMC":
+                sentence = parse_rmc(fields)
+                if sentence is not None:
+                    if sentence["date"]:
+                        self._set_date(sentence["date"], sentence["gnss_time"], fixes)
+                    if not self.gga_seen and sentence["valid"]:
+                        self._fix(sentence, fixes)
+            else:
+                sentence = parse_gst(fields)
+                if sentence is not None:
+                    self.gst = sentence
+        except ValueError:
+            sentence = None
+        if sentence is None:
+            self.invalid += 1
+
+    def _set_date(self, date: str, gnss_time: str, fixes: List[dict]):
+        if date != self.date:
+            shift_date(date, 0)  # ValueError (counted as invalid) for a malformed date
+        self.date, self.date_seconds = date, seconds_of_day(gnss_time)
+        if self.undated:
+            for fix in self.undated:
+                fix["date"] = self._date_of(fix["gnss_time"])
+            fixes.extend(self.undated)
+            self.undated = []
+
+    def _date_of(self, gnss_time: str) -> Optional[str]:
+        """The latest RMC date, moved a day when ``gnss_time`` is on the other side of a midnight"""
+        seconds = seconds_of_day(gnss_time)
+        if self.date is None or seconds is None or self.date_seconds is None:
+            return self.date
+        if seconds < self.date_seconds - SECONDS_PER_DAY / 2:
+            return shift_date(self.date, 1)     # Fix after midnight, date from an RMC before it
+        if seconds > self.date_seconds + SECONDS_PER_DAY / 2:
+            return shift_date(self.date, -1)    # Fix before midnight, date from an RMC after it
+        return self.date
+
+    def _fix(self, sentence: dict, fixes: List[dict]):
+        if sentence["lat"] is None or sentence["lon"] is None:
+            return  # No position (e.g. quality 0 before the first fix)
+        fix = {
+            "gnss_time": sentence["gnss_time"],
+            "date": self._date_of(sentence["gnss_time"]),
+            "lat": sentence["lat"],
+            "lon": sentence["lon"],
+            "type": sentence["type"],
+            "alt": sentence.get("alt"),
+            "num_sats": sentence.get("num_sats"),
+            "hdop": sentence.get("hdop"),
+        }
+        if self.gst is not None:
+            fix["std_lat"] = self.gst["std_lat"]
+            fix["std_lon"] = self.gst["std_lon"]
+            fix["std_time"] = self.gst["gnss_time"]
+        self.fixes += 1
+        if self.date is not None or self.dateless:
+            fixes.append(fix)
+            return
+        self.undated.append(fix)
+        if len(self.undated) >= DATE_WAIT_FIXES:
+            self.dateless = True
+            fixes.extend(self.flush())
+
+    def stats(self) -> dict:
+        return {
+            "sentences": self.sentences,
+            "fixes": self.fixes,
+            "ignored": self.ignored,
+            "checksum_errors": self.checksum_errors,
+            "invalid": self.invalid,
+        }
@@ -5,13 +5,24 @@ class ThreadSafeQueue:
     def __init__(self, max_size=1000):
         self.queue = deque(maxlen=max_size)
         self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
 
     def put(self, item):
         with self.lock:
             self.queue.append(item)
+            self.not_empty.notify()
 
-    def get(self):
+    def put_many(self, items):
+        """Append a batch under one lock; the oldest items are dropped when full"""
         with self.lock:
+            self.queue.extend(items)
+            self.not_empty.notify_all()
+
+    def get(self, block=False, timeout=None):
+        """Pop the oldest item; None when empty (after waiting up to ``timeout`` with ``block``)"""
+        with self.lock:
+            if block and not self.queue:
+                self.not_empty.wait_for(lambda: self.queue, timeout=timeout)
             if self.queue:
                 return self.queue.popleft()
             return None
@@ -22,4 +33,4 @@ class ThreadSafeQueue:
 
     def size(self):
         with self.lock:
-            return len(self.queue)
\ No newline at end of file
+            return len(self.queue)
@@ -0,0 +1,293 @@
+"""Offline re-evaluation of recorded fixes against a new ground truth.
+
+The live client scores each fix as it arrives (``evaluate_data`` in
+gnss_eval_tcp_client.py). Here a whole chunk is scored at once: fixes are
+grouped by UTM zone and each group is projected with one array call of the
+same ``pyproj.Proj`` the client uses, so the recomputed HPE/northing/easting
+match what the client would have logged against that ground truth.
+
+The ground truth is a static point (``StaticGroundTruth``) or a reference
+trajectory interpolated at each fix's time (``TrajectoryGroundTruth``).
+Inputs are client logs (CSV or Parquet, read with ``iter_log_chunks``) or raw
+captures of a stream: the streamer's JSON lines or a receiver's NMEA
+sentences (``iter_raw_chunks``), turned into chunks with the log's columns.
+"""
+import json
+import functools
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyproj
+
+from dashboard.utils.log_exporters import DEFAULT_UTC_OFFSET_HOURS
+from dashboard.utils.log_loader import DEFAULT_CHUNK_ROWS, TRACE_COLUMNS, iter_log_chunks, load_log, parse_timestamps
+from dashboard.utils.nmea import NmeaDecoder
+from dashboard.utils.time_sync import interpolate_at
+
+try:
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+except ImportError:  # JSON captures are parsed line by line instead
+    pa = None
+
+ERROR_COLUMNS = ("HPE(m)", "NorthingError(m)", "EastingError(m)")
+# Raw capture suffixes and their format; anything else is read as a client log
+RAW_FORMATS = {".jsonl": "json", ".ndjson": "json", ".nmea": "nmea"}
+# Bytes of a raw capture read (and framed into complete lines) at a time
+RAW_READ_BYTES = 16 << 20
+# Largest gap between two reference samples that is interpolated across, in seconds
+TRAJECTORY_MAX_GAP_S = 1.0
+
+
+@functools.lru_cache(maxsize=16)
+def utm_proj(zone: int, south: bool) -> pyproj.Proj:
+    return pyproj.Proj(proj='utm', zone=zone, ellps='WGS84', south=south)
+
+
+def utm_errors(lats, lons, gt_lats, gt_lons) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(HPE, northing error, easting error) in meters of each fix against its ground truth point.
+
+    Like the client, both are projected in the UTM zone of the fix. Fixes
+    outside the UTM latitude range or without a ground truth get NaN.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    gt_lats = np.broadcast_to(np.asarray(gt_lats, dtype=np.float64), lats.shape)
+    gt_lons = np.broadcast_to(np.asarray(gt_lons, dtype=np.float64), lats.shape)
+    northing = np.full(lats.shape, np.nan)
+    easting = np.full(lats.shape, np.nan)
+    valid = (np.isfinite(lats) & np.isfinite(lons) & np.isfinite(gt_lats) & np.isfinite(gt_lons)
+             & (lats >= -80.0) & (lats <= 84.0))
+    zones = np.zeros(lats.shape, dtype=np.int64)
+    zones[valid] = np.floor((lons[valid] + 180) / 6).astype(np.int64) + 1
+    keys = zones * 2 + (lats < 0)
+    for key in np.unique(keys[valid]):
+        rows = np.flatnonzero(valid & (keys == key))
+        proj = utm_proj(int(key // 2), bool(key % 2))
+        fix_e, fix_n = proj(lons[rows], lats[rows])
+        gt_e, gt_n = proj(gt_lons[rows], gt_lats[rows])
+        northing[rows] = fix_n - gt_n
+        easting[rows] = fix_e - gt_e
+    return np.hypot(northing, easting), northing, easting
+
+
+class StaticGroundTruth:
+    """One surveyed point for every fix"""
+
+    def __init__(self, lat: float, lon: float):
+        self.lat = float(lat)
+        self.lon = float(lon)
+
+    def at(self, timestamps: Optional[pd.Series], n: int) -> Tuple[np.ndarray, np.ndarray]:
+        return np.full(n, self.lat), np.full(n, self.lon)
+
+    def describe(self) -> str:
+        return f"static point ({self.lat}, {self.lon})"
+
+
+class TrajectoryGroundTruth:
+    """A reference trace interpolated at each fix's time.
+
+    ``time_offset_s`` is the reference clock minus the evaluated clock. Fixes
+    outside the reference or between samples more than ``max_gap_s`` apart
+    get no ground truth (NaN errors).
+    """
+
+    def __init__(self, timestamps, lats, lons, time_offset_s: float = 0.0, max_gap_s: float = TRAJECTORY_MAX_GAP_S):
+        t = _epoch_seconds(pd.Series(timestamps)) - time_offset_s
+        latlon = np.column_stack((np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)))
+        keep = np.isfinite(t) & np.isfinite(latlon).all(axis=1)
+        order = np.argsort(t[keep], kind="stable")
+        self.t = t[keep][order]
+        self.latlon = latlon[keep][order]
+        if len(self.t) < 2:
+            raise ValueError("The reference trajectory needs at least two timed positions")
+        self.max_gap_s = max_gap_s
+        self.time_offset_s = time_offset_s
+
+    @classmethod
+    def from_log(cls, path, time_offset_s: float = 0.0, max_gap_s: float = TRAJECTORY_MAX_GAP_S):
+        """Reference from a client log (CSV or Parquet) or any CSV with its trace columns"""
+        df = load_log(path, columns=TRACE_COLUMNS)
+        missing = [col for col in ("TimestampKST", "Latitude", "Longitude") if col not in df.columns]
+        if missing:
+            raise ValueError(f"{path}: reference is missing columns: {', '.join(missing)}")
+        return cls(df["TimestampKST"], df["Latitude"], df["Longitude"], time_offset_s, max_gap_s)
+
+    def at(self, timestamps: Optional[pd.Series], n: int) -> Tuple[np.ndarray, np.ndarray]:
+        if timestamps is None:
+            raise ValueError("Rows need TimestampKST to be matched with a reference trajectory")
+        t = _epoch_seconds(timestamps)
+        timed = np.isfinite(t)
+        latlon, _, valid = interpolate_at(np.where(timed, t, self.t[0]), self.t, self.latlon, self.max_gap_s)
+        latlon[~(valid & timed)] = np.nan
+        return latlon[:, 0], latlon[:, 1]
+
+    def describe(self) -> str:
+        return f"trajectory of {len(self.t)} points (offset {self.time_offset_s:g} s)"
+
+
+def _epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    """Seconds since 1970 as float64, NaN for missing times"""
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = parse_timestamps(timestamps)
+    ns = timestamps.to_numpy(dtype="datetime64[ns]")
+    seconds = ns.astype(np.int64) / 1e9
+    seconds[np.isnat(ns)] = np.nan
+    return seconds
+
+
+def reevaluate_chunk(df: pd.DataFrame, ground_truth) -> pd.DataFrame:
+    """The chunk with its error columns recomputed against ``ground_truth``"""
+    if "Latitude" not in df.columns or "Longitude" not in df.columns:
+        raise ValueError("Rows have no Latitude/Longitude columns to evaluate")
+    timestamps = df["TimestampKST"] if "TimestampKST" in df.columns else None
+    gt_lats, gt_lons = ground_truth.at(timestamps, len(df))
+    hpe, northing, easting = utm_errors(df["Latitude"].to_numpy(dtype=np.float64, na_value=np.nan),
+                                        df["Longitude"].to_numpy(dtype=np.float64, na_value=np.nan),
+                                        gt_lats, gt_lons)
+    df = df.copy(deep=False)
+    for column, values in zip(ERROR_COLUMNS, (hpe, northing, easting)):
+        df[column] = values.astype(np.float32)
+    return df
+
+
+# --- Raw captures ---
+
+def raw_format(path) -> Optional[str]:
+    """``json`` or ``nmea`` for a raw capture (by suffix), None for a client log"""
+    return RAW_FORMATS.get(Path(path).suffix.lower())
+
+
+def _line_blocks(path) -> Iterator[bytes]:
+    """The file in blocks of complete lines"""
+    partial = b""
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(RAW_READ_BYTES)
+            if not data:
+                break
+            end = data.rfind(b"\n")
+            if end < 0:
+                partial += data
+                continue
+            yield partial + data[:end + 1]
+            partial = data[end + 1:]
+    if partial.strip():
+        yield partial + b"\n"
+
+
+_JSON_FIELDS = ("timestamp", "gnss_time", "lat", "lon", "type")
+
+
+def _json_block(block: bytes) -> pd.DataFrame:
+    """Fields of the streamer's JSON lines; unparsable lines are skipped"""
+    if pa is not None:
+        schema = pa.schema([("timestamp", pa.string()), ("gnss_time", pa.string()), ("lat", pa.float64()),
+                            ("lon", pa.float64()), ("type", pa.string())])
+        options = pa_json.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore")
+        try:
+            return pa_json.read_json(pa.py_buffer(block), parse_options=options).to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # A malformed line fails the whole block; parse it line by line
+    records = []
+    for line in block.split(b"\n"):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            records.append({field: data.get(field) for field in _JSON_FIELDS})
+    df = pd.DataFrame.from_records(records, columns=list(_JSON_FIELDS))
+    df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
+    df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
+    return df
+
+
+def _nmea_timestamps(dates: pd.Series, times: pd.Series, utc_offset_hours: float) -> pd.Series:
+    """Local (KST by default) timestamps of NMEA UTC dates (ddmmyy) and times.
+
+    The decoder dates every fix across midnight. Only fixes of a source that
+    sends no RMC are undated; like the client, they get the current UTC date.
+    """
+    today = pd.Timestamp.now(tz="UTC").strftime("%d%m%y")
+    dates = dates.astype("string").fillna(today)
+    utc = pd.to_datetime(dates + times.astype("string"), format="%d%m%y%H%M%S.%f", errors="coerce")
+    return (utc + pd.Timedelta(hours=utc_offset_hours)).astype("datetime64[ms]")
+
+
+def _nmea_rows(fixes, utc_offset_hours: float) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(fixes, columns=["gnss_time", "date", "lat", "lon", "type"])
+    return _log_rows(_nmea_timestamps(frame["date"], frame["gnss_time"], utc_offset_hours),
+                     frame["gnss_time"], frame["lat"], frame["lon"], frame["type"])
+
+
+def _raw_frames(path, input_format: str, utc_offset_hours: float) -> Iterator[pd.DataFrame]:
+    """The capture's fixes, one frame with the log's columns per block of lines"""
+    decoder = NmeaDecoder() if input_format == "nmea" else None
+    for block in _line_blocks(path):
+        if decoder is None:
+            frame = _json_block(block)
+            yield _log_rows(parse_timestamps(frame["timestamp"]), frame["gnss_time"], frame["lat"], frame["lon"],
+                            frame["type"])
+            continue
+        fixes = decoder.feed_block(block)
+        if fixes:
+            yield _nmea_rows(fixes, utc_offset_hours)
+    if decoder is not None:
+        fixes = decoder.flush()  # Fixes still waiting for a date at the end of the capture
+        if fixes:
+            yield _nmea_rows(fixes, utc_offset_hours)
+
+
+def _log_rows(timestamps, gnss_times, lats, lons, fix_types) -> pd.DataFrame:
+    return pd.DataFrame({
+        "TimestampKST": timestamps,
+        "GNSSTime": pd.Series(gnss_times, dtype="string"),
+        "Latitude": np.asarray(lats, dtype=np.float64),
+        "Longitude": np.asarray(lons, dtype=np.float64),
+        "FixType": pd.Series(fix_types, dtype="category"),
+        "MessageRate(Hz)": np.full(len(lats), np.nan, dtype=np.float32),  # Unknown offline
+    })
+
+
+def iter_raw_chunks(path, input_format: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    utc_offset_hours: float = DEFAULT_UTC_OFFSET_HOURS) -> Iterator[pd.DataFrame]:
+    """Yield a raw capture as chunks of about ``chunk_rows`` fixes with the client log's columns.
+
+    ``json``: the streamer's lines, whose ``timestamp`` is logged as is.
+    ``nmea``: a receiver's sentences, fixes as ``NmeaDecoder`` makes them,
+    stamped with their UTC date and time shifted by ``utc_offset_hours``.
+    """
+    input_format = input_format or raw_format(path)
+    if input_format not in ("json", "nmea"):
+        raise ValueError(f"{path}: unknown raw capture format {input_format!r}")
+    pending, rows = [], 0
+    for df in _raw_frames(path, input_format, utc_offset_hours):
+        pending.append(df)
+        rows += len(df)
+        while rows >= chunk_rows:
+            merged = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            yield merged.iloc[:chunk_rows].reset_index(drop=True)
+            pending, rows = [merged.iloc[chunk_rows:]], len(merged) - chunk_rows
+    if rows or not pending:
+        yield pd.concat(pending, ignore_index=True) if pending else _log_rows([], [], [], [], [])
+
+
+def iter_input_chunks(path, input_format: Optional[str] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      use_sidecar: bool = True) -> Iterator[pd.DataFrame]:
+    """Chunks of a client log or (by ``input_format`` or suffix) a raw capture"""
+    if (input_format or raw_format(path)) in ("json", "nmea"):
+        return iter_raw_chunks(path, input_format, chunk_rows)
+    return iter_log_chunks(path, chunk_rows=chunk_rows, use_sidecar=use_sidecar)
+
+
+def output_path(source, output_dir, suffix: Optional[str] = None) -> Path:
+    """Where the re-evaluated log of ``source`` goes: its stem in ``output_dir``, CSV for raw captures"""
+    source = Path(source)
+    if suffix is None:
+        suffix = ".csv" if raw_format(source) else source.suffix
+    return Path(output_dir) / f"{source.stem}{suffix}"
+
@@ -0,0 +1,236 @@
+import os
+import sys
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+import pandas as pd
+import streamlit as st
+
+from dashboard.utils.logger import logger
+
+
+DEFAULT_CACHE_DIR = ".gnss_cache"
+DEFAULT_MEMORY_BUDGET_MB = 1024
+DEFAULT_DISK_BUDGET_MB = 4096
+
+_MISSING = object()
+
+
+def content_hash(data: bytes) -> str:
+    """Stable hash of file contents, used as the identity of an uploaded log"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def estimate_size(value: Any, pickled_size: Optional[int] = None) -> int:
+    """Approximate in-memory size in bytes of a cached value.
+
+    DataFrames are measured with ``memory_usage``, NumPy-backed objects
+    (arrays, ``LogIndex``) with their ``nbytes`` and tuples/lists/dicts item by
+    item. Anything else is taken to be as large as its pickle, using
+    ``pickled_size`` when the caller has already pickled it.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(getattr(value, "nbytes", None), int):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if pickled_size is not None:
+        return pickled_size
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)  # Unpicklable values still count against the budget
+
+
+class ResultCache:
+    """Two-level cache for parsed logs and analysis results.
+
+    Values live in an in-memory LRU bounded by ``memory_budget_bytes`` and
+    are also pickled to ``cache_dir`` (bounded by ``disk_budget_bytes``,
+    oldest files removed first), so a restarted dashboard can reuse them.
+    The directory's size is counted once at start and then kept as a running
+    total; it is only listed again when the total goes over the budget.
+    Keys are tuples of plain values, typically starting with a kind such as
+    ``"log"``, ``"analysis"`` or ``"compare"`` followed by content hashes and
+    filter parameters.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_MB * 1024 * 1024,
+        disk_budget_bytes: int = DEFAULT_DISK_BUDGET_MB * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # digest -> (value, size)
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Cannot create cache directory {self.cache_dir}: {e}. Disk cache disabled.")
+                self.cache_dir = None
+        if self.cache_dir is not None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def _digest(key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def _path(self, digest: str) -> Optional[Path]:
+        return self.cache_dir / f"{digest}.pkl" if self.cache_dir is not None else None
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    def _remember(self, digest: str, value: Any, pickled_size: Optional[int] = None):
+        size = estimate_size(value, pickled_size)
+        if size > self.memory_budget_bytes:
+            return  # Too large to keep in memory at all; it stays on disk only
+        old = self._entries.pop(digest, None)
+        if old is not None:
+            self._memory_bytes -= old[1]
+        self._entries[digest] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_budget_bytes and self._entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        digest = self._digest(key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry[0]
+        path = self._path(digest)
+        if path is not None and path.exists():
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                os.utime(path)  # Keep recently used files out of disk pruning
+                with self._lock:
+                    self._remember(digest, value)
+                    self.disk_hits += 1
+                return value
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cache file {path}: {e}")
+                self._remove_file(path)
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any):
+        digest = self._digest(key)
+        path = self._path(digest)
+        data = None
+        if path is not None:
+            try:
+                data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.warning(f"Cannot pickle the value cached for {key!r}: {e}. Kept in memory only.")
+        with self._lock:
+            self._remember(digest, value, len(data) if data is not None else None)
+        if data is None:
+            return
+        try:
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            replaced = self._file_size(path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache file {path}: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += len(data) - replaced
+            over_budget = self._disk_bytes > self.disk_budget_bytes
+        if over_budget:
+            self._prune_disk()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _disk_files(self):
+        """(mtime, size, path) of the cache files, each stat'ed once; files removed meanwhile are skipped"""
+        files = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _remove_file(self, path: Path):
+        size = self._file_size(path)
+        path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_bytes = max(0, self._disk_bytes - size)
+
+    def _prune_disk(self):
+        """Remove the least recently used files until the directory fits the budget"""
+        try:
+            files = self._disk_files()
+        except OSError as e:
+            logger.warning(f"Cannot list cache directory {self.cache_dir}: {e}")
+            return
+        total = sum(size for _, size, _ in files)  # Also corrects the running total for other writers
+        for _, size, path in sorted(files):
+            if total <= self.disk_budget_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        if disk and self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._disk_bytes = 0
+
+
+@st.cache_resource
+def get_result_cache(
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+    memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB,
+    disk_budget_mb: int = DEFAULT_DISK_BUDGET_MB,
+) -> ResultCache:
+    """Return the cache shared by every session of this Streamlit server process"""
+    return ResultCache(cache_dir, memory_budget_mb * 1024 * 1024, disk_budget_mb * 1024 * 1024)
@@ -0,0 +1,79 @@
+import threading
+from typing import Any, List, Optional, Tuple
+
+
+class SharedRingBuffer:
+    """Fixed-capacity ring shared by one writer and any number of readers.
+
+    Every appended item gets a monotonically increasing sequence number.
+    Readers keep their own cursor (the next sequence number they want) and
+    never remove anything, so one write can be consumed by many sessions.
+    Readers that fall more than ``capacity`` items behind skip ahead and are
+    told how many items they missed.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._items: List[Any] = [None] * capacity
+        self._next_seq = 0  # Sequence number of the next item to be written
+        self._cond = threading.Condition(threading.Lock())
+
+    @property
+    def head(self) -> int:
+        """Sequence number the next appended item will receive"""
+        with self._cond:
+            return self._next_seq
+
+    @property
+    def oldest(self) -> int:
+        """Sequence number of the oldest item still held"""
+        with self._cond:
+            return max(0, self._next_seq - self.capacity)
+
+    def append(self, item: Any) -> int:
+        """Append an item, overwriting the oldest one when full, and wake waiting readers"""
+        with self._cond:
+            seq = self._next_seq
+            self._items[seq % self.capacity] = item
+            self._next_seq = seq + 1
+            self._cond.notify_all()
+            return seq
+
+    def extend(self, items: List[Any]) -> int:
+        """Append several items under one lock and wake waiting readers once; returns the new head"""
+        with self._cond:
+            seq = self._next_seq
+            if len(items) > self.capacity:
+                seq += len(items) - self.capacity
+                items = items[-self.capacity:]
+            for offset, item in enumerate(items):
+                self._items[(seq + offset) % self.capacity] = item
+            self._next_seq = seq + len(items)
+            self._cond.notify_all()
+            return self._next_seq
+
+    def read_since(self, cursor: int, max_items: Optional[int] = None) -> Tuple[List[Any], int, int]:
+        """Return ``(items, new_cursor, dropped)`` for everything written at or after ``cursor``"""
+        with self._cond:
+            oldest = max(0, self._next_seq - self.capacity)
+            dropped = 0
+            if cursor < oldest:
+                dropped = oldest - cursor
+                cursor = oldest
+            end = self._next_seq
+            if max_items is not None:
+                end = min(end, cursor + max_items)
+            items = [self._items[seq % self.capacity] for seq in range(cursor, end)]
+            return items, end, dropped
+
+    def wait_for_new(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Block until an item with sequence number >= ``cursor`` exists; return False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._next_seq > cursor, timeout=timeout)
+
+    def notify_all(self):
+        """Wake all waiting readers without writing (used on shutdown)"""
+        with self._cond:
+            self._cond.notify_all()
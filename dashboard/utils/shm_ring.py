@@ -0,0 +1,192 @@
+"""Fixed-width GNSS fix records in a ``multiprocessing.shared_memory`` ring.
+
+One process writes (the ingest child of ``ProcessGNSSStream``) and any number
+of readers in other processes read, each with its own cursor, with the same
+``head``/``oldest``/``read_since`` interface as ``SharedRingBuffer``. The
+block holds a ``RING_HEADER`` (write head, capacity, writer state and ingest
+counters) followed by ``capacity`` ``FIX_RECORD`` slots.
+
+The writer fills the slots of a batch and only then advances the head (one
+aligned 8-byte store), so readers never see a partly written record and no
+lock is shared between the processes. ``read_since`` returns a NumPy view of
+the slots, not a copy (a copy is made only when the span wraps around the
+end of the ring). A view stays valid until the writer laps it, so consume it
+before the next poll; slots the writer may have reached while the view was
+taken are trimmed off and counted as dropped.
+"""
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+FIX_RECORD = np.dtype([
+    ("recv_time", "<f8"),       # Wall time (time.time()) the sink received the fix
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("timestamp", "S24"),       # Strings are UTF-8, truncated to the field width
+    ("gnss_time", "S16"),
+    ("fix_type", "S16"),
+])
+RING_HEADER = np.dtype([
+    ("head", "<i8"),            # Sequence number of the next record to be written
+    ("capacity", "<i8"),
+    ("state", "<i8"),
+    ("pid", "<i8"),             # Writer process
+    ("reads", "<i8"),
+    ("bytes", "<i8"),
+    ("messages", "<i8"),
+    ("parse_errors", "<i8"),
+    ("decode_errors", "<i8"),
+    ("oversized", "<i8"),
+    ("sink_errors", "<i8"),
+    ("rate", "<f8"),            # Smoothed messages/s; NaN until known
+])
+HEADER_BYTES = 128
+# Writer states
+STARTING, RUNNING, STOPPED, FAILED = range(4)
+STATE_NAMES = {STARTING: "starting", RUNNING: "running", STOPPED: "stopped", FAILED: "failed"}
+# Header counters published by the writer (see IngestStats.snapshot)
+STAT_FIELDS = ("reads", "bytes", "messages", "decode_errors", "oversized", "sink_errors")
+# Readers poll the head at this period in wait_for_new (there is no cross-process condition)
+WAIT_POLL_SECONDS = 0.01
+
+
+class ShmFixRing:
+    """Single-writer, multi-reader ring of ``FIX_RECORD`` in shared memory.
+
+    ``ShmFixRing(capacity)`` creates (and owns) a new block; ``ShmFixRing(name=...)``
+    attaches to an existing one. The owner calls ``unlink()`` when done.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, name: Optional[str] = None):
+        if name is None:
+            if not capacity or capacity <= 0:
+                raise ValueError("capacity must be positive")
+            self._shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + capacity * FIX_RECORD.itemsize)
+            self.owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.header = np.ndarray((), dtype=RING_HEADER, buffer=self._shm.buf)
+        if self.owner:
+            self.header[()] = np.zeros((), dtype=RING_HEADER)
+            self.header["capacity"] = capacity
+            self.header["rate"] = np.nan
+        self.capacity = int(self.header["capacity"])
+        self.records = np.ndarray((self.capacity,), dtype=FIX_RECORD, buffer=self._shm.buf, offset=HEADER_BYTES)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def head(self) -> int:
+        return int(self.header["head"])
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.head - self.capacity)
+
+    @property
+    def state(self) -> int:
+        return int(self.header["state"])
+
+    def set_state(self, state: int):
+        self.header["state"] = state
+
+    # --- Writer ---
+
+    def write(self, batch: np.ndarray) -> int:
+        """Append a ``FIX_RECORD`` array (overwriting the oldest records when full); returns the new head"""
+        head = self.head
+        n = len(batch)
+        if n > self.capacity:
+            head += n - self.capacity
+            batch = batch[-self.capacity:]
+            n = self.capacity
+        start = head % self.capacity
+        first = min(n, self.capacity - start)
+        self.records[start:start + first] = batch[:first]
+        if first < n:
+            self.records[:n - first] = batch[first:]
+        self.header["head"] = head + n
+        return head + n
+
+    def publish_stats(self, stats: dict, parse_errors: int):
+        header = self.header
+        for field in STAT_FIELDS:
+            header[field] = stats[field]
+        header["parse_errors"] = parse_errors
+        header["rate"] = np.nan if stats["rate"] is None else stats["rate"]
+
+    # --- Readers ---
+
+    def read_since(self, cursor: int, max_items: Optional[int] = None) -> Tuple[np.ndarray, int, int]:
+        """Return ``(records, new_cursor, dropped)`` for everything written at or after ``cursor``"""
+        head = self.head
+        oldest = max(0, head - self.capacity)
+        dropped = 0
+        if cursor < oldest:
+            dropped = oldest - cursor
+            cursor = oldest
+        end = head if max_items is None else min(head, cursor + max_items)
+        n = end - cursor
+        start = cursor % self.capacity
+        if start + n <= self.capacity:
+            records = self.records[start:start + n]
+        else:
+            records = np.concatenate((self.records[start:], self.records[:start + n - self.capacity]))
+        # The writer may have started overwriting the front of the span meanwhile
+        lapped = self.head - self.capacity
+        if lapped > cursor:
+            trim = min(lapped, end) - cursor
+            records = records[trim:]
+            dropped += trim
+        return records, end, dropped
+
+    def wait_for_new(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Block until a record with sequence number >= ``cursor`` exists; return False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.head <= cursor:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(WAIT_POLL_SECONDS)
+        return True
+
+    def notify_all(self):
+        """Readers poll the head, so there is nobody to wake (kept for the ``SharedRingBuffer`` interface)"""
+
+    def stats(self) -> dict:
+        """Writer counters in the shape of ``IngestStats.snapshot()``"""
+        header = self.header
+        snapshot = {field: int(header[field]) for field in STAT_FIELDS}
+        rate = float(header["rate"])
+        snapshot["rate"] = None if np.isnan(rate) else rate
+        return snapshot
+
+    # --- Lifecycle ---
+
+    def close(self):
+        """Unmap the block; views handed out by ``read_since`` must be gone (else it stays mapped until they are)"""
+        self.header = self.records = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+
+    def unlink(self):
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def fix_records(fixes: List[dict]) -> np.ndarray:
+    """``FIX_RECORD`` array of fix dicts as produced by ``parse_fix`` (with ``recv_time``)"""
+    return np.array([
+        (fix["recv_time"], fix["lat"], fix["lon"], str(fix["timestamp"]).encode("utf-8"),
+         str(fix["gnss_time"]).encode("utf-8"), str(fix["fix_type"]).encode("utf-8"))
+        for fix in fixes
+    ], dtype=FIX_RECORD)
@@ -0,0 +1,87 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from dashboard.utils.geo import local_xy
+
+
+class SimplifyResult(NamedTuple):
+    indices: np.ndarray  # Indices of the kept points, ascending
+    dropped: int  # Points removed (including non-finite ones)
+    max_deviation_m: float  # Largest distance from a removed point to the simplified line
+
+
+def _point_segment_distances(px, py, ax, ay, bx, by):
+    """Distance from points p to segments a-b; degenerate segments (a == b) use the distance to a"""
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = ((px - ax) * dx + (py - ay) * dy) / length2
+    t = np.where(length2 > 0, np.clip(t, 0.0, 1.0), 0.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def douglas_peucker(x: np.ndarray, y: np.ndarray, tolerance: float):
+    """Douglas-Peucker on planar coordinates; returns (keep mask, max deviation).
+
+    All open segments of one recursion level are processed in a single
+    vectorized pass, so the work per level is O(n) NumPy operations and the
+    number of Python iterations is the recursion depth (about log2 of the
+    number of kept points for typical traces), not the number of segments.
+    Distances are to the segment rather than the infinite line, so loops and
+    stops (where a segment's ends coincide) are handled.
+    """
+    n = len(x)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep, 0.0
+    keep[0] = keep[-1] = True
+    starts = np.array([0], dtype=np.int64)
+    ends = np.array([n - 1], dtype=np.int64)
+    max_deviation = 0.0
+    while len(starts):
+        interior = ends - starts - 1
+        open_segments = interior > 0
+        starts, ends, interior = starts[open_segments], ends[open_segments], interior[open_segments]
+        if not len(starts):
+            break
+        # Index of every interior point, grouped by segment
+        segment = np.repeat(np.arange(len(starts)), interior)
+        offsets = np.concatenate(([0], np.cumsum(interior)[:-1]))
+        idx = starts[segment] + 1 + (np.arange(len(segment)) - offsets[segment])
+        s, e = starts[segment], ends[segment]
+        d = _point_segment_distances(x[idx], y[idx], x[s], y[s], x[e], y[e])
+
+        segment_max = np.maximum.reduceat(d, offsets)
+        split = segment_max > tolerance
+        if (~split).any():
+            max_deviation = max(max_deviation, float(segment_max[~split].max()))
+        if not split.any():
+            break
+        # First point reaching its segment's maximum becomes a new vertex
+        at_max = np.flatnonzero(d == segment_max[segment])
+        _, first = np.unique(segment[at_max], return_index=True)
+        vertex = np.empty(len(starts), dtype=np.int64)
+        vertex[segment[at_max[first]]] = idx[at_max[first]]
+        vertex = vertex[split]
+        keep[vertex] = True
+        starts = np.concatenate((starts[split], vertex))
+        ends = np.concatenate((vertex, ends[split]))
+    return keep, max_deviation
+
+
+def simplify_trace(lats, lons, tolerance_m: float) -> SimplifyResult:
+    """Simplify a lat/lon polyline so no removed point is farther than ``tolerance_m`` from it.
+
+    Points with non-finite coordinates are dropped. A tolerance of 0 (or
+    less) keeps every finite point.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    finite = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+    if tolerance_m <= 0 or len(finite) <= 2:
+        return SimplifyResult(finite, len(lats) - len(finite), 0.0)
+    x, y = local_xy(lats[finite], lons[finite])
+    keep, max_deviation = douglas_peucker(x, y, tolerance_m)
+    indices = finite[keep]
+    return SimplifyResult(indices, len(lats) - len(indices), max_deviation)
@@ -0,0 +1,206 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.geo import haversine, local_xy
+from dashboard.utils.log_loader import parse_timestamps
+
+
+SYNC_SIGNALS = ("speed", "position")
+
+
+class OffsetEstimate(NamedTuple):
+    offset_s: float  # Trace B's clock minus trace A's; subtract it from B's timestamps to align them
+    correlation: float  # Normalized cross-correlation at the peak, -1 to 1
+    overlap_s: float  # Length of the overlapping valid signal at the peak
+
+
+class SyncResult(NamedTuple):
+    synced_a: pd.DataFrame  # Rows of A inside the common window, indexed by TimestampKST
+    synced_b: pd.DataFrame  # B interpolated to the same index (after removing the offset)
+    offset: Optional[OffsetEstimate]  # None if no offset was estimated
+
+
+def timestamps_to_seconds(timestamps, origin=None):
+    """Seconds since ``origin`` (default: the first timestamp) as float64, from datetimes or strings"""
+    timestamps = pd.Series(timestamps)
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = parse_timestamps(timestamps)
+    ns = timestamps.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    origin_ns = ns[0] if origin is None else pd.Timestamp(origin).as_unit("ns").value
+    return (ns - origin_ns) / 1e9
+
+
+def _valid_grid(t: np.ndarray, grid: np.ndarray, max_gap_s: float) -> np.ndarray:
+    """Grid points inside the trace whose bracketing samples are at most ``max_gap_s`` apart"""
+    right = np.searchsorted(t, grid, side="left")
+    inside = (right > 0) & (right < len(t)) | (grid == t[0])
+    left = np.clip(right - 1, 0, len(t) - 1)
+    right = np.clip(right, 0, len(t) - 1)
+    return inside & (t[right] - t[left] <= max_gap_s)
+
+
+def _signal(t, x, y, grid, rate_hz, kind, max_gap_s):
+    """Resampled channels of one trace on ``grid`` and their validity mask"""
+    valid = _valid_grid(t, grid, max_gap_s)
+    gx = np.interp(grid, t, x)
+    gy = np.interp(grid, t, y)
+    if kind == "speed":
+        speed = np.hypot(np.gradient(gx), np.gradient(gy)) * rate_hz
+        # The central difference needs both neighbors to be valid
+        valid[1:-1] &= valid[:-2] & valid[2:]
+        valid[[0, -1]] = False
+        channels = [speed]
+    else:
+        channels = [gx, gy]
+    # Centering only improves FFT precision; the correlation removes each lag's overlap mean
+    centered = [np.where(valid, c - c[valid].mean(), 0.0) if valid.any() else np.zeros_like(c) for c in channels]
+    return centered, valid.astype(np.float64)
+
+
+def estimate_time_offset(t_a, lat_a, lon_a, t_b, lat_b, lon_b, rate_hz: float = 10.0,
+                         max_offset_s: Optional[float] = 60.0, signal: str = "speed",
+                         max_gap_s: float = 1.0, min_overlap: float = 0.25) -> OffsetEstimate:
+    """Estimate a constant clock offset between two traces of the same motion.
+
+    Both traces are resampled at ``rate_hz`` on a common time grid and the
+    normalized cross-correlation of their speed (insensitive to a constant
+    position offset between antennas) or east/north position is computed for
+    every lag at once with FFTs, O(n log n) in the grid length. Gaps longer
+    than ``max_gap_s`` are masked out and the means and variances are taken
+    over the overlapping valid samples at each lag, so partially overlapping
+    logs are not biased toward zero lag. Lags with less than ``min_overlap`` of the
+    shorter signal overlapping are ignored. The peak is refined to sub-sample
+    precision with a parabola. Times are float seconds on a shared origin.
+    """
+    if signal not in SYNC_SIGNALS:
+        raise ValueError(f"Unknown sync signal '{signal}', expected one of {SYNC_SIGNALS}")
+    t_a, t_b = np.asarray(t_a, dtype=np.float64), np.asarray(t_b, dtype=np.float64)
+    if len(t_a) < 3 or len(t_b) < 3:
+        raise ValueError("Offset estimation needs at least 3 points per trace")
+    lat0, lon0 = float(np.mean(lat_a)), float(np.mean(lon_a))
+    xa, ya = local_xy(lat_a, lon_a, lat0, lon0)
+    xb, yb = local_xy(lat_b, lon_b, lat0, lon0)
+
+    origin = min(t_a[0], t_b[0])
+    length = int(np.ceil((max(t_a[-1], t_b[-1]) - origin) * rate_hz)) + 1
+    grid = origin + np.arange(length) / rate_hz
+    channels_a, mask_a = _signal(t_a, xa, ya, grid, rate_hz, signal, max_gap_s)
+    channels_b, mask_b = _signal(t_b, xb, yb, grid, rate_hz, signal, max_gap_s)
+
+    # c[lag] = sum_k u[k] * v[k + lag], for all lags, via zero-padded real FFTs
+    nfft = 1 << int(np.ceil(np.log2(2 * length)))
+    spectra = {}
+
+    def spectrum(name, values):
+        if name not in spectra:
+            spectra[name] = np.fft.rfft(values, nfft)
+        return spectra[name]
+
+    def xcorr(name_u, u, name_v, v):
+        return np.fft.irfft(np.conj(spectrum(name_u, u)) * spectrum(name_v, v), nfft)
+
+    # Pearson correlation over the overlapping valid samples at every lag
+    overlap = xcorr("ma", mask_a, "mb", mask_b)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = np.maximum(overlap, 1.0)
+        covariance = variance_a = variance_b = 0.0
+        for i, (ca, cb) in enumerate(zip(channels_a, channels_b)):
+            sum_a = xcorr(f"a{i}", ca, "mb", mask_b)
+            sum_b = xcorr("ma", mask_a, f"b{i}", cb)
+            covariance = covariance + xcorr(f"a{i}", ca, f"b{i}", cb) - sum_a * sum_b / n
+            variance_a = variance_a + xcorr(f"aa{i}", ca * ca, "mb", mask_b) - sum_a * sum_a / n
+            variance_b = variance_b + xcorr("ma", mask_a, f"bb{i}", cb * cb) - sum_b * sum_b / n
+        correlation = covariance / np.sqrt(np.maximum(variance_a, 0.0) * np.maximum(variance_b, 0.0))
+
+    lags = np.arange(nfft)
+    lags[nfft // 2:] -= nfft
+    max_lag = length - 1 if max_offset_s is None else min(length - 1, int(round(max_offset_s * rate_hz)))
+    min_samples = max(3.0, min_overlap * min(mask_a.sum(), mask_b.sum()))
+    usable = (np.abs(lags) <= max_lag) & (overlap >= min_samples - 0.5) & np.isfinite(correlation)
+    if not usable.any():
+        raise ValueError("Traces do not overlap enough in time to estimate an offset")
+    correlation = np.where(usable, correlation, -np.inf)
+    peak = int(np.argmax(correlation))
+
+    refined = float(lags[peak])
+    before, after = correlation[peak - 1], correlation[(peak + 1) % nfft]
+    if np.isfinite(before) and np.isfinite(after):
+        curvature = before - 2 * correlation[peak] + after
+        if curvature < 0:
+            refined += 0.5 * (before - after) / curvature
+    return OffsetEstimate(float(refined / rate_hz), float(correlation[peak]), float(overlap[peak]) / rate_hz)
+
+
+def interpolate_at(t_query, t, values, max_gap_s: float = 1.0):
+    """Linearly interpolate ``values`` (n or n x k) sampled at sorted ``t`` to ``t_query``.
+
+    Returns (interpolated values, index of the nearest sample, valid mask);
+    queries outside ``t`` or between samples more than ``max_gap_s`` apart are invalid.
+    """
+    t_query = np.asarray(t_query, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    right = np.clip(np.searchsorted(t, t_query, side="left"), 1, len(t) - 1)
+    left = right - 1
+    span = t[right] - t[left]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(span > 0, (t_query - t[left]) / span, 0.0)
+    valid = (t_query >= t[0]) & (t_query <= t[-1]) & (span <= max_gap_s)
+    weight = np.clip(weight, 0.0, 1.0)
+    nearest = np.where(weight < 0.5, left, right)
+    if values.ndim > 1:
+        weight = weight[:, None]
+    interpolated = values[left] + weight * (values[right] - values[left])
+    return interpolated, nearest, valid
+
+
+def sync_logs(df_a: pd.DataFrame, df_b: pd.DataFrame, estimate_offset: bool = True, rate_hz: float = 10.0,
+              max_offset_s: Optional[float] = 60.0, signal: str = "speed", max_gap_s: float = 1.0,
+              time_col: str = "TimestampKST") -> SyncResult:
+    """Align log B to log A's timestamps, optionally after removing an estimated clock offset.
+
+    Numeric columns of B are linearly interpolated at A's times and other
+    columns (e.g. FixType) take B's nearest sample. Rows of A outside B's
+    coverage or across gaps in B longer than ``max_gap_s`` are dropped.
+    """
+    prepared = []
+    for df in (df_a, df_b):
+        df = df.dropna(subset=["Latitude", "Longitude"])
+        timestamps = df[time_col]
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = parse_timestamps(timestamps)
+        df = df.assign(**{time_col: timestamps}).dropna(subset=[time_col]).sort_values(time_col, kind="stable")
+        prepared.append(df.drop_duplicates(subset=[time_col]))
+    df_a, df_b = prepared
+    if len(df_a) < 2 or len(df_b) < 2:
+        raise ValueError("Both logs need at least two timestamped fixes to synchronize")
+
+    origin = df_a[time_col].iloc[0]
+    t_a = timestamps_to_seconds(df_a[time_col], origin)
+    t_b = timestamps_to_seconds(df_b[time_col], origin)
+    offset = None
+    if estimate_offset:
+        offset = estimate_time_offset(
+            t_a, df_a["Latitude"].to_numpy(), df_a["Longitude"].to_numpy(),
+            t_b, df_b["Latitude"].to_numpy(), df_b["Longitude"].to_numpy(),
+            rate_hz=rate_hz, max_offset_s=max_offset_s, signal=signal, max_gap_s=max_gap_s,
+        )
+        t_b = t_b - offset.offset_s
+
+    numeric = [col for col in df_b.columns if col != time_col and pd.api.types.is_numeric_dtype(df_b[col])]
+    values, nearest, valid = interpolate_at(t_a, t_b, df_b[numeric].to_numpy(dtype=np.float64), max_gap_s)
+    if not valid.any():
+        raise ValueError("No overlapping time window found")
+
+    synced_a = df_a[valid].set_index(time_col)
+    synced_b = df_b.iloc[nearest[valid]].drop(columns=[time_col]).copy()
+    synced_b[numeric] = values[valid]
+    synced_b.index = synced_a.index
+    return SyncResult(synced_a, synced_b[[col for col in df_b.columns if col != time_col]], offset)
+
+
+def synced_separation(synced_a: pd.DataFrame, synced_b: pd.DataFrame) -> np.ndarray:
+    """Distance in meters between time-aligned fixes of two synced logs"""
+    return haversine(synced_a["Latitude"].to_numpy(), synced_a["Longitude"].to_numpy(),
+                     synced_b["Latitude"].to_numpy(), synced_b["Longitude"].to_numpy())
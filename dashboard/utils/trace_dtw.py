@@ -0,0 +1,249 @@
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from dashboard.utils.geo import RadianTrace
+
+
+BANDS = ("none", "sakoe-chiba", "itakura")
+
+
+class DTWResult(NamedTuple):
+    distance: float
+    normalized_distance: float  # distance / (n + m), same normalization as dtw-python's symmetric2
+    path: Optional[np.ndarray]  # (k, 2) index pairs into trace A and trace B, if requested
+
+
+def band_limits(n: int, m: int, band: str = "none", radius: Optional[int] = None,
+                itakura_slope: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row column range ``[lo[i], hi[i])`` of trace B allowed for point ``i`` of trace A.
+
+    ``radius`` is the Sakoe-Chiba half-width in samples of trace B around the
+    (length-normalized) diagonal. The Itakura parallelogram limits the local
+    slope of the warping path to ``[1/itakura_slope, itakura_slope]``. Ranges
+    are widened where needed so a path from (0, 0) to (n-1, m-1) always exists.
+    """
+    if band not in BANDS:
+        raise ValueError(f"Unknown DTW band '{band}', expected one of {BANDS}")
+    rows = np.arange(n, dtype=np.float64)
+    x = rows / (n - 1) if n > 1 else np.zeros(n)
+    # Smallest band that still connects consecutive rows along the diagonal
+    min_radius = int(np.ceil((m - 1) / (n - 1))) if n > 1 else m
+    center = x * (m - 1)
+
+    if band == "none":
+        lo = np.zeros(n, dtype=np.int64)
+        hi = np.full(n, m, dtype=np.int64)
+    elif band == "sakoe-chiba":
+        r = max(int(radius) if radius is not None else max(1, m // 10), min_radius)
+        lo = np.floor(center - r).astype(np.int64)
+        hi = np.ceil(center + r).astype(np.int64) + 1
+    else:
+        s = float(itakura_slope)
+        if s <= 1.0:
+            raise ValueError("itakura_slope must be greater than 1")
+        y_lo = np.maximum(x / s, 1.0 - s * (1.0 - x))
+        y_hi = np.minimum(s * x, 1.0 - (1.0 - x) / s)
+        lo = np.floor(y_lo * (m - 1)).astype(np.int64)
+        hi = np.ceil(y_hi * (m - 1)).astype(np.int64) + 1
+        # Very different lengths make the parallelogram empty; keep at least the diagonal
+        lo = np.minimum(lo, np.floor(center - min_radius).astype(np.int64))
+        hi = np.maximum(hi, np.ceil(center + min_radius).astype(np.int64) + 1)
+
+    return _connect(lo, hi, m)
+
+
+class DTWCancelled(Exception):
+    """Raised when the ``cancel`` callback of a DTW computation returns True"""
+
+
+def dtw_distance(trace_a, trace_b, band: str = "none", radius: Optional[int] = None,
+                 itakura_slope: float = 2.0, return_path: bool = False,
+                 progress: Optional[Callable[[float], None]] = None,
+                 cancel: Optional[Callable[[], bool]] = None) -> DTWResult:
+    """DTW between two ``[(lat, lon), ...]`` traces with haversine local cost in meters.
+
+    Uses the symmetric2 step pattern (diagonal steps cost twice), so results
+    match ``dtw.dtw(..., dist_method=haversine)``. Costs are computed one row
+    at a time with vectorized haversine over the allowed band; the in-row
+    recurrence ``g[j] = min(t[j], g[j-1] + d[j])`` is solved with a cumulative
+    sum and ``np.minimum.accumulate``. Without ``return_path`` only two rows
+    of cost are kept; with it, one step code (int8) per band cell is stored.
+
+    ``progress`` is called with the completed fraction and ``cancel`` is
+    polled periodically; if it returns True, DTWCancelled is raised.
+    """
+    a = RadianTrace(trace_a)
+    b = RadianTrace(trace_b)
+    if len(a) == 0 or len(b) == 0:
+        raise ValueError("DTW needs two non-empty traces")
+    lo, hi = band_limits(len(a), len(b), band, radius, itakura_slope)
+    monitor = _Monitor(len(a), progress, cancel)
+    distance, path = _dtw_window(a, b, lo, hi, return_path, monitor)
+    monitor.done()
+    return DTWResult(distance, distance / (len(a) + len(b)), path)
+
+
+class _Monitor:
+    """Turns completed rows into progress callbacks and cancellation checks"""
+
+    def __init__(self, total_rows: int, progress, cancel, every: int = 256):
+        self.total_rows = max(1, total_rows)
+        self.rows = 0
+        self.progress = progress
+        self.cancel = cancel
+        self.every = every
+
+    def row_done(self):
+        self.rows += 1
+        if self.rows % self.every == 0:
+            if self.cancel is not None and self.cancel():
+                raise DTWCancelled()
+            if self.progress is not None:
+                self.progress(min(1.0, self.rows / self.total_rows))
+
+    def done(self):
+        if self.progress is not None:
+            self.progress(1.0)
+
+
+def _dtw_window(a: RadianTrace, b: RadianTrace, lo: np.ndarray, hi: np.ndarray,
+                return_path: bool, monitor: _Monitor) -> Tuple[float, Optional[np.ndarray]]:
+    """Symmetric2 DTW restricted to columns ``[lo[i], hi[i])`` of every row"""
+    n, m = len(a), len(b)
+    steps = [] if return_path else None  # Per row: 0 = diagonal, 1 = from row above, 2 = from the left
+    prev = None
+    prev_lo = prev_hi = 0
+    for i in range(n):
+        row_lo, row_hi = lo[i], hi[i]
+        d = a.distances_to(b, i, row_lo, row_hi)
+        if i == 0:
+            row = np.cumsum(d)
+            if steps is not None:
+                steps.append(np.full(len(d), 2, dtype=np.int8))
+        else:
+            width = row_hi - row_lo
+            up = np.full(width, np.inf)
+            diag = np.full(width, np.inf)
+            # Cost of (i-1, j) for j in this row's range
+            s, e = max(row_lo, prev_lo), min(row_hi, prev_hi)
+            if e > s:
+                up[s - row_lo:e - row_lo] = prev[s - prev_lo:e - prev_lo]
+            # Cost of (i-1, j-1)
+            s, e = max(row_lo, prev_lo + 1), min(row_hi, prev_hi + 1)
+            if e > s:
+                diag[s - row_lo:e - row_lo] = prev[s - prev_lo - 1:e - prev_lo - 1]
+            from_diag = diag + 2.0 * d
+            from_up = up + d
+            t = np.minimum(from_diag, from_up)
+            cum = np.cumsum(d)
+            u = t - cum
+            best = np.minimum.accumulate(u)
+            row = best + cum
+            if steps is not None:
+                step = np.where(from_diag <= from_up, 0, 1).astype(np.int8)
+                step[best < u] = 2
+                steps.append(step)
+        prev, prev_lo, prev_hi = row, row_lo, row_hi
+        monitor.row_done()
+
+    distance = float(prev[m - 1 - prev_lo])
+    path = _backtrack(steps, lo, n, m) if steps is not None else None
+    return distance, path
+
+
+def _connect(lo: np.ndarray, hi: np.ndarray, m: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Clip per-row ranges and widen them so a monotone path from (0, 0) to (n-1, m-1) exists"""
+    lo = np.clip(lo, 0, m - 1)
+    hi = np.clip(hi, 1, m)
+    lo[0] = 0
+    hi[-1] = m
+    hi = np.maximum.accumulate(hi)
+    # Row i must start no later than one diagonal step past the end of row i-1
+    lo[1:] = np.minimum(lo[1:], hi[:-1])
+    return lo, hi
+
+
+# --- Multiscale (FastDTW-style) approximation ---
+def coarsen(latlon: np.ndarray) -> np.ndarray:
+    """Halve a trace's resolution by averaging consecutive pairs of points"""
+    n = len(latlon)
+    pairs = latlon[:n - n % 2].reshape(-1, 2, 2).mean(axis=1)
+    return np.vstack((pairs, latlon[n - 1:])) if n % 2 else pairs
+
+
+def expand_window(path: np.ndarray, n: int, m: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Project a coarse warping path onto the next finer level and widen it by ``radius`` cells"""
+    lo = np.full(n, m, dtype=np.int64)
+    hi = np.zeros(n, dtype=np.int64)
+    for row_offset in (0, 1):
+        rows = np.minimum(2 * path[:, 0] + row_offset, n - 1)
+        np.minimum.at(lo, rows, 2 * path[:, 1])
+        np.maximum.at(hi, rows, np.minimum(2 * path[:, 1] + 2, m))
+    if radius > 0:
+        # Widen horizontally by radius and spread each row's range over +/- radius rows
+        lo_r, hi_r = lo - radius, hi + radius
+        lo, hi = lo_r.copy(), hi_r.copy()
+        for shift in range(1, radius + 1):
+            lo[shift:] = np.minimum(lo[shift:], lo_r[:-shift])
+            lo[:-shift] = np.minimum(lo[:-shift], lo_r[shift:])
+            hi[shift:] = np.maximum(hi[shift:], hi_r[:-shift])
+            hi[:-shift] = np.maximum(hi[:-shift], hi_r[shift:])
+    return _connect(lo, hi, m)
+
+
+def multiscale_dtw_distance(trace_a, trace_b, radius: int = 2, min_size: int = 100,
+                            return_path: bool = False,
+                            progress: Optional[Callable[[float], None]] = None,
+                            cancel: Optional[Callable[[], bool]] = None) -> DTWResult:
+    """Approximate DTW in roughly O((n + m) * radius) time and memory (FastDTW).
+
+    Both traces are repeatedly coarsened by 2 until one is at most
+    ``min_size`` points, solved exactly there, and each finer level is then
+    solved only inside the previous level's warping path widened by
+    ``radius`` cells. Larger radii are slower but closer to the exact result.
+    """
+    a0 = np.asarray(trace_a, dtype=np.float64).reshape(-1, 2)
+    b0 = np.asarray(trace_b, dtype=np.float64).reshape(-1, 2)
+    if len(a0) == 0 or len(b0) == 0:
+        raise ValueError("DTW needs two non-empty traces")
+
+    pyramid = [(a0, b0)]
+    while min(len(pyramid[-1][0]), len(pyramid[-1][1])) > max(min_size, 2 * radius + 2):
+        a, b = pyramid[-1]
+        pyramid.append((coarsen(a), coarsen(b)))
+
+    monitor = _Monitor(sum(len(a) for a, _ in pyramid), progress, cancel)
+    path = None
+    distance = 0.0
+    for level, (a, b) in enumerate(reversed(pyramid)):
+        n, m = len(a), len(b)
+        if path is None:
+            lo, hi = band_limits(n, m)
+        else:
+            lo, hi = expand_window(path, n, m, radius)
+        finest = level == len(pyramid) - 1
+        distance, path = _dtw_window(RadianTrace(a), RadianTrace(b), lo, hi, return_path or not finest, monitor)
+    monitor.done()
+    n, m = len(a0), len(b0)
+    return DTWResult(distance, distance / (n + m), path)
+
+
+def _backtrack(steps, lo, n: int, m: int) -> np.ndarray:
+    i, j = n - 1, m - 1
+    path = [(i, j)]
+    while i > 0 or j > 0:
+        step = steps[i][j - lo[i]]
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+        path.append((i, j))
+    return np.array(path[::-1], dtype=np.int64)
+
+
+def similarity_score(normalized_distance: float) -> float:
+    """Map a normalized DTW distance in meters to a 0-1 score (higher = more similar)"""
+    return 1 / (1 + normalized_distance)
@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+TRACE_COLUMNS = {
+    "lat": np.float64,
+    "lon": np.float64,
+    "fix": np.int16,  # Code into TraceStore.fix_type_names
+    "time": np.float64,  # Seconds (epoch or any monotonic clock)
+}
+
+
+class _ColumnRing:
+    """Bounded append-only columns in preallocated NumPy arrays.
+
+    Storage starts small and doubles up to ``max_capacity``; after that the
+    oldest quarter is evicted whenever the arrays fill up, so appends stay
+    amortized O(1). Elements are addressed by a sequence number that keeps
+    increasing across evictions.
+    """
+
+    def __init__(self, max_capacity: int, initial_capacity: int = 1024):
+        self.max_capacity = max_capacity
+        capacity = min(initial_capacity, max_capacity)
+        self._arrays = {name: np.empty(capacity, dtype=dtype) for name, dtype in TRACE_COLUMNS.items()}
+        self._start = 0  # Physical index of the oldest live element
+        self.count = 0
+        self.first_seq = 0  # Sequence number of the oldest live element
+
+    @property
+    def end_seq(self) -> int:
+        return self.first_seq + self.count
+
+    def _make_room(self):
+        capacity = len(self._arrays["lat"])
+        if self.count >= self.max_capacity:
+            evict = max(1, self.max_capacity // 4)
+            self._start += evict
+            self.count -= evict
+            self.first_seq += evict
+        new_capacity = capacity if self.count < capacity // 2 else min(capacity * 2, self.max_capacity)
+        live = slice(self._start, self._start + self.count)
+        for name, array in self._arrays.items():
+            if new_capacity == capacity:
+                array[:self.count] = array[live]
+            else:
+                grown = np.empty(new_capacity, dtype=array.dtype)
+                grown[:self.count] = array[live]
+                self._arrays[name] = grown
+        self._start = 0
+
+    def append(self, lat: float, lon: float, fix: int, t: float):
+        if self._start + self.count == len(self._arrays["lat"]):
+            self._make_room()
+        i = self._start + self.count
+        self._arrays["lat"][i] = lat
+        self._arrays["lon"][i] = lon
+        self._arrays["fix"][i] = fix
+        self._arrays["time"][i] = t
+        self.count += 1
+
+    def extend(self, lat: np.ndarray, lon: np.ndarray, fix: np.ndarray, t: np.ndarray):
+        """Append columns of equal length with the same eviction as repeated ``append``"""
+        columns = {"lat": lat, "lon": lon, "fix": fix, "time": t}
+        done, n = 0, len(lat)
+        while done < n:
+            if self._start + self.count == len(self._arrays["lat"]):
+                self._make_room()
+            i = self._start + self.count
+            take = min(n - done, len(self._arrays["lat"]) - i)
+            for name, values in columns.items():
+                self._arrays[name][i:i + take] = values[done:done + take]
+            self.count += take
+            done += take
+
+    def column(self, name: str, lo_seq: Optional[int] = None, hi_seq: Optional[int] = None) -> np.ndarray:
+        """View (not a copy) of one column between two sequence numbers"""
+        lo = self.first_seq if lo_seq is None else max(lo_seq, self.first_seq)
+        hi = self.end_seq if hi_seq is None else min(hi_seq, self.end_seq)
+        offset = self._start - self.first_seq
+        return self._arrays[name][lo + offset:max(lo, hi) + offset]
+
+
+class TraceStore:
+    """Per-stream trace store with multi-resolution decimated levels.
+
+    Level ``k`` keeps every ``2**k``-th fix, each level in its own bounded
+    ring, so adding a fix costs O(1) amortized and coarse levels retain a
+    much longer history than level 0. ``select`` picks the finest level that
+    draws at most ``max_points`` points for a time window.
+    """
+
+    def __init__(self, max_points_per_level: int = 1 << 16, levels: int = 12):
+        self.levels = [_ColumnRing(max_points_per_level) for _ in range(levels)]
+        self.fix_type_names: List[str] = []
+        self._fix_codes: Dict[str, int] = {}
+        self.total = 0  # Fixes ever appended
+
+    def __len__(self) -> int:
+        return self.levels[0].count
+
+    def fix_code(self, fix_type: str) -> int:
+        code = self._fix_codes.get(fix_type)
+        if code is None:
+            code = self._fix_codes[fix_type] = len(self.fix_type_names)
+            self.fix_type_names.append(fix_type)
+        return code
+
+    def append(self, lat: float, lon: float, fix_type: str, t: float):
+        code = self.fix_code(fix_type)
+        seq = self.total
+        for level, ring in enumerate(self.levels):
+            if seq & ((1 << level) - 1):
+                break
+            ring.append(lat, lon, code, t)
+        self.total += 1
+
+    def extend_fixes(self, fixes: List[dict], time_key: str = "recv_time"):
+        """Append fix dicts as produced by the stream registry"""
+        for fix in fixes:
+            self.append(fix["lat"], fix["lon"], fix.get("fix_type", "N/A"), fix.get(time_key, 0.0))
+
+    def extend_records(self, records: np.ndarray):
+        """Append a ``FIX_RECORD`` array (from a shared-memory stream) level by level, without per-fix Python work"""
+        n = len(records)
+        if not n:
+            return
+        names, inverse = np.unique(records["fix_type"], return_inverse=True)
+        codes = np.array([self.fix_code(name.decode("utf-8", "replace")) for name in names], dtype=np.int16)[inverse]
+        lat, lon, t = records["lat"], records["lon"], records["recv_time"]
+        for level, ring in enumerate(self.levels):
+            step = 1 << level
+            first = -self.total % step  # Offset of the first fix whose sequence number is a multiple of step
+            if first >= n:
+                break
+            ring.extend(lat[first::step], lon[first::step], codes[first::step], t[first::step])
+        self.total += n
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        ring = self.levels[0]
+        if ring.count == 0:
+            return None
+        last = ring.end_seq - 1
+        return float(ring.column("lat", last)[0]), float(ring.column("lon", last)[0])
+
+    def _seq_range(self, level: int, t_start: Optional[float], t_end: Optional[float]) -> Tuple[int, int]:
+        ring = self.levels[level]
+        times = ring.column("time")
+        lo = 0 if t_start is None else int(np.searchsorted(times, t_start, side="left"))
+        hi = len(times) if t_end is None else int(np.searchsorted(times, t_end, side="right"))
+        return ring.first_seq + lo, ring.first_seq + hi
+
+    def _covers(self, level: int, t_start: Optional[float]) -> bool:
+        """False if the level has already evicted part of the window starting at ``t_start``"""
+        ring = self.levels[level]
+        if ring.first_seq == 0:
+            return True
+        return t_start is not None and ring.count > 0 and ring.column("time")[0] <= t_start
+
+    def select(self, max_points: int, t_start: Optional[float] = None, t_end: Optional[float] = None) -> Tuple[int, int, int]:
+        """Return ``(level, lo_seq, hi_seq)`` of the finest level with at most ``max_points`` in the window.
+
+        If no level fits, the coarsest level is used and the window is cut to
+        its most recent ``max_points`` points.
+        """
+        choice = (0, 0, 0)
+        for level, ring in enumerate(self.levels):
+            if ring.count == 0:
+                break
+            lo, hi = self._seq_range(level, t_start, t_end)
+            choice = (level, lo, hi)
+            if hi - lo <= max_points and self._covers(level, t_start):
+                return choice
+        level, lo, hi = choice
+        return level, max(lo, hi - max_points), hi
+
+    def column(self, level: int, name: str, lo_seq: int, hi_seq: int) -> np.ndarray:
+        return self.levels[level].column(name, lo_seq, hi_seq)
@@ -0,0 +1,190 @@
+import json
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pydeck as pdk
+import streamlit as st
+
+from dashboard.utils.trace_store import TraceStore
+
+
+STREAM_COLORS = [
+    [255, 0, 0, 255],  # Bright red
+    [0, 0, 255, 255],  # Bright blue
+    [0, 200, 0, 255],  # Green
+    [255, 0, 255, 255],  # Magenta
+]
+
+
+def _layer_json(layer: pdk.Layer, data: list) -> str:
+    """Serialize a layer compactly with ``data`` spliced in (pydeck pretty-prints and sorts keys)"""
+    spec = json.loads(layer.to_json())
+    spec["data"] = data
+    return json.dumps(spec, separators=(",", ":"))
+
+
+class IncrementalDeck(pdk.Deck):
+    """Deck whose layers are supplied as pre-serialized JSON strings.
+
+    ``st.pydeck_chart`` only needs ``to_json()``, so frozen trace chunks are
+    serialized once and reused verbatim on every later render.
+    """
+
+    def __init__(self, layer_jsons: List[str], **kwargs):
+        super().__init__(layers=[], **kwargs)
+        self._layer_jsons = layer_jsons
+        self._json: Optional[str] = None
+
+    def to_json(self):
+        if self._json is None:
+            base = json.loads(super().to_json())
+            for key in ("layers", "_layerJsons", "_json"):  # pydeck serializes every attribute
+                base.pop(key, None)
+            head = json.dumps(base, separators=(",", ":"))
+            self._json = head[:-1] + ',"layers":[' + ",".join(self._layer_jsons) + "]}"
+        return self._json
+
+
+class _StreamTrace:
+    """One stream's trace drawn from a decimated TraceStore level in fixed-size chunks.
+
+    Chunks that are fully inside the drawn window never change for a given
+    level, so their JSON is serialized once and cached; only the chunk at
+    the head of the trace (and a partial chunk at a sliding window start)
+    is rebuilt per update.
+    """
+
+    def __init__(self, key: str, color: list, chunk_size: int):
+        self.key = key
+        self.color = color
+        self.chunk_size = chunk_size
+        self.store = TraceStore()
+        self.drawn_start: Optional[float] = None  # Time of the oldest point in the last layers built
+        self._chunk_cache: Dict[Tuple[int, int], str] = {}
+
+    def _path_json(self, level: int, chunk: int, lo: int, hi: int) -> str:
+        layer = pdk.Layer(
+            "PathLayer",
+            data=[],
+            id=f"{self.key}-path-{level}-{chunk}",
+            get_path="path",
+            get_color=self.color,
+            get_width=0.01,
+            pickable=True,
+            width_scale=20,
+            width_min_pixels=5,
+        )
+        lon = self.store.column(level, "lon", lo, hi)
+        lat = self.store.column(level, "lat", lo, hi)
+        return _layer_json(layer, [{"path": np.column_stack((lon, lat)).tolist()}])
+
+    def extend(self, fixes: Union[List[dict], np.ndarray]):
+        if isinstance(fixes, np.ndarray):
+            self.store.extend_records(fixes)
+        else:
+            self.store.extend_fixes(fixes)
+
+    def layer_jsons(self, max_points: int, t_start: Optional[float]) -> List[str]:
+        level, lo, hi = self.store.select(max_points, t_start)
+        self.drawn_start = float(self.store.column(level, "time", lo, lo + 1)[0]) if hi - lo > 1 else None
+        size = self.chunk_size
+        first_chunk = lo // size
+        # Drop cached chunks of other levels or that scrolled out of the window
+        for cache_key in [k for k in self._chunk_cache if k[0] != level or k[1] < first_chunk]:
+            del self._chunk_cache[cache_key]
+
+        jsons = []
+        if hi - lo > 1:
+            for chunk in range(first_chunk, (hi - 2) // size + 1):
+                # Chunks overlap by one point so the path stays continuous
+                chunk_lo, chunk_hi = chunk * size, (chunk + 1) * size + 1
+                if chunk_lo >= lo and chunk_hi <= hi:
+                    cached = self._chunk_cache.get((level, chunk))
+                    if cached is None:
+                        cached = self._chunk_cache[(level, chunk)] = self._path_json(level, chunk, chunk_lo, chunk_hi)
+                    jsons.append(cached)
+                else:
+                    jsons.append(self._path_json(level, chunk, max(chunk_lo, lo), min(chunk_hi, hi)))
+
+        latest = self.store.latest()
+        if latest is not None:
+            position = pdk.Layer(
+                "ScatterplotLayer",
+                data=[],
+                id=f"{self.key}-position",
+                get_position="[lon, lat]",
+                get_color=self.color[:3] + [160],
+                get_radius=1,
+                radius_min_pixels=6,
+            )
+            jsons.append(_layer_json(position, [{"lat": latest[0], "lon": latest[1]}]))
+        return jsons
+
+
+class LiveMapView:
+    """Live map that is only re-serialized when new fixes arrive.
+
+    Each stream is drawn with at most ``max_points`` points from its
+    TraceStore (optionally limited to the last ``window_s`` seconds), split
+    into cached chunks so the per-update cost is proportional to the delta
+    rather than the whole trace.
+    """
+
+    def __init__(self, chunk_size: int = 500, zoom: int = 17, max_points: int = 5000, window_s: Optional[float] = None):
+        self.chunk_size = chunk_size
+        self.zoom = zoom
+        self.max_points = max_points
+        self.window_s = window_s
+        self._traces: Dict[str, _StreamTrace] = {}
+        self._view_state: Optional[pdk.ViewState] = None
+        self._deck: Optional[IncrementalDeck] = None
+        self._dirty = True
+        self.render_count = 0
+
+    def add_fixes(self, key: str, fixes: Union[List[dict], np.ndarray]) -> bool:
+        """Append new fixes (dicts or a ``FIX_RECORD`` array) for a stream; return True if the map needs a rebuild"""
+        if len(fixes) == 0:
+            return False
+        trace = self._traces.get(key)
+        if trace is None:
+            used = [trace.color for trace in self._traces.values()]
+            free = [color for color in STREAM_COLORS if color not in used]
+            color = free[0] if free else STREAM_COLORS[len(self._traces) % len(STREAM_COLORS)]
+            trace = self._traces[key] = _StreamTrace(key, color, self.chunk_size)
+        trace.extend(fixes)
+        if self._view_state is None:
+            # Center once on the first fix; keeping the view state stable preserves user pan/zoom
+            self._view_state = pdk.ViewState(latitude=float(fixes[-1]["lat"]), longitude=float(fixes[-1]["lon"]), zoom=self.zoom)
+        self._dirty = True
+        return True
+
+    def configure(self, max_points: int, window_s: Optional[float]):
+        """Change the level-of-detail budget or the time window; marks the map dirty if changed"""
+        if (max_points, window_s) != (self.max_points, self.window_s):
+            self.max_points = max_points
+            self.window_s = window_s
+            self._dirty = True
+
+    def remove_stream(self, key: str):
+        if self._traces.pop(key, None) is not None:
+            self._dirty = True
+
+    def deck(self) -> IncrementalDeck:
+        """Return the deck, rebuilding it only if fixes arrived or drawn fixes left the window since the last call"""
+        t_start = time.time() - self.window_s if self.window_s else None
+        if t_start is not None and any(trace.drawn_start is not None and trace.drawn_start < t_start
+                                       for trace in self._traces.values()):
+            self._dirty = True  # The window moved on while the stream is stalled
+        if self._dirty or self._deck is None:
+            layer_jsons = []
+            for trace in self._traces.values():
+                layer_jsons.extend(trace.layer_jsons(self.max_points, t_start))
+            kwargs = {"initial_view_state": self._view_state} if self._view_state is not None else {}
+            self._deck = IncrementalDeck(layer_jsons, map_style="mapbox://styles/mapbox/satellite-v9", **kwargs)
+            self._dirty = False
+            self.render_count += 1
+        return self._deck
+
+    def render(self):
+        st.pydeck_chart(self.deck())
@@ -6,11 +6,23 @@ import logging
 import pyproj # For UTM conversion
 import math
 import json
+import functools
+import os
+import signal
 from datetime import datetime, timezone # Added timezone for KST
 from pathlib import Path
 import threading
+import cProfile
+import pstats
+import tracemalloc
 from collections import deque
 
+# The client is built standalone with nuitka (scripts/build-bin.sh), so these modules
+# import nothing beyond the standard library; keep it that way
+from dashboard.utils.gnss_ingest import TRANSPORTS, CallbackSink, IngestLoop, IngestStats, RawSink, StopEvent
+from dashboard.utils.nmea import NmeaDecoder
+from dashboard.utils.stage_profiler import DISABLED, StageProfiler
+
 # --- Global ZoneInfo for KST (if available) ---
 KST_TZ = None
 try:
@@ -31,6 +43,19 @@ ch.setFormatter(formatter)
 if not console_logger.hasHandlers():
     console_logger.addHandler(ch)
 
+# --- Memory Caps ---
+# Every buffer the client keeps is bounded so memory stays flat over multi-day runs
+# (checked by benchmarks/soak_client.py). The log file and console handler write through.
+# Messages waiting for the processor; the oldest are dropped when it falls behind eval_hz
+MESSAGE_QUEUE_MAX = 200
+# Longest partial line the receiver holds while waiting for its newline (fixes are ~200 bytes)
+MAX_LINE_BYTES = 64 * 1024
+# UTM projections kept, one per (zone, hemisphere) in use
+UTM_PROJ_CACHE_SIZE = 8
+
+# Message formats the receiver understands
+INPUT_FORMATS = ('json', 'nmea')
+
 # --- Utility Functions ---
 def get_utm_zone(latitude, longitude):
     """
@@ -40,15 +65,42 @@ def get_utm_zone(latitude, longitude):
         raise ValueError("Latitude out of UTM range (-80 to 84 degrees).")
     return math.floor((longitude + 180) / 6) + 1
 
-def format_timestamp_to_kst(utc_timestamp_str):
+@functools.lru_cache(maxsize=UTM_PROJ_CACHE_SIZE)
+def get_utm_proj(utm_zone, south):
+    """
+    Returns the (cached) UTM projection of a zone; building one per message dominated evaluation time.
+    """
+    return pyproj.Proj(proj='utm', zone=utm_zone, ellps='WGS84', south=south)
+
+@functools.lru_cache(maxsize=UTM_PROJ_CACHE_SIZE)
+def project_ground_truth(utm_zone, south, gt_latitude, gt_longitude):
+    """
+    Returns the (cached) UTM easting/northing of the ground truth in a zone.
+    """
+    return get_utm_proj(utm_zone, south)(gt_longitude, gt_latitude)
+
+def prime_projection_cache(gt_latitude, gt_longitude):
+    """
+    Builds the projection of the ground truth's zone before the first fix needs it.
+    """
+    if gt_latitude is None or gt_longitude is None:
+        return
+    try:
+        project_ground_truth(get_utm_zone(gt_latitude, gt_longitude), gt_latitude < 0, gt_latitude, gt_longitude)
+    except ValueError as e:
+        console_logger.warning(f"[Util] Ground truth ({gt_latitude}, {gt_longitude}) not projected: {e}")
+
+def format_timestamp_to_kst(utc_timestamp_str, utc_date_str=None):
     """
     Formats a UTC timestamp string (from NMEA or similar) to a KST string.
-    Example input: "010203.000" (HHMMSS.sss)
+    Example input: "010203.000" (HHMMSS.sss), with the date as "ddmmyy" (NMEA RMC) if known
     """
     try:
-        # Assuming the input is just HHMMSS.sss and refers to the current date
-        # This might need adjustment if the timestamp includes date information
-        current_date = datetime.now(timezone.utc).date()
+        # Without a date, the time refers to the current UTC date
+        if utc_date_str:
+            current_date = datetime.strptime(utc_date_str, '%d%m%y').date()
+        else:
+            current_date = datetime.now(timezone.utc).date()
         hour = int(utc_timestamp_str[0:2])
         minute = int(utc_timestamp_str[2:4])
         second = int(utc_timestamp_str[4:6])
@@ -66,12 +118,19 @@ def format_timestamp_to_kst(utc_timestamp_str):
         console_logger.error(f"[Util] Error formatting timestamp '{utc_timestamp_str}': {e}")
         return utc_timestamp_str # Return original on error
 
-def evaluate_data(json_str, gt_latitude, gt_longitude):
+def evaluate_data(json_str, gt_latitude, gt_longitude, profiler=DISABLED):
     """
-    Processes a JSON string, extracts GNSS data, and calculates errors.
+    Processes a JSON string (or a fix already decoded from NMEA), extracts GNSS data, and calculates errors.
+    Parsing and the UTM conversion are timed as the "json" and "pyproj" stages of profiler.
     """
     try:
-        data = json.loads(json_str)
+        if isinstance(json_str, dict): # NMEA fix from the receiver, stamped with its UTC time and date
+            data = json_str
+            data['timestamp'] = format_timestamp_to_kst(data['gnss_time'], data.get('date'))
+        else:
+            started = profiler.start()
+            data = json.loads(json_str)
+            started = profiler.stop("json", started)
         if not isinstance(data, dict):
             console_logger.warning(f"[Evaluate] Parsed JSON is not a dictionary: {json_str}")
             return None
@@ -102,8 +161,9 @@ def evaluate_data(json_str, gt_latitude, gt_longitude):
             return None
 
         # Calculate UTM zone and create a PyProj transformer
+        started = profiler.start()
         utm_zone = get_utm_zone(lat, lon)
-        transformer = pyproj.Proj(proj='utm', zone=utm_zone, ellps='WGS84', south=lat < 0)
+        transformer = get_utm_proj(utm_zone, lat < 0)
 
         northing_error = None
         easting_error = None
@@ -112,12 +172,13 @@ def evaluate_data(json_str, gt_latitude, gt_longitude):
         if gt_latitude is not None and gt_longitude is not None:
             # Transform current and ground truth coordinates to UTM
             easting, northing = transformer(lon, lat)
-            gt_easting, gt_northing = transformer(gt_longitude, gt_latitude)
+            gt_easting, gt_northing = project_ground_truth(utm_zone, lat < 0, gt_latitude, gt_longitude)
 
             # Calculate errors
             northing_error = northing - gt_northing
             easting_error = easting - gt_easting
             horizontal_error_2d = math.sqrt(northing_error**2 + easting_error**2) # This is often same as hpe from receiver if fix is good.
+        profiler.stop("pyproj", started)
 
         processed_info = {
             "timestamp": msg_time, #format_timestamp_to_kst(msg_time),
@@ -142,148 +203,228 @@ def evaluate_data(json_str, gt_latitude, gt_longitude):
         return None
 
 # --- Receiver Thread Function ---
+class NmeaSink(RawSink):
+    """Decodes each read's NMEA sentences (undecoded bytes) into fixes and passes them on in one batch.
+
+    The callback gets the fix rate too: the connection's rate counts every sentence.
+    """
+
+    def __init__(self, decoder, callback):
+        self.decoder = decoder
+        self.callback = callback
+        self.stats = IngestStats()
+
+    def put_block(self, block, count, now):
+        fixes = self.decoder.feed_block(block)
+        self.stats.update(now, len(block), len(fixes))
+        if fixes:
+            self.callback(fixes, self.stats.rate)
+
+def input_description(transport, host, port, unix_path):
+    if transport == 'unix':
+        return f"unix://{unix_path}"
+    return f"{transport}://{host}:{port}"
+
 def receiver_thread_func(
     host,
     port,
     shared_deque,
     lock,
-    stop_event
+    stop_event,
+    profiler=DISABLED,
+    transport='tcp',
+    unix_path=None,
+    udp_interface='0.0.0.0',
+    input_format='json'
 ):
-    console_logger.info(f"[Receiver] Thread started. Attempting to connect to {host}:{port}.")
-    data_buffer = b""
-    sock = None
-    msg_rate = None
-    msg_prev_time = []
-    alpha = 0.2  # Smoothing factor for EMA
+    """Receive messages until the server closes or stop_event is set.
+
+    Reads are event-driven (a StopEvent wakes the loop immediately) and each
+    read's messages are queued as one batch with the current message rate.
+    Reads are timed as the recv/frame/decode/sink stages of profiler.
+    transport 'tcp' connects to host:port, 'unix' to unix_path and 'udp'
+    listens on host:port (joining the group when host is a multicast address)
+    until stop_event is set. With input_format 'nmea' the sentences are decoded
+    into fixes here and the fixes are queued instead of the lines.
+    """
+    source = input_description(transport, host, port, unix_path)
+    console_logger.info(f"[Receiver] Thread started. Attempting to open {source}.")
+    loop = IngestLoop(stop_event=stop_event, logger=console_logger, max_line_bytes=MAX_LINE_BYTES,
+                      profiler=profiler)
 
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        console_logger.info(f"[Receiver] Successfully connected to server at {host}:{port}.")
-        sock.settimeout(0.1) # Short timeout for non-blocking recv
+        connection = None
 
-        while not stop_event.is_set():
-            try:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    console_logger.info("[Receiver] Server closed connection.")
-                    break
-                data_buffer += chunk
-            except socket.timeout:
-                # This is expected if no data is received within the timeout
-                # Check stop_event again to allow quick exit if flagged
-                if stop_event.is_set():
-                    break
-                continue # Go back to recv
-            except socket.error as e:
-                console_logger.error(f"[Receiver] Socket error: {e}")
-                break 
-
-            # Calculate message rate
-            current_time = time.time()
-            msg_prev_time.append(current_time)
-
-            if len(msg_prev_time) > 10: # Keep window of last 10 message arrival times
-                msg_prev_time.pop(0)
-
-            if len(msg_prev_time) >= 2:
-                time_diff = current_time - msg_prev_time[0]
-                if time_diff > 0:
-                    current_rate_calc = len(msg_prev_time) / time_diff
-                    if msg_rate is None:
-                        msg_rate = current_rate_calc
-                    else:
-                        # Exponential Moving Average (EMA)
-                        msg_rate = alpha * current_rate_calc + (1 - alpha) * msg_rate
-
-            # Process messages in buffer
-            while b'\n' in data_buffer:
-                if stop_event.is_set():
-                    break
-                message_bytes, data_buffer = data_buffer.split(b'\n', 1)
-                try:
-                    msg_str_decoded = message_bytes.decode('utf-8', errors='replace').strip()
-                    if msg_str_decoded:
-                        with lock:
-                            shared_deque.append((msg_str_decoded, msg_rate))
-                except UnicodeDecodeError as ude:
-                    console_logger.warning(f"[Receiver] Unicode decode error: {ude}. Message part: {message_bytes[:50]}")
-                except Exception as e_decode:
-                    console_logger.error(f"[Receiver] Error decoding/queueing message: {e_decode}")
+        def enqueue(messages, rate):
+            with lock:
+                shared_deque.extend((msg_str, rate) for msg_str in messages)
 
+        decoder = NmeaDecoder() if input_format == 'nmea' else None
+        if decoder:
+            sink = NmeaSink(decoder, enqueue)  # Rate of fixes, not of sentences
+        else:
+            sink = CallbackSink(lambda messages: enqueue(messages, connection.stats.rate), batch=True)
+        connection = loop.open(transport, sink, host=host, port=port,
+                               path=unix_path, interface=udp_interface, timeout=None)
+        console_logger.info(f"[Receiver] Receiving from {source}.")
+        loop.run()
+        if decoder:
+            enqueue(decoder.flush(), sink.stats.rate)  # Fixes still waiting for the first RMC date
+        stats = connection.stats
+        console_logger.info(f"[Receiver] Received {stats.messages} messages ({stats.bytes} bytes), "
+                            f"{stats.decode_errors} decode errors, {stats.oversized} oversized lines.")
+        if decoder:
+            nmea = decoder.stats()
+            console_logger.info(f"[Receiver] NMEA: {nmea['fixes']} fixes from {nmea['sentences']} sentences, "
+                                f"{nmea['ignored']} other sentence types, {nmea['checksum_errors']} checksum errors, "
+                                f"{nmea['invalid']} malformed.")
 
     except ConnectionRefusedError:
-        console_logger.error(f"[Receiver] Connection refused to {host}:{port}.")
+        console_logger.error(f"[Receiver] Connection refused to {source}.")
+    except FileNotFoundError:
+        console_logger.error(f"[Receiver] No socket at {unix_path}.")
     except socket.gaierror:
-        console_logger.error(f"[Receiver] Address-related error connecting to {host}:{port} (e.g., host not found).")
+        console_logger.error(f"[Receiver] Address-related error opening {source} (e.g., host not found).")
     except Exception as e:
         console_logger.error(f"[Receiver] Unexpected error: {e}", exc_info=True)
     finally:
         console_logger.info("[Receiver] Thread stopping...")
-        if sock:
-            try:
-                sock.shutdown(socket.SHUT_RDWR) # Gracefully close
-            except OSError:
-                pass 
-            sock.close()
+        loop.close()
         if not stop_event.is_set():
              stop_event.set() 
         console_logger.info("[Receiver] Thread finished.")
 
 
+# --- Live Configuration ---
+class LiveConfig:
+    """
+    Effective settings shared with the processor thread. A reload replaces them as a whole,
+    so the processor never sees half of an update.
+    """
+    def __init__(self, settings):
+        self._condition = threading.Condition()
+        self.settings = dict(settings)
+        self.version = 0
+        self.log_epoch = 0 # Bumped to make the processor reopen its log file (e.g. after logrotate)
+
+    def update(self, settings, reopen_log=False):
+        with self._condition:
+            self.settings = dict(settings)
+            self.version += 1
+            if reopen_log:
+                self.log_epoch += 1
+            self._condition.notify_all()
+
+    def snapshot(self):
+        """(version, settings, log_epoch) of the current settings"""
+        with self._condition:
+            return self.version, self.settings, self.log_epoch
+
+    def wait(self, version, timeout, stop_event):
+        """Wait up to timeout for settings newer than version or for stop; True if either happened"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.version != version or stop_event.is_set(), timeout)
+
+    def wake(self):
+        """Wake waiters to re-check their stop event"""
+        with self._condition:
+            self._condition.notify_all()
+
 # --- Processor Thread Function ---
+REPORT_LOG_HEADER = "TimestampKST,GNSSTime,Latitude,Longitude,FixType,HPE(m),NorthingError(m),EastingError(m),MessageRate(Hz)\n"
+
+def open_report_log(log_file_path, append=False):
+    """
+    Opens the report log (appending when reopening the same file) and writes the header to a new file.
+    Returns None if it cannot be opened.
+    """
+    try:
+        Path(log_file_path).parent.mkdir(parents=True, exist_ok=True)
+        log_file_handle = open(log_file_path, 'a' if append else 'w', encoding='utf-8', newline='')
+        if log_file_handle.tell() == 0:
+            log_file_handle.write(REPORT_LOG_HEADER)
+            log_file_handle.flush() # Ensure header is written
+        console_logger.info(f"[Processor] Logging report data lines to '{log_file_path}' enabled.")
+        return log_file_handle
+    except IOError as e:
+        console_logger.error(f"[Processor] Failed to open log file {log_file_path}: {e}")
+        return None
+
+def close_report_log(log_file_handle, log_file_path):
+    try:
+        log_file_handle.close()
+        console_logger.info(f"[Processor] Closed log file: {log_file_path}")
+    except Exception as e_close:
+        console_logger.error(f"[Processor] Error closing log file: {e_close}")
+
 def processor_thread_func(
     shared_deque,
     lock,
-    eval_hz,
-    gt_lat,
-    gt_lon,
-    log_enable_flag,
-    log_file_path,
-    stop_event
+    live_config,
+    stop_event,
+    profiler=DISABLED
 ):
+    """Evaluate one queued message per report interval and report it to the console and log file.
+
+    Settings are re-read from live_config whenever they change: a new eval_hz restarts the
+    report interval, new ground truth re-primes the projection cache and a new log file (or a
+    reopen request) rotates the log file. Each report is timed as the
+    queue/json/pyproj/format/console/file stages of profiler.
+    """
     console_logger.info("[Processor] Thread started.")
 
     log_file_handle = None
-    if log_enable_flag and log_file_path:
-        try:
-            Path(log_file_path).parent.mkdir(parents=True, exist_ok=True)
-            log_file_handle = open(log_file_path, 'w', encoding='utf-8', newline='')
-            # Write header to log file
-            header = "TimestampKST,GNSSTime,Latitude,Longitude,FixType,HPE(m),NorthingError(m),EastingError(m),MessageRate(Hz)\n"
-            log_file_handle.write(header)
-            log_file_handle.flush() # Ensure header is written
-            console_logger.info(f"[Processor] Logging report data lines to '{log_file_path}' enabled.")
-        except IOError as e:
-            console_logger.error(f"[Processor] Failed to open log file {log_file_path}: {e}")
-            log_file_handle = None # Ensure it's None if open fails
-
-    report_interval_seconds = 1.0 / eval_hz if eval_hz > 0 else float('inf') # Avoid division by zero
-    if report_interval_seconds == float('inf'):
-        console_logger.warning("[Processor] eval_hz is zero or invalid, processor will not report periodically.")
-
+    log_file_path = None
+    settings = None
+    version = None
+    log_epoch = None
+    report_interval_seconds = float('inf')
 
     while not stop_event.is_set():
-        # Wait for the report interval or until stop_event is set
-        if report_interval_seconds != float('inf') and stop_event.wait(report_interval_seconds):
-            break # Stop event was set
+        if live_config.version != version:
+            previous = settings
+            version, settings, new_log_epoch = live_config.snapshot()
+            eval_hz, gt_lat, gt_lon = settings['eval_hz'], settings['gt_lat'], settings['gt_lon']
+
+            report_interval_seconds = 1.0 / eval_hz if eval_hz > 0 else float('inf') # Avoid division by zero
+            if report_interval_seconds == float('inf'):
+                console_logger.warning("[Processor] eval_hz is zero or invalid, processor will not report periodically.")
+
+            if previous is None or (previous['gt_lat'], previous['gt_lon']) != (gt_lat, gt_lon):
+                prime_projection_cache(gt_lat, gt_lon)
+
+            new_log_file_path = settings['log_file'] if settings['log_enable'] else None
+            if new_log_file_path != log_file_path or new_log_epoch != log_epoch:
+                reopen = new_log_file_path == log_file_path
+                if log_file_handle:
+                    close_report_log(log_file_handle, log_file_path)
+                log_file_handle = open_report_log(new_log_file_path, append=reopen) if new_log_file_path else None
+                log_file_path = new_log_file_path
+            log_epoch = new_log_epoch
+
+        # Wait for the report interval; new settings restart it and stop ends it
+        if report_interval_seconds != float('inf') and live_config.wait(version, report_interval_seconds, stop_event):
+            continue
 
         msg_str_from_q = None
         msg_rate_from_q = None
         processed_info = None
 
+        started = profiler.start()
         with lock:
             if shared_deque:
                 data = shared_deque.popleft()
                 msg_str_from_q = data[0]
                 msg_rate_from_q = data[1]
+        profiler.stop("queue", started)
 
         if msg_str_from_q: # Check if a message was actually popped
             # print(f"gt_lat: {gt_lat}, gt_lon: {gt_lon}")
-            processed_info = evaluate_data(msg_str_from_q, gt_lat, gt_lon)
+            processed_info = evaluate_data(msg_str_from_q, gt_lat, gt_lon, profiler)
 
 
         # --- Constructing report string and data fields ---
+        started = profiler.start()
         report_data_fields_list = []
         console_report_str_parts = []
 
@@ -313,12 +454,16 @@ def processor_thread_func(
             console_report_str_parts = [f"MsgRate(msg/s):{current_rate_str}", "(No valid GNSS data for this interval)"]
 
 
-        console_logger.info(f"CONSOLE_REPORT | {' | '.join(console_report_str_parts)} (Report @ {eval_hz}Hz)")
+        console_report = f"CONSOLE_REPORT | {' | '.join(console_report_str_parts)} (Report @ {eval_hz}Hz)"
+        started = profiler.stop("format", started)
+        console_logger.info(console_report)
+        started = profiler.stop("console", started)
 
         if processed_info and log_file_handle:
             try:
                 log_file_handle.write(','.join(map(str, report_data_fields_list)) + "\n")
                 log_file_handle.flush() # Ensure data is written to disk periodically
+                profiler.stop("file", started)
             except Exception as e_log_file:
                 console_logger.error(f"[Processor] Error writing to log file: {e_log_file}")
                 # Consider closing the file or re-opening if errors persist
@@ -329,13 +474,48 @@ def processor_thread_func(
 
     console_logger.info("[Processor] Stop event received or loop finished.")
     if log_file_handle:
-        try:
-            log_file_handle.close()
-            console_logger.info(f"[Processor] Closed log file: {log_file_path}")
-        except Exception as e_close:
-            console_logger.error(f"[Processor] Error closing log file: {e_close}")
+        close_report_log(log_file_handle, log_file_path)
     console_logger.info("[Processor] Thread finished.")
 
+# --- Profiling Helpers ---
+def run_cprofiled(target, profiles, *args):
+    """Run a thread target under its own cProfile.Profile (cProfile only sees the calling thread)"""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e: # Python 3.12+ allows one active profiler per process
+        console_logger.warning(f"[Profile] {threading.current_thread().name} runs without cProfile: {e}")
+        return target(*args)
+    profiles.append(profile)
+    try:
+        return target(*args)
+    finally:
+        profile.disable()
+
+def profile_report(profiler, since_last, trace_baseline):
+    lines = [profiler.report(since_last=since_last)] if profiler.enabled else []
+    if trace_baseline is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"tracemalloc: {current / 1e6:.2f} MB current, {peak / 1e6:.2f} MB peak")
+    return "\n".join(lines)
+
+def finish_profiling(profiles, cprofile_path, trace_baseline, top=15):
+    """Save the merged cProfile stats and print the top functions and allocation growth"""
+    growth = None
+    if trace_baseline is not None:
+        growth = tracemalloc.take_snapshot().compare_to(trace_baseline, 'lineno')
+        tracemalloc.stop()
+    if profiles:
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(cprofile_path)
+        console_logger.info(f"[Profile] cProfile stats of {len(profiles)} threads saved to {cprofile_path}")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    if growth is not None:
+        console_logger.info("[Profile] Top allocation growth since start:\n" +
+                            "\n".join(str(stat) for stat in growth[:top]))
+
 # --- Argument Parser Setup ---
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -344,10 +524,20 @@ def parse_args():
     )
     parser.add_argument('--yaml-config', type=str, default=None,
                         help='Path to YAML configuration file. CLI arguments will override YAML settings.')
+    parser.add_argument('--watch-config', action=argparse.BooleanOptionalAction, default=True,
+                        help='Reload the YAML file when it changes (SIGHUP also reloads it and reopens the log file). '
+                             'Report rate, ground truth and logging apply without reconnecting; input settings need a restart.')
     # TCP settings
     pgroup_tcp = parser.add_argument_group('TCP Server Connection')
-    pgroup_tcp.add_argument('--tcp-host', type=str, help='Server IP address (overrides YAML/default)')
-    pgroup_tcp.add_argument('--tcp-port', type=int, help='Server port (overrides YAML/default)')
+    pgroup_tcp.add_argument('--tcp-host', type=str, help='Server IP address; with --transport udp the address to listen on or a multicast group to join (overrides YAML/default)')
+    pgroup_tcp.add_argument('--tcp-port', type=int, help='Server port; with --transport udp the port to listen on (overrides YAML/default)')
+    pgroup_tcp.add_argument('--transport', choices=TRANSPORTS, default=None,
+                        help='Input transport: tcp (connect to host:port), udp (one JSON fix per datagram sent to host:port) or unix (connect to --unix-path) (overrides YAML/default: tcp)')
+    pgroup_tcp.add_argument('--unix-path', type=str, default=None, help='Unix-domain socket path of the streamer for --transport unix (overrides YAML)')
+    pgroup_tcp.add_argument('--udp-interface', type=str, default=None,
+                        help='Local interface address on which to join a multicast group (overrides YAML/default: 0.0.0.0)')
+    pgroup_tcp.add_argument('--input-format', choices=INPUT_FORMATS, default=None,
+                        help='Message format: json (the companion streamer) or nmea (raw GGA/RMC/GST sentences from a receiver) (overrides YAML/default: json)')
 
     # Evaluation settings
     pgroup_eval = parser.add_argument_group('Evaluation Parameters')
@@ -361,61 +551,88 @@ def parse_args():
                         help='Enable logging of report data lines. Use --log-enable or --no-log-enable. Overrides YAML if present.')
     pgroup_log.add_argument('--log-file', type=str, default=None,
                         help='File to log report data lines. Overrides YAML. If --log-enable is used and this is not set (and not in YAML), a default name is generated.')
-    return parser.parse_args()
-
-# --- Main Function ---
-def main():
-    args = parse_args()
 
-    # 1. Set base default configuration (used if not in YAML and not in CLI)
-    config = {
-        'tcp_host': '127.0.0.1',
-        'tcp_port': 50012,
-        'eval_hz': 1.0,
-        'gt_lat': 36.116588, # Example: Gumi City Hall
-        'gt_lon': 128.364695, # Example: Gumi City Hall
-        'log_enable': False,
-        'log_file': None, # Default to None, will be auto-generated if enabled and not specified
-    }
-    console_logger.info(f"[Main] Initial default config: {config}")
+    # Profiling settings
+    pgroup_prof = parser.add_argument_group('Profiling')
+    pgroup_prof.add_argument('--profile', action='store_true',
+                        help='Time each pipeline stage (recv, frame, decode, queue, json, pyproj, format, console, file) and print a breakdown periodically and at exit.')
+    pgroup_prof.add_argument('--profile-interval', type=float, default=10.0,
+                        help='Seconds between stage breakdowns with --profile (0 prints only at exit).')
+    pgroup_prof.add_argument('--cprofile', type=str, default=None, metavar='PATH',
+                        help='Run both threads under cProfile and save the merged stats to PATH (open with pstats or snakeviz).')
+    pgroup_prof.add_argument('--tracemalloc', action='store_true',
+                        help='Trace Python allocations: memory in each breakdown, top allocation growth at exit.')
+    return parser.parse_args()
 
-    # 2. Load and merge YAML configuration if a path is provided
-    if args.yaml_config:
-        try:
-            with open(args.yaml_config, 'r', encoding='utf-8') as f:
-                yaml_data = yaml.safe_load(f)
-                if yaml_data:
-                    console_logger.info(f"[Main] Loading configuration from YAML file: {args.yaml_config}")
-                    # TCP settings
-                    tcp_settings = yaml_data.get('tcp', {})
-                    if tcp_settings.get('host') is not None: config['tcp_host'] = tcp_settings['host']
-                    if tcp_settings.get('port') is not None: config['tcp_port'] = tcp_settings['port']
-                    # Evaluation settings
-                    eval_settings = yaml_data.get('evaluation', {})
-                    if eval_settings.get('rate_hz') is not None: config['eval_hz'] = eval_settings['rate_hz']
-                    # Ground truth settings
-                    gt_settings = yaml_data.get('ground_truth', {})
-                    if gt_settings.get('latitude') is not None: config['gt_lat'] = gt_settings['latitude']
-                    if gt_settings.get('longitude') is not None: config['gt_lon'] = gt_settings['longitude']
-                    # Logging settings
-                    log_settings = yaml_data.get('logging', {})
-                    if log_settings.get('enable') is not None: config['log_enable'] = log_settings['enable']
-                    if log_settings.get('file_path') is not None: config['log_file'] = log_settings['file_path']
-                    console_logger.info(f"[Main] Config after YAML load: {config}")
-                else:
-                    console_logger.warning(f"[Main] YAML config file {args.yaml_config} is empty or invalid. Using defaults and/or CLI args.")
-        except FileNotFoundError:
-            console_logger.warning(f"[Main] YAML config file not found: {args.yaml_config}. Using defaults and/or CLI args.")
-        except yaml.YAMLError as e:
-            console_logger.error(f"[Main] Error parsing YAML config file {args.yaml_config}: {e}. Using defaults and/or CLI args.")
-        except Exception as e:
-            console_logger.error(f"[Main] Unexpected error loading YAML config {args.yaml_config}: {e}", exc_info=True)
+# --- Configuration ---
+# Base default configuration (used if not in YAML and not in CLI)
+DEFAULT_CONFIG = {
+    'tcp_host': '127.0.0.1',
+    'tcp_port': 50012,
+    'transport': 'tcp',
+    'unix_path': None,
+    'udp_interface': '0.0.0.0',
+    'input_format': 'json',
+    'eval_hz': 1.0,
+    'gt_lat': 36.116588, # Example: Gumi City Hall
+    'gt_lon': 128.364695, # Example: Gumi City Hall
+    'log_enable': False,
+    'log_file': None, # Default to None, will be auto-generated if enabled and not specified
+}
+# Changing these needs a restart (the receiver keeps its connection across reloads)
+RESTART_ONLY_KEYS = ('tcp_host', 'tcp_port', 'transport', 'unix_path', 'udp_interface', 'input_format')
+
+def read_yaml_config(path, fallback="Using defaults and/or CLI args."):
+    """
+    Returns the parsed YAML configuration, or None (logged, followed by fallback) if it cannot be used.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            yaml_data = yaml.safe_load(f)
+    except FileNotFoundError:
+        console_logger.warning(f"[Main] YAML config file not found: {path}. {fallback}")
+        return None
+    except yaml.YAMLError as e:
+        console_logger.error(f"[Main] Error parsing YAML config file {path}: {e}. {fallback}")
+        return None
+    except Exception as e:
+        console_logger.error(f"[Main] Unexpected error loading YAML config {path}: {e}", exc_info=True)
+        return None
+    if not isinstance(yaml_data, dict):
+        console_logger.warning(f"[Main] YAML config file {path} is empty or invalid. {fallback}")
+        return None
+    return yaml_data
 
+def merge_yaml_config(config, yaml_data):
+    # TCP settings
+    tcp_settings = yaml_data.get('tcp') or {}
+    if tcp_settings.get('host') is not None: config['tcp_host'] = tcp_settings['host']
+    if tcp_settings.get('port') is not None: config['tcp_port'] = tcp_settings['port']
+    if tcp_settings.get('transport') is not None: config['transport'] = tcp_settings['transport']
+    if tcp_settings.get('unix_path') is not None: config['unix_path'] = tcp_settings['unix_path']
+    if tcp_settings.get('udp_interface') is not None: config['udp_interface'] = tcp_settings['udp_interface']
+    if tcp_settings.get('input_format') is not None: config['input_format'] = tcp_settings['input_format']
+    # Evaluation settings
+    eval_settings = yaml_data.get('evaluation') or {}
+    if eval_settings.get('rate_hz') is not None: config['eval_hz'] = eval_settings['rate_hz']
+    # Ground truth settings
+    gt_settings = yaml_data.get('ground_truth') or {}
+    if gt_settings.get('latitude') is not None: config['gt_lat'] = gt_settings['latitude']
+    if gt_settings.get('longitude') is not None: config['gt_lon'] = gt_settings['longitude']
+    # Logging settings
+    log_settings = yaml_data.get('logging') or {}
+    if log_settings.get('enable') is not None: config['log_enable'] = log_settings['enable']
+    if log_settings.get('file_path') is not None: config['log_file'] = log_settings['file_path']
 
-    # 3. Override with Command Line Arguments (CLI has highest precedence)
+def apply_cli_overrides(config, args):
+    """Command line arguments have the highest precedence, also over a reloaded YAML file"""
     cli_args_provided = vars(args)
     if cli_args_provided.get('tcp_host') is not None: config['tcp_host'] = cli_args_provided['tcp_host']
     if cli_args_provided.get('tcp_port') is not None: config['tcp_port'] = cli_args_provided['tcp_port']
+    if cli_args_provided.get('transport') is not None: config['transport'] = cli_args_provided['transport']
+    if cli_args_provided.get('unix_path') is not None: config['unix_path'] = cli_args_provided['unix_path']
+    if cli_args_provided.get('udp_interface') is not None: config['udp_interface'] = cli_args_provided['udp_interface']
+    if cli_args_provided.get('input_format') is not None: config['input_format'] = cli_args_provided['input_format']
     if cli_args_provided.get('eval_hz') is not None: config['eval_hz'] = cli_args_provided['eval_hz']
     if cli_args_provided.get('gt_lat') is not None: config['gt_lat'] = cli_args_provided['gt_lat']
     if cli_args_provided.get('gt_lon') is not None: config['gt_lon'] = cli_args_provided['gt_lon']
@@ -424,7 +641,13 @@ def main():
         config['log_enable'] = args.log_enable
     if cli_args_provided.get('log_file') is not None: config['log_file'] = cli_args_provided['log_file']
 
-    console_logger.info(f"[Main] Config after CLI override: {config}")
+def resolve_log_file(config, current_log_file=None):
+    """
+    Picks the log file when logging is enabled without a path: the current one on reload
+    (so an unrelated change does not rotate it), otherwise a new timestamped name.
+    """
+    if config['log_enable'] and config['log_file'] is None and current_log_file is not None:
+        config['log_file'] = current_log_file
 
     # Automatic log file naming if enabled but no file path is set
     if config['log_enable'] and config['log_file'] is None:
@@ -447,14 +670,71 @@ def main():
         console_logger.error("[Main] Logging is enabled, but no log file path could be determined. Disabling logging.")
         config['log_enable'] = False
 
+def reload_config(args, live_config, reopen_log=False):
+    """
+    Re-reads the YAML file, re-applies the CLI overrides and hands every changed setting to the
+    processor in one update. Unreadable YAML keeps the current settings.
+    """
+    _, current, _ = live_config.snapshot()
+    config = dict(DEFAULT_CONFIG)
+    if args.yaml_config:
+        yaml_data = read_yaml_config(args.yaml_config, fallback="Keeping the current settings.")
+        if yaml_data is None:
+            if reopen_log:
+                live_config.update(current, reopen_log=True)
+            return
+        merge_yaml_config(config, yaml_data)
+    apply_cli_overrides(config, args)
+    resolve_log_file(config, current['log_file'])
+
+    for key in RESTART_ONLY_KEYS:
+        if config[key] != current[key]:
+            console_logger.warning(f"[Main] {key} change to {config[key]} needs a restart; keeping {current[key]}.")
+            config[key] = current[key]
+    changes = {key: (current[key], config[key]) for key in config if config[key] != current[key]}
+    if not changes and not reopen_log:
+        console_logger.info("[Main] Configuration reloaded, no changes.")
+        return
+    live_config.update(config, reopen_log=reopen_log)
+    changed = ", ".join(f"{key}: {old} -> {new}" for key, (old, new) in changes.items()) or "none"
+    console_logger.info(f"[Main] Configuration reloaded. Changes: {changed}{' (log file reopened)' if reopen_log else ''}")
+
+def config_file_state(path):
+    """(mtime, size) of the YAML file to detect edits, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+# --- Main Function ---
+def main():
+    args = parse_args()
+
+    # 1. Set base default configuration (used if not in YAML and not in CLI)
+    config = dict(DEFAULT_CONFIG)
+    console_logger.info(f"[Main] Initial default config: {config}")
+
+    # 2. Load and merge YAML configuration if a path is provided
+    if args.yaml_config:
+        yaml_data = read_yaml_config(args.yaml_config)
+        if yaml_data is not None:
+            console_logger.info(f"[Main] Loading configuration from YAML file: {args.yaml_config}")
+            merge_yaml_config(config, yaml_data)
+            console_logger.info(f"[Main] Config after YAML load: {config}")
+
+    # 3. Override with Command Line Arguments (CLI has highest precedence)
+    apply_cli_overrides(config, args)
+    console_logger.info(f"[Main] Config after CLI override: {config}")
+
+    resolve_log_file(config)
 
     final_log_enable_flag = config['log_enable']
     final_log_file_path = config['log_file']
 
     console_logger.info(
         f"[Main] Final effective configuration: \n"
-        f"  TCP Host: {config['tcp_host']}\n"
-        f"  TCP Port: {config['tcp_port']}\n"
+        f"  Input: {input_description(config['transport'], config['tcp_host'], config['tcp_port'], config['unix_path'])} ({config['input_format']})\n"
         f"  Report Rate: {config['eval_hz']} Hz\n"
         f"  GT Latitude: {config['gt_lat']}\n"
         f"  GT Longitude: {config['gt_lon']}\n"
@@ -464,24 +744,51 @@ def main():
 
     if config['eval_hz'] <= 0:
         console_logger.warning("[Main] eval_hz is non-positive. Processor thread will process messages as they arrive but console/log reporting interval will be effectively infinite (or very slow based on wait timeout).")
+    if config['transport'] not in TRANSPORTS:
+        console_logger.error(f"[Main] Unknown transport {config['transport']!r}; expected one of {', '.join(TRANSPORTS)}.")
+        return
+    if config['input_format'] not in INPUT_FORMATS:
+        console_logger.error(f"[Main] Unknown input format {config['input_format']!r}; expected one of {', '.join(INPUT_FORMATS)}.")
+        return
+    if config['transport'] == 'unix' and not config['unix_path']:
+        console_logger.error("[Main] The unix transport needs --unix-path (or tcp.unix_path in the YAML file).")
+        return
+
+    # --- Live reload: edits to the YAML file (polled each second) or SIGHUP ---
+    live_config = LiveConfig(config)
+    reload_requested = threading.Event()
+    watch_config = bool(args.yaml_config and args.watch_config)
+    watched_state = config_file_state(args.yaml_config) if watch_config else None
+    if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_requested.set())
 
 
     # --- Shared Resources & Threads ---
-    shared_message_deque = deque(maxlen=200) # Max length to prevent unbounded memory growth if processor is slow
+    shared_message_deque = deque(maxlen=MESSAGE_QUEUE_MAX) # Max length to prevent unbounded memory growth if processor is slow
     deque_lock = threading.Lock()
-    stop_event = threading.Event()
-
-    receiver = threading.Thread(target=receiver_thread_func,
-                                args=(config['tcp_host'], config['tcp_port'],
-                                      shared_message_deque, deque_lock,
-                                      stop_event),
-                                name="ReceiverThread")
-    processor = threading.Thread(target=processor_thread_func,
-                                 args=(shared_message_deque, deque_lock,
-                                       config['eval_hz'], config['gt_lat'], config['gt_lon'],
-                                       final_log_enable_flag, final_log_file_path,
-                                       stop_event),
-                                 name="ProcessorThread")
+    stop_event = StopEvent()  # set() also wakes the receiver's socket loop
+
+    # --- Profiling (all off by default; a disabled profiler costs two calls per stage) ---
+    profiler = StageProfiler() if args.profile else DISABLED
+    profile_interval = args.profile_interval if args.profile and args.profile_interval > 0 else float('inf')
+    trace_baseline = None
+    if args.tracemalloc:
+        tracemalloc.start()
+        trace_baseline = tracemalloc.take_snapshot()
+    cprofiles = []
+
+    receiver_args = (config['tcp_host'], config['tcp_port'], shared_message_deque, deque_lock,
+                     stop_event, profiler, config['transport'], config['unix_path'], config['udp_interface'],
+                     config['input_format'])
+    processor_args = (shared_message_deque, deque_lock, live_config, stop_event, profiler)
+    if args.cprofile:
+        receiver_target, receiver_args = run_cprofiled, (receiver_thread_func, cprofiles) + receiver_args
+        processor_target, processor_args = run_cprofiled, (processor_thread_func, cprofiles) + processor_args
+    else:
+        receiver_target, processor_target = receiver_thread_func, processor_thread_func
+
+    receiver = threading.Thread(target=receiver_target, args=receiver_args, name="ReceiverThread")
+    processor = threading.Thread(target=processor_target, args=processor_args, name="ProcessorThread")
 
     # Daemon threads will exit when the main program exits
     receiver.daemon = True
@@ -494,8 +801,21 @@ def main():
     try:
         # Keep main thread alive while worker threads are running
         # Or implement more sophisticated monitoring/control logic
+        next_profile_report = time.monotonic() + profile_interval
         while not stop_event.is_set() and receiver.is_alive() and processor.is_alive():
             time.sleep(1.0) # Check periodically
+            if watch_config and config_file_state(args.yaml_config) != watched_state:
+                watched_state = config_file_state(args.yaml_config)
+                console_logger.info(f"[Main] {args.yaml_config} changed, reloading configuration...")
+                reload_config(args, live_config)
+            if reload_requested.is_set():
+                reload_requested.clear()
+                console_logger.info("[Main] SIGHUP received, reloading configuration and reopening the log file...")
+                reload_config(args, live_config, reopen_log=True)
+            if time.monotonic() >= next_profile_report:
+                next_profile_report += profile_interval
+                console_logger.info(f"[Profile] Last {profile_interval:g} s:\n"
+                                    f"{profile_report(profiler, True, trace_baseline)}")
 
         # If stop_event was set by one of the threads (e.g., receiver connection closed)
         if stop_event.is_set():
@@ -521,6 +841,7 @@ def main():
 
         if not stop_event.is_set(): # Ensure stop_event is set if not already
             stop_event.set()
+        live_config.wake() # The processor may be waiting for its next report
 
         console_logger.info("[Main] Waiting for Receiver thread to join (timeout 2s)...")
         receiver.join(timeout=2.0)
@@ -532,6 +853,10 @@ def main():
         if processor.is_alive():
             console_logger.warning("[Main] Processor thread did not join in time.")
 
+        if args.profile or args.tracemalloc:
+            console_logger.info(f"[Profile] Whole run:\n{profile_report(profiler, False, trace_baseline)}")
+        finish_profiling(cprofiles, args.cprofile, trace_baseline)
+
         console_logger.info("[Main] Application finished.")
 
 
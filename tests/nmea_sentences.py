@@ -0,0 +1,32 @@
+"""Checksummed NMEA sentences for the tests"""
+import functools
+import operator
+
+
+def sentence(body):
+    return f"${body}*{functools.reduce(operator.xor, body.encode(), 0):02X}\r\n".encode()
+
+
+def gga(hhmmss, quality=4, lat="3606.99528", lon="12821.88170"):
+    return sentence(f"GNGGA,{hhmmss},{lat},N,{lon},E,{quality},18,0.61,52.3,M,24.1,M,1.0,0000")
+
+
+def rmc(hhmmss, ddmmyy, lat="3606.99528", lon="12821.88170"):
+    return sentence(f"GNRMC,{hhmmss},A,{lat},N,{lon},E,0.012,,{ddmmyy},,,R,V")
+
+
+def hhmmss(seconds):
+    seconds %= 86400
+    return f"{int(seconds // 3600):02d}{int(seconds % 3600 // 60):02d}{seconds % 60:05.2f}"
+
+
+def midnight_capture(epochs=200, start=86400 - 10.0):
+    """GGA, RMC and GSV per 10 Hz epoch from ``start`` seconds after midnight of 12 June 2025, UTC"""
+    lines = []
+    for i in range(epochs):
+        seconds = start + i * 0.1
+        date = "120625" if seconds < 86400 else "130625"
+        lat = f"3606.{99528 + i % 7:05d}"
+        lines += [gga(hhmmss(seconds), lat=lat), rmc(hhmmss(seconds), date, lat=lat),
+                  sentence("GPGSV,3,3,11,30,09,199,31,36,44,152,42,40,10,255,,1")]
+    return b"".join(lines)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from dashboard.utils.cross_track import SegmentGrid, cross_track_error, error_summary
+from dashboard.utils.geo import EARTH_RADIUS_M
+
+
+def brute_force(x, y, px, py):
+    """Distance from every point to every segment; the nearest one per point"""
+    x0, y0, x1, y1 = x[:-1], y[:-1], x[1:], y[1:]
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = ((px[:, None] - x0) * dx + (py[:, None] - y0) * dy) / length2
+    t = np.where(length2 > 0, np.clip(t, 0.0, 1.0), 0.0)
+    d = np.hypot(px[:, None] - (x0 + t * dx), py[:, None] - (y0 + t * dy))
+    return d.min(axis=1)
+
+
+def drive(n, seed):
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.2, n))
+    step = rng.uniform(0.0, 3.0, n)
+    step[rng.random(n) < 0.1] = 0.0  # Stops: repeated points
+    return np.cumsum(step * np.cos(heading)), np.cumsum(step * np.sin(heading))
+
+
+@pytest.mark.parametrize("cell_size", [None, 0.5, 50.0])
+def test_grid_matches_brute_force(cell_size):
+    x, y = drive(3000, 1)
+    rng = np.random.default_rng(2)
+    px = np.concatenate((x[::7] + rng.normal(0, 1.5, len(x[::7])), rng.uniform(x.min() - 500, x.max() + 500, 200)))
+    py = np.concatenate((y[::7] + rng.normal(0, 1.5, len(y[::7])), rng.uniform(y.min() - 500, y.max() + 500, 200)))
+    distance, segment, t = SegmentGrid(x, y, cell_size).nearest(px, py)
+    np.testing.assert_allclose(distance, brute_force(x, y, px, py), atol=1e-9)
+    assert (segment >= 0).all() and ((t >= 0) & (t <= 1)).all()
+
+
+def test_single_point_reference_and_non_finite_queries():
+    grid = SegmentGrid(np.array([1.0]), np.array([2.0]))
+    distance, segment, _ = grid.nearest(np.array([4.0, np.nan]), np.array([6.0, 0.0]))
+    assert distance[0] == pytest.approx(5.0)
+    assert segment[1] == -1 and np.isinf(distance[1])
+
+
+def test_cross_track_error_sign_and_along_track():
+    lat0, lon0 = 36.1166, 128.3647
+    meters_east = np.arange(0, 101, 10.0)
+    ref_lats = np.full(len(meters_east), lat0)
+    ref_lons = lon0 + np.degrees(meters_east / (EARTH_RADIUS_M * np.cos(np.radians(lat0))))
+    north = np.degrees(3.0 / EARTH_RADIUS_M)
+    lats = np.array([lat0 + north, lat0 - north, np.nan])
+    lons = np.array([ref_lons[5] + 1e-6, ref_lons[5] + 1e-6, lon0])
+    result = cross_track_error(ref_lats, ref_lons, lats, lons)
+    np.testing.assert_allclose(result.distance_m[:2], 3.0, atol=0.01)
+    assert result.signed_m[0] > 0 > result.signed_m[1]  # Left of an eastbound reference is north
+    np.testing.assert_allclose(result.along_track_m[:2], 50.09, atol=0.05)
+    assert np.isnan(result.distance_m[2]) and result.segment[2] == -1
+
+
+def test_error_summary():
+    summary = error_summary([1.0, -2.0, np.nan, 3.0, 4.0])
+    assert summary["mean"] == pytest.approx(2.5)
+    assert summary["max"] == 4.0
+    assert summary["rms"] == pytest.approx(np.sqrt(7.5))
@@ -0,0 +1,59 @@
+import socket
+import time
+
+import pytest
+
+from dashboard.utils.gnss_ingest import CallbackSink, IngestLoop, LineFramer, RawSink, Sink, StopEvent
+
+
+def test_sink_without_its_method_fails_at_construction():
+    class NoPutMany(Sink):
+        pass
+
+    class NoPutBlock(RawSink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoPutMany()
+    with pytest.raises(TypeError):
+        NoPutBlock()
+
+
+def test_raw_sink_takes_decoded_lines_as_a_block():
+    class Blocks(RawSink):
+        def __init__(self):
+            self.blocks = []
+
+        def put_block(self, block, count, now):
+            self.blocks.append((block, count))
+
+    sink = Blocks()
+    sink.put_many(["a", "bc"], 0.0)
+    assert sink.blocks == [(b"a\nbc\n", 2)]
+    assert not CallbackSink(print).raw and sink.raw
+
+
+def test_framer_keeps_partial_line():
+    framer = LineFramer()
+    assert framer.feed(b"one\ntw") == b"one\n"
+    assert framer.feed(b"o\n") == b"two\n"
+
+
+def test_loop_passes_monotonic_time_to_sinks(monkeypatch):
+    class Times(Sink):
+        def __init__(self):
+            self.times = []
+
+        def put_many(self, messages, now):
+            self.times.append(now)
+
+    sink = Times()
+    loop = IngestLoop(stop_event=StopEvent())
+    server, client = socket.socketpair()
+    connection = loop.add(server, sink, "pair")
+    monkeypatch.setattr(time, "time", lambda: 0.0)  # A wall clock stepped back must not reach the sink
+    client.sendall(b"a\nb\n")
+    client.close()
+    loop.run()
+    assert len(sink.times) == 1 and 0.0 < sink.times[0] <= time.monotonic()
+    assert connection.stats.last_message_at == sink.times[0]
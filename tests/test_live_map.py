@@ -0,0 +1,46 @@
+import json
+import time
+
+from dashboard.views.live_map import LiveMapView
+
+
+def fixes(t0, n):
+    return [{"lat": 36.1 + i * 1e-5, "lon": 128.3, "fix_type": "fixed-rtk", "recv_time": t0 + i} for i in range(n)]
+
+
+def path_layers(deck):
+    return deck.to_json().count('"PathLayer"')
+
+
+def test_window_drops_old_fixes_while_stream_is_stalled(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    live_map = LiveMapView(window_s=10)
+    live_map.add_fixes("a", fixes(now - 5, 5))
+    assert path_layers(live_map.deck()) == 1
+    renders = live_map.render_count
+    live_map.deck()
+    assert live_map.render_count == renders  # Nothing left the window yet
+
+    now += 20
+    assert path_layers(live_map.deck()) == 0
+    renders = live_map.render_count
+    live_map.deck()
+    assert live_map.render_count == renders
+
+
+def test_readded_stream_gets_a_color_not_in_use():
+    live_map = LiveMapView()
+    live_map.add_fixes("a", fixes(0.0, 2))
+    live_map.add_fixes("b", fixes(0.0, 2))
+    live_map.remove_stream("a")
+    live_map.add_fixes("c", fixes(0.0, 2))
+    assert live_map._traces["c"].color != live_map._traces["b"].color
+
+
+def test_deck_json_holds_each_layer_once():
+    live_map = LiveMapView()
+    live_map.add_fixes("a", fixes(0.0, 5))
+    spec = json.loads(live_map.deck().to_json())
+    assert [layer["@@type"] for layer in spec["layers"]] == ["PathLayer", "ScatterplotLayer"]
+    assert "_layerJsons" not in spec
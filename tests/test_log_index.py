@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.utils.log_index import LogIndex
+from dashboard.utils.log_metrics import analyze_log
+
+FIX_TYPES = ["fixed-rtk", "float-rtk", "no-rtk", "dead-reckoning"]
+
+
+def make_log(n=2000, seed=0, shuffle=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "TimestampKST": pd.Timestamp("2025-06-12 10:00") + pd.to_timedelta(np.arange(n) * 100, unit="ms"),
+        "Latitude": 36.1166 + np.cumsum(rng.normal(0, 1e-5, n)),
+        "Longitude": 128.3647 + np.cumsum(rng.normal(0, 1e-5, n)),
+        "FixType": pd.Categorical(rng.choice(FIX_TYPES, n, p=[0.6, 0.25, 0.1, 0.05])),
+    })
+    if shuffle:
+        df = df.iloc[rng.permutation(n)].reset_index(drop=True)
+    return df
+
+
+def reference(df, fix_types, start, end):
+    mask = np.ones(len(df), dtype=bool)
+    if fix_types:
+        mask &= df["FixType"].isin(fix_types).to_numpy()
+    if start is not None:
+        mask &= (df["TimestampKST"] >= start).to_numpy()
+    if end is not None:
+        mask &= (df["TimestampKST"] <= end).to_numpy()
+    return mask
+
+
+def assert_same_analysis(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if key == "Total Distance (meters)":
+            assert actual[key] == pytest.approx(value, abs=0.011)  # Both are rounded to 0.01 m
+        elif key in ("Latitude Range", "Longitude Range") and isinstance(value, list):
+            np.testing.assert_allclose(actual[key], value)
+        else:
+            assert actual[key] == value, key
+
+
+SELECTIONS = [
+    (None, None, None),
+    (["fixed-rtk"], None, None),
+    (["float-rtk", "no-rtk"], None, None),
+    (None, "2025-06-12 10:00:30", None),
+    (None, None, "2025-06-12 10:01:00.05"),
+    (["fixed-rtk", "dead-reckoning"], "2025-06-12 10:00:12.3", "2025-06-12 10:02:00"),
+    (["no-rtk"], "2025-06-12 11:00", None),  # Empty selection
+]
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("fix_types, start, end", SELECTIONS)
+def test_analysis_matches_analyze_log_of_mask(shuffle, fix_types, start, end):
+    df = make_log(shuffle=shuffle)
+    index = LogIndex(df)
+    start = pd.Timestamp(start) if start else None
+    end = pd.Timestamp(end) if end else None
+    mask = reference(df, fix_types, start, end)
+    np.testing.assert_array_equal(index.select(fix_types, start, end), mask)
+    assert_same_analysis(index.analysis(fix_types, start, end), analyze_log(df[mask]))
+
+
+def test_missing_positions_poison_only_selections_that_include_them():
+    df = make_log(200)
+    df.loc[50, "Latitude"] = np.nan
+    index = LogIndex(df)
+    assert np.isnan(index.distance(np.ones(len(df), dtype=bool)))
+    mask = np.zeros(len(df), dtype=bool)
+    mask[100:] = True
+    assert index.distance(mask) == pytest.approx(analyze_log(df[mask])["Total Distance (meters)"], abs=0.01)
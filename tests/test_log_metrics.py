@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.utils.log_metrics import (DistanceReducer, LogSummary, ValueCounts, summarize_log,
+                                         summarize_log_chunks, total_distance)
+from dashboard.utils.geo import segment_distances
+
+
+def make_log(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    north = np.round(rng.normal(0, 0.3, n), 2)
+    east = np.round(rng.normal(0, 0.3, n), 2)
+    north[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        "TimestampKST": pd.Timestamp("2025-06-12 10:00") + pd.to_timedelta(np.arange(n) * 100, unit="ms"),
+        "Latitude": 36.1166 + np.cumsum(rng.normal(0, 1e-5, n)),
+        "Longitude": 128.3647 + np.cumsum(rng.normal(0, 1e-5, n)),
+        "FixType": pd.Categorical(rng.choice(["fixed-rtk", "float-rtk", "no-rtk"], n)),
+        "HPE(m)": np.round(np.hypot(north, east), 2),
+        "NorthingError(m)": north,
+        "EastingError(m)": east,
+        "MessageRate(Hz)": np.round(rng.normal(10, 0.05, n), 2),
+    })
+
+
+def chunks(df, sizes):
+    start = 0
+    for size in sizes:
+        yield df.iloc[start:start + size]
+        start += size
+    if start < len(df):
+        yield df.iloc[start:]
+
+
+@pytest.mark.parametrize("sizes", [[1], [7, 1, 1000, 0, 3], [2500], [4999]])
+def test_chunked_summary_equals_in_memory(sizes):
+    df = make_log()
+    expected = summarize_log(df)
+    actual = summarize_log_chunks(chunks(df, sizes * 50))
+    assert actual == expected
+
+
+def test_distance_is_independent_of_chunking():
+    df = make_log(3 * (1 << 16) // 2)
+    reducer = DistanceReducer()
+    for chunk in chunks(df, [12345] * 20):
+        reducer.update(chunk["Latitude"].values, chunk["Longitude"].values)
+    assert reducer.result() == total_distance(df)
+    assert reducer.result() == pytest.approx(segment_distances(df["Latitude"], df["Longitude"]).sum(), rel=1e-12)
+
+
+def test_value_counts_match_numpy():
+    rng = np.random.default_rng(1)
+    values = np.round(rng.exponential(0.5, 10000), 2)
+    counts = ValueCounts()
+    for part in np.array_split(values, 7):
+        counts.update(np.concatenate((part, [np.nan, np.inf])))
+    assert counts.n == len(values)
+    assert counts.mean() == pytest.approx(values.mean(), rel=1e-12)
+    assert counts.mean_square() == pytest.approx(np.mean(values ** 2), rel=1e-12)
+    for p in (0, 1, 50, 68, 95, 99.9, 100):
+        assert counts.percentile(p) == pytest.approx(np.percentile(values, p), abs=1e-12)
+
+
+def test_analysis_matches_direct_computation():
+    df = make_log(1000)
+    analysis = LogSummary(accuracy=False).update(df).analysis()
+    assert analysis["Trace Duration"] == str(df["TimestampKST"].iloc[-1] - df["TimestampKST"].iloc[0])
+    assert analysis["Latitude Range"] == [df["Latitude"].min(), df["Latitude"].max()]
+    assert analysis["FixType Distribution"] == df["FixType"].value_counts().to_dict()
+    row = summarize_log(df)
+    assert row["hpe_m_p95"] == pytest.approx(np.nanpercentile(df["HPE(m)"], 95))
+    horizontal = np.hypot(df["NorthingError(m)"], df["EastingError(m)"]).dropna()
+    assert row["horizontal_rms_m"] == pytest.approx(np.sqrt(np.mean(horizontal ** 2)))
+
+
+def test_value_counts_stay_bounded_on_unrounded_values():
+    rng = np.random.default_rng(2)
+    values = rng.exponential(0.5, 200000)
+    counts = ValueCounts(max_bins=1000)
+    for part in np.array_split(values, 20):
+        counts.update(part)
+    assert len(counts.bins) <= 1000
+    assert counts.mean() == pytest.approx(values.mean(), rel=1e-12)
+    assert counts.stats("x")["x_max"] == values.max()
+    for p in (50, 95, 99):
+        assert counts.percentile(p) == pytest.approx(np.percentile(values, p), abs=counts.resolution)
@@ -0,0 +1,72 @@
+from dashboard.utils.nmea import DATE_WAIT_FIXES, NmeaDecoder, nmea_checksum, sentence_fields
+from nmea_sentences import gga, rmc, sentence
+
+
+def dates(fixes):
+    return [(fix["gnss_time"], fix["date"]) for fix in fixes]
+
+
+def test_checksum():
+    line = sentence("GNGSA,A,3,05,13,15,18,20,23,24,29,,,,,1.12,0.61,0.94,1").rstrip()
+    assert int(line[-2:], 16) == nmea_checksum(line[1:-3])
+    assert sentence_fields(line)[0] == b"GNGSA"
+    assert sentence_fields(line.replace(b"1.12", b"1.13")) is None
+    assert sentence_fields(b"GNGSA,A*00") is None
+
+
+def test_fix_fields():
+    decoder = NmeaDecoder()
+    fixes = decoder.feed_block(gga("100000.00") + rmc("100000.00", "120625") + gga("100000.10"))
+    assert len(fixes) == 2
+    fix = fixes[1]
+    assert fix["gnss_time"] == "100000.10" and fix["date"] == "120625" and fix["type"] == "fixed-rtk"
+    assert abs(fix["lat"] - (36 + 6.99528 / 60)) < 1e-12
+    assert abs(fix["lon"] - (128 + 21.88170 / 60)) < 1e-12
+
+
+def test_bad_checksum_skipped():
+    decoder = NmeaDecoder()
+    line = gga("100000.00").replace(b"4,18", b"5,18")
+    assert len(decoder.feed_block(gga("095959.90") + rmc("095959.90", "120625") + line)) == 1
+    assert decoder.stats()["checksum_errors"] == 1
+
+
+def test_midnight_rollover():
+    decoder = NmeaDecoder()
+    block = (gga("235959.90") + rmc("235959.90", "120625") + gga("000000.00") + rmc("000000.00", "130625")
+             + gga("000000.10") + rmc("000000.10", "130625"))
+    assert dates(decoder.feed_block(block)) == [
+        ("235959.90", "120625"), ("000000.00", "130625"), ("000000.10", "130625")]
+
+
+def test_rollover_at_month_and_year_end():
+    decoder = NmeaDecoder()
+    fixes = decoder.feed_block(gga("235959.90") + rmc("235959.90", "311225") + gga("000000.00"))
+    assert dates(fixes) == [("235959.90", "311225"), ("000000.00", "010126")]
+
+
+def test_fixes_before_first_rmc_take_its_date():
+    decoder = NmeaDecoder()
+    assert decoder.feed_block(gga("235959.80") + gga("235959.90")) == []
+    fixes = decoder.feed_block(gga("000000.00") + rmc("000000.00", "130625"))
+    assert dates(fixes) == [("235959.80", "120625"), ("235959.90", "120625"), ("000000.00", "130625")]
+
+
+def test_source_without_rmc_is_passed_on_undated():
+    decoder = NmeaDecoder()
+    fixes = decoder.feed_block(b"".join(gga(f"1000{i:02d}.00") for i in range(DATE_WAIT_FIXES + 2)))
+    assert len(fixes) == DATE_WAIT_FIXES + 2
+    assert all(fix["date"] is None for fix in fixes)
+
+
+def test_flush_returns_waiting_fixes():
+    decoder = NmeaDecoder()
+    assert decoder.feed_block(gga("100000.00")) == []
+    assert dates(decoder.flush()) == [("100000.00", None)]
+    assert decoder.flush() == []
+
+
+def test_rmc_only_source():
+    decoder = NmeaDecoder()
+    fixes = decoder.feed_block(rmc("235959.90", "120625") + rmc("000000.00", "130625"))
+    assert dates(fixes) == [("235959.90", "120625"), ("000000.00", "130625")]
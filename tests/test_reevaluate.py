@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import gnss_eval_tcp_client as client
+from dashboard.utils.nmea import NmeaDecoder
+from dashboard.utils.reevaluate import StaticGroundTruth, iter_raw_chunks, reevaluate_chunk, utm_errors
+from nmea_sentences import midnight_capture
+
+GT_LAT, GT_LON = 36.116588, 128.364695
+
+
+def test_utm_errors_match_client():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-80, 84, 200)
+    lons = rng.uniform(-180, 180, 200)
+    gt_lats = lats + rng.normal(0, 1e-4, 200)
+    gt_lons = lons + rng.normal(0, 1e-4, 200)
+    hpe, northing, easting = utm_errors(lats, lons, gt_lats, gt_lons)
+    for i in range(200):
+        live = client.evaluate_data({"gnss_time": "000000.00", "lat": lats[i], "lon": lons[i]}, gt_lats[i], gt_lons[i])
+        assert hpe[i] == pytest.approx(live["hpe"], abs=1e-6)
+        assert northing[i] == pytest.approx(live["northing_error"], abs=1e-6)
+        assert easting[i] == pytest.approx(live["easting_error"], abs=1e-6)
+
+
+def test_nmea_capture_across_midnight_matches_live(tmp_path):
+    capture = midnight_capture()
+    path = tmp_path / "midnight.nmea"
+    path.write_bytes(capture)
+
+    decoder = NmeaDecoder()
+    lines = capture.splitlines(keepends=True)
+    live = []
+    for i in range(0, len(lines), 7):  # Reads that do not line up with epochs
+        for fix in decoder.feed_block(b"".join(lines[i:i + 7])):
+            live.append(client.evaluate_data(fix, GT_LAT, GT_LON))
+    live = pd.DataFrame(live)
+
+    offline = pd.concat([reevaluate_chunk(chunk, StaticGroundTruth(GT_LAT, GT_LON))
+                         for chunk in iter_raw_chunks(path, chunk_rows=64)], ignore_index=True)
+    assert len(offline) == len(live) == 200
+    timestamps = offline["TimestampKST"].dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+    assert timestamps.tolist() == live["timestamp"].tolist()
+    assert offline["TimestampKST"].is_monotonic_increasing
+    assert timestamps.iloc[0] == "2025-06-13 08:59:50.000"
+    assert timestamps.iloc[-1] == "2025-06-13 09:00:09.900"
+    np.testing.assert_allclose(offline["HPE(m)"], live["hpe"], atol=1e-5)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.utils.log_index import LogIndex
+from dashboard.utils.result_cache import ResultCache, estimate_size
+
+
+def log_frame(n=1000):
+    return pd.DataFrame({
+        "TimestampKST": pd.date_range("2025-06-12 10:00", periods=n, freq="100ms"),
+        "Latitude": np.linspace(36.1, 36.2, n),
+        "Longitude": np.linspace(128.3, 128.4, n),
+        "FixType": pd.Categorical(np.where(np.arange(n) % 3, "fixed-rtk", "float-rtk")),
+    })
+
+
+def test_log_index_sized_from_arrays():
+    index = LogIndex(log_frame())
+    assert estimate_size(index) == index.nbytes >= index.lats.nbytes + index.lons.nbytes + index.cum_distance.nbytes
+
+
+def test_unpicklable_value_counts_against_budget():
+    assert estimate_size(lambda: None) > 0
+
+
+def test_disk_total_is_kept_and_pruned(tmp_path):
+    cache = ResultCache(tmp_path, disk_budget_bytes=3000)
+    for i in range(5):
+        cache.put(("blob", i), bytes(1000))
+    files = list(tmp_path.glob("*.pkl"))
+    assert cache.disk_bytes == sum(p.stat().st_size for p in files) <= 3000
+    assert len(files) == 2
+    assert cache.get(("blob", 4)) == bytes(1000)
+    assert ResultCache(tmp_path).disk_bytes == cache.disk_bytes
+
+
+def test_overwrite_does_not_double_count(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("key", bytes(1000))
+    size = cache.disk_bytes
+    cache.put("key", bytes(1000))
+    assert cache.disk_bytes == size
@@ -0,0 +1,63 @@
+import numpy as np
+
+from dashboard.utils.simplify import _point_segment_distances, douglas_peucker, simplify_trace
+
+
+def naive_douglas_peucker(x, y, tolerance):
+    keep = np.zeros(len(x), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(x) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        idx = np.arange(start + 1, end)
+        d = _point_segment_distances(x[idx], y[idx], x[start], y[start], x[end], y[end])
+        if d.max() > tolerance:
+            vertex = idx[np.argmax(d)]
+            keep[vertex] = True
+            stack += [(start, vertex), (vertex, end)]
+    return keep
+
+
+def walk(n, seed):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(0, 1, n)), np.cumsum(rng.normal(0, 1, n))
+
+
+def test_matches_naive_recursion():
+    for seed in range(5):
+        x, y = walk(2000, seed)
+        for tolerance in (0.1, 1.0, 5.0):
+            keep, max_deviation = douglas_peucker(x, y, tolerance)
+            np.testing.assert_array_equal(keep, naive_douglas_peucker(x, y, tolerance))
+            assert max_deviation <= tolerance
+
+
+def test_max_deviation_is_the_largest_distance_to_the_result():
+    x, y = walk(500, 7)
+    keep, max_deviation = douglas_peucker(x, y, 2.0)
+    kept = np.flatnonzero(keep)
+    worst = 0.0
+    for start, end in zip(kept[:-1], kept[1:]):
+        idx = np.arange(start + 1, end)
+        if len(idx):
+            worst = max(worst, _point_segment_distances(x[idx], y[idx], x[start], y[start], x[end], y[end]).max())
+    assert max_deviation == worst
+
+
+def test_stops_and_loops():
+    x = np.array([0.0, 1.0, 1.0, 1.0, 0.0, 0.0])
+    y = np.array([0.0, 0.0, 1.0, 1.0, 1.0, 0.0])  # A closed loop with a repeated point
+    keep, _ = douglas_peucker(x, y, 0.5)
+    np.testing.assert_array_equal(keep, naive_douglas_peucker(x, y, 0.5))
+    assert keep[[0, 1, 2, 4, 5]].all()
+
+
+def test_simplify_trace_drops_non_finite():
+    lats = np.array([36.0, np.nan, 36.0001, 36.0002, 36.0003])
+    lons = np.array([128.0, 128.0, 128.0, np.inf, 128.0])
+    result = simplify_trace(lats, lons, 1.0)
+    np.testing.assert_array_equal(result.indices, [0, 4])
+    assert result.dropped == 3
+    np.testing.assert_array_equal(simplify_trace(lats, lons, 0).indices, [0, 2, 4])
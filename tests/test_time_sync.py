@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.utils.geo import EARTH_RADIUS_M, local_xy
+from dashboard.utils.time_sync import _signal, estimate_time_offset, interpolate_at, sync_logs, synced_separation
+
+LAT0, LON0 = 36.1166, 128.3647
+
+
+def motion(t):
+    """A drive with changing speed and heading, as lat/lon"""
+    x = 2.0 * t + 40.0 * np.sin(0.07 * t) + 15.0 * np.sin(0.31 * t)
+    y = 25.0 * np.sin(0.05 * t) + 10.0 * np.cos(0.23 * t)
+    lat = LAT0 + np.degrees(y / EARTH_RADIUS_M)
+    lon = LON0 + np.degrees(x / (EARTH_RADIUS_M * np.cos(np.radians(LAT0))))
+    return lat, lon
+
+
+def naive_correlation(t_a, lat_a, lon_a, t_b, lat_b, lon_b, rate_hz, max_lag, signal, min_overlap=0.25):
+    """Pearson correlation of the resampled signals over their overlapping valid samples, one lag at a time"""
+    xa, ya = local_xy(lat_a, lon_a, float(np.mean(lat_a)), float(np.mean(lon_a)))
+    xb, yb = local_xy(lat_b, lon_b, float(np.mean(lat_a)), float(np.mean(lon_a)))
+    origin = min(t_a[0], t_b[0])
+    length = int(np.ceil((max(t_a[-1], t_b[-1]) - origin) * rate_hz)) + 1
+    grid = origin + np.arange(length) / rate_hz
+    channels_a, mask_a = _signal(t_a, xa, ya, grid, rate_hz, signal, 1.0)
+    channels_b, mask_b = _signal(t_b, xb, yb, grid, rate_hz, signal, 1.0)
+    min_samples = max(3.0, min_overlap * min(mask_a.sum(), mask_b.sum()))
+    best = (-np.inf, None)
+    for lag in range(-max_lag, max_lag + 1):
+        k = np.arange(max(0, -lag), min(length, length - lag))
+        both = (mask_a[k] > 0) & (mask_b[k + lag] > 0)
+        if both.sum() < min_samples:
+            continue
+        covariance = variance_a = variance_b = 0.0
+        for ca, cb in zip(channels_a, channels_b):
+            u, v = ca[k][both], cb[k + lag][both]
+            covariance += np.sum((u - u.mean()) * (v - v.mean()))
+            variance_a += np.sum((u - u.mean()) ** 2)
+            variance_b += np.sum((v - v.mean()) ** 2)
+        correlation = covariance / np.sqrt(variance_a * variance_b)
+        if correlation > best[0]:
+            best = (correlation, lag)
+    return best
+
+
+@pytest.mark.parametrize("signal", ["speed", "position"])
+def test_fft_correlation_matches_direct_sum(signal):
+    t_a = np.arange(0, 60, 0.1)
+    t_b = np.arange(5, 70, 0.1) + 0.03
+    t_b = np.delete(t_b, np.s_[200:240])  # A 4 s gap in B
+    lat_a, lon_a = motion(t_a)
+    lat_b, lon_b = motion(t_b - 2.4)
+    estimate = estimate_time_offset(t_a, lat_a, lon_a, t_b, lat_b, lon_b, rate_hz=10.0, max_offset_s=10.0,
+                                    signal=signal)
+    correlation, lag = naive_correlation(t_a, lat_a, lon_a, t_b, lat_b, lon_b, 10.0, 100, signal)
+    assert estimate.correlation == pytest.approx(correlation, abs=1e-9)
+    assert abs(estimate.offset_s * 10.0 - lag) <= 0.5
+
+
+@pytest.mark.parametrize("offset_s", [-7.33, 0.0, 3.27])
+def test_recovers_clock_offset(offset_s):
+    t_true = np.arange(0, 120, 0.1)
+    lat, lon = motion(t_true)
+    t_b = np.arange(0, 120, 0.1) + 0.05
+    lat_b, lon_b = motion(t_b)
+    estimate = estimate_time_offset(t_true, lat, lon, t_b + offset_s, lat_b, lon_b, rate_hz=10.0)
+    assert estimate.offset_s == pytest.approx(offset_s, abs=0.02)
+    assert estimate.correlation > 0.99
+
+
+def test_interpolate_at_matches_np_interp_and_masks_gaps():
+    t = np.array([0.0, 1.0, 2.0, 5.0, 6.0])
+    values = np.array([0.0, 10.0, 20.0, 50.0, 60.0])
+    query = np.array([-1.0, 0.0, 0.25, 1.5, 3.0, 5.5, 6.0, 7.0])
+    interpolated, nearest, valid = interpolate_at(query, t, values, max_gap_s=1.0)
+    np.testing.assert_array_equal(valid, [False, True, True, True, False, True, True, False])
+    np.testing.assert_allclose(interpolated[valid], np.interp(query[valid], t, values))
+    np.testing.assert_array_equal(nearest[valid], [0, 0, 2, 4, 4])
+
+
+def test_sync_logs_aligns_shifted_log():
+    t = np.arange(0, 90, 0.1)
+    lat, lon = motion(t)
+    start = pd.Timestamp("2025-06-12 10:00:00")
+    df_a = pd.DataFrame({"TimestampKST": start + pd.to_timedelta(t, unit="s"), "Latitude": lat, "Longitude": lon})
+    df_b = df_a.assign(TimestampKST=df_a["TimestampKST"] + pd.Timedelta(seconds=4.5), FixType="fixed-rtk")
+    result = sync_logs(df_a, df_b)
+    assert result.offset.offset_s == pytest.approx(4.5, abs=0.02)
+    assert synced_separation(result.synced_a, result.synced_b).max() < 0.5
+    assert (result.synced_b["FixType"] == "fixed-rtk").all()
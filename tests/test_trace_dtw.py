@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from dashboard.utils.geo import haversine
+from dashboard.utils.trace_dtw import band_limits, dtw_distance, multiscale_dtw_distance
+
+
+def trace(n, seed, lat0=36.1166, lon0=128.3647):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 2e-6, (n, 2)) + [1e-6, 2e-6]
+    return np.cumsum(steps, axis=0) + [lat0, lon0]
+
+
+def naive_dtw(a, b, lo=None, hi=None):
+    """Full symmetric2 DP (diagonal steps cost twice); cells outside [lo[i], hi[i]) are not allowed"""
+    n, m = len(a), len(b)
+    cost = haversine(a[:, None, 0], a[:, None, 1], b[None, :, 0], b[None, :, 1])
+    g = np.full((n, m), np.inf)
+    for i in range(n):
+        for j in range(m):
+            if lo is not None and not lo[i] <= j < hi[i]:
+                continue
+            if i == 0 and j == 0:
+                g[i, j] = cost[0, 0]
+                continue
+            g[i, j] = min(g[i - 1, j - 1] + 2 * cost[i, j] if i and j else np.inf,
+                          g[i - 1, j] + cost[i, j] if i else np.inf,
+                          g[i, j - 1] + cost[i, j] if j else np.inf)
+    return g[-1, -1]
+
+
+def path_cost(a, b, path):
+    cost = haversine(a[path[:, 0], 0], a[path[:, 0], 1], b[path[:, 1], 0], b[path[:, 1], 1])
+    diagonal = np.concatenate(([False], np.all(np.diff(path, axis=0) == 1, axis=1)))
+    return float(np.sum(np.where(diagonal, 2 * cost, cost)))
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 7), (9, 1), (40, 40), (37, 52), (60, 23)])
+def test_unbanded_matches_naive(n, m):
+    a, b = trace(n, 1), trace(m, 2)
+    result = dtw_distance(a, b, return_path=True)
+    assert result.distance == pytest.approx(naive_dtw(a, b), abs=1e-6)
+    assert result.normalized_distance == pytest.approx(result.distance / (n + m))
+    assert tuple(result.path[0]) == (0, 0) and tuple(result.path[-1]) == (n - 1, m - 1)
+    assert path_cost(a, b, result.path) == pytest.approx(result.distance, abs=1e-6)
+
+
+@pytest.mark.parametrize("band, radius", [("sakoe-chiba", 3), ("sakoe-chiba", 10), ("itakura", None)])
+def test_banded_matches_naive_in_the_same_band(band, radius):
+    a, b = trace(45, 3), trace(61, 4)
+    lo, hi = band_limits(len(a), len(b), band, radius)
+    result = dtw_distance(a, b, band=band, radius=radius)
+    assert result.distance == pytest.approx(naive_dtw(a, b, lo, hi), abs=1e-6)
+    assert result.distance >= naive_dtw(a, b) - 1e-6
+
+
+def test_band_limits_connect_corners():
+    for n, m in [(5, 200), (200, 5), (50, 50)]:
+        for band in ("none", "sakoe-chiba", "itakura"):
+            lo, hi = band_limits(n, m, band, 1)
+            assert lo[0] == 0 and hi[-1] == m
+            assert np.all(lo[1:] <= hi[:-1])  # Every row overlaps or touches the previous one
+
+
+def test_multiscale_is_an_upper_bound_that_converges():
+    a, b = trace(300, 5), trace(340, 6)
+    exact = dtw_distance(a, b).distance
+    approx = multiscale_dtw_distance(a, b, radius=2, min_size=20).distance
+    assert approx >= exact - 1e-6
+    assert multiscale_dtw_distance(a, b, radius=400, min_size=20).distance == pytest.approx(exact, abs=1e-6)
@@ -0,0 +1,17 @@
+from dashboard.utils.trace_store import TraceStore
+
+
+def test_window_longer_than_history_draws_every_point():
+    store = TraceStore()
+    for i in range(100):
+        store.append(36.1 + i * 1e-5, 128.3, "fixed-rtk", 1000.0 + i)
+    assert store.select(5000, t_start=900.0) == (0, 0, 100)
+    assert store.select(5000, t_start=1050.0) == (0, 50, 100)
+
+
+def test_evicted_window_falls_back_to_a_coarser_level():
+    store = TraceStore(max_points_per_level=64)
+    for i in range(1000):
+        store.append(36.1, 128.3, "fixed-rtk", float(i))
+    level, lo, hi = store.select(5000, t_start=0.0)
+    assert level > 0 and store.column(level, "time", lo, lo + 1)[0] < 64
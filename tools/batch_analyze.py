@@ -0,0 +1,200 @@
+"""Analyze a directory or glob of GNSS eval logs in parallel and write one summary table.
+
+    python tools/batch_analyze.py .gnss_log/ --output summary.parquet --workers 8
+    python tools/batch_analyze.py ".gnss_log/2025_06_12/*.csv" --pairs pairs.yaml --sync
+
+Each log gets the same metrics as the dashboard's log-analysis page plus
+HPE / ground-truth error statistics. Pairs to compare are given with
+``--pair A B`` or a YAML file::
+
+    pairs:
+      - name: f9k-vs-f9r
+        a: ss2/f9k_gnss_eval_192.168.10.137_50012_20250612_014323.csv
+        b: ss2/f9r_gnss_eval_192.168.10.137_50011_20250612_014328.csv
+
+Relative paths in the YAML file are resolved against the file's directory.
+Pair results go to ``<output stem>_pairs<ext>``.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+import pandas as pd
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.log_loader import TRACE_COLUMNS, iter_log_chunks, load_log
+from dashboard.utils.log_metrics import LogSummary, compare_logs
+
+OUTPUT_FORMATS = (".csv", ".parquet", ".json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-analyze GNSS eval logs in parallel.")
+    parser.add_argument('inputs', nargs='+', help='Log files, directories (searched recursively for *.csv) or glob patterns.')
+    parser.add_argument('--output', type=str, default='gnss_batch_summary.csv',
+                        help=f'Summary table path; format from the extension ({", ".join(OUTPUT_FORMATS)}).')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes. Default: number of CPUs.')
+    parser.add_argument('--fix-types', nargs='*', default=None, help='Only use fixes with these fix types. Default: all.')
+    parser.add_argument('--pair', nargs=2, action='append', default=[], metavar=('A', 'B'),
+                        help='Compare log B against log A (repeatable).')
+    parser.add_argument('--pairs', type=str, default=None, help='YAML file listing pairs to compare.')
+    parser.add_argument('--sync', action='store_true', help='Time-synchronize pairs (estimating the clock offset) before comparing.')
+    parser.add_argument('--max-offset', type=float, default=60.0, help='Largest clock offset searched with --sync, in seconds.')
+    parser.add_argument('--dtw-radius', type=int, default=None, help='Also compute multiscale DTW for pairs with this radius.')
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help='Stream each log in chunks of this many rows instead of loading it whole '
+                             '(bounded memory for logs larger than RAM; pairs are still loaded whole).')
+    parser.add_argument('--no-sidecar', action='store_true', help='Do not read or write Parquet sidecars next to the logs.')
+    return parser.parse_args(argv)
+
+
+def find_logs(inputs, suffixes=(".csv",)):
+    """Expand files, directories and glob patterns to a sorted list of unique paths with one of ``suffixes``"""
+    paths = set()
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            paths.update(p for p in path.rglob("*") if p.suffix in suffixes and p.is_file())
+        elif path.is_file():
+            paths.add(path)
+        else:
+            paths.update(Path(p) for p in glob.glob(pattern, recursive=True) if p.endswith(suffixes))
+    return sorted(p.resolve() for p in paths)
+
+
+def load_pairs(pairs_file, cli_pairs):
+    pairs = [(f"{Path(a).stem} vs {Path(b).stem}", Path(a), Path(b)) for a, b in cli_pairs]
+    if pairs_file:
+        base = Path(pairs_file).resolve().parent
+        with open(pairs_file, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        for entry in config.get("pairs", []):
+            a, b = base / entry["a"], base / entry["b"]
+            pairs.append((entry.get("name", f"{a.stem} vs {b.stem}"), a, b))
+    return [(name, a.resolve(), b.resolve()) for name, a, b in pairs]
+
+
+def _chunks(path, fix_types, use_sidecar, chunk_rows=None):
+    if chunk_rows:
+        chunks = iter_log_chunks(path, chunk_rows=chunk_rows, use_sidecar=use_sidecar)
+    else:
+        chunks = [load_log(path, use_sidecar=use_sidecar)]
+    for df in chunks:
+        missing = [col for col in TRACE_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Not a GNSS eval log, missing columns: {', '.join(missing)}")
+        if fix_types:
+            df = df[df["FixType"].astype(str).str.lower().isin(fix_types)]
+        yield df
+
+
+def _load(path, fix_types, use_sidecar):
+    return next(_chunks(path, fix_types, use_sidecar))
+
+
+def analyze_file(path, fix_types=None, use_sidecar=True, chunk_rows=None):
+    """Summary row for one log; failures are reported in the ``error`` column instead of raised"""
+    start = time.perf_counter()
+    row = {"file": str(path)}
+    try:
+        summary = LogSummary()
+        for df in _chunks(path, fix_types, use_sidecar, chunk_rows):
+            summary.update(df)
+        row.update(summary.row())
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["analysis_s"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def compare_pair(name, path_a, path_b, fix_types=None, use_sidecar=True, sync=False,
+                 max_offset_s=60.0, dtw_radius=None):
+    start = time.perf_counter()
+    row = {"pair": name, "file_a": str(path_a), "file_b": str(path_b)}
+    try:
+        row.update(compare_logs(_load(path_a, fix_types, use_sidecar), _load(path_b, fix_types, use_sidecar),
+                                sync=sync, max_offset_s=max_offset_s, dtw_radius=dtw_radius))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["analysis_s"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def run_parallel(fn, jobs, workers, label):
+    """Run ``fn(*job)`` for every job, in this process for one worker, and keep the job order"""
+    results = [None] * len(jobs)
+    if workers <= 1 or len(jobs) <= 1:
+        for i, job in enumerate(jobs):
+            results[i] = fn(*job)
+            print(f"[{label}] {i + 1}/{len(jobs)} done", end="\r")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fn, *job): i for i, job in enumerate(jobs)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                print(f"[{label}] {done}/{len(jobs)} done", end="\r")
+    if jobs:
+        print()
+    return results
+
+
+def run_batch(paths, workers=1, fix_types=None, use_sidecar=True, chunk_rows=None):
+    fix_types = [ft.lower() for ft in fix_types] if fix_types else None
+    jobs = [(path, fix_types, use_sidecar, chunk_rows) for path in paths]
+    return pd.DataFrame(run_parallel(analyze_file, jobs, workers, "Batch"))
+
+
+def run_pairs(pairs, workers=1, fix_types=None, use_sidecar=True, sync=False, max_offset_s=60.0, dtw_radius=None):
+    fix_types = [ft.lower() for ft in fix_types] if fix_types else None
+    jobs = [(name, a, b, fix_types, use_sidecar, sync, max_offset_s, dtw_radius) for name, a, b in pairs]
+    return pd.DataFrame(run_parallel(compare_pair, jobs, workers, "Pairs"))
+
+
+def write_table(df, path):
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif path.suffix == ".json":
+        df.to_json(path, orient="records", indent=2)
+    else:
+        df.to_csv(path, index=False)
+    print(f"[Batch] Wrote {len(df)} rows to {path}")
+
+
+def main(args=None):
+    args = parse_args() if args is None else args
+    output = Path(args.output)
+    if output.suffix not in OUTPUT_FORMATS:
+        raise SystemExit(f"Unsupported output format '{output.suffix}', expected one of {OUTPUT_FORMATS}")
+    paths = find_logs(args.inputs)
+    pairs = load_pairs(args.pairs, args.pair)
+    if not paths and not pairs:
+        raise SystemExit("No logs found.")
+    workers = max(1, args.workers or 1)
+    use_sidecar = not args.no_sidecar
+
+    if paths:
+        start = time.perf_counter()
+        summary = run_batch(paths, workers, args.fix_types, use_sidecar, args.chunk_rows)
+        elapsed = time.perf_counter() - start
+        failed = int(summary["error"].notna().sum()) if "error" in summary.columns else 0
+        print(f"[Batch] Analyzed {len(paths)} logs with {workers} workers in {elapsed:.2f} s "
+              f"({len(paths) / elapsed:.1f} logs/s), {failed} failed")
+        write_table(summary, output)
+
+    if pairs:
+        start = time.perf_counter()
+        pair_summary = run_pairs(pairs, workers, args.fix_types, use_sidecar, args.sync, args.max_offset, args.dtw_radius)
+        print(f"[Pairs] Compared {len(pairs)} pairs in {time.perf_counter() - start:.2f} s")
+        write_table(pair_summary, output.with_name(f"{output.stem}_pairs{output.suffix}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare two GNSS eval logs from the command line.
+
+    python tools/compare_2_traces.py reference.csv candidate.csv --sync --dtw-radius 10
+
+Prints the same comparison metrics as ``tools/batch_analyze.py --pair``.
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tools.batch_analyze import compare_pair
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare log B against reference log A.")
+    parser.add_argument('a', type=str, help='Reference log CSV.')
+    parser.add_argument('b', type=str, help='Log CSV to compare against the reference.')
+    parser.add_argument('--fix-types', nargs='*', default=None, help='Only use fixes with these fix types. Default: all.')
+    parser.add_argument('--sync', action='store_true', help='Time-synchronize the logs (estimating the clock offset) first.')
+    parser.add_argument('--max-offset', type=float, default=60.0, help='Largest clock offset searched with --sync, in seconds.')
+    parser.add_argument('--dtw-radius', type=int, default=None, help='Also compute multiscale DTW with this radius.')
+    parser.add_argument('--json', action='store_true', help='Print the metrics as JSON.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    a, b = Path(args.a).resolve(), Path(args.b).resolve()
+    fix_types = [ft.lower() for ft in args.fix_types] if args.fix_types else None
+    row = compare_pair(f"{a.stem} vs {b.stem}", a, b, fix_types=fix_types, sync=args.sync,
+                       max_offset_s=args.max_offset, dtw_radius=args.dtw_radius)
+    if args.json:
+        print(json.dumps(row, indent=2, default=float))
+        return
+    width = max(len(key) for key in row)
+    for key, value in row.items():
+        print(f"{key:<{width}}  {value:.4f}" if isinstance(value, float) else f"{key:<{width}}  {value}")
+    if "error" in row:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,20 @@
-import pandas as pd
+import sys
+import shutil
 import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.kml_tiles import TILE_POINTS, TileData, write_tiled_kmz
+from dashboard.utils.kml_writer import KmlWriter, format_coordinates
+from dashboard.utils.log_loader import DEFAULT_CHUNK_ROWS, iter_log_chunks
+from dashboard.utils.simplify import simplify_trace
 
 # Define all possible fix types
 ALL_FIX_TYPES = [
@@ -15,126 +30,128 @@ ALL_FIX_TYPES = [
 def parse_args():
     parser = argparse.ArgumentParser(description="Convert GNSS log files to KML format.")
     parser.add_argument('--input', type=str, required=True, help='Path to the input GNSS log file.')
-    parser.add_argument('--output', type=str, required=True, help='Path to the output KML file.')
+    parser.add_argument('--output', type=str, required=True, help='Path to the output KML file (.kmz writes a compressed KMZ).')
     parser.add_argument('--name', type=str, default='GNSS Log', help='Name for trace in KML file.')
     parser.add_argument('--downsample', type=int, default=1, help='Downsample: include every N-th point. Default: 1 (no downsampling).')
     parser.add_argument('--trace', action='store_true', help='Include a trace (line) connecting all points.')
+    parser.add_argument('--simplify', type=float, default=0.0,
+                       help='Simplify the trace line with this tolerance in meters (Douglas-Peucker). Replaces --downsample for the line. Default: 0 (off).')
     parser.add_argument('--placemark', action='store_true', help='Include a group of placemarks (points).')
     parser.add_argument('--fix-types', nargs='*', default=ALL_FIX_TYPES,
                        help=f'Only use points with these fix types. Default: all ({", ".join(ALL_FIX_TYPES)}).')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows read and written per chunk.')
+    parser.add_argument('--tiles', action='store_true',
+                       help='Write a KMZ of Region/NetworkLink quadtree tiles that Google Earth loads as they come into view.')
+    parser.add_argument('--tile-points', type=int, default=TILE_POINTS, help=f'Placemarks per tile with --tiles. Default: {TILE_POINTS}.')
+    parser.add_argument('--workers', type=int, default=None, help='Processes rendering tiles with --tiles. Default: CPU count.')
     return parser.parse_args()
 
-def get_color(fix_type):
-    color_map = {
-        'extrapolated': 'ff0000ff',     # Red
-        'no-fix': 'ff7f7f7f',           # Gray
-        'no-rtk': 'ff00ffff',           # Cyan
-        'float-rtk': 'ff00ff00',        # Green
-        'fixed-rtk': 'ffff0000',        # Blue
-        'dead-reckoning': 'ffff00ff'    # Magenta
-    }
-    return color_map.get(fix_type.lower(), "ffffffff")  # default: white
+def iter_selected_points(path, fix_types, downsample, chunk_rows):
+    """Yield (numbers, lats, lons, fix types, all lats, all lons) per chunk of the log.
+
+    ``numbers`` are positions among the rows matching ``fix_types`` and only
+    every ``downsample``-th of them is returned; the "all" arrays hold every
+    matching row (used to simplify the trace).
+    """
+    selected = {ft.lower() for ft in fix_types}
+    offset = 0  # Matching rows in earlier chunks
+    for chunk in iter_log_chunks(path, columns=['Latitude', 'Longitude', 'FixType'], chunk_rows=chunk_rows):
+        fix = chunk['FixType'].astype('category')
+        allowed = np.append(fix.cat.categories.str.lower().isin(selected), False)  # Code -1 (missing) is never selected
+        rows = np.flatnonzero(allowed[fix.cat.codes.to_numpy()])
+        lats = chunk['Latitude'].to_numpy()[rows]
+        lons = chunk['Longitude'].to_numpy()[rows]
+        first = -offset % downsample
+        keep = slice(first, None, downsample)
+        numbers = np.arange(offset + first, offset + len(rows), downsample)
+        yield numbers, lats[keep], lons[keep], fix.iloc[rows[keep]].array, lats, lons
+        offset += len(rows)
+
+def write_tiles(args, downsample):
+    """Collect the selected points and trace, then write them as a tiled KMZ"""
+    numbers, lats, lons, fix_types, track_lats, track_lons = [], [], [], [], [], []
+    for chunk_numbers, chunk_lats, chunk_lons, chunk_fix, all_lats, all_lons in iter_selected_points(
+            args.input, args.fix_types, downsample, args.chunk_rows):
+        if args.placemark:
+            numbers.append(chunk_numbers)
+            lats.append(chunk_lats)
+            lons.append(chunk_lons)
+            fix_types.append(pd.Categorical(chunk_fix))
+        if args.trace:
+            # The trace follows the same points as without tiles; leaves apply --simplify themselves
+            track_lats.append(all_lats if args.simplify > 0 else chunk_lats)
+            track_lons.append(all_lons if args.simplify > 0 else chunk_lons)
+
+    def join(arrays, dtype):
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+
+    data = TileData(
+        point_numbers=join(numbers, np.int64),
+        point_lats=join(lats, np.float64),
+        point_lons=join(lons, np.float64),
+        point_fix_types=union_categoricals(fix_types) if fix_types else pd.Categorical([]),
+        track_lats=join(track_lats, np.float64),
+        track_lons=join(track_lons, np.float64),
+    )
+    summary = write_tiled_kmz(args.output, data, args.name, tile_points=max(1, args.tile_points),
+                              simplify_m=max(0.0, args.simplify), workers=args.workers)
+    print(f"Wrote {summary['tiles']} tiles in {summary['levels']} levels "
+          f"({summary['points']} placemarks, {summary['track_points']} trace points)")
 
 def main(args=None):
     args = parse_args() if args is None else args
-
-    # Read the CSV file
-    df = pd.read_csv(args.input)
-
-    # Filter by fix type (args.fix_types is already a list)
-    selected_types = [ft.lower() for ft in args.fix_types]
-    df = df[df['FixType'].str.lower().isin(selected_types)]
-
-    # Reset index for clean downsampling (optional, but recommended for clarity)
-    df = df.reset_index(drop=True)
-
-    # KML header
-    kml_header = f"""<?xml version="1.0" encoding="UTF-8"?>
-<kml xmlns="http://www.opengis.net/kml/2.2">
-  <Document>
-    <name>{args.name}</name>
-"""
-
-    # Prepare placemarks and track coordinates
-    placemarks = []
-    track_coords = []
-    for idx, row in df.iterrows():
-        if idx % args.downsample != 0:
-            continue
-
-        lat = row['Latitude']
-        lon = row['Longitude']
-        fix_type = row['FixType']
-        color = get_color(fix_type)
-        point_name = f"{args.name} {idx}"
-
+    downsample = max(1, args.downsample)
+    simplify = args.trace and args.simplify > 0
+
+    if args.tiles:
+        if Path(args.output).suffix.lower() != '.kmz':
+            raise SystemExit("--tiles writes a KMZ; use an output path ending in .kmz")
+        write_tiles(args, downsample)
+        print(f"KML file generated: {args.output}")
+        return
+
+    # Points and the trace are written in one pass over the log. The trace comes after the
+    # points folder, so with both its coordinates are spooled to a temporary file first.
+    with KmlWriter(args.output, args.name) as kml, tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        kml.write_styles(args.fix_types)
         if args.placemark:
-            placemark = f"""
-      <Placemark>
-        <name>{point_name}</name>
-        <description>FixType: {fix_type}</description>
-        <Style>
-          <IconStyle>
-            <color>{color}</color>
-            <scale>0.6</scale>
-            <Icon>
-              <href>http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png</href>
-            </Icon>
-          </IconStyle>
-        </Style>
-        <Point>
-          <coordinates>{lon},{lat},0</coordinates>
-        </Point>
-      </Placemark>
-"""
-            placemarks.append(placemark)
-        if args.trace:
-            track_coords.append(f"{lon},{lat},0")
-
-    # Add placemark group if requested
-    points_group = ""
-    if args.placemark:
-        points_group = f"""
-    <Folder>
-      <name>{args.name} Points</name>
-      {''.join(placemarks)}
-    </Folder>
-"""
-
-    # Add trace if requested
-    track_kml = ""
-    if args.trace and track_coords:
-        track_kml = f"""
-    <Placemark>
-      <name>GNSS Track</name>
-      <Style>
-        <LineStyle>
-          <color>ff00ffff</color>
-          <width>2</width>
-        </LineStyle>
-      </Style>
-      <LineString>
-        <coordinates>
-          {' '.join(track_coords)}
-        </coordinates>
-      </LineString>
-    </Placemark>
-"""
-
-    # KML footer
-    kml_footer = """
-  </Document>
-</kml>
-"""
-
-    # Write to file
-    with open(args.output, 'w', encoding='utf-8') as f:
-        f.write(kml_header)
+            kml.begin_folder(f"{args.name} Points")
+        track = spool if args.placemark else kml  # Where streamed trace coordinates go
+        track_points = 0
+        simplify_lats, simplify_lons = [], []
+
+        for numbers, lats, lons, fix_types, all_lats, all_lons in iter_selected_points(
+                args.input, args.fix_types, downsample, args.chunk_rows):
+            if args.placemark:
+                kml.write_points(numbers, lats, lons, fix_types)
+            if simplify:
+                simplify_lats.append(all_lats)
+                simplify_lons.append(all_lons)
+            elif args.trace and len(lats):
+                if track is kml and not track_points:
+                    kml.begin_line("GNSS Track")
+                track.write(format_coordinates(lats, lons))
+                track_points += len(lats)
+
         if args.placemark:
-            f.write(points_group)
-        if args.trace:
-            f.write(track_kml)
-        f.write(kml_footer)
+            kml.end_folder()
+
+        if simplify:
+            # Douglas-Peucker needs the whole trace; only its lat/lon arrays are kept
+            lats, lons = np.concatenate(simplify_lats or [[]]), np.concatenate(simplify_lons or [[]])
+            simplified = simplify_trace(lats, lons, args.simplify)
+            if len(simplified.indices):
+                kml.begin_line("GNSS Track")
+                kml.write_line_coordinates(lats[simplified.indices], lons[simplified.indices])
+                kml.end_line()
+            print(f"Trace simplified: kept {len(simplified.indices)} of {len(lats)} points, "
+                  f"dropped {simplified.dropped}, max deviation {simplified.max_deviation_m:.3f} m")
+        elif args.trace and track_points:
+            if args.placemark:
+                kml.begin_line("GNSS Track")
+                spool.seek(0)
+                shutil.copyfileobj(spool, kml)
+            kml.end_line()
 
     print(f"KML file generated: {args.output}")
 
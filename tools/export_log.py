@@ -0,0 +1,42 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.log_exporters import DEFAULT_UTC_OFFSET_HOURS, EXPORTERS, export_log, exporter_for
+from dashboard.utils.log_loader import DEFAULT_CHUNK_ROWS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export a GNSS eval log to GeoJSON, GPX, Parquet and/or CSV in one pass.")
+    parser.add_argument('--input', type=str, required=True, help='Path to the input GNSS log file (CSV or Parquet).')
+    parser.add_argument('--output', type=str, nargs='+', required=True,
+                        help=f'Output files; the format follows the suffix ({", ".join(sorted(EXPORTERS))}).')
+    parser.add_argument('--name', type=str, default='GNSS Log', help='Track name in GPX output.')
+    parser.add_argument('--fix-types', nargs='*', default=None, help='Only export rows with these fix types. Default: all.')
+    parser.add_argument('--utc-offset', type=float, default=DEFAULT_UTC_OFFSET_HOURS,
+                        help=f'Hours the log timestamps are ahead of UTC, for GPX times. Default: {DEFAULT_UTC_OFFSET_HOURS:g} (KST).')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows read and written per chunk.')
+    return parser.parse_args()
+
+
+def main(args=None):
+    args = parse_args() if args is None else args
+    try:
+        exporters = [exporter_for(path, args.name, utc_offset_hours=args.utc_offset) for path in args.output]
+    except (ValueError, RuntimeError) as e:
+        raise SystemExit(str(e))
+
+    start = time.perf_counter()
+    rows = export_log(args.input, exporters, fix_types=args.fix_types, chunk_rows=args.chunk_rows)
+    elapsed = time.perf_counter() - start
+    for exporter in exporters:
+        print(f"Wrote {exporter.rows} rows to {exporter.path}")
+    print(f"Exported {rows} rows in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
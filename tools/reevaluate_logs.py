@@ -0,0 +1,167 @@
+"""Re-score recorded GNSS fixes against a new ground truth and write new eval logs.
+
+    python tools/reevaluate_logs.py .gnss_log/2025_06_12/ --gt-lat 36.116601 --gt-lon 128.364712 --output-dir rescored/
+    python tools/reevaluate_logs.py drive.csv --gt-trajectory reference.csv --gt-offset 0.2 --output drive_rescored.parquet
+    python tools/reevaluate_logs.py capture.nmea capture.jsonl --gt-lat 36.1166 --gt-lon 128.3647 --output-dir rescored/
+
+Inputs are client logs (CSV or Parquet) or raw stream captures: the
+streamer's JSON lines (``.jsonl``/``.ndjson``) or a receiver's NMEA sentences
+(``.nmea``), e.g. saved with ``nc <host> <port> > capture.jsonl``. Every row
+gets HPE / northing / easting error recomputed in vectorized chunks against
+a static point (``--gt-lat``/``--gt-lon``) or a reference trajectory
+(``--gt-trajectory``, any log with TimestampKST/Latitude/Longitude,
+interpolated at each row's time). Rows the ground truth does not cover get
+N/A. The other columns are kept; captures have no message rate (N/A).
+
+Files are processed in parallel, one per worker process. Each output keeps
+its input's name in ``--output-dir`` (CSV for raw captures unless
+``--format`` says otherwise), or goes to ``--output`` for a single input.
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.log_exporters import exporter_for
+from dashboard.utils.log_loader import DEFAULT_CHUNK_ROWS, SIDECAR_SUFFIX
+from dashboard.utils.reevaluate import (RAW_FORMATS, StaticGroundTruth, TrajectoryGroundTruth, iter_input_chunks,
+                                        output_path, reevaluate_chunk)
+from tools.batch_analyze import find_logs, run_parallel, write_table
+
+INPUT_SUFFIXES = (".csv", ".parquet") + tuple(RAW_FORMATS)
+OUTPUT_FORMATS = ("csv", "parquet")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute GNSS eval errors against a new ground truth.")
+    parser.add_argument('inputs', nargs='+',
+                        help=f'Logs or captures ({", ".join(INPUT_SUFFIXES)}), directories (searched recursively) or glob patterns.')
+    gt = parser.add_argument_group('Ground truth (a static point or a trajectory)')
+    gt.add_argument('--gt-lat', type=float, default=None, help='Ground truth latitude.')
+    gt.add_argument('--gt-lon', type=float, default=None, help='Ground truth longitude.')
+    gt.add_argument('--gt-trajectory', type=str, default=None, help='Reference log (CSV or Parquet) interpolated at each row time.')
+    gt.add_argument('--gt-offset', type=float, default=0.0,
+                    help='Reference clock minus the inputs\' clock, in seconds (e.g. from tools/compare_2_traces.py --sync).')
+    gt.add_argument('--gt-max-gap', type=float, default=1.0, help='Largest reference gap interpolated across, in seconds.')
+    out = parser.add_argument_group('Output')
+    out.add_argument('--output', type=str, default=None, help='Output file for a single input (.csv or .parquet).')
+    out.add_argument('--output-dir', type=str, default=None, help='Directory for the outputs, named after the inputs.')
+    out.add_argument('--format', choices=OUTPUT_FORMATS, default=None,
+                     help='Output format with --output-dir. Default: the input\'s (CSV for raw captures).')
+    out.add_argument('--summary', type=str, default=None, help='Also write the per-file summary table (.csv, .parquet or .json).')
+    parser.add_argument('--input-format', choices=sorted(set(RAW_FORMATS.values())), default=None,
+                        help='Read every input as this raw capture format regardless of its suffix.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes. Default: number of CPUs.')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help='Rows evaluated and written per chunk.')
+    parser.add_argument('--no-sidecar', action='store_true', help='Do not read or write Parquet sidecars next to CSV logs.')
+    return parser.parse_args(argv)
+
+
+def ground_truth_from_args(args):
+    if args.gt_trajectory:
+        if args.gt_lat is not None or args.gt_lon is not None:
+            raise SystemExit("Give either --gt-lat/--gt-lon or --gt-trajectory, not both.")
+        return TrajectoryGroundTruth.from_log(args.gt_trajectory, args.gt_offset, args.gt_max_gap)
+    if args.gt_lat is None or args.gt_lon is None:
+        raise SystemExit("A ground truth is needed: --gt-lat and --gt-lon, or --gt-trajectory.")
+    return StaticGroundTruth(args.gt_lat, args.gt_lon)
+
+
+def find_inputs(inputs):
+    """Logs and captures, without the Parquet sidecars of CSV logs that are inputs themselves"""
+    paths = find_logs(inputs, INPUT_SUFFIXES)
+    listed = set(paths)
+    return [p for p in paths if not (p.name.endswith(".csv" + SIDECAR_SUFFIX) and p.with_suffix("") in listed)]
+
+
+def plan_outputs(paths, args):
+    """(input, output) pairs; refuses to overwrite an input or to write two inputs to one file"""
+    if args.output:
+        if len(paths) != 1:
+            raise SystemExit(f"--output takes a single input ({len(paths)} found); use --output-dir.")
+        outputs = [Path(args.output).resolve()]
+    elif args.output_dir:
+        suffix = f".{args.format}" if args.format else None
+        outputs = [output_path(path, args.output_dir, suffix).resolve() for path in paths]
+    else:
+        raise SystemExit("Give --output or --output-dir.")
+    if len(set(outputs)) != len(outputs):
+        raise SystemExit("Several inputs have the same name; re-evaluate them into different --output-dir.")
+    for path, output in zip(paths, outputs):
+        if output == path:
+            raise SystemExit(f"{path} would be overwritten; choose another --output-dir.")
+        if output.suffix not in (".csv", ".parquet"):
+            raise SystemExit(f"Unsupported output format '{output.suffix}', expected .csv or .parquet")
+    return list(zip(paths, outputs))
+
+
+def reevaluate_file(source, output, ground_truth, input_format=None, chunk_rows=DEFAULT_CHUNK_ROWS, use_sidecar=True):
+    """Re-evaluate one input into ``output``; failures are reported in the ``error`` column instead of raised"""
+    start = time.perf_counter()
+    row = {"file": str(source), "output": str(output)}
+    rows = evaluated = 0
+    hpe_sum, hpe_max = 0.0, np.nan
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with exporter_for(output, Path(source).stem) as exporter:
+            for chunk in iter_input_chunks(source, input_format, chunk_rows, use_sidecar):
+                chunk = reevaluate_chunk(chunk, ground_truth)
+                exporter.write(chunk)
+                hpe = chunk["HPE(m)"].to_numpy(dtype=np.float64)
+                hpe = hpe[np.isfinite(hpe)]
+                rows += len(chunk)
+                evaluated += len(hpe)
+                if len(hpe):
+                    hpe_sum += float(hpe.sum())
+                    hpe_max = np.fmax(hpe_max, hpe.max())
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    row.update({
+        "rows": rows,
+        "evaluated": evaluated,
+        "hpe_mean_m": round(hpe_sum / evaluated, 4) if evaluated else None,
+        "hpe_max_m": round(float(hpe_max), 4) if evaluated else None,
+        "seconds": round(elapsed, 4),
+    })
+    return row
+
+
+def main(args=None):
+    args = parse_args() if args is None else args
+    ground_truth = ground_truth_from_args(args)
+    paths = find_inputs(args.inputs)
+    if not paths:
+        raise SystemExit("No logs or captures found.")
+    jobs = [(source, output, ground_truth, args.input_format, args.chunk_rows, not args.no_sidecar)
+            for source, output in plan_outputs(paths, args)]
+    workers = max(1, args.workers or 1)
+
+    print(f"[Reevaluate] {len(jobs)} input(s) against the {ground_truth.describe()} with {min(workers, len(jobs))} worker(s)")
+    start = time.perf_counter()
+    summary = run_parallel(reevaluate_file, jobs, workers, "Reevaluate")
+    elapsed = time.perf_counter() - start
+    rows = sum(row["rows"] for row in summary)
+    for row in summary:
+        if "error" in row:
+            print(f"  FAILED {row['file']}: {row['error']}")
+        else:
+            print(f"  {row['file']} -> {row['output']}: {row['rows']} rows, {row['evaluated']} with ground truth, "
+                  f"mean HPE {row['hpe_mean_m'] if row['hpe_mean_m'] is not None else 'N/A'} m")
+    failed = sum("error" in row for row in summary)
+    print(f"[Reevaluate] {rows} rows in {elapsed:.2f} s ({rows / elapsed * 60 / 1e6:.1f} M rows/min), {failed} failed")
+    if args.summary:
+        write_table(pd.DataFrame(summary), args.summary)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,305 @@
-import socket
-import argparse
+"""Throughput and latency probe for the GNSS TCP streamer.
+
+    python tools/tcp_client.py --host 127.0.0.1 --port 50012 --connections 4 --duration 30 --json probe.json
+
+Opens ``--connections`` concurrent connections, all read by one selector
+thread of the shared ingest loop (``dashboard/utils/gnss_ingest.py``), and measures, per connection: message and byte rates, a histogram
+of message inter-arrival times (jitter), and gaps, reorderings and duplicates
+in the ``--seq-field`` of the messages (``gnss_time``, HHMMSS.sss, by
+default). A message that arrives after a later one counts as reordered; the
+gap it left when the later one arrived is counted too. Payloads are only
+printed with ``--print``.
+
+Messages that arrive in the same ``recv()`` share its arrival time: the first
+of them gets the time since the previous read, the others 0 ms.
+"""
+import re
+import sys
+import json
 import time
+import logging
+import threading
+import argparse
+from typing import Optional
 
-def main():
-    parser = argparse.ArgumentParser(description="Simple TCP client for GNSS data with message rate display.")
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from dashboard.utils.gnss_ingest import IngestLoop, RawSink, StopEvent, decode_lines, start_ingest_thread
+
+# Inter-arrival histogram bucket edges in milliseconds; the last bucket is open-ended
+INTERARRIVAL_EDGES_MS = [0, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+# Sequence steps used to learn the message period when --period is not given
+PERIOD_SAMPLES = 32
+SECONDS_PER_DAY = 86400
+
+probe_logger = logging.getLogger("GNSS Probe")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure message rate, jitter and gaps of the GNSS TCP streamer.")
     parser.add_argument('--host', type=str, default='127.0.0.1', help='Server IP address (default: 127.0.0.1)')
     parser.add_argument('--port', type=int, default=50012, help='Server port (default: 50012)')
-    parser.add_argument('--rate-interval', type=float, default=1.0, help='Interval (seconds) to display message rate (default: 1.0)')
-    args = parser.parse_args()
+    parser.add_argument('--connections', type=int, default=1, help='Concurrent connections (default: 1)')
+    parser.add_argument('--duration', type=float, default=0.0, help='Seconds to measure; 0 runs until the server closes or Ctrl+C (default: 0)')
+    parser.add_argument('--rate-interval', type=float, default=1.0, help='Interval (seconds) to display the total message rate; 0 disables it (default: 1.0)')
+    parser.add_argument('--print', dest='print_messages', action='store_true', help='Print every received message (slow at high rates)')
+    parser.add_argument('--seq-field', type=str, default='gnss_time', help='JSON field ordering the messages (default: gnss_time)')
+    parser.add_argument('--seq-format', choices=['hhmmss', 'number'], default='hhmmss',
+                        help='hhmmss: time of day as HHMMSS.sss, wrapping at midnight; number: plain counter (default: hhmmss)')
+    parser.add_argument('--period', type=float, default=None,
+                        help=f'Expected sequence step between messages; learned from the first {PERIOD_SAMPLES} steps if not given')
+    parser.add_argument('--gap-factor', type=float, default=1.5, help='A step larger than this many periods is a gap (default: 1.5)')
+    parser.add_argument('--json', type=str, default=None, help='Write the results as JSON to this path')
+    return parser.parse_args()
+
+
+def hhmmss_seconds(values: np.ndarray) -> np.ndarray:
+    """HHMMSS.sss time-of-day values as seconds of the day"""
+    whole = np.floor(values)
+    hours, rest = np.divmod(whole, 10000)
+    minutes, seconds = np.divmod(rest, 100)
+    return hours * 3600 + minutes * 60 + seconds + (values - whole)
+
+
+class ConnectionStats:
+    """Counters of one connection; everything is updated per read, vectorized over its messages"""
+
+    def __init__(self, index: int, seq_field: str, seq_format: str, period: Optional[float], gap_factor: float):
+        self.index = index
+        self.messages = 0
+        self.bytes = 0
+        self.first_time = None
+        self.last_time = None
+        self.error = None
+
+        self.histogram = np.zeros(len(INTERARRIVAL_EDGES_MS), dtype=np.int64)
+        self.interarrival_sum = 0.0
+        self.interarrival_square_sum = 0.0
+        self.interarrival_max = 0.0
+        self.intervals = 0
+
+        self.seq_format = seq_format
+        self.seq_pattern = re.compile(rb'"' + re.escape(seq_field.encode()) + rb'"\s*:\s*"?(-?[0-9]+(?:\.[0-9]*)?)')
+        self.period = period
+        self.gap_factor = gap_factor
+        self.period_steps = []
+        self.seq_max = None         # Largest (unwrapped) sequence value so far
+        self.seq_last_raw = None    # Last value as received, to detect the midnight wrap
+        self.seq_offset = 0.0       # Days added by midnight wraps, in seconds
+        self.seq_values = 0
+        self.gaps = 0
+        self.missing = 0
+        self.reordered = 0
+        self.duplicates = 0
+
+    def add(self, now: float, payload: bytes, count: int):
+        """Account for ``count`` complete messages in ``payload`` that arrived at ``now``"""
+        if self.first_time is None:
+            self.first_time = now
+        elif count:
+            interval_ms = (now - self.last_time) * 1000
+            self.histogram[np.searchsorted(INTERARRIVAL_EDGES_MS, interval_ms, side="right") - 1] += 1
+            self.histogram[0] += count - 1
+            self.interarrival_sum += interval_ms
+            self.interarrival_square_sum += interval_ms * interval_ms
+            self.interarrival_max = max(self.interarrival_max, interval_ms)
+            self.intervals += count
+        if count:
+            self.last_time = now
+        self.messages += count
+        self.bytes += len(payload)
+        self._add_sequence(payload)
+
+    def _add_sequence(self, payload: bytes):
+        found = self.seq_pattern.findall(payload)
+        if not found:
+            return
+        values = np.array([float(value) for value in found])
+        self.seq_values += len(values)
+        if self.seq_format == "hhmmss":
+            values = hhmmss_seconds(values)
+            # A step back of more than half a day is the clock passing midnight, not a reordering
+            previous = np.concatenate(([values[0] if self.seq_last_raw is None else self.seq_last_raw], values[:-1]))
+            self.seq_last_raw = values[-1]
+            wraps = np.cumsum(values - previous < -SECONDS_PER_DAY / 2) * SECONDS_PER_DAY
+            values = values + wraps + self.seq_offset
+            self.seq_offset += wraps[-1]
 
-    HOST = args.host
-    PORT = args.port
-    RATE_INTERVAL = args.rate_interval
+        running_max = np.maximum.accumulate(np.concatenate(([-np.inf if self.seq_max is None else self.seq_max], values)))
+        before = running_max[:-1]
+        self.seq_max = running_max[-1]
+        steps = values - before
+        first = self.seq_values == len(values)  # The very first value has no step
+        if first:
+            steps = steps[1:]
+        self.duplicates += int(np.count_nonzero(steps == 0))
+        self.reordered += int(np.count_nonzero(steps < 0))
+        forward = steps[steps > 0]
 
+        if self.period is None:
+            learn = forward[:PERIOD_SAMPLES - len(self.period_steps)]
+            self.period_steps.extend(learn.tolist())
+            if len(self.period_steps) < PERIOD_SAMPLES:
+                return
+            self.period = float(np.median(self.period_steps))
+            forward = forward[len(learn):]
+        gaps = forward[forward > self.gap_factor * self.period]
+        self.gaps += len(gaps)
+        self.missing += int(np.round(gaps / self.period).sum()) - len(gaps)
+
+    def duration(self) -> float:
+        if self.first_time is None:
+            return 0.0
+        return self.last_time - self.first_time
+
+    def result(self) -> dict:
+        duration = self.duration()
+        mean = self.interarrival_sum / self.intervals if self.intervals else None
+        std = None
+        if self.intervals:
+            std = float(np.sqrt(max(self.interarrival_square_sum / self.intervals - mean * mean, 0.0)))
+        return {
+            "connection": self.index,
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "duration_s": round(duration, 6),
+            "messages_per_s": round(self.messages / duration, 3) if duration > 0 else None,
+            "bytes_per_s": round(self.bytes / duration, 3) if duration > 0 else None,
+            "interarrival_ms": {
+                "mean": mean,
+                "jitter_std": std,
+                "max": self.interarrival_max if self.intervals else None,
+                "histogram": {"edges": INTERARRIVAL_EDGES_MS, "counts": self.histogram.tolist()},
+            },
+            "sequence": {
+                "values": self.seq_values,
+                "period": self.period,
+                "gaps": self.gaps,
+                "missing": self.missing,
+                "reordered": self.reordered,
+                "duplicates": self.duplicates,
+            },
+            "error": self.error,
+        }
+
+
+class ProbeSink(RawSink):
+    """Feeds each read's undecoded block of lines to a connection's ConnectionStats"""
+
+    def __init__(self, stats: ConnectionStats, print_messages: bool):
+        self.stats = stats
+        self.print_messages = print_messages
+
+    def put_block(self, block: bytes, count: int, now: float):
+        self.stats.add(now, block, count)
+        if self.print_messages:
+            for line in decode_lines(block)[0]:
+                print(f"[{self.stats.index}] {line}")
+
+
+def report_rates(connections, interval: float, stop: StopEvent, deadline: Optional[float]):
+    """Print the total rate every ``interval`` seconds until ``stop`` is set or ``deadline`` passes"""
+    last_messages, last_bytes, last_time = 0, 0, time.perf_counter()
+    while not stop.is_set():
+        wait = interval if interval > 0 else None
+        if deadline is not None:
+            wait = max(0.0, min(deadline - time.perf_counter(), wait if wait is not None else float("inf")))
+        if stop.wait(wait):
+            break
+        now = time.perf_counter()
+        if deadline is not None and now >= deadline:
+            break
+        messages = sum(c.messages for c in connections)
+        total_bytes = sum(c.bytes for c in connections)
+        elapsed = now - last_time
+        print(f"Message rate: {(messages - last_messages) / elapsed:.2f} messages/sec, "
+              f"{(total_bytes - last_bytes) / elapsed / 1e3:.1f} kB/sec over {len(connections)} connection(s)")
+        last_messages, last_bytes, last_time = messages, total_bytes, now
+
+
+def run_probe(args) -> list:
+    stop = StopEvent()
+    loop = IngestLoop(stop_event=stop, logger=probe_logger)
+    connections = [ConnectionStats(i, args.seq_field, args.seq_format, args.period, args.gap_factor)
+                   for i in range(max(1, args.connections))]
+    for stats in connections:
+        try:
+            loop.connect(args.host, args.port, ProbeSink(stats, args.print_messages), name=f"[{stats.index}]")
+            print(f"[{stats.index}] Connected to server at {args.host}:{args.port}.")
+        except OSError as e:
+            stats.error = f"Connection failed: {e}"
+            print(f"[{stats.index}] {stats.error}")
+
+    # All connections are read by one selector thread; this thread only reports and waits
+    reader = start_ingest_thread(loop, name="TcpProbe")
+    watcher = threading.Thread(target=lambda: (reader.join(), stop.set()), daemon=True)
+    watcher.start()
+    deadline = time.perf_counter() + args.duration if args.duration > 0 else None
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((HOST, PORT))
-            print(f"Connected to server at {HOST}:{PORT}.")
-
-            msg_count = 0
-            start_time = time.time()
-
-            while True:
-                data = s.recv(4096)
-                if not data:
-                    print("Server closed connection.")
-                    break
-                print("Received:", data.decode('utf-8').strip())
-                msg_count += 1
-
-                elapsed = time.time() - start_time
-                if elapsed >= RATE_INTERVAL:
-                    rate = msg_count / elapsed
-                    print(f"Message rate: {rate:.2f} messages/sec")
-                    msg_count = 0
-                    start_time = time.time()
-
-    except ConnectionRefusedError:
-        print("Connection refused. Ensure the server is running and the host/port are correct.")
+        report_rates(connections, args.rate_interval, stop, deadline)
     except KeyboardInterrupt:
         print("Client stopped by user.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    stop.set()
+    reader.join()
+    return [c.result() for c in connections]
+
+
+def summarize(results: list) -> dict:
+    """Totals over all connections; rates are summed, the span covers the whole run"""
+    total = {key: sum(r[key] for r in results) for key in ("messages", "bytes")}
+    total["messages_per_s"] = round(sum(r["messages_per_s"] or 0 for r in results), 3)
+    total["bytes_per_s"] = round(sum(r["bytes_per_s"] or 0 for r in results), 3)
+    for key in ("gaps", "missing", "reordered", "duplicates"):
+        total[key] = sum(r["sequence"][key] for r in results)
+    total["failed_connections"] = sum(r["error"] is not None for r in results)
+    return total
+
+
+def print_report(results: list, total: dict):
+    print(f"\n{'conn':>4} {'messages':>10} {'msg/s':>10} {'kB/s':>10} {'mean ms':>8} {'jitter ms':>9} "
+          f"{'max ms':>8} {'gaps':>6} {'missing':>8} {'reorder':>8} {'dup':>6}")
+    for r in results:
+        ia = r["interarrival_ms"]
+        seq = r["sequence"]
+
+        def num(value, spec):
+            return format(value, spec) if value is not None else "-"
+
+        print(f"{r['connection']:>4} {r['messages']:>10} {num(r['messages_per_s'], '>10.1f')} "
+              f"{num(r['bytes_per_s'] and r['bytes_per_s'] / 1e3, '>10.1f')} {num(ia['mean'], '>8.2f')} "
+              f"{num(ia['jitter_std'], '>9.2f')} {num(ia['max'], '>8.1f')} {seq['gaps']:>6} {seq['missing']:>8} "
+              f"{seq['reordered']:>8} {seq['duplicates']:>6}")
+    print(f"{'all':>4} {total['messages']:>10} {total['messages_per_s']:>10.1f} {total['bytes_per_s'] / 1e3:>10.1f} "
+          f"{'':>8} {'':>9} {'':>8} {total['gaps']:>6} {total['missing']:>8} {total['reordered']:>8} {total['duplicates']:>6}")
+    if results:
+        print("\nInter-arrival histogram (all connections):")
+        counts = np.sum([r["interarrival_ms"]["histogram"]["counts"] for r in results], axis=0)
+        edges = INTERARRIVAL_EDGES_MS + [None]
+        for low, high, count in zip(edges[:-1], edges[1:], counts):
+            label = f"{low:g}-{high:g} ms" if high is not None else f">= {low:g} ms"
+            print(f"  {label:>14} {count:>10}")
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run_probe(args)
+    total = summarize(results)
+    print_report(results, total)
+    if args.json:
+        config = {key: getattr(args, key) for key in
+                  ("host", "port", "connections", "duration", "seq_field", "seq_format", "period", "gap_factor")}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "total": total, "connections": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    if total["failed_connections"] == len(results):
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()